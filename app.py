@@ -28,27 +28,42 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from utils import http_client
+from utils.swr_cache import stale_while_revalidate, format_freshness
+from utils.single_flight import get_coalescing_stats
+from utils.flight_tracking import get_flight_status, get_flight_history, get_flight_tracker
+from utils.hourly_weather import HourlyWeather, conditions_at, fetch_weather
+from utils.tide_series import TideSeries, SERIES_STEP_MINUTES, format_window
+from utils.schedule_index import ScheduleIndex, DEFAULT_DURATION_MINUTES
+from utils.activity_model import Activity, ActivityType, normalize_activities
+from utils.time_parsing import format_clock, parse_clock, parse_duration, parse_durations
+from utils.trip_optimizer import day_slots, plan_trip
 import json
 import os
 import hashlib
 import re
+import math
 import base64
 import io
 from typing import Dict, List, Any, Optional
 import folium
 from streamlit_folium import st_folium
-from geopy.distance import geodesic
 import qrcode
 from PIL import Image
 import pytz
 import pickle
 
 # GitHub storage system (replaces SQLite database)
-from github_storage import get_trip_data, save_trip_data, load_data_from_github
+from github_storage import (
+    get_trip_data, save_trip_data, load_data_from_github, reload_trip_data,
+    retry_pending_saves, get_save_status
+)
 from data_operations import (
     save_meal_proposal, get_meal_proposal, save_john_meal_vote, finalize_meal_choice,
+    reset_meal_proposal, delete_meal_proposal,
     save_activity_proposal, get_activity_proposal, save_john_activity_vote, finalize_activity_choice,
+    reset_activity_proposal, delete_activity_proposal,
     load_john_preferences, save_john_preference,
     add_alcohol_request, get_alcohol_requests, delete_alcohol_request, mark_alcohol_purchased,
     save_custom_activity, load_custom_activities, delete_custom_activity,
@@ -92,7 +107,6 @@ try:
         generate_static_map_url
     )
     from utils.flight_tracking import (
-        get_flight_status,
         get_historical_performance,
         render_flight_status_card,
         get_flight_alerts
@@ -206,46 +220,8 @@ TRIP_CONFIG = {
 
 def parse_duration_to_minutes(duration_str):
     """Parse duration string like '1.5 hours', '2-3 hours', '45min-1 hour' to average minutes"""
-    if not duration_str or duration_str == "N/A":
-        return 60  # Default 1 hour
-
-    duration_str = duration_str.lower().strip()
-
-    # Handle ranges like "2-3 hours" or "1-1.5 hours" or "45min-1 hour"
-    if '-' in duration_str:
-        parts = duration_str.split('-')
-        try:
-            # Parse each part separately with its unit
-            low_num = float(re.findall(r'[\d.]+', parts[0])[0])
-            high_num = float(re.findall(r'[\d.]+', parts[1])[0])
-
-            # Convert each part to minutes
-            if 'min' in parts[0] and 'hour' not in parts[0]:
-                low_minutes = low_num  # Already in minutes
-            else:
-                low_minutes = low_num * 60  # Convert hours to minutes
-
-            if 'min' in parts[1] and 'hour' not in parts[1]:
-                high_minutes = high_num  # Already in minutes
-            else:
-                high_minutes = high_num * 60  # Convert hours to minutes
-
-            # Average the two values in minutes
-            return int((low_minutes + high_minutes) / 2)
-        except:
-            return 60  # Default to 1 hour on error
-    else:
-        # Single value like "1.5 hours" or "45min"
-        try:
-            num = float(re.findall(r'[\d.]+', duration_str)[0])
-        except:
-            return 60  # Default to 1 hour on error
-
-        # Convert to minutes
-        if 'min' in duration_str and 'hour' not in duration_str:
-            return int(num)  # Already in minutes
-        else:
-            return int(num * 60)  # Convert hours to minutes
+    minutes = parse_duration(duration_str)
+    return 60 if minutes is None else minutes  # Default 1 hour
 
 def calculate_end_time(start_time_str, duration_str):
     """Calculate end time given start time and duration
@@ -257,19 +233,10 @@ def calculate_end_time(start_time_str, duration_str):
     Returns:
         String like "11:30 AM"
     """
-    try:
-        # Parse start time
-        start_time = datetime.strptime(start_time_str, "%I:%M %p")
-
-        # Get duration in minutes
-        duration_minutes = parse_duration_to_minutes(duration_str)
-
-        # Calculate end time
-        end_time = start_time + timedelta(minutes=duration_minutes)
-
-        return end_time.strftime("%I:%M %p")
-    except Exception as e:
+    start = parse_clock(start_time_str)
+    if start is None:
         return None
+    return format_clock(start + parse_duration_to_minutes(duration_str))
 
 # ============================================================================
 # ENHANCED CSS - ULTIMATE EDITION
@@ -2299,39 +2266,8 @@ def mask_info(text, show=False):
 # WEATHER INTEGRATION
 # ============================================================================
 
-@st.cache_data(ttl=1800)
-def get_uv_index():
-    """Get UV index data from OpenWeather"""
-    api_key = os.getenv('OPENWEATHER_API_KEY', '')
-    lat, lon = 30.6074, -81.4493  # Amelia Island
-
-    if api_key:
-        try:
-            # UV Index endpoint (using One Call API 3.0)
-            uv_url = f"https://api.openweathermap.org/data/3.0/onecall?lat={lat}&lon={lon}&appid={api_key}&exclude=minutely,hourly,alerts"
-            resp = requests.get(uv_url, timeout=5)
-
-            if resp.status_code == 200:
-                data = resp.json()
-                return {
-                    'current': round(data.get('current', {}).get('uvi', 5), 1),
-                    'daily': [{'date': datetime.fromtimestamp(day['dt']).strftime('%Y-%m-%d'),
-                               'uv': round(day.get('uvi', 5), 1)}
-                              for day in data.get('daily', [])[:6]]
-                }
-        except:
-            pass
-
-    # Fallback UV data (moderate levels)
-    from datetime import datetime, timedelta
-    today = datetime.now()
-    return {
-        'current': 5.0,
-        'daily': [{'date': (today + timedelta(days=i)).strftime('%Y-%m-%d'), 'uv': 5.0 + (i % 3)}
-                  for i in range(6)]
-    }
-
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@stale_while_revalidate(ttl=3600, max_stale=12 * 3600,  # Predictions barely change
+                        accept=lambda tides: tides.get('source') != 'fallback')
 def get_tide_data():
     """Get live tide data from NOAA for Fernandina Beach, FL (Station 8720030)"""
     station_id = "8720030"  # Fernandina Beach, FL
@@ -2341,9 +2277,13 @@ def get_tide_data():
         begin_date = datetime.now().strftime('%Y%m%d')
         end_date = (datetime.now() + timedelta(days=7)).strftime('%Y%m%d')
 
-        url = f"https://api.tidesandcurrents.noaa.gov/api/prod/datagetter?begin_date={begin_date}&end_date={end_date}&station={station_id}&product=predictions&datum=MLLW&time_zone=lst_ldt&units=english&interval=hilo&format=json"
+        url = f"https://api.tidesandcurrents.noaa.gov/api/prod/datagetter?begin_date={begin_date}&end_date={end_date}&station={station_id}&product=predictions&datum=MLLW&time_zone=lst_ldt&units=english&format=json"
 
-        resp = requests.get(url, timeout=10)
+        # High/low events and the 6-minute water level series, in parallel
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='tides') as pool:
+            hilo_future = pool.submit(http_client.get, url + "&interval=hilo", timeout=10)
+            series_future = pool.submit(http_client.get, url + f"&interval={SERIES_STEP_MINUTES}", timeout=10)
+            resp, series_resp = hilo_future.result(), series_future.result()
 
         if resp.status_code == 200:
             data = resp.json()
@@ -2377,6 +2317,10 @@ def get_tide_data():
                 else:
                     daily_tides[date_str]['low'].append(tide_info)
 
+            levels = series_resp.json().get('predictions', []) if series_resp.status_code == 200 else []
+            daily_tides['series'] = (TideSeries.from_predictions(levels) if levels
+                                     else TideSeries.from_daily_tides(daily_tides))
+            daily_tides['source'] = 'NOAA'
             return daily_tides
     except Exception as e:
         # Log error but don't crash
@@ -2384,7 +2328,7 @@ def get_tide_data():
         pass
 
     # Fallback tide data (in case API is down)
-    return {
+    daily_tides = {
         '2025-11-07': {
             'high': [{'time': '6:30 AM', 'time_24hr': '06:30', 'height': 6.5},
                      {'time': '7:00 PM', 'time_24hr': '19:00', 'height': 6.8}],
@@ -2410,8 +2354,20 @@ def get_tide_data():
                     {'time': '3:00 PM', 'time_24hr': '15:00', 'height': 0.0}]
         },
     }
+    daily_tides['series'] = TideSeries.from_daily_tides(daily_tides)
+    daily_tides['source'] = 'fallback'
+    return daily_tides
 
-def get_tide_recommendation(activity_start_time, activity_type, date_str, tide_data):
+def parse_tide_time(date_str, time_str):
+    """Combine "2025-11-10" and "10:00 AM" (or "10:00") into a datetime, or None"""
+    for fmt in ('%Y-%m-%d %I:%M %p', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(f"{date_str} {str(time_str).strip()}", fmt)
+        except ValueError:
+            continue
+    return None
+
+def get_tide_recommendation(activity_start_time, activity_type, date_str, tide_data, duration_minutes=60):
     """Get tide-based recommendation for an activity
 
     Args:
@@ -2419,9 +2375,12 @@ def get_tide_recommendation(activity_start_time, activity_type, date_str, tide_d
         activity_type: "beach", "activity", etc.
         date_str: "2025-11-10"
         tide_data: Dictionary from get_tide_data()
+        duration_minutes: Activity length, for the low-tide check
 
     Returns:
-        Dictionary with tide info and recommendations
+        Dictionary with tide info and recommendations; with the water level
+        series also level_ft, rising, low_tide_windows (6 AM-8 PM) and
+        in_low_tide (whether the activity overlaps a low-water stretch)
     """
     if date_str not in tide_data:
         return None
@@ -2446,18 +2405,41 @@ def get_tide_recommendation(activity_start_time, activity_type, date_str, tide_d
         'best_time': ''
     }
 
+    # Water level at the activity and low-water stretches from the 6-minute series
+    series = tide_data.get('series')
+    activity_start = parse_tide_time(date_str, activity_start_time)
+    if series is not None and activity_start:
+        activity_end = activity_start + timedelta(minutes=duration_minutes)
+        day_start = activity_start.replace(hour=6, minute=0)
+        slot_windows, day_windows = series.low_tide_windows(
+            [(activity_start, activity_end), (day_start, day_start + timedelta(hours=14))])
+        result['level_ft'] = series.level_at(activity_start)
+        result['rising'] = series.is_rising(activity_start)
+        result['low_tide_windows'] = day_windows
+        result['in_low_tide'] = bool(slot_windows)
+
+    # Next high tide after the activity starts (not just the day's first)
+    start_24hr = activity_start.strftime('%H:%M') if activity_start else '00:00'
+    next_high = next((tide for tide in high_tides if tide['time_24hr'] >= start_24hr), None)
+    next_high = next_high or (high_tides[0] if high_tides else None)
+
     # Create recommendations based on activity type
     if 'beach' in activity_type.lower() or 'swim' in activity_type.lower():
-        if high_tides:
+        if next_high:
             result['recommendation'] = "🌊 Best for swimming during high tide"
-            result['best_time'] = f"High tide: {high_tides[0]['time']} ({high_tides[0]['height']}ft)"
+            result['best_time'] = f"High tide: {next_high['time']} ({next_high['height']}ft)"
         if low_tides:
             result['recommendation'] += "\n🐚 Best for shell hunting during low tide"
+        if result.get('in_low_tide'):
+            result['best_time'] = f"🐚 Low tide {format_window(slot_windows[0])} - wide beach for walking and shelling"
+        elif result.get('level_ft') is not None:
+            direction = 'rising' if result['rising'] else 'falling'
+            result['best_time'] = f"🌊 Tide {result['level_ft']}ft and {direction} at {activity_start_time}"
 
     elif 'surf' in activity_type.lower():
-        if high_tides:
+        if next_high:
             result['recommendation'] = "🏄 Better waves during high tide"
-            result['best_time'] = f"High tide: {high_tides[0]['time']}"
+            result['best_time'] = f"High tide: {next_high['time']}"
 
     return result
 
@@ -2465,14 +2447,39 @@ def get_tide_recommendation(activity_start_time, activity_type, date_str, tide_d
 # TRAFFIC & FLIGHT TRACKING APIS
 # ============================================================================
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes (traffic changes frequently)
+# Routes shown by the traffic widgets (and prefetched before airport runs)
+HOTEL_TRAFFIC_ADDRESS = "4750 Amelia Island Parkway, Amelia Island, FL"
+AIRPORT_TRAFFIC_ADDRESSES = {'JAX': "2400 Yankee Clipper Dr, Jacksonville, FL 32218"}
+
+
+@st.cache_resource
+def get_trip_travel_matrix():
+    """Get the shared travel-time matrix, seeded with every trip location
+
+    Origins/destinations are the hotel, the airport and every scheduled
+    activity; the optional-activities catalog is added as destinations.
+    """
+    from utils.travel_matrix import get_travel_matrix, collect_trip_locations
+    from utils.smart_timing import HOTEL_LOCATION, AIRPORT_LOCATION
+
+    _, activities = get_ultimate_trip_data()
+    trip_locations, catalog_locations = collect_trip_locations(
+        activities, get_optional_activities(), fixed=[HOTEL_LOCATION, AIRPORT_LOCATION]
+    )
+    matrix = get_travel_matrix()
+    matrix.add_locations(origins=trip_locations, destinations=catalog_locations)
+    return matrix
+
+
+@stale_while_revalidate(ttl=300, max_stale=900, accept=lambda traffic: traffic.get('status') == 'OK')
 def get_traffic_data(origin, destination, departure_time=None):
-    """Get real-time traffic data using Google Maps Distance Matrix API
+    """Get real-time traffic data from the cached Distance Matrix
 
     Args:
         origin: Starting address or coordinates
         destination: Ending address or coordinates
-        departure_time: Unix timestamp for departure (optional, defaults to now)
+        departure_time: Unix timestamp for departure (optional, defaults to now;
+            quantized to the matrix's departure buckets)
 
     Returns:
         Dictionary with duration, duration_in_traffic, distance, and traffic level
@@ -2493,52 +2500,34 @@ def get_traffic_data(origin, destination, departure_time=None):
         }
 
     try:
-        # If departure_time not specified, use current time
-        if departure_time is None:
-            departure_time = int(datetime.now().timestamp())
-
-        url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-        params = {
-            'origins': origin,
-            'destinations': destination,
-            'departure_time': departure_time,
-            'traffic_model': 'best_guess',
-            'key': api_key
-        }
+        element = get_trip_travel_matrix().lookup(origin, destination, departure_time)
 
-        resp = requests.get(url, params=params, timeout=10)
+        if element:
+            # Calculate traffic level
+            normal_duration = element['duration']['value']
+            traffic_duration = element.get('duration_in_traffic', {}).get('value', normal_duration)
 
-        if resp.status_code == 200:
-            data = resp.json()
-
-            if data['status'] == 'OK' and data['rows'][0]['elements'][0]['status'] == 'OK':
-                element = data['rows'][0]['elements'][0]
+            delay_minutes = (traffic_duration - normal_duration) / 60
 
-                # Calculate traffic level
-                normal_duration = element['duration']['value']
-                traffic_duration = element.get('duration_in_traffic', {}).get('value', normal_duration)
-
-                delay_minutes = (traffic_duration - normal_duration) / 60
-
-                if delay_minutes < 5:
-                    traffic_level = 'Light'
-                    traffic_emoji = '🟢'
-                elif delay_minutes < 15:
-                    traffic_level = 'Moderate'
-                    traffic_emoji = '🟡'
-                else:
-                    traffic_level = 'Heavy'
-                    traffic_emoji = '🔴'
-
-                return {
-                    'distance': element['distance'],
-                    'duration': element['duration'],
-                    'duration_in_traffic': element.get('duration_in_traffic', element['duration']),
-                    'traffic_level': traffic_level,
-                    'traffic_emoji': traffic_emoji,
-                    'delay_minutes': round(delay_minutes, 1),
-                    'status': 'OK'
-                }
+            if delay_minutes < 5:
+                traffic_level = 'Light'
+                traffic_emoji = '🟢'
+            elif delay_minutes < 15:
+                traffic_level = 'Moderate'
+                traffic_emoji = '🟡'
+            else:
+                traffic_level = 'Heavy'
+                traffic_emoji = '🔴'
+
+            return {
+                'distance': element['distance'],
+                'duration': element['duration'],
+                'duration_in_traffic': element.get('duration_in_traffic', element['duration']),
+                'traffic_level': traffic_level,
+                'traffic_emoji': traffic_emoji,
+                'delay_minutes': round(delay_minutes, 1),
+                'status': 'OK'
+            }
     except Exception as e:
         print(f"Traffic API error: {e}")
 
@@ -2555,131 +2544,7 @@ def get_traffic_data(origin, destination, departure_time=None):
     }
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_flight_status(flight_number, flight_date):
-    """Get live flight status from AviationStack API
-
-    Args:
-        flight_number: e.g., "AA2434"
-        flight_date: Date in YYYY-MM-DD format
-
-    Returns:
-        Dictionary with flight status, gate info, delays, etc.
-    """
-    api_key = os.getenv('AVIATIONSTACK_API_KEY', '')
-
-    if not api_key:
-        # Return fallback data
-        return {
-            'status': 'scheduled',
-            'departure': {
-                'airport': 'DCA' if 'AA2434' in flight_number or 'AA1585' in flight_number else 'JAX',
-                'scheduled': None,
-                'actual': None,
-                'gate': 'TBD',
-                'terminal': 'TBD'
-            },
-            'arrival': {
-                'airport': 'JAX' if 'AA2434' in flight_number or 'AA1585' in flight_number else 'DCA',
-                'scheduled': None,
-                'actual': None,
-                'gate': 'TBD',
-                'terminal': 'TBD'
-            },
-            'live_status': 'FALLBACK',
-            'message': 'Set AVIATIONSTACK_API_KEY for live tracking'
-        }
-
-    try:
-        # Extract airline code and flight number
-        # AA2434 -> airline: AA, flight: 2434
-        airline_code = flight_number[:2]
-        flight_num = flight_number[2:]
-
-        url = "http://api.aviationstack.com/v1/flights"
-        params = {
-            'access_key': api_key,
-            'flight_iata': flight_number
-        }
-
-        resp = requests.get(url, params=params, timeout=10)
-
-        if resp.status_code == 200:
-            data = resp.json()
-
-            if data.get('data') and len(data['data']) > 0:
-                flight = data['data'][0]
-
-                # Determine status emoji and message
-                status = flight.get('flight_status', 'scheduled').lower()
-                if status == 'active' or status == 'en-route':
-                    status_emoji = '✈️'
-                    status_text = 'In Flight'
-                elif status == 'landed':
-                    status_emoji = '🛬'
-                    status_text = 'Landed'
-                elif status == 'scheduled':
-                    status_emoji = '🕐'
-                    status_text = 'On Time'
-                elif status == 'cancelled':
-                    status_emoji = '❌'
-                    status_text = 'Cancelled'
-                elif status == 'delayed':
-                    status_emoji = '⏰'
-                    status_text = 'Delayed'
-                else:
-                    status_emoji = '🛫'
-                    status_text = status.title()
-
-                return {
-                    'status': status,
-                    'status_emoji': status_emoji,
-                    'status_text': status_text,
-                    'flight_number': flight.get('flight', {}).get('iata', flight_number),
-                    'departure': {
-                        'airport': flight.get('departure', {}).get('iata', ''),
-                        'scheduled': flight.get('departure', {}).get('scheduled', ''),
-                        'actual': flight.get('departure', {}).get('actual', ''),
-                        'gate': flight.get('departure', {}).get('gate', 'TBD'),
-                        'terminal': flight.get('departure', {}).get('terminal', 'TBD'),
-                        'delay': flight.get('departure', {}).get('delay', 0)
-                    },
-                    'arrival': {
-                        'airport': flight.get('arrival', {}).get('iata', ''),
-                        'scheduled': flight.get('arrival', {}).get('scheduled', ''),
-                        'actual': flight.get('arrival', {}).get('actual', ''),
-                        'gate': flight.get('arrival', {}).get('gate', 'TBD'),
-                        'terminal': flight.get('arrival', {}).get('terminal', 'TBD'),
-                        'delay': flight.get('arrival', {}).get('delay', 0)
-                    },
-                    'live_status': 'OK'
-                }
-    except Exception as e:
-        print(f"Flight API error: {e}")
-
-    # Fallback on error
-    return {
-        'status': 'scheduled',
-        'status_emoji': '🕐',
-        'status_text': 'Scheduled',
-        'flight_number': flight_number,
-        'departure': {
-            'airport': 'DCA' if 'AA2434' in flight_number or 'AA1585' in flight_number else 'JAX',
-            'scheduled': None,
-            'gate': 'TBD',
-            'terminal': 'TBD'
-        },
-        'arrival': {
-            'airport': 'JAX' if 'AA2434' in flight_number or 'AA1585' in flight_number else 'DCA',
-            'scheduled': None,
-            'gate': 'TBD',
-            'terminal': 'TBD'
-        },
-        'live_status': 'ERROR',
-        'message': 'Flight tracking unavailable'
-    }
-
-
+@stale_while_revalidate(ttl=120, max_stale=600)
 def get_tsa_wait_times(airport_code):
     """Get TSA security checkpoint wait times using historical data and manual updates
 
@@ -2864,6 +2729,18 @@ def render_flight_status_widget(flight_number, flight_date, compact=False):
 </div>
 </div>""", unsafe_allow_html=True)
 
+        history = get_flight_history(flight_number, flight_date)
+        if len(history) > 1:
+            with st.expander(f"🕓 Status changes ({len(history)})"):
+                for change in reversed(history):
+                    checked = datetime.fromisoformat(change['at']).strftime('%I:%M %p')
+                    delay = f" • {change['dep_delay']} min late" if change['dep_delay'] else ""
+                    st.caption(f"{checked}: {change['status'].title()} • Gate {change['dep_gate']}{delay}")
+        if status.get('checked_at'):
+            st.caption(f"Checked {datetime.fromisoformat(status['checked_at']).strftime('%I:%M %p')}"
+                       + (f" • next check {datetime.fromisoformat(status['next_check_at']).strftime('%I:%M %p')}"
+                          if status.get('next_check_at') else " • final"))
+
 
 def render_traffic_widget(origin, destination, label=""):
     """Render a traffic status widget
@@ -2897,6 +2774,8 @@ def render_traffic_widget(origin, destination, label=""):
         safe_delay = html.escape(str(traffic['delay_minutes']))
         delay_text = f"<p style='margin: 0.5rem 0 0 0; font-size: 0.85rem;'>+{safe_delay} min delay</p>"
 
+    freshness = html.escape(format_freshness(get_traffic_data.freshness(origin, destination)))
+
     st.markdown(f"""<div class="ultimate-card" style="border-left: 4px solid {color};">
 <div class="card-body">
 <h4 style="margin: 0 0 0.5rem 0;">🚗 {safe_label}</h4>
@@ -2914,10 +2793,30 @@ def render_traffic_widget(origin, destination, label=""):
 {delay_text}
 </div>
 </div>
+<p style="margin: 0.5rem 0 0 0; font-size: 0.75rem; opacity: 0.7;">🕒 {freshness}</p>
 </div>
 </div>""", unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_prefetch_scheduler():
+    """Start the shared background scheduler that warms live-data caches
+
+    Flight status, TSA waits, traffic to the airport and the forecast are
+    refreshed ahead of need, so the Travel Dashboard renders from warm caches.
+    """
+    from utils.prefetch_scheduler import PrefetchScheduler
+
+    scheduler = PrefetchScheduler(fetchers={
+        'flight': get_flight_status,  # The tracker decides whether AviationStack is due
+        'tsa': get_tsa_wait_times.refresh,
+        'traffic': lambda airport: get_traffic_data.refresh(HOTEL_TRAFFIC_ADDRESS, AIRPORT_TRAFFIC_ADDRESSES[airport]),
+        'weather': get_weather_ultimate.refresh
+    })
+    scheduler.start()
+    return scheduler
+
+
 def render_tsa_wait_widget(airport_code):
     """Render TSA security wait times widget with manual update capability
 
@@ -2993,6 +2892,7 @@ def render_tsa_wait_widget(airport_code):
             st.markdown("<br>", unsafe_allow_html=True)
             if st.button(f"💾 Save Update", key=f"save_tsa_{airport_code}", use_container_width=True):
                 if save_manual_tsa_update(airport_code, manual_wait, reported_by="Manual Entry", notes=manual_notes):
+                    get_tsa_wait_times.clear()  # Show the new report right away
                     st.success("✅ Wait time updated!")
                     st.rerun()
                 else:
@@ -3445,9 +3345,9 @@ def detect_meal_gaps(activities_data):
 
     # Group activities by date
     days = defaultdict(list)
-    for activity in activities_data:
-        date_str = activity['date']
-        days[date_str].append(activity)
+    for item in normalize_activities(activities_data):
+        if item.date:
+            days[item.date].append(item)
 
     missing_meals = []
 
@@ -3462,25 +3362,20 @@ def detect_meal_gaps(activities_data):
             'dinner': False
         }
 
-        for activity in day_activities:
-            activity_lower = activity['activity'].lower()
-            time_str = activity['time']
-
-            # Try to parse time
-            try:
-                time_obj = datetime.strptime(time_str, "%I:%M %p")
-                hour = time_obj.hour
-
-                # Classify by time and activity type
-                if activity['type'] == 'dining' or 'lunch' in activity_lower or 'breakfast' in activity_lower or 'dinner' in activity_lower:
-                    if 6 <= hour < 11:
-                        meals_found['breakfast'] = True
-                    elif 11 <= hour < 16:
-                        meals_found['lunch'] = True
-                    elif 16 <= hour < 23:
-                        meals_found['dinner'] = True
-            except:
-                pass
+        for item in day_activities:
+            if item.start is None:
+                continue  # No time yet (TBD)
+            activity_lower = item.name.lower()
+            hour = item.start // 60
+
+            # Classify by time and activity type
+            if item.type == ActivityType.DINING or 'lunch' in activity_lower or 'breakfast' in activity_lower or 'dinner' in activity_lower:
+                if 6 <= hour < 11:
+                    meals_found['breakfast'] = True
+                elif 11 <= hour < 16:
+                    meals_found['lunch'] = True
+                elif 16 <= hour < 23:
+                    meals_found['dinner'] = True
 
         # Merge meals from proposals
         for meal_type in ['breakfast', 'lunch', 'dinner']:
@@ -3533,90 +3428,80 @@ def detect_meal_gaps(activities_data):
 
 def parse_time_for_sorting(time_str):
     """Convert time string like '9:00 AM' or '12:30 PM' to minutes from midnight for proper sorting"""
-    try:
-        # Handle 'TBD' or empty times
-        if not time_str or time_str == 'TBD':
-            return 9999  # Put TBD times at the end
-
-        # Parse the time string
-        time_obj = datetime.strptime(time_str.strip(), '%I:%M %p')
-        # Convert to minutes from midnight
-        return time_obj.hour * 60 + time_obj.minute
-    except (ValueError, AttributeError):
-        # If parsing fails, return a large number to put it at the end
-        return 9999
-
-def detect_conflicts(activities_data):
+    minutes = parse_clock(time_str)
+    return 9999 if minutes is None else minutes  # TBD/unparsable times go last
+
+def get_schedule_index(activities_data):
+    """This session's schedule index, brought in line with activities_data
+
+    One index serves every conflict check; sync() only inserts and deletes
+    the activities that changed since the last page run.
+    """
+    if 'schedule_index' not in st.session_state:
+        st.session_state.schedule_index = ScheduleIndex()
+    index = st.session_state.schedule_index
+    index.sync(activities_data)
+    return index
+
+def detect_conflicts(activities_data, index=None):
     """Detect scheduling conflicts (overlaps, tight timings, impossible logistics)
 
+    Args:
+        activities_data: List of scheduled activities
+        index: The schedule's ScheduleIndex (see get_schedule_index)
+
     Returns:
         List of conflicts with severity and recommendations
     """
     conflicts = []
-
-    # Sort activities by date and time (chronologically, not alphabetically!)
-    sorted_activities = sorted(activities_data, key=lambda x: (x['date'], parse_time_for_sorting(x.get('time', '12:00 PM'))))
-
-    for i in range(len(sorted_activities) - 1):
-        current = sorted_activities[i]
-        next_act = sorted_activities[i + 1]
-
-        # Only check same-day activities
-        if current['date'] != next_act['date']:
-            continue
-
-        try:
-            # Get end time of current activity
-            if current.get('duration'):
-                current_end = calculate_end_time(current['time'], current['duration'])
-                if not current_end:
-                    continue
-
-                current_end_obj = datetime.strptime(current_end, "%I:%M %p")
-                next_start_obj = datetime.strptime(next_act['time'], "%I:%M %p")
-
-                # Calculate gap in minutes
-                gap_minutes = (next_start_obj - current_end_obj).total_seconds() / 60
-
-                if gap_minutes < 0:
-                    # OVERLAP!
-                    conflicts.append({
-                        'type': 'overlap',
-                        'severity': 'critical',
-                        'date': current['date'],
-                        'activity1': current['activity'],
-                        'activity2': next_act['activity'],
-                        'end_time': current_end,
-                        'start_time': next_act['time'],
-                        'message': f"🔴 OVERLAP: {current['activity']} ends {current_end}, but {next_act['activity']} starts {next_act['time']}",
-                        'suggestion': f"Reschedule {next_act['activity']} to start after {current_end}"
-                    })
-                elif gap_minutes < 15:
-                    # TOO TIGHT
-                    conflicts.append({
-                        'type': 'tight_timing',
-                        'severity': 'warning',
-                        'date': current['date'],
-                        'activity1': current['activity'],
-                        'activity2': next_act['activity'],
-                        'gap_minutes': int(gap_minutes),
-                        'message': f"🟡 TIGHT: Only {int(gap_minutes)} min between {current['activity']} and {next_act['activity']}",
-                        'suggestion': f"Consider adding 15-30 min buffer"
-                    })
-                elif gap_minutes > 240:  # More than 4 hours
-                    # LARGE GAP - opportunity!
-                    conflicts.append({
-                        'type': 'large_gap',
-                        'severity': 'info',
-                        'date': current['date'],
-                        'gap_start': current_end,
-                        'gap_end': next_act['time'],
-                        'gap_hours': round(gap_minutes / 60, 1),
-                        'message': f"💡 FREE TIME: {round(gap_minutes/60, 1)} hours between {current_end} and {next_act['time']}",
-                        'suggestion': f"Perfect time to add an activity!"
-                    })
-        except Exception as e:
-            pass
+    if index is None:
+        index = ScheduleIndex(activities_data)
+
+    # Activities without a duration count as instants here (flights, check-ins)
+    # Every overlapping pair - also activities spanning more than the next one
+    for date, first, second in index.overlaps(untimed_minutes=0):
+        current, next_act = first.activity, second.activity
+        conflicts.append({
+            'type': 'overlap',
+            'severity': 'critical',
+            'date': date,
+            'activity1': current['activity'],
+            'activity2': next_act['activity'],
+            'end_time': first.end_time,
+            'start_time': next_act['time'],
+            'message': f"🔴 OVERLAP: {current['activity']} ends {first.end_time}, but {next_act['activity']} starts {next_act['time']}",
+            'suggestion': f"Reschedule {next_act['activity']} to start after {first.end_time}"
+        })
+
+    for date, previous, next_interval, gap_minutes in index.transitions(untimed_minutes=0):
+        current, next_act = previous.activity, next_interval.activity
+        if previous.item.duration is None:
+            continue  # No end time to measure the gap from
+
+        if gap_minutes < 15:
+            # TOO TIGHT
+            conflicts.append({
+                'type': 'tight_timing',
+                'severity': 'warning',
+                'date': date,
+                'activity1': current['activity'],
+                'activity2': next_act['activity'],
+                'gap_minutes': int(gap_minutes),
+                'message': f"🟡 TIGHT: Only {int(gap_minutes)} min between {current['activity']} and {next_act['activity']}",
+                'suggestion': f"Consider adding 15-30 min buffer"
+            })
+        elif gap_minutes > 240:  # More than 4 hours
+            # LARGE GAP - opportunity!
+            conflicts.append({
+                'type': 'large_gap',
+                'severity': 'info',
+                'date': date,
+                'gap_start': previous.end_time,
+                'gap_end': next_act['time'],
+                'gap_hours': round(gap_minutes / 60, 1),
+                'message': f"💡 FREE TIME: {round(gap_minutes/60, 1)} hours between {previous.end_time} and {next_act['time']}",
+                'suggestion': f"Perfect time to add an activity!"
+            })
 
     return conflicts
 
@@ -3755,117 +3640,19 @@ def detect_weather_swap_opportunities(activities_data, weather_data):
 
     return unique_swaps
 
-def score_activity_for_slot(activity, time_slot_start, date_str, weather_data, tide_data, recent_activities):
-    """Score how well an activity fits a specific time slot (0-100)
-
-    Multi-factor scoring based on:
-    - Weather compatibility (30 points)
-    - Time slot fit (25 points)
-    - Location proximity (20 points)
-    - Energy level balance (10 points)
-    - Budget (10 points)
-    - Variety (5 points)
-    """
-    score = 0
-    reasons = []
-    warnings = []
-
-    # Get activity details
-    activity_type = activity.get('type', '')
-    duration = activity.get('duration', '1 hour')
-    cost_str = activity.get('cost_range', '$0')
-
-    # Parse cost (rough estimate)
-    try:
-        cost = int(re.findall(r'\d+', cost_str.split('-')[0])[0])
-    except:
-        cost = 20
-
-    # FACTOR 1: Weather Match (30 points)
-    weather_score = 15  # Default moderate score
-    outdoor_activities = ['beach', 'hiking', 'kayak', 'horse', 'bike', 'walk', 'tour', 'boat']
-    indoor_activities = ['spa', 'museum', 'shopping', 'dining', 'cooking', 'wine']
-
-    is_outdoor = any(word in activity['name'].lower() or word in activity.get('description', '').lower()
-                     for word in outdoor_activities)
-    is_indoor = any(word in activity['name'].lower() or word in activity.get('description', '').lower()
-                    for word in indoor_activities)
-
-    # Check weather for this date
-    if weather_data and 'forecast' in weather_data:
-        for forecast in weather_data['forecast']:
-            if forecast['date'] == date_str:
-                condition = forecast.get('condition', '').lower()
-                temp = forecast.get('high', 75)
-                rain_chance = forecast.get('precipitation', 0)
-
-                if is_outdoor:
-                    if rain_chance > 70:
-                        weather_score = 5
-                        warnings.append(f"⚠️ {rain_chance}% rain chance - consider indoor alternative")
-                    elif rain_chance < 30 and 'sun' in condition:
-                        weather_score = 30
-                        reasons.append(f"☀️ Perfect weather ({condition}, {temp}°F)")
-                    elif rain_chance < 30:
-                        weather_score = 25
-                        reasons.append(f"✅ Good weather ({temp}°F, {rain_chance}% rain)")
-
-                elif is_indoor:
-                    weather_score = 25  # Indoor always works
-                    if rain_chance > 50:
-                        reasons.append(f"☔ Great indoor choice (rainy day)")
-                break
-
-    score += weather_score
-
-    # FACTOR 2: Duration Fit (25 points)
-    duration_minutes = parse_duration_to_minutes(duration)
-    # Assume we want activities that fit well
-    if 60 <= duration_minutes <= 180:  # 1-3 hours is ideal
-        score += 25
-        reasons.append(f"⏱️ Perfect duration ({duration})")
-    elif duration_minutes < 60:
-        score += 20
-    elif duration_minutes > 180:
-        score += 15
-        warnings.append(f"⏱️ Long activity ({duration}) - plan accordingly")
-
-    # FACTOR 3: Cost (10 points)
-    if cost == 0:
-        score += 10
-        reasons.append("💰 FREE activity!")
-    elif cost < 30:
-        score += 8
-    elif cost < 100:
-        score += 5
-    else:
-        score += 3
-
-    # FACTOR 4: Rating (10 points)
-    rating_str = activity.get('rating', '0/5')
-    try:
-        rating = float(rating_str.split('/')[0])
-        score += int(rating * 2)  # 5.0 rating = 10 points
-        if rating >= 4.7:
-            reasons.append(f"⭐ Highly rated ({rating}/5)")
-    except:
-        pass
-
-    # FACTOR 5: Tide match for beach activities (bonus 10 points)
-    if 'beach' in activity_type.lower() or 'beach' in activity['name'].lower():
-        tide_rec = get_tide_recommendation(time_slot_start, 'beach', date_str, tide_data)
-        if tide_rec:
-            score += 10
-            reasons.append(tide_rec.get('best_time', ''))
-
-    # Cap at 100
-    score = min(100, score)
-
-    return {
-        'score': score,
-        'reasons': reasons,
-        'warnings': warnings
-    }
+def beach_tide_check(tide_data):
+    """Tide check for catalog scoring: (bonus points, reason, warning) for a beach slot"""
+    def check(date_str, time_str, duration_minutes):
+        tide_rec = get_tide_recommendation(time_str, 'beach', date_str, tide_data or {}, duration_minutes)
+        if not tide_rec:
+            return 0, None, None
+        if 'in_low_tide' not in tide_rec or tide_rec['in_low_tide']:
+            # Low water during the slot (or only high/low events to go on)
+            return 10, tide_rec.get('best_time', ''), None
+        if tide_rec['low_tide_windows']:
+            return 0, None, f"🌊 High water then - low tide {format_window(tide_rec['low_tide_windows'][0])}"
+        return 0, None, None
+    return check
 
 def get_smart_duration_default(activity_name, activity_type='activity'):
     """Get smart default duration for an activity based on its name and type
@@ -3911,7 +3698,7 @@ def get_smart_duration_default(activity_name, activity_type='activity'):
     return "2 hours"
 
 
-def check_time_conflict(new_date, new_time_str, new_duration, existing_activities):
+def check_time_conflict(new_date, new_time_str, new_duration, existing_activities, index=None):
     """Check if a new activity conflicts with existing scheduled activities
 
     Args:
@@ -3919,66 +3706,17 @@ def check_time_conflict(new_date, new_time_str, new_duration, existing_activitie
         new_time_str: Time string like "10:00 AM"
         new_duration: Duration string like "2 hours" or "90 minutes"
         existing_activities: List of already scheduled activities
+        index: The schedule's ScheduleIndex (see get_schedule_index)
 
     Returns:
         tuple: (has_conflict: bool, conflicting_activity: dict or None)
     """
-    from datetime import datetime, timedelta
-
-    # Parse new activity time
-    try:
-        new_time = datetime.strptime(new_time_str, "%I:%M %p")
-    except:
-        try:
-            new_time = datetime.strptime(new_time_str, "%H:%M")
-        except:
-            return (False, None)  # Can't parse time, skip conflict check
-
-    # Parse new activity duration
-    try:
-        if 'hour' in new_duration.lower():
-            hours = float(new_duration.lower().split('hour')[0].strip())
-            new_end_time = new_time + timedelta(hours=hours)
-        elif 'min' in new_duration.lower():
-            minutes = int(new_duration.lower().split('min')[0].strip())
-            new_end_time = new_time + timedelta(minutes=minutes)
-        else:
-            new_end_time = new_time + timedelta(hours=2)  # Default 2 hours
-    except:
-        new_end_time = new_time + timedelta(hours=2)  # Default 2 hours
-
-    # Check against existing activities on same date
-    for activity in existing_activities:
-        if activity['date'] != new_date:
-            continue
-
-        # Parse existing activity time
-        try:
-            existing_time = datetime.strptime(activity['time'], "%I:%M %p")
-        except:
-            try:
-                existing_time = datetime.strptime(activity['time'], "%H:%M")
-            except:
-                continue  # Can't parse, skip
-
-        # Parse existing activity duration
-        existing_duration = activity.get('duration', '2 hours')
-        try:
-            if 'hour' in existing_duration.lower():
-                hours = float(existing_duration.lower().split('hour')[0].strip())
-                existing_end_time = existing_time + timedelta(hours=hours)
-            elif 'min' in existing_duration.lower():
-                minutes = int(existing_duration.lower().split('min')[0].strip())
-                existing_end_time = existing_time + timedelta(minutes=minutes)
-            else:
-                existing_end_time = existing_time + timedelta(hours=2)
-        except:
-            existing_end_time = existing_time + timedelta(hours=2)
-
-        # Check for overlap
-        # Conflict if: new starts before existing ends AND new ends after existing starts
-        if new_time < existing_end_time and new_end_time > existing_time:
-            return (True, activity)
+    if index is None:
+        index = get_schedule_index(existing_activities)
+    new_minutes = parse_duration(new_duration) or DEFAULT_DURATION_MINUTES
+    conflicting = index.find_conflicts(new_date, new_time_str, new_minutes)
+    if conflicting:
+        return (True, conflicting[0])
 
     return (False, None)
 
@@ -4093,6 +3831,8 @@ def add_activity_to_schedule(activity_name, activity_description, selected_day,
         st.session_state.custom_activities = []
 
     st.session_state.custom_activities.append(new_activity)
+    if 'schedule_index' in st.session_state:
+        st.session_state.schedule_index.add(new_activity)
 
     # Save to database for persistence
     save_custom_activity(new_activity)
@@ -4248,18 +3988,44 @@ def auto_fill_meals(meal_gaps, weather_data):
 
     return added_activities
 
-def ai_auto_scheduler(target_date_str, existing_activities, weather_data, tide_data, preferences=None):
-    """AI-powered automatic schedule generator for a specific day
+TRIP_DATES = ["2025-11-07", "2025-11-08", "2025-11-09", "2025-11-10", "2025-11-11", "2025-11-12"]
+
+def catalog_travel_minutes(origin, destination):
+    """Drive minutes between catalog places from cached matrix cells (None = from the hotel)
+
+    Never calls the API - planning a whole trip asks for hundreds of pairs.
+    Falls back to the hotel leg when the pair itself isn't cached.
+    """
+    from utils.travel_matrix import CATALOG_AREA
+    from utils.smart_timing import HOTEL_LOCATION
+
+    def place(item):
+        return {'name': item['name'], 'address': item.get('address') or f"{item['name']}, {CATALOG_AREA}"}
+
+    try:
+        matrix = get_trip_travel_matrix()
+        element = (origin and matrix.peek(place(origin), place(destination))) or \
+            matrix.peek(HOTEL_LOCATION, place(destination))
+    except Exception as e:
+        print(f"Travel matrix unavailable for planning: {e}")
+        return None
+    if not element:
+        return None
+    return element.get('duration_in_traffic', element['duration'])['value'] / 60
+
+def plan_trip_schedule(existing_activities, weather_data, tide_data, preferences=None, dates=None):
+    """AI-powered schedule for the whole trip, planned across all days at once
 
     Args:
-        target_date_str: Date string like "2025-11-08"
         existing_activities: Current scheduled activities
         weather_data: Weather forecast data
         tide_data: Tide data
-        preferences: Dict with user preferences (budget, activity_types, etc.)
+        preferences: Dict with user preferences (budget, activity limits, etc.);
+                     John's saved preferences are applied on top
+        dates: Days to plan (default: every trip day)
 
     Returns:
-        List of recommended activities for the day with optimal timing
+        Dict of date -> recommended activities with optimal timing
     """
     if preferences is None:
         preferences = {
@@ -4270,281 +4036,74 @@ def ai_auto_scheduler(target_date_str, existing_activities, weather_data, tide_d
             'energy_balance': True,
             'avoid_seafood_focused': True  # Avoid seafood-only restaurants (diverse menus are OK)
         }
+    # John's saved restaurant preferences ("true"/"false") add to these
+    john_prefs = load_john_preferences()
+    preferences = dict(preferences)
+    for key in ('avoid_seafood_focused', 'avoid_mexican'):
+        if str(john_prefs.get(key)).lower() == 'true':
+            preferences[key] = True
+
+    slots = []
+    for date_str in dates or TRIP_DATES:
+        day_activities = [a for a in existing_activities if a['date'] == date_str]
+
+        # Check for flights/transport on this day
+        has_flight = any(a.get('type') == 'transport' and ('flight' in a.get('activity', '').lower() or 'arrival' in a.get('activity', '').lower() or 'departure' in a.get('activity', '').lower()) for a in day_activities)
+
+        kinds, times = None, None
+        if has_flight and date_str == "2025-11-07":
+            # Arrives 6:01 PM + 90 min (deplane, luggage, drive, check-in) = ready by 7:30 PM;
+            # 8:00 PM gives time to settle in, later if the arrival block runs past it
+            kinds, times = ['dinner'], {'dinner': '8:00 PM'}
+        elif has_flight and date_str == "2025-11-12":
+            # Departs 11:40 AM - only breakfast before leaving for the airport
+            kinds = ['breakfast']
+
+        day = day_slots(date_str, day_activities, kinds, include_meals=preferences.get('include_meals', True),
+                        times=times)
+        for slot in day:
+            if slot['kind'] == 'dinner' and has_flight and date_str == "2025-11-07":
+                slot['reason'] = 'Welcome dinner after arrival'
+        slots.extend(day)
+
+    return plan_trip(get_optional_activities(), slots, weather_data, existing_activities, preferences,
+                     tide_check=beach_tide_check(tide_data), travel_minutes=catalog_travel_minutes)
 
-    # Get all optional activities
-    optional_activities = get_optional_activities()
-
-    # Separate dining from activities
-    dining_options = optional_activities.get('🍽️ Fine Dining', []) + \
-                     optional_activities.get('🍽️ Casual Dining', []) + \
-                     optional_activities.get('🥞 Breakfast & Brunch', [])
-
-    # Apply seafood preference filter
-    if preferences.get('avoid_seafood_focused'):
-        # Exclude seafood-focused restaurants (but keep places with diverse menus)
-        seafood_focused = optional_activities.get('🦞 Seafood & Waterfront', [])
-        dining_options = [r for r in dining_options if r not in seafood_focused]
-
-    # Get NON-DINING activities only (for activity slots)
-    all_activities = []
-    for category, items in optional_activities.items():
-        # Skip dining categories - they'll be handled in meal slots only
-        if '🍽️' not in category and '🥞' not in category:
-            all_activities.extend(items)
-
-    # Check what's already scheduled for this day
-    day_activities = [a for a in existing_activities if a['date'] == target_date_str]
-
-    # SPECIAL HANDLING: Arrival/departure days with flights
-    is_arrival_day = target_date_str == "2025-11-07"  # Arrives 6:01 PM
-    is_departure_day = target_date_str == "2025-11-12"  # Departs 11:40 AM
-
-    # Check for flights/transport on this day
-    has_flight = any(a.get('type') == 'transport' and ('flight' in a.get('activity', '').lower() or 'arrival' in a.get('activity', '').lower() or 'departure' in a.get('activity', '').lower()) for a in day_activities)
-
-    # Determine which time slots are available based on flight times
-    allow_breakfast = True
-    allow_morning = True
-    allow_lunch = True
-    allow_afternoon = True
-    allow_dinner = True
-
-    if has_flight and is_arrival_day:
-        # Arrives 6:01 PM + 90 min (deplane, luggage, drive, check-in) = ready by 7:30 PM
-        # Dinner recommendation at 8:00 PM gives time to settle in
-        allow_breakfast = False
-        allow_morning = False
-        allow_lunch = False
-        allow_afternoon = False
-        allow_dinner = True  # Can have dinner after arrival (~8:00 PM)
-    elif has_flight and is_departure_day:
-        # Departs 11:40 AM - only allow breakfast and early morning
-        allow_breakfast = True  # Can have breakfast before departure
-        allow_morning = False  # No time for 10am activities (need to leave by 10am)
-        allow_lunch = False
-        allow_afternoon = False
-        allow_dinner = False
-
-    # Convert date string to day name
-    date_obj = pd.to_datetime(target_date_str)
-    day_name = date_obj.strftime('%A, %B %d')
-
-    # Day name mapping
-    date_to_day = {
-        "2025-11-07": "Friday, Nov 7",
-        "2025-11-08": "Saturday, Nov 8",
-        "2025-11-09": "Sunday, Nov 9",
-        "2025-11-10": "Monday, Nov 10",
-        "2025-11-11": "Tuesday, Nov 11",
-        "2025-11-12": "Wednesday, Nov 12"
-    }
-    selected_day = date_to_day.get(target_date_str, day_name)
-
-    recommendations = []
-
-    # STEP 1: Schedule breakfast if missing (7:30-9:00 AM)
-    has_breakfast = any(a['type'] == 'dining' and datetime.strptime(a['time'], "%I:%M %p").hour < 11 for a in day_activities)
-
-    if not has_breakfast and preferences['include_meals'] and allow_breakfast:
-        breakfast_candidates = [r for r in dining_options if 'breakfast' in r.get('name', '').lower() or 'brunch' in r.get('name', '').lower()]
-        if breakfast_candidates:
-            best_breakfast = max(breakfast_candidates, key=lambda x: float(x.get('rating', '0/5').split('/')[0]))
-
-            recommendations.append({
-                'time': '8:00 AM',
-                'activity': best_breakfast,
-                'type': 'dining',
-                'reason': 'Start your day with highly-rated breakfast',
-                'duration': '45 minutes'
-            })
-
-    # STEP 2: Morning activity (9:00 AM - 12:00 PM)
-    morning_slot_filled = any(9 <= datetime.strptime(a['time'], "%I:%M %p").hour < 12 for a in day_activities)
-
-    if not morning_slot_filled and allow_morning:
-        # Score activities for morning slot
-        morning_scores = []
-
-        for activity in all_activities:
-            score_result = score_activity_for_slot(
-                activity,
-                '10:00 AM',
-                target_date_str,
-                weather_data,
-                tide_data,
-                day_activities
-            )
-
-            # Boost outdoor activities in morning
-            if any(word in activity.get('name', '').lower() for word in ['beach', 'kayak', 'bike', 'walk', 'boat']):
-                score_result['score'] += 15
-
-            morning_scores.append({
-                'activity': activity,
-                'score': score_result['score'],
-                'reasons': score_result['reasons']
-            })
-
-        # Get top recommendation
-        if morning_scores:
-            best_morning = max(morning_scores, key=lambda x: x['score'])
-            if best_morning['score'] > 50:  # Only recommend if score is decent
-                recommendations.append({
-                    'time': '10:00 AM',
-                    'activity': best_morning['activity'],
-                    'type': 'activity',
-                    'reason': ', '.join(best_morning['reasons'][:2]),
-                    'duration': best_morning['activity'].get('duration', '2 hours')
-                })
-
-    # STEP 3: Lunch (12:00 PM - 2:00 PM)
-    has_lunch = any(a['type'] == 'dining' and 11 <= datetime.strptime(a['time'], "%I:%M %p").hour < 16 for a in day_activities)
-
-    if not has_lunch and preferences['include_meals'] and allow_lunch:
-        lunch_candidates = [r for r in dining_options if 'casual' in r.get('description', '').lower() or 'lunch' in r.get('description', '').lower()]
-        if not lunch_candidates:
-            lunch_candidates = dining_options[:10]
-
-        if lunch_candidates:
-            # Score by rating and cost
-            best_lunch = max(lunch_candidates, key=lambda x: float(x.get('rating', '0/5').split('/')[0]))
-
-            recommendations.append({
-                'time': '12:30 PM',
-                'activity': best_lunch,
-                'type': 'dining',
-                'reason': 'Refuel with a great lunch spot',
-                'duration': '1 hour'
-            })
-
-    # STEP 4: Afternoon activity (2:00 PM - 5:00 PM)
-    afternoon_slot_filled = any(14 <= datetime.strptime(a['time'], "%I:%M %p").hour < 17 for a in day_activities)
-
-    if not afternoon_slot_filled and allow_afternoon:
-        afternoon_scores = []
-
-        for activity in all_activities:
-            score_result = score_activity_for_slot(
-                activity,
-                '3:00 PM',
-                target_date_str,
-                weather_data,
-                tide_data,
-                day_activities + [r for r in recommendations]
-            )
-
-            # Boost relaxing activities in afternoon
-            if any(word in activity.get('name', '').lower() for word in ['spa', 'massage', 'wine', 'museum']):
-                score_result['score'] += 10
-
-            afternoon_scores.append({
-                'activity': activity,
-                'score': score_result['score'],
-                'reasons': score_result['reasons']
-            })
-
-        if afternoon_scores:
-            best_afternoon = max(afternoon_scores, key=lambda x: x['score'])
-            if best_afternoon['score'] > 50:
-                recommendations.append({
-                    'time': '3:00 PM',
-                    'activity': best_afternoon['activity'],
-                    'type': 'activity',
-                    'reason': ', '.join(best_afternoon['reasons'][:2]),
-                    'duration': best_afternoon['activity'].get('duration', '2 hours')
-                })
-
-    # STEP 5: Dinner (6:00 PM - 8:00 PM)
-    has_dinner = any(a['type'] == 'dining' and datetime.strptime(a['time'], "%I:%M %p").hour >= 16 for a in day_activities)
-
-    if not has_dinner and preferences['include_meals'] and allow_dinner:
-        dinner_candidates = [r for r in dining_options if 'fine' in r.get('description', '').lower() or 'dinner' in r.get('description', '').lower()]
-        if not dinner_candidates:
-            dinner_candidates = dining_options[:10]
-
-        if dinner_candidates:
-            # Prefer highly-rated restaurants for dinner
-            best_dinner = max(dinner_candidates, key=lambda x: float(x.get('rating', '0/5').split('/')[0]))
-
-            # Adjust dinner time for arrival day (arrive 6:01 PM + 90 min travel/checkin = 8:00 PM)
-            dinner_time = '8:00 PM' if is_arrival_day else '6:30 PM'
+def ai_auto_scheduler(target_date_str, existing_activities, weather_data, tide_data, preferences=None):
+    """AI-powered automatic schedule generator for a specific day
 
-            recommendations.append({
-                'time': dinner_time,
-                'activity': best_dinner,
-                'type': 'dining',
-                'reason': 'End the day with an amazing dinner' if not is_arrival_day else 'Welcome dinner after arrival',
-                'duration': '1.5 hours'
-            })
+    Args:
+        target_date_str: Date string like "2025-11-08"
+        existing_activities: Current scheduled activities
+        weather_data: Weather forecast data
+        tide_data: Tide data
+        preferences: Dict with user preferences (budget, activity_types, etc.)
 
-    return recommendations
+    Returns:
+        List of recommended activities for the day with optimal timing
+    """
+    plan = plan_trip_schedule(existing_activities, weather_data, tide_data, preferences, dates=[target_date_str])
+    return plan.get(target_date_str, [])
 
-@st.cache_data(ttl=1800)
+@stale_while_revalidate(ttl=1800, max_stale=3 * 3600,
+                        accept=lambda weather: 'Real Data' in weather.get('source', ''))
 def get_weather_ultimate():
-    """Get real weather data with fallback"""
+    """Get real weather data with fallback
+
+    One OpenWeather round (a single One Call request, or current + forecast
+    fetched concurrently) feeds an hourly store; 'forecast' holds the daily
+    summaries and 'hourly' the HourlyWeather for per-activity lookups.
+    """
     api_key = os.getenv('OPENWEATHER_API_KEY', '')
     lat, lon = 30.6074, -81.4493  # Amelia Island
 
     if api_key:
-        try:
-            # Current weather
-            current_url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=imperial"
-            forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={api_key}&units=imperial"
-
-            current_resp = requests.get(current_url, timeout=5)
-            forecast_resp = requests.get(forecast_url, timeout=5)
-
-            if current_resp.status_code == 200 and forecast_resp.status_code == 200:
-                current_data = current_resp.json()
-                forecast_data = forecast_resp.json()
-
-                # Get UV data
-                uv_data = get_uv_index()
-
-                # Process forecast
-                daily_forecasts = {}
-                for item in forecast_data['list']:
-                    date = item['dt_txt'].split(' ')[0]
-                    if date not in daily_forecasts:
-                        # Find UV for this date
-                        uv_for_date = 5.0
-                        for uv_day in uv_data['daily']:
-                            if uv_day['date'] == date:
-                                uv_for_date = uv_day['uv']
-                                break
+        weather = fetch_weather(lat, lon, api_key)
+        if weather:
+            return weather
 
-                        daily_forecasts[date] = {
-                            'date': date,
-                            'high': item['main']['temp_max'],
-                            'low': item['main']['temp_min'],
-                            'condition': item['weather'][0]['description'].title(),
-                            'precipitation': int(item.get('pop', 0) * 100),
-                            'humidity': item['main']['humidity'],
-                            'wind': round(item['wind']['speed']),
-                            'uv_index': uv_for_date
-                        }
-                    else:
-                        daily_forecasts[date]['high'] = max(daily_forecasts[date]['high'], item['main']['temp_max'])
-                        daily_forecasts[date]['low'] = min(daily_forecasts[date]['low'], item['main']['temp_min'])
-
-                return {
-                    "current": {
-                        "temperature": round(current_data['main']['temp']),
-                        "feels_like": round(current_data['main']['feels_like']),
-                        "condition": current_data['weather'][0]['description'].title(),
-                        "humidity": current_data['main']['humidity'],
-                        "wind_speed": round(current_data['wind']['speed']),
-                        "visibility": round(current_data.get('visibility', 10000) / 1609.34, 1),
-                        "uv_index": uv_data['current']
-                    },
-                    "forecast": list(daily_forecasts.values())[:6],
-                    "source": "OpenWeather API (Real Data)"
-                }
-        except Exception as e:
-            pass
-    
     # Fallback weather data
-    return {
+    weather = {
         "current": {
             "temperature": 75,
             "feels_like": 73,
@@ -4564,6 +4123,8 @@ def get_weather_ultimate():
         ],
         "source": "Sample Data (Set OPENWEATHER_API_KEY for real data)"
     }
+    weather["hourly"] = HourlyWeather.from_daily(weather["forecast"])
+    return weather
 
 def get_weather_emoji(condition):
     """Get emoji for weather condition"""
@@ -4588,12 +4149,13 @@ def analyze_schedule_gaps(activities_data):
     Analyze the schedule to find free time gaps.
     Returns a list of time gaps with metadata for smart recommendations.
     """
-    from datetime import datetime, timedelta
+    from collections import defaultdict
 
-    # Convert to DataFrame for easier manipulation
-    df = pd.DataFrame(activities_data)
-    df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'])
-    df = df.sort_values('datetime')
+    # Parsed once: minute offsets per day, real durations (2 hours if unknown)
+    by_date = defaultdict(list)
+    for item in normalize_activities(activities_data):
+        if item.is_scheduled:
+            by_date[item.date].append(item)
 
     gaps = []
     trip_dates = pd.date_range(start='2025-11-07', end='2025-11-12', freq='D')
@@ -4602,8 +4164,8 @@ def analyze_schedule_gaps(activities_data):
         date_str = date.strftime('%Y-%m-%d')
         day_name = date.strftime('%A, %b %d')
 
-        # Get activities for this day
-        day_activities = df[df['date'] == date_str].sort_values('datetime')
+        # Get activities for this day (sorted by start)
+        day_activities = by_date.get(date_str, [])
 
         if len(day_activities) == 0:
             # Full day free
@@ -4616,70 +4178,67 @@ def analyze_schedule_gaps(activities_data):
                 'time_of_day': 'all_day',
                 'description': f"{day_name}: Full day available"
             })
-        else:
-            # Check for gaps between activities
-            for i in range(len(day_activities)):
-                # Morning gap (before first activity)
-                if i == 0:
-                    first_activity_time = day_activities.iloc[i]['datetime']
-                    first_activity_hour = first_activity_time.hour
-                    if first_activity_hour > 9:  # Gap before first activity (assuming 8am start)
-                        duration = first_activity_hour - 8
-                        if duration >= 2:  # Only show gaps of 2+ hours
-                            gaps.append({
-                                'date': date_str,
-                                'day_name': day_name,
-                                'start_time': '08:00',
-                                'end_time': f'{first_activity_hour:02d}:00',
-                                'duration_hours': duration,
-                                'time_of_day': 'morning',
-                                'description': f"{day_name}: Morning free (until {first_activity_time.strftime('%I:%M %p')})"
-                            })
-
-                # Gap between activities
-                if i < len(day_activities) - 1:
-                    current_end = day_activities.iloc[i]['datetime'] + timedelta(hours=2)  # Assume 2hr activity
-                    next_start = day_activities.iloc[i + 1]['datetime']
-                    gap_hours = (next_start - current_end).total_seconds() / 3600
-
-                    if gap_hours >= 2:  # Only show gaps of 2+ hours
-                        start_hour = current_end.hour
-                        end_hour = next_start.hour
-
-                        # Determine time of day
-                        if start_hour < 12:
-                            time_of_day = 'morning'
-                        elif start_hour < 17:
-                            time_of_day = 'afternoon'
-                        else:
-                            time_of_day = 'evening'
+            continue
 
-                        gaps.append({
-                            'date': date_str,
-                            'day_name': day_name,
-                            'start_time': f'{start_hour:02d}:00',
-                            'end_time': f'{end_hour:02d}:00',
-                            'duration_hours': int(gap_hours),
-                            'time_of_day': time_of_day,
-                            'description': f"{day_name}: {time_of_day.title()} gap ({current_end.strftime('%I:%M %p')} - {next_start.strftime('%I:%M %p')})"
-                        })
-
-                # Evening gap (after last activity)
-                if i == len(day_activities) - 1:
-                    last_activity_time = day_activities.iloc[i]['datetime']
-                    last_activity_hour = last_activity_time.hour + 2  # Assume 2hr activity
-                    if last_activity_hour < 21:  # Gap after last activity
-                        duration = 21 - last_activity_hour
-                        if duration >= 2:
-                            gaps.append({
-                                'date': date_str,
-                                'day_name': day_name,
-                                'start_time': f'{last_activity_hour:02d}:00',
-                                'end_time': '21:00',
-                                'duration_hours': duration,
-                                'time_of_day': 'evening',
-                                'description': f"{day_name}: Evening free (after {(last_activity_time + timedelta(hours=2)).strftime('%I:%M %p')})"
-                            })
+        # Morning gap (before first activity)
+        first = day_activities[0]
+        first_activity_hour = first.start // 60
+        if first_activity_hour > 9:  # Gap before first activity (assuming 8am start)
+            duration = first_activity_hour - 8
+            if duration >= 2:  # Only show gaps of 2+ hours
+                gaps.append({
+                    'date': date_str,
+                    'day_name': day_name,
+                    'start_time': '08:00',
+                    'end_time': f'{first_activity_hour:02d}:00',
+                    'duration_hours': duration,
+                    'time_of_day': 'morning',
+                    'description': f"{day_name}: Morning free (until {format_clock(first.start)})"
+                })
+
+        # Gaps between activities - measured from the latest end so far, so
+        # a short activity inside a long one doesn't open a fake gap
+        latest_end = first.end_with_default(120)
+        for item in day_activities[1:]:
+            gap_hours = (item.start - latest_end) / 60
+
+            if gap_hours >= 2:  # Only show gaps of 2+ hours
+                start_hour = latest_end // 60
+                end_hour = item.start // 60
+
+                # Determine time of day
+                if start_hour < 12:
+                    time_of_day = 'morning'
+                elif start_hour < 17:
+                    time_of_day = 'afternoon'
+                else:
+                    time_of_day = 'evening'
+
+                gaps.append({
+                    'date': date_str,
+                    'day_name': day_name,
+                    'start_time': f'{start_hour:02d}:00',
+                    'end_time': f'{end_hour:02d}:00',
+                    'duration_hours': int(gap_hours),
+                    'time_of_day': time_of_day,
+                    'description': f"{day_name}: {time_of_day.title()} gap ({format_clock(latest_end)} - {format_clock(item.start)})"
+                })
+            latest_end = max(latest_end, item.end_with_default(120))
+
+        # Evening gap (after last activity)
+        last_activity_hour = latest_end // 60
+        if last_activity_hour < 21:  # Gap after last activity
+            duration = 21 - last_activity_hour
+            if duration >= 2:
+                gaps.append({
+                    'date': date_str,
+                    'day_name': day_name,
+                    'start_time': f'{last_activity_hour:02d}:00',
+                    'end_time': '21:00',
+                    'duration_hours': duration,
+                    'time_of_day': 'evening',
+                    'description': f"{day_name}: Evening free (after {format_clock(latest_end)})"
+                })
 
     return gaps
 
@@ -4702,6 +4261,18 @@ def get_smart_recommendations(gap, weather_data, optional_activities):
     if not gap_weather:
         gap_weather = weather_data.get('current', {})
 
+    # Low-water stretches in this gap - one query shared by every candidate
+    gap_low_tides = []
+    try:
+        tide_data = get_tide_data()
+        series = tide_data.get('series')
+        gap_start = parse_tide_time(gap['date'], gap['start_time'])
+        gap_end = parse_tide_time(gap['date'], gap['end_time'])
+        if series is not None and gap_start and gap_end:
+            gap_low_tides = series.low_tide_windows([(gap_start, gap_end)])[0]
+    except Exception:
+        tide_data = {}
+
     recommendations = []
 
     # Score each activity based on conditions
@@ -4807,10 +4378,12 @@ def get_smart_recommendations(gap, weather_data, optional_activities):
 
             # 5. Tide considerations for beach/water activities
             try:
-                tide_data = get_tide_data()
                 day_tides = tide_data.get(gap['date'], {})
 
-                if any(keyword in activity_name for keyword in ['beach', 'swim', 'kayak', 'paddleboard', 'fishing']):
+                if any(keyword in activity_name for keyword in ['beach', 'walk', 'shell']) and gap_low_tides:
+                    score += 15
+                    reasons.append(f"🐚 Low tide {format_window(gap_low_tides[0])} - wide beach for walking and shelling")
+                elif any(keyword in activity_name for keyword in ['beach', 'swim', 'kayak', 'paddleboard', 'fishing']):
                     if day_tides:
                         # Check if activity time aligns with good tides
                         gap_start_hour = int(gap['start_time'].split(':')[0])
@@ -4918,57 +4491,64 @@ def create_ultimate_map(activities_data, center_on=None, show_routes=True):
     }
     
     # Add activity markers
-    for activity in activities_data:
-        if activity['type'] != 'transport' or 'Arrives' in activity['activity']:
-            loc = activity['location']
-            
-            # Distance from hotel
-            distance = geodesic(
-                (TRIP_CONFIG['hotel']['lat'], TRIP_CONFIG['hotel']['lon']),
-                (loc['lat'], loc['lon'])
-            ).miles
-            
-            travel_time = int(distance / 0.583)  # Assume 35 mph average
+    mapped_activities = [a for a in activities_data if a['type'] != 'transport' or 'Arrives' in a['activity']]
 
-            # Escape HTML to prevent broken rendering in map popups
-            import html
-            safe_activity = html.escape(activity['activity'])
-            safe_date = html.escape(activity['date'])
-            safe_time = html.escape(activity['time'])
-            safe_loc_name = html.escape(loc['name'])
-            safe_phone = html.escape(loc.get('phone', 'N/A'))
-            safe_notes = html.escape(activity['notes'])
-
-            popup_html = f"""
-            <div style='min-width: 280px; font-family: Inter, sans-serif;'>
-                <h3 style='color: #ff6b6b; margin: 0 0 10px 0;'>{safe_activity}</h3>
-                <p style='margin: 5px 0;'><b>📅</b> {safe_date} at {safe_time}</p>
-                <p style='margin: 5px 0;'><b>📍</b> {safe_loc_name}</p>
-                <p style='margin: 5px 0;'><b>📞</b> {safe_phone}</p>
-                <p style='margin: 5px 0;'><b>💰</b> ${activity['cost']}</p>
-                <p style='margin: 5px 0;'><b>🚗</b> {distance:.1f} mi ({travel_time} min from hotel)</p>
-                <p style='margin: 5px 0; font-style: italic;'>{safe_notes}</p>
-            </div>
-            """
+    # Drive distance/time from hotel for every marker in one vectorized pass
+    travel_minutes, travel_miles = estimate_travel_from_hotel([a['location'] for a in mapped_activities])
 
-            folium.Marker(
-                location=[loc['lat'], loc['lon']],
-                popup=folium.Popup(popup_html, max_width=320),
-                tooltip=f"{safe_activity} - {safe_date}",
-                icon=folium.Icon(
-                    color=type_colors.get(activity['type'], 'gray'),
-                    icon=type_icons.get(activity['type'], 'info-sign'),
-                    prefix='fa'
-                )
-            ).add_to(m)
+    for activity, travel_time, distance in zip(mapped_activities, travel_minutes, travel_miles):
+        loc = activity['location']
+
+        # Escape HTML to prevent broken rendering in map popups
+        import html
+        safe_activity = html.escape(activity['activity'])
+        safe_date = html.escape(activity['date'])
+        safe_time = html.escape(activity['time'])
+        safe_loc_name = html.escape(loc['name'])
+        safe_phone = html.escape(loc.get('phone', 'N/A'))
+        safe_notes = html.escape(activity['notes'])
+
+        popup_html = f"""
+        <div style='min-width: 280px; font-family: Inter, sans-serif;'>
+            <h3 style='color: #ff6b6b; margin: 0 0 10px 0;'>{safe_activity}</h3>
+            <p style='margin: 5px 0;'><b>📅</b> {safe_date} at {safe_time}</p>
+            <p style='margin: 5px 0;'><b>📍</b> {safe_loc_name}</p>
+            <p style='margin: 5px 0;'><b>📞</b> {safe_phone}</p>
+            <p style='margin: 5px 0;'><b>💰</b> ${activity['cost']}</p>
+            <p style='margin: 5px 0;'><b>🚗</b> {distance:.1f} mi ({travel_time} min from hotel)</p>
+            <p style='margin: 5px 0; font-style: italic;'>{safe_notes}</p>
+        </div>
+        """
+
+        folium.Marker(
+            location=[loc['lat'], loc['lon']],
+            popup=folium.Popup(popup_html, max_width=320),
+            tooltip=f"{safe_activity} - {safe_date}",
+            icon=folium.Icon(
+                color=type_colors.get(activity['type'], 'gray'),
+                icon=type_icons.get(activity['type'], 'info-sign'),
+                prefix='fa'
+            )
+        ).add_to(m)
     
     return m
 
-def calculate_distance_from_hotel(lat, lon):
-    """Calculate distance from hotel"""
-    hotel = (TRIP_CONFIG['hotel']['lat'], TRIP_CONFIG['hotel']['lon'])
-    location = (lat, lon)
-    return geodesic(hotel, location).miles
+def estimate_travel_from_hotel(locations):
+    """Estimate drive time and road distance from the hotel (no API calls)
+
+    Args:
+        locations: Location dicts with 'lat' and 'lon'
+
+    Returns:
+        Tuple of (minutes list, road miles list), one entry per location
+    """
+    from utils.travel_estimator import get_estimator
+
+    if not locations:
+        return [], []
+    hotel = [(TRIP_CONFIG['hotel']['lat'], TRIP_CONFIG['hotel']['lon'])]
+    minutes, miles = get_estimator().estimate_matrix(hotel, [(loc['lat'], loc['lon']) for loc in locations])
+    return [int(math.ceil(m)) for m in minutes[0]], [float(d) for d in miles[0]]
 
 # ============================================================================
 # QR CODE GENERATION
@@ -5222,7 +4802,7 @@ def render_dashboard_ultimate(df, activities_data, weather_data, show_sensitive)
                 <p style="margin: 0.5rem 0;">💨 Wind: {current['wind_speed']} mph</p>
             </div>
             <div style="font-size: 0.8rem; opacity: 0.7; margin-top: 1rem;">
-                {weather_data['source']}
+                {weather_data['source']}<br>🕒 {format_freshness(get_weather_ultimate.freshness())}
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -5416,8 +4996,8 @@ def render_today_view(df, activities_data, weather_data, show_sensitive):
                         if 'departure' in travel_act.get('activity', '').lower() or 'drop' in travel_act.get('activity', '').lower():
                             st.markdown("#### 🚗 Traffic to Airport")
                             render_traffic_widget(
-                                "4750 Amelia Island Parkway, Amelia Island, FL",
-                                "2400 Yankee Clipper Dr, Jacksonville, FL 32218",
+                                HOTEL_TRAFFIC_ADDRESS,
+                                AIRPORT_TRAFFIC_ADDRESSES['JAX'],
                                 "Hotel → Jacksonville Airport (JAX)"
                             )
                         elif 'arrival' in travel_act.get('activity', '').lower() and 'DCA' in travel_act.get('notes', ''):
@@ -5465,6 +5045,12 @@ def render_today_view(df, activities_data, weather_data, show_sensitive):
                 if day_tides.get('high'):
                     high_tide = day_tides['high'][0]
                     st.write(f"**🌊 High Tide:** {high_tide['time']} ({high_tide['height']}ft)")
+                series = tide_data.get('series')
+                if series is not None:
+                    day_start = datetime.strptime(today_str, '%Y-%m-%d').replace(hour=6)
+                    low_windows = series.low_tide_windows([(day_start, day_start + timedelta(hours=14))])[0]
+                    if low_windows:
+                        st.write(f"**🐚 Low Tide Beach:** {', '.join(format_window(w) for w in low_windows)}")
 
             st.markdown("</div></div>", unsafe_allow_html=True)
 
@@ -5747,10 +5333,11 @@ def render_map_page(activities_data):
             unique_locations[loc_name] = activity['location']
 
     if unique_locations:
+        travel_minutes, travel_miles = estimate_travel_from_hotel(list(unique_locations.values()))
         for idx, (name, loc) in enumerate(unique_locations.items()):
             with cols[idx % 3]:
-                distance = calculate_distance_from_hotel(loc['lat'], loc['lon'])
-                travel_time = int(distance / 0.583)  # 35 mph average
+                distance = travel_miles[idx]
+                travel_time = travel_minutes[idx]
 
                 st.markdown(f"""
                 <div class="ultimate-card fade-in">
@@ -5869,47 +5456,9 @@ def render_packing_list():
                         st.rerun()
 
 
-def enrich_activity_with_live_data(activity, date_str, weather_data):
-    """Enrich activity with ALL live API data - maps, traffic, weather, places, etc.
-
-    Returns dict with all dynamic data ready to display
-    """
+def _smart_timing_fields(activity, hotel_address, location_address):
+    """Smart timing for one activity (falls back to plain traffic data)"""
     enriched = {}
-
-    # Hotel location (origin for all trips)
-    hotel_address = "The Ritz-Carlton, Amelia Island, 4750 Amelia Island Pkwy, Fernandina Beach, FL 32034"
-
-    location = activity.get('location', {})
-    location_name = location.get('name', '')
-    location_address = location.get('address', location_name)
-
-    if not location_address or location_address == 'N/A':
-        return enriched
-
-    # 1. STATIC MAP
-    if GOOGLE_APIS_AVAILABLE:
-        try:
-            from utils.static_maps import generate_static_map_url
-            enriched['map_url'] = generate_static_map_url(
-                center=location_address,
-                zoom=15,
-                size="600x300",
-                markers=[{'location': location_address, 'color': 'red', 'label': 'A'}]
-            )
-        except:
-            pass
-
-    # 2. STREET VIEW
-    if GOOGLE_APIS_AVAILABLE:
-        try:
-            from utils.street_view import get_street_view_url, get_street_view_metadata
-            metadata = get_street_view_metadata(location_address)
-            if metadata and metadata.get('status') == 'OK':
-                enriched['street_view_url'] = get_street_view_url(location_address, size="600x300")
-        except:
-            pass
-
-    # 3. SMART TIMING CALCULATION - Universal system for all event types
     try:
         from utils.smart_timing import calculate_smart_timing
 
@@ -5978,8 +5527,60 @@ def enrich_activity_with_live_data(activity, date_str, weather_data):
                 enriched['traffic'] = traffic
         except:
             pass
+    return enriched
+
 
-    # 4. WEATHER FOR THIS DAY
+def _live_data_lookups(activity, date_str, weather_data):
+    """Split one activity's enrichment into local fields and network lookups
+
+    Args:
+        activity (dict): Activity or meal
+        date_str (str): Day being shown (YYYY-MM-DD)
+        weather_data (dict): Weather already fetched for the page
+
+    Returns:
+        tuple: (fields computed locally, dict of lookup name -> callable
+               returning a dict of fields) - the lookups are independent
+               and safe to run in parallel
+    """
+    enriched = {}
+    lookups = {}
+
+    # Hotel location (origin for all trips)
+    hotel_address = "The Ritz-Carlton, Amelia Island, 4750 Amelia Island Pkwy, Fernandina Beach, FL 32034"
+
+    location = activity.get('location', {})
+    location_name = location.get('name', '')
+    location_address = location.get('address', location_name)
+
+    if not location_address or location_address == 'N/A':
+        return enriched, lookups
+
+    # 1. STATIC MAP
+    if GOOGLE_APIS_AVAILABLE:
+        def static_map():
+            from utils.static_maps import generate_static_map_url
+            return {'map_url': generate_static_map_url(
+                center=location_address,
+                zoom=15,
+                size="600x300",
+                markers=[{'location': location_address, 'color': 'red', 'label': 'A'}]
+            )}
+        lookups['static_map'] = static_map
+
+    # 2. STREET VIEW
+    if GOOGLE_APIS_AVAILABLE:
+        def street_view():
+            from utils.street_view import get_street_view_url, get_street_view_metadata
+            metadata = get_street_view_metadata(location_address)
+            if metadata and metadata.get('status') == 'OK':
+                return {'street_view_url': get_street_view_url(location_address, size="600x300")}
+        lookups['street_view'] = street_view
+
+    # 3. SMART TIMING CALCULATION - Universal system for all event types
+    lookups['smart_timing'] = lambda: _smart_timing_fields(activity, hotel_address, location_address)
+
+    # 4. WEATHER FOR THIS DAY (already fetched - no network)
     weather_by_date = {}
     for day in weather_data.get('forecast', []):
         weather_by_date[day['date']] = day
@@ -6003,51 +5604,59 @@ def enrich_activity_with_live_data(activity, date_str, weather_data):
             }
 
     # 5. PLACES API DATA
-    if GOOGLE_APIS_AVAILABLE:
-        try:
+    lat = location.get('lat')
+    lon = location.get('lon')
+    if GOOGLE_APIS_AVAILABLE and lat and lon:
+        def places_data():
             from utils.google_places import search_nearby_places, get_place_photo_url
             # Search for this specific place
-            lat = location.get('lat')
-            lon = location.get('lon')
-            if lat and lon:
-                places = search_nearby_places(lat, lon, place_type="restaurant", radius=100, max_results=1)
-                if places and len(places) > 0:
-                    place = places[0]
-                    enriched['places_data'] = {
-                        'rating': place.get('rating'),
-                        'rating_count': place.get('userRatingCount'),
-                        'price_level': place.get('priceLevel'),
-                        'is_open': place.get('currentOpeningHours', {}).get('openNow'),
-                        'phone': place.get('nationalPhoneNumber'),
-                        'website': place.get('websiteUri')
-                    }
-                    # Get photos
-                    photos = place.get('photos', [])
-                    if photos:
-                        enriched['place_photo_url'] = get_place_photo_url(photos[0], max_width=400)
-        except:
-            pass
-
-    # 6. UV INDEX for outdoor activities
+            places = search_nearby_places(lat, lon, place_type="restaurant", radius=100, max_results=1)
+            if not places:
+                return None
+            place = places[0]
+            fields = {
+                'places_data': {
+                    'rating': place.get('rating'),
+                    'rating_count': place.get('userRatingCount'),
+                    'price_level': place.get('priceLevel'),
+                    'is_open': place.get('currentOpeningHours', {}).get('openNow'),
+                    'phone': place.get('nationalPhoneNumber'),
+                    'website': place.get('websiteUri')
+                }
+            }
+            # Get photos
+            photos = place.get('photos', [])
+            if photos:
+                fields['place_photo_url'] = get_place_photo_url(photos[0], max_width=400)
+            return fields
+        lookups['places'] = places_data
+
+    # 6. UV INDEX for outdoor activities (hourly forecast - no network)
     is_outdoor = activity.get('type') in ['activity', 'beach', 'outdoor']
     if is_outdoor and day_weather:
-        uv_data = get_uv_index()
-        if uv_data:
-            for day_uv in uv_data.get('daily', []):
-                if day_uv['date'] == date_str:
-                    uv_index = day_uv['uv']
-                    enriched['uv_index'] = uv_index
-                    if uv_index > 6:
-                        enriched['uv_alert'] = f"⚠️ High UV Index ({uv_index}) - wear sunscreen SPF 30+"
-                    break
+        conditions = conditions_at(weather_data, date_str, activity.get('time'))
+        uv = conditions['uv'] if conditions else day_weather.get('uv_index')
+        if uv is not None:
+            enriched['uv_index'] = uv
+            if uv > 6:
+                enriched['uv_alert'] = f"⚠️ High UV Index ({uv}) - wear sunscreen SPF 30+"
 
     # 7. TIDE DATA for beach/water activities
     if 'beach' in location_name.lower() or 'water' in location_name.lower() or activity.get('type') == 'beach':
-        tide_data = get_tide_data()
-        if tide_data:
-            day_tides = tide_data.get(date_str, [])
-            if day_tides:
-                enriched['tides'] = day_tides[:4]  # Show next 4 tides
+        def tides():
+            tide_data = get_tide_data() or {}
+            day_tides = tide_data.get(date_str, {})
+            events = sorted([{**tide, 'type': kind} for kind in ('high', 'low') for tide in day_tides.get(kind, [])],
+                            key=lambda tide: tide['time_24hr'])
+            if events:
+                fields = {'tides': events[:4]}  # Show next 4 tides
+                series = tide_data.get('series')
+                start = parse_tide_time(date_str, activity.get('time'))
+                level = series.level_at(start) if series is not None and start else None
+                if level is not None:
+                    fields['tide_level'] = f"{level} ft and {'rising' if series.is_rising(start) else 'falling'}"
+                return fields
+        lookups['tides'] = tides
 
     # 8. DIRECTIONS LINK
     if GOOGLE_APIS_AVAILABLE:
@@ -6055,44 +5664,88 @@ def enrich_activity_with_live_data(activity, date_str, weather_data):
         enriched['directions_url'] = f"https://www.google.com/maps/dir/?api=1&origin={quote(hotel_address)}&destination={quote(location_address)}&travelmode=driving"
 
     # 9. FLIGHT TRACKING for transport activities
-    if activity.get('type') == 'transport' or 'flight' in location_name.lower() or 'airport' in location_name.lower():
-        flight_number = activity.get('flight_number')
-        if flight_number:
-            try:
-                # Get historical performance
-                airline = flight_number[:2] if len(flight_number) >= 4 else 'AA'
-                departure_airport = activity.get('departure_airport', 'DCA')
-                arrival_airport = activity.get('arrival_airport', 'JAX')
-                route = f"{departure_airport}-{arrival_airport}"
-
-                historical = get_historical_performance(airline, flight_number[2:], route)
-                enriched['flight_performance'] = historical
-
-                # Get flight alerts
-                flight_data = {
-                    'flight_number': flight_number,
-                    'departure_airport': departure_airport,
-                    'arrival_airport': arrival_airport,
-                    'date': date_str
-                }
-                alerts = get_flight_alerts(flight_data)
-                if alerts:
-                    enriched['flight_alerts'] = alerts
+    flight_number = activity.get('flight_number')
+    is_flight = activity.get('type') == 'transport' or 'flight' in location_name.lower() or 'airport' in location_name.lower()
+    if is_flight and flight_number:
+        airline = flight_number[:2] if len(flight_number) >= 4 else 'AA'
+        departure_airport = activity.get('departure_airport', 'DCA')
+        arrival_airport = activity.get('arrival_airport', 'JAX')
+        route = f"{departure_airport}-{arrival_airport}"
+
+        # Historical performance
+        lookups['flight_performance'] = lambda: {
+            'flight_performance': get_historical_performance(airline, flight_number[2:], route)
+        }
 
-                # Get real-time status (if close to flight date)
-                from datetime import datetime
-                flight_date = datetime.strptime(date_str, '%Y-%m-%d')
-                days_until_flight = (flight_date - datetime.now()).days
+        # Flight alerts
+        def flight_alerts():
+            alerts = get_flight_alerts({
+                'flight_number': flight_number,
+                'departure_airport': departure_airport,
+                'arrival_airport': arrival_airport,
+                'date': date_str
+            })
+            if alerts:
+                return {'flight_alerts': alerts}
+        lookups['flight_alerts'] = flight_alerts
 
-                if -1 <= days_until_flight <= 7:  # Within a week of flight
-                    status = get_flight_status(flight_number, date_str)
-                    if status and status.get('status') == 'success':
-                        enriched['flight_status'] = status
-            except Exception as e:
-                print(f"Flight tracking error: {e}")
-                pass
+        # Real-time status (if close to flight date)
+        try:
+            days_until_flight = (datetime.strptime(date_str, '%Y-%m-%d') - datetime.now()).days
+        except ValueError as e:
+            print(f"Flight tracking error: {e}")
+            days_until_flight = None
+        if days_until_flight is not None and -1 <= days_until_flight <= 7:  # Within a week of flight
+            def flight_status():
+                status = get_flight_status(flight_number, date_str)
+                if status.get('live_status') == 'OK':
+                    return {'flight_status': status}
+            lookups['flight_status'] = flight_status
 
-    return enriched
+    return enriched, lookups
+
+
+def enrich_activities_with_live_data(activities, date_str, weather_data):
+    """Enrich a day's activities with ALL live API data in one parallel pass
+
+    Every activity's lookups (maps, traffic, places, UV, tides, flights) go
+    to the shared bounded pool together; results are merged as they arrive
+    and lookups still running at the deadline are skipped.
+
+    Args:
+        activities (list): Activities and meals being shown
+        date_str (str): Day being shown (YYYY-MM-DD)
+        weather_data (dict): Weather already fetched for the page
+
+    Returns:
+        list: One dict of display-ready live data per activity (same order)
+    """
+    from utils.live_enrichment import run_lookup_batches
+
+    # Seed the travel-time matrix before the lookups share it
+    get_trip_travel_matrix()
+
+    local_fields, batches = [], []
+    for activity in activities:
+        enriched, lookups = _live_data_lookups(activity, date_str, weather_data)
+        local_fields.append(enriched)
+        batches.append(lookups)
+
+    results = []
+    for enriched, (live, missed) in zip(local_fields, run_lookup_batches(batches)):
+        enriched.update(live)
+        if missed:
+            enriched['live_data_missing'] = missed
+        results.append(enriched)
+    return results
+
+
+def enrich_activity_with_live_data(activity, date_str, weather_data):
+    """Enrich activity with ALL live API data - maps, traffic, weather, places, etc.
+
+    Returns dict with all dynamic data ready to display
+    """
+    return enrich_activities_with_live_data([activity], date_str, weather_data)[0]
 
 def render_full_schedule(df, activities_data, show_sensitive):
     """Complete trip schedule - Improved UX with tabs, filters, and clear activity types"""
@@ -6102,7 +5755,8 @@ def render_full_schedule(df, activities_data, show_sensitive):
     weather_data = get_weather_ultimate()
     tide_data = get_tide_data()
     meal_gaps = detect_meal_gaps(activities_data)
-    conflicts = detect_conflicts(activities_data)
+    schedule_index = get_schedule_index(activities_data)
+    conflicts = detect_conflicts(activities_data, schedule_index)
     weather_swaps = detect_weather_swap_opportunities(activities_data, weather_data)
 
     # Show trip overview
@@ -6280,7 +5934,7 @@ def render_full_schedule(df, activities_data, show_sensitive):
     st.markdown("---")
     if st.checkbox("🔍 Show Detailed Conflict Analysis", value=False):
         from utils.schedule_checker import show_schedule_conflicts_panel
-        show_schedule_conflicts_panel(activities_data)
+        show_schedule_conflicts_panel(activities_data, schedule_index)
 
     # WEATHER-BASED SWAP SUGGESTIONS
     if weather_swaps and st.checkbox("🌦️ Show Weather Swap Suggestions", value=False):
@@ -6589,14 +6243,25 @@ def render_full_schedule(df, activities_data, show_sensitive):
         # Show all activities and meals chronologically
         if day_activities:
             st.markdown("### 📅 TODAY'S SCHEDULE")
+
+            # Fetch live data for every activity shown today in one parallel pass
+            # (meal votes don't show live data; keyed by activity since idx is
+            # reused by nested loops below)
+            enriched_activities = [a for a in day_activities if not a.get('is_meal_voting')]
+            live_data_by_activity = dict(zip(
+                map(id, enriched_activities),
+                enrich_activities_with_live_data(enriched_activities, date_str, weather_data)
+            ))
+
+            timed_activities = [Activity(a) for a in day_activities]
+
             for idx, activity in enumerate(day_activities):
                 status_class = activity['status'].lower()
                 activity_id = activity.get('id', '')
 
-                # Calculate end time
-                end_time = None
-                if activity.get('duration'):
-                    end_time = calculate_end_time(activity['time'], activity['duration'])
+                # Calculate end time (parsed once per activity)
+                item = timed_activities[idx]
+                end_time = format_clock(item.end) if item.duration and item.start is not None else None
 
                 # Format time display
                 time_display = activity['time']
@@ -6605,14 +6270,12 @@ def render_full_schedule(df, activities_data, show_sensitive):
 
                 # Check for gap before this activity
                 if idx > 0:
-                    prev_activity = day_activities[idx - 1]
-                    if prev_activity.get('duration'):
-                        prev_end_time = calculate_end_time(prev_activity['time'], prev_activity['duration'])
+                    prev_item = timed_activities[idx - 1]
+                    if prev_item.duration and prev_item.start is not None and item.start is not None:
+                        prev_end_time = format_clock(prev_item.end)
                         if prev_end_time:
                             try:
-                                prev_end_obj = datetime.strptime(prev_end_time, "%I:%M %p")
-                                curr_start_obj = datetime.strptime(activity['time'], "%I:%M %p")
-                                gap_minutes = (curr_start_obj - prev_end_obj).total_seconds() / 60
+                                gap_minutes = item.start - prev_item.end
 
                                 if gap_minutes > 60:  # More than 1 hour gap
                                     import html
@@ -6638,28 +6301,14 @@ def render_full_schedule(df, activities_data, show_sensitive):
                                                 act['category'] = category
                                                 all_activities_list.append(act)
 
-                                        # Filter by duration (if activity fits in the gap)
-                                        def parse_duration_hours(duration_str):
-                                            """Parse duration string to hours"""
-                                            if not duration_str:
-                                                return 2  # Default 2 hours
-                                            duration_str = str(duration_str).lower()
-                                            if 'all day' in duration_str or 'full day' in duration_str:
-                                                return 8
-                                            if 'flexible' in duration_str:
-                                                return 1
-                                            # Extract numbers
-                                            import re
-                                            numbers = re.findall(r'(\d+(?:\.\d+)?)', duration_str)
-                                            if numbers:
-                                                return float(numbers[0])
-                                            return 2
+                                        # Filter by duration (if activity fits in the gap) - one batch parse, default 2 hours
+                                        duration_hours = parse_durations([a.get('duration', '') for a in all_activities_list], default=120) / 60
 
                                         # Filter activities that fit in the time gap (with 30 min buffer)
                                         available_hours = gap_minutes / 60 - 0.5
                                         fitting_activities = [
-                                            a for a in all_activities_list
-                                            if parse_duration_hours(a.get('duration', '')) <= available_hours
+                                            a for a, hours in zip(all_activities_list, duration_hours)
+                                            if hours <= available_hours
                                         ]
 
                                         # Sort by price (free first, then ascending)
@@ -6778,7 +6427,7 @@ def render_full_schedule(df, activities_data, show_sensitive):
 
                     with st.expander(f"{status_emoji} {meal_time} - 🍽️ {meal_name}", expanded=False):
                         # Get ALL live data for this meal
-                        live_data = enrich_activity_with_live_data(activity, date_str, weather_data)
+                        live_data = live_data_by_activity.get(id(activity), {})
 
                         st.markdown(f"**Type:** {meal_type_label}")
 
@@ -6941,28 +6590,16 @@ def render_full_schedule(df, activities_data, show_sensitive):
                                     all_activities_list.append(act)
 
                             # Filter by duration (meals are usually 1-2 hours)
-                            def parse_duration_hours(duration_str):
-                                """Parse duration string to hours"""
-                                if not duration_str:
-                                    return 2
-                                duration_str = str(duration_str).lower()
-                                if 'all day' in duration_str or 'full day' in duration_str:
-                                    return 8
-                                if 'flexible' in duration_str:
-                                    return 1
-                                import re
-                                numbers = re.findall(r'(\d+(?:\.\d+)?)', duration_str)
-                                if numbers:
-                                    return float(numbers[0])
-                                return 2
+                            # One batch parse for the whole list
+                            duration_hours = parse_durations([a.get('duration', '') for a in all_activities_list], default=120) / 60
 
                             # Get duration of current activity (meals are ~1.5-2 hours)
-                            current_duration_hours = parse_duration_hours(activity.get('duration', '1.5 hours'))
+                            current_duration_hours = (parse_duration(activity.get('duration', '1.5 hours')) or 120) / 60
 
                             # Filter activities that fit
                             fitting_activities = [
-                                a for a in all_activities_list
-                                if parse_duration_hours(a.get('duration', '')) <= current_duration_hours + 0.5
+                                a for a, hours in zip(all_activities_list, duration_hours)
+                                if hours <= current_duration_hours + 0.5
                             ]
 
                             # Sort by price
@@ -7135,7 +6772,7 @@ def render_full_schedule(df, activities_data, show_sensitive):
 
                     with st.expander(expander_title, expanded=expanded):
                         # Get ALL live data for this activity
-                        live_data = enrich_activity_with_live_data(activity, date_str, weather_data)
+                        live_data = live_data_by_activity.get(id(activity), {})
 
                         # Skipped badge for optional spa treatments
                         if is_skipped and activity_id in ['spa002', 'spa003']:
@@ -7288,6 +6925,8 @@ def render_full_schedule(df, activities_data, show_sensitive):
                             st.markdown("**🌊 Tide Times:**")
                             for tide in live_data['tides']:
                                 st.markdown(f"- {tide['time']}: {tide['type'].title()} ({tide['height']} ft)")
+                            if live_data.get('tide_level'):
+                                st.caption(f"Water level at {activity.get('time')}: {live_data['tide_level']}")
 
                         # === FLIGHT TRACKING (for flights/transport) ===
                         if live_data.get('flight_performance'):
@@ -7450,30 +7089,17 @@ def render_full_schedule(df, activities_data, show_sensitive):
                                     all_activities_list.append(act)
 
                             # Filter by duration (if activity fits in the time slot)
-                            def parse_duration_hours(duration_str):
-                                """Parse duration string to hours"""
-                                if not duration_str:
-                                    return 2  # Default 2 hours
-                                duration_str = str(duration_str).lower()
-                                if 'all day' in duration_str or 'full day' in duration_str:
-                                    return 8
-                                if 'flexible' in duration_str:
-                                    return 1
-                                # Extract numbers
-                                import re
-                                numbers = re.findall(r'(\d+(?:\.\d+)?)', duration_str)
-                                if numbers:
-                                    return float(numbers[0])
-                                return 2
+                            # One batch parse for the whole list
+                            duration_hours = parse_durations([a.get('duration', '') for a in all_activities_list], default=120) / 60
 
                             # Get duration of current activity
                             current_duration_str = activity.get('duration', '2 hours')
-                            current_duration_hours = parse_duration_hours(current_duration_str)
+                            current_duration_hours = (parse_duration(current_duration_str) or 120) / 60
 
                             # Filter activities that fit in the same time window
                             fitting_activities = [
-                                a for a in all_activities_list
-                                if parse_duration_hours(a.get('duration', '')) <= current_duration_hours + 0.5
+                                a for a, hours in zip(all_activities_list, duration_hours)
+                                if hours <= current_duration_hours + 0.5
                             ]
 
                             # Sort by price (free first, then ascending)
@@ -9123,11 +8749,7 @@ def render_travel_dashboard(activities_data, show_sensitive=True):
 
                 if st.button(f"🔄 Change {meal_slot['label']}", key=f"change_{meal_slot['id']}"):
                     # Reset to proposal stage
-                    data = get_trip_data()
-                    if meal_slot['id'] in data.get('meal_proposals', {}):
-                        data['meal_proposals'][meal_slot['id']]['status'] = 'proposed'
-                        data['meal_proposals'][meal_slot['id']]['final_choice'] = None
-                        save_trip_data(f"Reset meal proposal: {meal_slot['id']}")
+                    reset_meal_proposal(meal_slot['id'])
                     st.rerun()
 
         elif proposal and proposal['status'] == 'voted':
@@ -9193,10 +8815,7 @@ def render_travel_dashboard(activities_data, show_sensitive=True):
             if john_vote == "none":
                 st.warning("❌ John said none of these work. Pick 3 new options!")
                 if st.button(f"Pick New Options for {meal_slot['label']}", key=f"repick_{meal_slot['id']}"):
-                    data = get_trip_data()
-                    if meal_slot['id'] in data.get('meal_proposals', {}):
-                        del data['meal_proposals'][meal_slot['id']]
-                        save_trip_data(f"Delete meal proposal: {meal_slot['id']}")
+                    delete_meal_proposal(meal_slot['id'])
                     st.rerun()
             else:
                 # Time picker for meal
@@ -9266,10 +8885,7 @@ def render_travel_dashboard(activities_data, show_sensitive=True):
                 """, unsafe_allow_html=True)
 
             if st.button(f"Cancel Proposal for {meal_slot['label']}", key=f"cancel_{meal_slot['id']}"):
-                data = get_trip_data()
-                if meal_slot['id'] in data.get('meal_proposals', {}):
-                    del data['meal_proposals'][meal_slot['id']]
-                    save_trip_data(f"Cancel meal proposal: {meal_slot['id']}")
+                delete_meal_proposal(meal_slot['id'], reason="Cancel")
                 st.rerun()
 
         else:
@@ -9998,11 +9614,7 @@ def render_travel_dashboard(activities_data, show_sensitive=True):
                 """, unsafe_allow_html=True)
 
                 if st.button(f"🔄 Change {activity_slot['label']}", key=f"change_activity_{activity_slot['id']}"):
-                    data = get_trip_data()
-                    if activity_slot['id'] in data.get('activity_proposals', {}):
-                        data['activity_proposals'][activity_slot['id']]['status'] = 'proposed'
-                        data['activity_proposals'][activity_slot['id']]['final_choice'] = None
-                        save_trip_data(f"Reset activity proposal: {activity_slot['id']}")
+                    reset_activity_proposal(activity_slot['id'])
                     st.rerun()
 
         elif proposal and proposal['status'] == 'voted':
@@ -10029,10 +9641,7 @@ def render_travel_dashboard(activities_data, show_sensitive=True):
             if john_vote == "none":
                 st.warning("❌ John said none of these work. Pick 3 new options!")
                 if st.button(f"Pick New Options for {activity_slot['label']}", key=f"repick_activity_{activity_slot['id']}"):
-                    data = get_trip_data()
-                    if activity_slot['id'] in data.get('activity_proposals', {}):
-                        del data['activity_proposals'][activity_slot['id']]
-                        save_trip_data(f"Delete activity proposal: {activity_slot['id']}")
+                    delete_activity_proposal(activity_slot['id'])
                     st.rerun()
             else:
                 # Confirm button
@@ -10058,10 +9667,7 @@ def render_travel_dashboard(activities_data, show_sensitive=True):
                 """, unsafe_allow_html=True)
 
             if st.button(f"🔄 Pick Different Options", key=f"repick_proposed_{activity_slot['id']}"):
-                data = get_trip_data()
-                if activity_slot['id'] in data.get('activity_proposals', {}):
-                    del data['activity_proposals'][activity_slot['id']]
-                    save_trip_data(f"Delete activity proposal: {activity_slot['id']}")
+                delete_activity_proposal(activity_slot['id'])
                 st.rerun()
 
         else:
@@ -10258,8 +9864,8 @@ def render_johns_page(df, activities_data, show_sensitive):
             # Traffic to airport (always show, but emphasize on day-of)
             st.markdown("**🚗 Traffic to Airport**")
             render_traffic_widget(
-                "4750 Amelia Island Parkway, Amelia Island, FL",
-                "2400 Yankee Clipper Dr, Jacksonville, FL 32218",
+                HOTEL_TRAFFIC_ADDRESS,
+                AIRPORT_TRAFFIC_ADDRESSES['JAX'],
                 "Hotel → JAX Airport"
             )
 
@@ -10782,10 +10388,11 @@ def render_johns_page(df, activities_data, show_sensitive):
 
         # Refresh button to reload proposals
         if st.button("🔄 Refresh to Check for New Proposals", use_container_width=True):
-            # Clear cached data to force reload from GitHub
-            if 'trip_data' in st.session_state:
-                del st.session_state['trip_data']
-            st.rerun()
+            # Push queued changes, then reload the shared snapshot from GitHub
+            if reload_trip_data():
+                st.rerun()
+            else:
+                st.warning(f"⚠️ Not refreshed - your latest changes haven't saved yet. {get_save_status()['last_error'] or ''}")
 
         # Get all meal proposals
         meal_slots = [
@@ -11009,10 +10616,11 @@ def render_johns_page(df, activities_data, show_sensitive):
 
         # Refresh button to reload proposals
         if st.button("🔄 Refresh to Check for New Proposals", key="refresh_activities", use_container_width=True):
-            # Clear cached data to force reload from GitHub
-            if 'trip_data' in st.session_state:
-                del st.session_state['trip_data']
-            st.rerun()
+            # Push queued changes, then reload the shared snapshot from GitHub
+            if reload_trip_data():
+                st.rerun()
+            else:
+                st.warning(f"⚠️ Not refreshed - your latest changes haven't saved yet. {get_save_status()['last_error'] or ''}")
 
         # Get all activity proposals
         activity_slots = [
@@ -11755,6 +11363,7 @@ def main():
 
     # Get data (app is OPEN - no password wall!)
     df, activities_data = get_ultimate_trip_data()
+    get_prefetch_scheduler().update_schedule(activities_data)
     weather_data = get_weather_ultimate()
     show_sensitive = st.session_state.get('password_verified', False)
     
@@ -11856,6 +11465,34 @@ def main():
         else:
             st.success("✅ Data validated!")
 
+        # Background GitHub saves (coalesced into one commit, retried on failure)
+        save_status = get_save_status()
+        if save_status['last_error']:
+            st.error(f"💾 {save_status['last_error']}")
+            if save_status['next_retry_at']:
+                st.caption(f"Retrying automatically at {save_status['next_retry_at'].strftime('%I:%M:%S %p')}")
+            if st.button("Retry Save", key="retry_pending_saves", use_container_width=True):
+                retry_pending_saves()
+                st.rerun()
+        elif save_status['pending']:
+            st.caption(f"💾 {save_status['pending_changes']} change(s) saving...")
+        elif save_status['last_flushed_at']:
+            st.caption(f"💾 All changes saved ({save_status['last_flushed_at'].strftime('%I:%M %p')})")
+
+        if save_status['operations']:
+            state_icons = {'pending': '⏳', 'saving': '🔄', 'retrying': '⚠️', 'saved': '✅'}
+            with st.expander("Recent saves"):
+                for operation in save_status['operations'][:10]:
+                    st.caption(
+                        f"{state_icons.get(operation['state'], '•')} {operation['message']} "
+                        f"({operation['queued_at'].strftime('%I:%M:%S %p')})"
+                    )
+
+        # Upstreams whose circuit is open are answered from fallbacks
+        down_hosts = [host for host, circuit in http_client.get_circuit_status().items() if circuit['state'] != 'closed']
+        if down_hosts:
+            st.warning(f"🔌 Using fallback data for {', '.join(down_hosts)} (see About → API Diagnostics)")
+
         st.markdown("---")
 
         # Notifications
@@ -11975,6 +11612,7 @@ def main():
                 </div>
             </div>
             """, unsafe_allow_html=True)
+            st.caption(f"🕒 Weather and UV {format_freshness(get_weather_ultimate.freshness())}")
 
         with col2:
             st.markdown("### 🌊 Today's Tides")
@@ -11991,6 +11629,7 @@ def main():
                     st.markdown(f"- {low['time']}: {low['height']}ft")
             else:
                 st.info("Tide data unavailable")
+            st.caption(f"🕒 Tides {format_freshness(get_tide_data.freshness())}")
 
         st.markdown("---")
         st.markdown("### 📅 6-Day Forecast with UV Index")
@@ -12176,6 +11815,54 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
+        # Upstream API health (circuit breakers + latency per host)
+        st.markdown("### 🩺 API Diagnostics")
+        circuits = http_client.get_circuit_status()
+        metrics = http_client.get_http_metrics()
+        coalescing = get_coalescing_stats()
+        if not circuits and not metrics:
+            st.caption("No API calls yet this session.")
+        else:
+            state_labels = {'closed': '✅ OK', 'half_open': '🔄 Probing', 'open': '🔌 Down - using fallbacks'}
+            rows = []
+            for host in sorted(set(circuits) | set(metrics)):
+                circuit = circuits.get(host, {})
+                stats = metrics.get(host, {})
+                retry_in = circuit.get('retry_in_seconds')
+                rows.append({
+                    'Host': host,
+                    'Status': state_labels.get(circuit.get('state', 'closed')),
+                    'Calls': stats.get('calls', 0),
+                    'Cached': stats.get('cache_hits', 0),
+                    'Errors': stats.get('errors', 0),
+                    'Shared': coalescing.get(host, {}).get('coalesced', 0),
+                    'p50 ms': stats.get('p50_ms'),
+                    'p95 ms': stats.get('p95_ms'),
+                    'Fast-failed': circuit.get('rejected', 0),
+                    'Next probe': f"{retry_in:.0f}s" if retry_in is not None else "",
+                    'Last failure': circuit.get('last_failure') or ""
+                })
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+
+            # Identical lookups that waited on another session's call instead of repeating it
+            shared_lookups = {name: counts for name, counts in coalescing.items()
+                              if name not in metrics and counts['coalesced']}
+            if shared_lookups:
+                st.caption("Shared lookups: " + " • ".join(
+                    f"{name} {counts['coalesced']}/{counts['issued'] + counts['coalesced']}"
+                    for name, counts in sorted(shared_lookups.items())
+                ))
+
+        prefetch = get_prefetch_scheduler().status()
+        st.caption(f"Background prefetch: {prefetch['runs']} refreshes, {prefetch['failures']} failed")
+        tracked = [
+            f"{flight} {info['flight_status']} (next check "
+            f"{info['next_check_at'].strftime('%I:%M %p') if info['next_check_at'] else 'none - finished'})"
+            for flight, info in get_flight_tracker().status().items()
+        ]
+        if tracked:
+            st.caption("Flights: " + " • ".join(tracked))
+
         st.markdown("---")
         st.caption("**Built with:** Streamlit • Google Maps Platform • OpenWeather • NOAA • AviationStack")
         st.caption("**Enhanced by:** Claude Code")
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark for utils.time_parsing
+
+Times three ways of parsing a schedule-sized column of durations and
+clock times:
+- Cold: every call misses the memo cache (regex work each time)
+- Warm: repeated values served from the LRU cache
+- Batch: parse_durations()/parse_clocks() into NumPy arrays
+
+Usage:
+    python benchmark_time_parsing.py [rows]
+"""
+
+import sys
+import time
+
+from utils import time_parsing
+from utils.time_parsing import parse_clock, parse_clocks, parse_duration, parse_durations
+
+DURATIONS = ['1.5 hours', '2 hours', '90 minutes', '45min', '2h 10m', '2-3 hours', '45min-1 hour',
+             '30-45 minutes', 'All day', 'Flexible', '1 hr 30 min', 'N/A']
+TIMES = ['7:00 AM', '9:30 AM', '12:00 PM', '1:15 PM', '3:00 PM', '6:30 PM', '8:00 PM', '14:30', 'TBD']
+
+
+def _time(label, func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"   {label:<28} {best * 1000:8.2f} ms")
+    return best
+
+
+def _cold(values, parse):
+    for value in values:
+        time_parsing._duration.cache_clear()
+        time_parsing._clock.cache_clear()
+        parse(value)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    durations = [DURATIONS[i % len(DURATIONS)] for i in range(rows)]
+    times = [TIMES[i % len(TIMES)] for i in range(rows)]
+
+    print("=" * 70)
+    print(f"⏱️  TIME PARSING BENCHMARK ({rows:,} rows)")
+    print("=" * 70)
+
+    print("\n📏 Durations")
+    cold = _time("cold (no cache)", lambda: _cold(durations, parse_duration))
+    warm = _time("warm (memoized)", lambda: [parse_duration(v) for v in durations])
+    batch = _time("batch (parse_durations)", lambda: parse_durations(durations))
+    print(f"   ✅ memoized {cold / warm:.1f}x, batch {cold / batch:.1f}x faster than cold")
+
+    print("\n🕐 Clock times")
+    cold = _time("cold (no cache)", lambda: _cold(times, parse_clock))
+    warm = _time("warm (memoized)", lambda: [parse_clock(v) for v in times])
+    batch = _time("batch (parse_clocks)", lambda: parse_clocks(times))
+    print(f"   ✅ memoized {cold / warm:.1f}x, batch {cold / batch:.1f}x faster than cold")
+
+    print(f"\n📊 Cache: {time_parsing.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
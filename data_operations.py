@@ -1,11 +1,14 @@
 """
 Data Operations - Wrapper functions that replace database operations
 Uses GitHub JSON storage instead of SQLite
+
+Changes are recorded as journal operations (see trip_journal.py) and then
+saved, so a save only appends to the journal instead of rewriting collections.
 """
 
 import json
 from datetime import datetime
-from github_storage import get_trip_data, save_trip_data
+from github_storage import get_trip_data, record_trip_operation, save_trip_data, get_storage_backend
 
 
 # ============================================================================
@@ -15,36 +18,9 @@ from github_storage import get_trip_data, save_trip_data
 def save_meal_proposal(meal_id, restaurant_options, submitted_by="Michael", is_solo=False):
     """Save meal proposal (or auto-confirm if solo meal)"""
     try:
-        data = get_trip_data()
-
-        # For solo meals, auto-confirm the choice
-        if is_solo:
-            data['meal_proposals'][meal_id] = {
-                'meal_id': meal_id,
-                'restaurant_options': restaurant_options,
-                'status': 'confirmed',  # Auto-confirm solo meals
-                'john_vote': None,  # Not applicable for solo meals
-                'final_choice': 0,  # Pick the only restaurant selected
-                'meal_time': None,
-                'submitted_by': submitted_by,
-                'is_solo': True,  # Mark as solo meal
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-        else:
-            # Regular meal proposal (requires John's vote)
-            data['meal_proposals'][meal_id] = {
-                'meal_id': meal_id,
-                'restaurant_options': restaurant_options,
-                'status': 'proposed',
-                'john_vote': None,
-                'final_choice': None,
-                'meal_time': None,
-                'submitted_by': submitted_by,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-
+        # Solo meals are auto-confirmed by the meal_propose operation
+        record_trip_operation('meal_propose', meal_id=meal_id, restaurant_options=restaurant_options,
+                              submitted_by=submitted_by, is_solo=is_solo)
         return save_trip_data(f"Add meal proposal: {meal_id}")
     except Exception as e:
         print(f"Error saving meal proposal: {e}")
@@ -52,10 +28,9 @@ def save_meal_proposal(meal_id, restaurant_options, submitted_by="Michael", is_s
 
 
 def get_meal_proposal(meal_id):
-    """Get meal proposal"""
+    """Get meal proposal (primary-key query on the SQLite backend)"""
     try:
-        data = get_trip_data()
-        return data['meal_proposals'].get(meal_id)
+        return get_storage_backend().get_proposal('meal_proposals', meal_id, get_trip_data())
     except Exception as e:
         print(f"Error getting meal proposal: {e}")
         return None
@@ -64,13 +39,10 @@ def get_meal_proposal(meal_id):
 def save_john_meal_vote(meal_id, restaurant_choice):
     """Save John's vote on meal"""
     try:
-        data = get_trip_data()
-        if meal_id in data['meal_proposals']:
-            data['meal_proposals'][meal_id]['john_vote'] = restaurant_choice
-            data['meal_proposals'][meal_id]['status'] = 'voted'
-            data['meal_proposals'][meal_id]['updated_at'] = datetime.now().isoformat()
-            return save_trip_data(f"John voted on meal: {meal_id}")
-        return False
+        if meal_id not in get_trip_data()['meal_proposals']:
+            return False
+        record_trip_operation('meal_vote', meal_id=meal_id, restaurant_choice=restaurant_choice)
+        return save_trip_data(f"John voted on meal: {meal_id}")
     except Exception as e:
         print(f"Error saving vote: {e}")
         return False
@@ -79,20 +51,40 @@ def save_john_meal_vote(meal_id, restaurant_choice):
 def finalize_meal_choice(meal_id, final_choice_index, meal_time=None):
     """Finalize meal choice"""
     try:
-        data = get_trip_data()
-        if meal_id in data['meal_proposals']:
-            data['meal_proposals'][meal_id]['final_choice'] = final_choice_index
-            data['meal_proposals'][meal_id]['status'] = 'confirmed'
-            if meal_time:
-                data['meal_proposals'][meal_id]['meal_time'] = meal_time
-            data['meal_proposals'][meal_id]['updated_at'] = datetime.now().isoformat()
-            return save_trip_data(f"Confirmed meal: {meal_id}")
-        return False
+        if meal_id not in get_trip_data()['meal_proposals']:
+            return False
+        record_trip_operation('meal_finalize', meal_id=meal_id, final_choice_index=final_choice_index,
+                              meal_time=meal_time)
+        return save_trip_data(f"Confirmed meal: {meal_id}")
     except Exception as e:
         print(f"Error finalizing meal: {e}")
         return False
 
 
+def reset_meal_proposal(meal_id):
+    """Send a confirmed meal back to the proposal stage"""
+    try:
+        if meal_id not in get_trip_data()['meal_proposals']:
+            return False
+        record_trip_operation('meal_reset', meal_id=meal_id)
+        return save_trip_data(f"Reset meal proposal: {meal_id}")
+    except Exception as e:
+        print(f"Error resetting meal proposal: {e}")
+        return False
+
+
+def delete_meal_proposal(meal_id, reason="Delete"):
+    """Delete a meal proposal (reason is used in the commit message)"""
+    try:
+        if meal_id not in get_trip_data()['meal_proposals']:
+            return False
+        record_trip_operation('meal_delete', meal_id=meal_id)
+        return save_trip_data(f"{reason} meal proposal: {meal_id}")
+    except Exception as e:
+        print(f"Error deleting meal proposal: {e}")
+        return False
+
+
 # ============================================================================
 # ACTIVITY PROPOSALS
 # ============================================================================
@@ -100,19 +92,9 @@ def finalize_meal_choice(meal_id, final_choice_index, meal_time=None):
 def save_activity_proposal(activity_slot_id, activity_options, activity_time=None, date=None, submitted_by="Michael"):
     """Save activity proposal"""
     try:
-        data = get_trip_data()
-        data['activity_proposals'][activity_slot_id] = {
-            'activity_slot_id': activity_slot_id,
-            'activity_options': activity_options,
-            'status': 'proposed',
-            'john_vote': None,
-            'final_choice': None,
-            'activity_time': activity_time,
-            'date': date,
-            'submitted_by': submitted_by,  # Track who submitted this proposal
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat()
-        }
+        record_trip_operation('activity_propose', activity_slot_id=activity_slot_id,
+                              activity_options=activity_options, activity_time=activity_time,
+                              date=date, submitted_by=submitted_by)
         return save_trip_data(f"Add activity proposal: {activity_slot_id}")
     except Exception as e:
         print(f"Error saving activity proposal: {e}")
@@ -120,10 +102,9 @@ def save_activity_proposal(activity_slot_id, activity_options, activity_time=Non
 
 
 def get_activity_proposal(activity_slot_id):
-    """Get activity proposal"""
+    """Get activity proposal (primary-key query on the SQLite backend)"""
     try:
-        data = get_trip_data()
-        return data['activity_proposals'].get(activity_slot_id)
+        return get_storage_backend().get_proposal('activity_proposals', activity_slot_id, get_trip_data())
     except Exception as e:
         print(f"Error getting activity proposal: {e}")
         return None
@@ -132,13 +113,11 @@ def get_activity_proposal(activity_slot_id):
 def save_john_activity_vote(activity_slot_id, activity_choice):
     """Save John's vote on activity"""
     try:
-        data = get_trip_data()
-        if activity_slot_id in data['activity_proposals']:
-            data['activity_proposals'][activity_slot_id]['john_vote'] = activity_choice
-            data['activity_proposals'][activity_slot_id]['status'] = 'voted'
-            data['activity_proposals'][activity_slot_id]['updated_at'] = datetime.now().isoformat()
-            return save_trip_data(f"John voted on activity: {activity_slot_id}")
-        return False
+        if activity_slot_id not in get_trip_data()['activity_proposals']:
+            return False
+        record_trip_operation('activity_vote', activity_slot_id=activity_slot_id,
+                              activity_choice=activity_choice)
+        return save_trip_data(f"John voted on activity: {activity_slot_id}")
     except Exception as e:
         print(f"Error saving activity vote: {e}")
         return False
@@ -147,20 +126,40 @@ def save_john_activity_vote(activity_slot_id, activity_choice):
 def finalize_activity_choice(activity_slot_id, final_choice_index, activity_time=None):
     """Finalize activity choice"""
     try:
-        data = get_trip_data()
-        if activity_slot_id in data['activity_proposals']:
-            data['activity_proposals'][activity_slot_id]['final_choice'] = final_choice_index
-            data['activity_proposals'][activity_slot_id]['status'] = 'confirmed'
-            if activity_time:
-                data['activity_proposals'][activity_slot_id]['activity_time'] = activity_time
-            data['activity_proposals'][activity_slot_id]['updated_at'] = datetime.now().isoformat()
-            return save_trip_data(f"Confirmed activity: {activity_slot_id}")
-        return False
+        if activity_slot_id not in get_trip_data()['activity_proposals']:
+            return False
+        record_trip_operation('activity_finalize', activity_slot_id=activity_slot_id,
+                              final_choice_index=final_choice_index, activity_time=activity_time)
+        return save_trip_data(f"Confirmed activity: {activity_slot_id}")
     except Exception as e:
         print(f"Error finalizing activity: {e}")
         return False
 
 
+def reset_activity_proposal(activity_slot_id):
+    """Send a confirmed activity back to the proposal stage"""
+    try:
+        if activity_slot_id not in get_trip_data()['activity_proposals']:
+            return False
+        record_trip_operation('activity_reset', activity_slot_id=activity_slot_id)
+        return save_trip_data(f"Reset activity proposal: {activity_slot_id}")
+    except Exception as e:
+        print(f"Error resetting activity proposal: {e}")
+        return False
+
+
+def delete_activity_proposal(activity_slot_id):
+    """Delete an activity proposal"""
+    try:
+        if activity_slot_id not in get_trip_data()['activity_proposals']:
+            return False
+        record_trip_operation('activity_delete', activity_slot_id=activity_slot_id)
+        return save_trip_data(f"Delete activity proposal: {activity_slot_id}")
+    except Exception as e:
+        print(f"Error deleting activity proposal: {e}")
+        return False
+
+
 # ============================================================================
 # JOHN'S PREFERENCES
 # ============================================================================
@@ -178,8 +177,7 @@ def load_john_preferences():
 def save_john_preference(key, value):
     """Save John's preference"""
     try:
-        data = get_trip_data()
-        data['john_preferences'][key] = value
+        record_trip_operation('set_preference', key=key, value=value)
         return save_trip_data(f"Update preference: {key}")
     except Exception as e:
         print(f"Error saving preference: {e}")
@@ -193,17 +191,7 @@ def save_john_preference(key, value):
 def add_alcohol_request(item_name, quantity='', notes=''):
     """Add alcohol request"""
     try:
-        data = get_trip_data()
-        request = {
-            'id': len(data['alcohol_requests']) + 1,
-            'item_name': item_name,
-            'quantity': quantity,
-            'notes': notes,
-            'purchased': False,
-            'cost': 0.0,
-            'created_at': datetime.now().isoformat()
-        }
-        data['alcohol_requests'].append(request)
+        record_trip_operation('alcohol_add', item_name=item_name, quantity=quantity, notes=notes)
         return save_trip_data(f"Add alcohol request: {item_name}")
     except Exception as e:
         print(f"Error adding alcohol request: {e}")
@@ -214,7 +202,7 @@ def get_alcohol_requests():
     """Get all alcohol requests"""
     try:
         data = get_trip_data()
-        return data.get('alcohol_requests', [])
+        return list(data.get('alcohol_requests', []))
     except Exception as e:
         print(f"Error getting alcohol requests: {e}")
         return []
@@ -223,8 +211,7 @@ def get_alcohol_requests():
 def delete_alcohol_request(request_id):
     """Delete alcohol request"""
     try:
-        data = get_trip_data()
-        data['alcohol_requests'] = [r for r in data['alcohol_requests'] if r['id'] != request_id]
+        record_trip_operation('alcohol_delete', request_id=request_id)
         return save_trip_data(f"Delete alcohol request: {request_id}")
     except Exception as e:
         print(f"Error deleting alcohol request: {e}")
@@ -234,13 +221,11 @@ def delete_alcohol_request(request_id):
 def mark_alcohol_purchased(request_id, cost=0.0):
     """Mark alcohol as purchased"""
     try:
-        data = get_trip_data()
-        for request in data['alcohol_requests']:
-            if request['id'] == request_id:
-                request['purchased'] = True
-                request['cost'] = cost
-                return save_trip_data(f"Mark purchased: {request['item_name']}")
-        return False
+        matches = [r for r in get_trip_data()['alcohol_requests'] if r['id'] == request_id]
+        if not matches:
+            return False
+        record_trip_operation('alcohol_purchased', request_id=request_id, cost=cost)
+        return save_trip_data(f"Mark purchased: {matches[0]['item_name']}")
     except Exception as e:
         print(f"Error marking purchased: {e}")
         return False
@@ -253,12 +238,10 @@ def mark_alcohol_purchased(request_id, cost=0.0):
 def save_custom_activity(activity_dict):
     """Save custom activity"""
     try:
-        data = get_trip_data()
         activity_id = activity_dict.get('id', f"custom_{datetime.now().timestamp()}")
         activity_dict['id'] = activity_id
-        # Remove existing if updating
-        data['custom_activities'] = [a for a in data['custom_activities'] if a['id'] != activity_id]
-        data['custom_activities'].append(activity_dict)
+        # Replaces any existing activity with the same id
+        record_trip_operation('custom_activity_save', activity=activity_dict)
         save_trip_data(f"Add custom activity: {activity_dict.get('activity', 'Unknown')}")
         return activity_id
     except Exception as e:
@@ -270,7 +253,7 @@ def load_custom_activities():
     """Load custom activities"""
     try:
         data = get_trip_data()
-        return data.get('custom_activities', [])
+        return list(data.get('custom_activities', []))
     except Exception as e:
         print(f"Error loading custom activities: {e}")
         return []
@@ -279,8 +262,7 @@ def load_custom_activities():
 def delete_custom_activity(activity_id):
     """Delete custom activity"""
     try:
-        data = get_trip_data()
-        data['custom_activities'] = [a for a in data['custom_activities'] if a['id'] != activity_id]
+        record_trip_operation('custom_activity_delete', activity_id=activity_id)
         return save_trip_data(f"Delete custom activity: {activity_id}")
     except Exception as e:
         print(f"Error deleting custom activity: {e}")
@@ -294,11 +276,10 @@ def delete_custom_activity(activity_id):
 def mark_activity_completed(activity_id):
     """Mark activity as completed"""
     try:
-        data = get_trip_data()
-        if activity_id not in data['completed_activities']:
-            data['completed_activities'].append(activity_id)
-            return save_trip_data(f"Complete activity: {activity_id}")
-        return True
+        if activity_id in get_trip_data()['completed_activities']:
+            return True
+        record_trip_operation('mark_completed', activity_id=activity_id)
+        return save_trip_data(f"Complete activity: {activity_id}")
     except Exception as e:
         print(f"Error marking completed: {e}")
         return False
@@ -308,7 +289,7 @@ def load_completed_activities():
     """Load completed activities"""
     try:
         data = get_trip_data()
-        return data.get('completed_activities', [])
+        return list(data.get('completed_activities', []))
     except Exception as e:
         print(f"Error loading completed activities: {e}")
         return []
@@ -317,13 +298,10 @@ def load_completed_activities():
 def mark_activity_done(activity_name):
     """Mark activity as done by name (for optional activities)"""
     try:
-        data = get_trip_data()
-        if 'done_activities' not in data:
-            data['done_activities'] = []
-        if activity_name not in data['done_activities']:
-            data['done_activities'].append(activity_name)
-            return save_trip_data(f"Mark done: {activity_name}")
-        return True
+        if activity_name in get_trip_data().get('done_activities', []):
+            return True
+        record_trip_operation('mark_done', activity_name=activity_name)
+        return save_trip_data(f"Mark done: {activity_name}")
     except Exception as e:
         print(f"Error marking activity done: {e}")
         return False
@@ -332,13 +310,10 @@ def mark_activity_done(activity_name):
 def unmark_activity_done(activity_name):
     """Remove activity from done list"""
     try:
-        data = get_trip_data()
-        if 'done_activities' not in data:
-            data['done_activities'] = []
-        if activity_name in data['done_activities']:
-            data['done_activities'].remove(activity_name)
-            return save_trip_data(f"Remove done: {activity_name}")
-        return True
+        if activity_name not in get_trip_data().get('done_activities', []):
+            return True
+        record_trip_operation('unmark_done', activity_name=activity_name)
+        return save_trip_data(f"Remove done: {activity_name}")
     except Exception as e:
         print(f"Error unmarking activity done: {e}")
         return False
@@ -348,7 +323,7 @@ def load_done_activities():
     """Load done activities"""
     try:
         data = get_trip_data()
-        return data.get('done_activities', [])
+        return list(data.get('done_activities', []))
     except Exception as e:
         print(f"Error loading done activities: {e}")
         return []
@@ -361,13 +336,10 @@ def load_done_activities():
 def mark_activity_interested(activity_name):
     """Mark activity as interested"""
     try:
-        data = get_trip_data()
-        if 'interested_activities' not in data:
-            data['interested_activities'] = []
-        if activity_name not in data['interested_activities']:
-            data['interested_activities'].append(activity_name)
-            return save_trip_data(f"Mark interested: {activity_name}")
-        return True
+        if activity_name in get_trip_data().get('interested_activities', []):
+            return True
+        record_trip_operation('mark_interested', activity_name=activity_name)
+        return save_trip_data(f"Mark interested: {activity_name}")
     except Exception as e:
         print(f"Error marking activity interested: {e}")
         return False
@@ -376,13 +348,10 @@ def mark_activity_interested(activity_name):
 def unmark_activity_interested(activity_name):
     """Remove activity from interested list"""
     try:
-        data = get_trip_data()
-        if 'interested_activities' not in data:
-            data['interested_activities'] = []
-        if activity_name in data['interested_activities']:
-            data['interested_activities'].remove(activity_name)
-            return save_trip_data(f"Remove interested: {activity_name}")
-        return True
+        if activity_name not in get_trip_data().get('interested_activities', []):
+            return True
+        record_trip_operation('unmark_interested', activity_name=activity_name)
+        return save_trip_data(f"Remove interested: {activity_name}")
     except Exception as e:
         print(f"Error unmarking activity interested: {e}")
         return False
@@ -392,7 +361,7 @@ def load_interested_activities():
     """Load interested activities"""
     try:
         data = get_trip_data()
-        return data.get('interested_activities', [])
+        return list(data.get('interested_activities', []))
     except Exception as e:
         print(f"Error loading interested activities: {e}")
         return []
@@ -405,11 +374,7 @@ def load_interested_activities():
 def update_packing_item(item_id, packed):
     """Update packing item status"""
     try:
-        data = get_trip_data()
-        data['packing_progress'][item_id] = {
-            'packed': packed,
-            'updated_at': datetime.now().isoformat()
-        }
+        record_trip_operation('packing_update', item_id=item_id, packed=packed)
         return save_trip_data("Update packing list")
     except Exception as e:
         print(f"Error updating packing: {e}")
@@ -433,15 +398,7 @@ def get_packing_progress():
 def add_note(date, content, note_type='note'):
     """Add note"""
     try:
-        data = get_trip_data()
-        note = {
-            'id': len(data['notes']) + 1,
-            'date': date,
-            'content': content,
-            'type': note_type,
-            'created_at': datetime.now().isoformat()
-        }
-        data['notes'].append(note)
+        record_trip_operation('add_note', date=date, content=content, note_type=note_type)
         return save_trip_data("Add note")
     except Exception as e:
         print(f"Error adding note: {e}")
@@ -452,7 +409,7 @@ def get_notes():
     """Get all notes"""
     try:
         data = get_trip_data()
-        return data.get('notes', [])
+        return list(data.get('notes', []))
     except Exception as e:
         print(f"Error getting notes: {e}")
         return []
@@ -461,14 +418,27 @@ def get_notes():
 def delete_note(note_id):
     """Delete a note"""
     try:
-        data = get_trip_data()
-        data['notes'] = [n for n in data['notes'] if n['id'] != note_id]
+        record_trip_operation('delete_note', note_id=note_id)
         return save_trip_data(f"Delete note: {note_id}")
     except Exception as e:
         print(f"Error deleting note: {e}")
         return False
 
 
+# ============================================================================
+# BOOKINGS
+# ============================================================================
+
+def update_booking(booking_key, commit_message, **fields):
+    """Create or update a booking status record (e.g. status, confirmation_number)"""
+    try:
+        record_trip_operation('booking_update', booking_key=booking_key, fields=fields)
+        return save_trip_data(commit_message)
+    except Exception as e:
+        print(f"Error updating booking: {e}")
+        return False
+
+
 # ============================================================================
 # PHOTOS (Stored in session state, not GitHub)
 # ============================================================================
@@ -521,17 +491,8 @@ def dismiss_notification(notif_id):
 def save_manual_tsa_update(airport_code, wait_minutes, reported_by="User", notes=""):
     """Save a manual TSA wait time update"""
     try:
-        data = get_trip_data()
-        update = {
-            'airport_code': airport_code,
-            'wait_minutes': wait_minutes,
-            'reported_by': reported_by,
-            'notes': notes,
-            'created_at': datetime.now().isoformat()
-        }
-        if 'tsa_updates' not in data:
-            data['tsa_updates'] = []
-        data['tsa_updates'].append(update)
+        record_trip_operation('tsa_update', airport_code=airport_code, wait_minutes=wait_minutes,
+                              reported_by=reported_by, notes=notes)
         return save_trip_data(f"TSA update: {airport_code}")
     except Exception as e:
         print(f"Error saving TSA update: {e}")
@@ -539,24 +500,14 @@ def save_manual_tsa_update(airport_code, wait_minutes, reported_by="User", notes
 
 
 def get_latest_manual_tsa_update(airport_code, max_age_hours=2):
-    """Get the most recent manual TSA wait time update for an airport"""
+    """Get the most recent manual TSA wait time update for an airport
+
+    Indexed query on the SQLite backend; a scan of the in-memory list otherwise.
+    """
     try:
         from datetime import timedelta
-        data = get_trip_data()
-        updates = data.get('tsa_updates', [])
-
-        # Filter by airport and time
-        cutoff = datetime.now() - timedelta(hours=max_age_hours)
-        recent_updates = [
-            u for u in updates
-            if u['airport_code'] == airport_code and
-            datetime.fromisoformat(u['created_at']) > cutoff
-        ]
-
-        # Return most recent
-        if recent_updates:
-            return sorted(recent_updates, key=lambda x: x['created_at'], reverse=True)[0]
-        return None
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        return get_storage_backend().latest_tsa_update(airport_code, cutoff, get_trip_data())
     except Exception as e:
         print(f"Error getting TSA update: {e}")
         return None
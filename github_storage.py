@@ -1,19 +1,37 @@
 """
 GitHub File Storage for Trip Data
 Stores all trip data in a JSON file on GitHub for persistence across Streamlit Cloud restarts
+
+Other backends (local JSON file, SQLite) plug in through StorageBackend -
+see get_storage_backend().
 """
 
 import os
 import json
+import copy
+import atexit
 import base64
-import requests
+import hashlib
+import time
+import threading
 import streamlit as st
-from datetime import datetime
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from utils import http_client
+from trip_journal import (
+    JOURNAL_COMPACT_AFTER, make_operation, apply_operation, collection_for, replay, empty_journal
+)
 
 # GitHub configuration
 GITHUB_OWNER = "WanderingWithPride"
 GITHUB_REPO = "40thBdayAppRebuild"
-GITHUB_DATA_PATH = "data/trip_data.json"
+GITHUB_BRANCH = "main"
+GITHUB_DATA_PATH = "data/trip_data.json"  # Legacy single-file layout (migrated automatically)
+GITHUB_SHARD_DIR = "data/trip_data"  # One JSON file per top-level collection
+GITHUB_MANIFEST_NAME = "manifest.json"
+SHARD_SCHEMA_VERSION = 1
+SHARD_FETCH_WORKERS = 6
 
 # Get GitHub token from Streamlit secrets (cloud) or environment variable (local)
 GITHUB_TOKEN = None
@@ -34,11 +52,44 @@ if not GITHUB_TOKEN:
     else:
         print(f"❌ No GitHub token found in secrets or environment")
 
+# Storage backend: "github", "local" or "sqlite". Unset means GitHub when a
+# token is configured, otherwise the local JSON file.
+STORAGE_BACKEND = None
+try:
+    if hasattr(st, 'secrets'):
+        STORAGE_BACKEND = st.secrets.get("TRIP_STORAGE_BACKEND", None)
+except Exception:
+    pass
+if not STORAGE_BACKEND:
+    STORAGE_BACKEND = os.getenv('TRIP_STORAGE_BACKEND')
+
 # Local fallback
 LOCAL_DATA_FILE = "trip_data_local.json"
 LOCAL_BACKUP_DIR = "data/backups"
 MAX_BACKUPS = 20
 
+# Commit queue - saves made within this window are pushed as one commit
+COMMIT_WINDOW_SECONDS = 3.0
+# Failed pushes are retried after 2s, 4s, 8s ... up to this cap
+SAVE_RETRY_BASE_SECONDS = 2.0
+SAVE_RETRY_MAX_SECONDS = 60.0
+SHUTDOWN_FLUSH_ATTEMPTS = 3
+# Unsent changes are written here if GitHub is unreachable at shutdown
+PENDING_SAVES_FILE = "data/pending_saves.json"
+# Number of recent saves shown in the save status
+SAVE_STATUS_HISTORY = 20
+
+# Top-level key holding the operation journal in the stored document
+JOURNAL_KEY = "journal"
+
+# Process-wide cache of GitHub files keyed by repo path (shared by every session).
+# ETags let us send If-None-Match so an unchanged file costs a 304 with no body;
+# blob SHAs let us skip unchanged downloads. The branch head (commit + tree)
+# from our last save lives under _BRANCH_CACHE_KEY.
+_github_cache = {}
+_BRANCH_CACHE_KEY = f"refs/heads/{GITHUB_BRANCH}"
+_github_cache_lock = threading.Lock()
+
 
 def _create_backup(data_file):
     """Create backup of current data file before writing
@@ -139,191 +190,1144 @@ def init_empty_data():
         "completed_activities": [],
         "notifications": [],
         "tsa_updates": [],
+        "journal": empty_journal(),  # Operations since the last compaction (see trip_journal)
         "last_updated": datetime.now().isoformat()
     }
 
 
 def load_data_from_github():
-    """Load data from GitHub"""
-    if not GITHUB_TOKEN:
-        # Local development - use local file
-        try:
-            if os.path.exists(LOCAL_DATA_FILE):
-                with open(LOCAL_DATA_FILE, 'r') as f:
-                    return json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ ERROR: Local data file is corrupted!")
-            print(f"JSON Error: {e}")
-
-            # Try to recover from most recent backup
-            from pathlib import Path
-            backups = sorted(Path(LOCAL_BACKUP_DIR).glob('trip_data_local_*.json'))
-            if backups:
-                most_recent = backups[-1]
-                print(f"🔄 Attempting recovery from backup: {most_recent}")
-                try:
-                    with open(most_recent, 'r') as f:
-                        recovered_data = json.load(f)
-                    print(f"✅ Successfully recovered from backup!")
-                    # Save recovered data
-                    _atomic_write_local(recovered_data, LOCAL_DATA_FILE)
-                    return recovered_data
-                except Exception as recovery_error:
-                    print(f"❌ Recovery failed: {recovery_error}")
-
-            print("⚠️ No backups available. Starting with empty data.")
-            return init_empty_data()
-        except Exception as e:
-            print(f"Error loading local data: {e}")
-            return init_empty_data()
-        return init_empty_data()
+    """Load trip data from the configured storage backend
+
+    Kept under its original name - GitHub is the default backend in the cloud.
+    """
+    return get_storage_backend().load()
 
+
+def _load_local():
+    """Load data from the local JSON file (recovering from backups if corrupted)"""
     try:
-        url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_DATA_PATH}"
+        if os.path.exists(LOCAL_DATA_FILE):
+            with open(LOCAL_DATA_FILE, 'r') as f:
+                return json.load(f)
+    except json.JSONDecodeError as e:
+        print(f"❌ ERROR: Local data file is corrupted!")
+        print(f"JSON Error: {e}")
 
-        # Debug: Show token info (safely)
-        token_prefix = GITHUB_TOKEN[:7] if GITHUB_TOKEN and len(GITHUB_TOKEN) > 7 else "INVALID"
-        print(f"🔍 Attempting to load from GitHub with token prefix: {token_prefix}...")
-        print(f"🔍 URL: {url}")
+        # Try to recover from most recent backup
+        from pathlib import Path
+        backups = sorted(Path(LOCAL_BACKUP_DIR).glob('trip_data_local_*.json'))
+        if backups:
+            most_recent = backups[-1]
+            print(f"🔄 Attempting recovery from backup: {most_recent}")
+            try:
+                with open(most_recent, 'r') as f:
+                    recovered_data = json.load(f)
+                print(f"✅ Successfully recovered from backup!")
+                # Save recovered data
+                _atomic_write_local(recovered_data, LOCAL_DATA_FILE)
+                return recovered_data
+            except Exception as recovery_error:
+                print(f"❌ Recovery failed: {recovery_error}")
 
-        headers = {
-            "Authorization": f"token {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        print("⚠️ No backups available. Starting with empty data.")
+        return init_empty_data()
+    except Exception as e:
+        print(f"Error loading local data: {e}")
+        return init_empty_data()
+    return init_empty_data()
 
-        print(f"🔍 Response status: {response.status_code}")
 
-        if response.status_code == 200:
-            content = response.json()
-            file_content = base64.b64decode(content['content']).decode('utf-8')
-            data = json.loads(file_content)
-            # Ensure all required keys exist
-            default_data = init_empty_data()
-            for key in default_data:
-                if key not in data:
-                    data[key] = default_data[key]
+def _load_github():
+    """Load data from GitHub
+
+    Reads the sharded layout (GITHUB_SHARD_DIR). If it doesn't exist yet,
+    the legacy single file is loaded and queued for migration to shards.
+    """
+    token_prefix = GITHUB_TOKEN[:7] if GITHUB_TOKEN and len(GITHUB_TOKEN) > 7 else "INVALID"
+    print(f"🔍 Attempting to load from GitHub with token prefix: {token_prefix}...")
+
+    try:
+        data = _load_sharded()
+        if isinstance(data, dict):
             return data
-        elif response.status_code == 404:
-            # File doesn't exist - initialize
-            return init_empty_data()
-        elif response.status_code == 401:
-            error_msg = "GitHub authentication failed (401)"
-            try:
-                error_details = response.json()
-                print(f"❌ {error_msg}")
-                print(f"❌ API Response: {error_details}")
-                print(f"❌ Token type: {token_prefix}")
-
-                # Check if it's a fine-grained token issue
-                if 'message' in error_details:
-                    msg = error_details['message']
-                    if 'fine-grained' in msg.lower() or 'permissions' in msg.lower():
-                        error_msg += " - Token may need additional permissions or be of wrong type."
-
-                st.warning(f"{error_msg} Please check your GITHUB_TOKEN permissions. Using default data.")
-            except:
-                print(f"❌ {error_msg}")
-                st.warning(f"{error_msg} Using default data.")
-            return init_empty_data()
-        else:
-            st.warning(f"Could not load data from GitHub (status {response.status_code}). Using default data.")
+        if data is not None:
+            # Error listing the shard directory - already reported
             return init_empty_data()
+
+        # No shard directory yet - read the legacy single file and migrate it
+        data, loaded = _load_single_file()
+        if loaded:
+            print(f"📦 Migrating {GITHUB_DATA_PATH} to sharded layout in {GITHUB_SHARD_DIR}/")
+            _commit_queue.enqueue(data, "Migrate trip data to sharded layout")
+        return data
     except Exception as e:
         st.warning(f"Error loading data from GitHub: {e}")
         return init_empty_data()
 
 
+# ============================================================================
+# GITHUB FILE ACCESS (ETag / SHA caching shared by every session)
+# ============================================================================
+
+def _github_headers():
+    """Headers for authenticated GitHub API requests"""
+    return {
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+
+
+def _contents_url(path):
+    """Contents API URL for a path in the data repository"""
+    return f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{path}"
+
+
+def _cached(path):
+    """Get a copy of the cache entry for a repo path (empty dict if none)"""
+    with _github_cache_lock:
+        return dict(_github_cache.get(path, {}))
+
+
+def _remember(path, **fields):
+    """Update the cache entry for a repo path"""
+    with _github_cache_lock:
+        _github_cache.setdefault(path, {}).update(fields)
+
+
+def _report_load_failure(response):
+    """Log and display a failed GitHub load"""
+    if response.status_code == 401:
+        error_msg = "GitHub authentication failed (401)"
+        try:
+            error_details = response.json()
+            print(f"❌ {error_msg}")
+            print(f"❌ API Response: {error_details}")
+
+            # Check if it's a fine-grained token issue
+            if 'message' in error_details:
+                msg = error_details['message']
+                if 'fine-grained' in msg.lower() or 'permissions' in msg.lower():
+                    error_msg += " - Token may need additional permissions or be of wrong type."
+
+            st.warning(f"{error_msg} Please check your GITHUB_TOKEN permissions. Using default data.")
+        except:
+            print(f"❌ {error_msg}")
+            st.warning(f"{error_msg} Using default data.")
+    else:
+        st.warning(f"Could not load data from GitHub (status {response.status_code}). Using default data.")
+
+
+# Why the last GitHub save on this thread failed. Saves run on the commit
+# queue's worker thread, which has no Streamlit script context, so the
+# reason is handed to the queue (shown in the sync status) instead of st.error
+_save_failure = threading.local()
+
+
+def _note_save_failure(message):
+    """Log a save failure and remember it for the commit queue"""
+    print(f"❌ {message}")
+    _save_failure.message = message
+
+
+def _take_save_failure():
+    """The reason noted by the last failed save on this thread (then cleared)"""
+    message = getattr(_save_failure, 'message', None)
+    _save_failure.message = None
+    return message
+
+
+def _report_auth_failure(response):
+    """Log a 401 from the GitHub API during a save"""
+    error_msg = "GitHub authentication failed (401). Cannot save data."
+    try:
+        print(f"❌ {error_msg} Details: {response.json()}")
+    except:
+        pass
+    _note_save_failure(f"{error_msg} Please check your GITHUB_TOKEN permissions.")
+
+
+def _fetch_json_file(path, known_sha=None):
+    """Download and parse a JSON file, reusing the cached copy when unchanged
+
+    Sends If-None-Match with the last ETag, so an unchanged file costs a 304
+    with no body. A 200 whose blob SHA matches the cache skips decoding.
+
+    Args:
+        path (str): Repo path of the file
+        known_sha (str): Current blob SHA if already known (e.g. from a
+            directory listing) - a cache hit then needs no request at all
+
+    Returns:
+        tuple: (response or None, parsed data or None if not 200/304)
+    """
+    cached = _cached(path)
+    if known_sha and known_sha == cached.get('sha') and 'data' in cached:
+        return None, copy.deepcopy(cached['data'])
+
+    headers = _github_headers()
+    if cached.get('etag') and 'data' in cached:
+        headers["If-None-Match"] = cached['etag']
+
+    response = http_client.get(_contents_url(path), headers=headers, timeout=10)
+
+    if response.status_code == 304:
+        # Unchanged since last download - reuse the parsed copy
+        return response, copy.deepcopy(cached['data'])
+    if response.status_code != 200:
+        return response, None
+
+    content = response.json()
+    sha = content.get('sha')
+    if sha and sha == cached.get('sha') and 'data' in cached:
+        # Same blob under a new ETag - skip decoding and parsing
+        _remember(path, etag=response.headers.get('ETag'))
+        return response, copy.deepcopy(cached['data'])
+
+    data = json.loads(base64.b64decode(content['content']).decode('utf-8'))
+    _remember(path, etag=response.headers.get('ETag'), sha=sha, data=copy.deepcopy(data))
+    return response, data
+
+
+def _git_url(path):
+    """Git Data API URL in the data repository (refs, trees, commits)"""
+    return f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/git/{path}"
+
+
+def _blob_sha(content):
+    """Blob SHA git assigns to file content (matches directory listings)"""
+    raw = content.encode('utf-8')
+    return hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+
+
+def _report_commit_failure(response, step):
+    """Log a failed Git Data API call during a save"""
+    if response.status_code == 401:
+        _report_auth_failure(response)
+    else:
+        _note_save_failure(f"Failed to save to GitHub ({step}): {response.status_code} - {response.text}")
+
+
+def _fetch_branch_head():
+    """GET the branch head commit and its tree
+
+    Returns:
+        tuple: (commit sha, tree sha), or (None, response) on failure
+    """
+    headers = _github_headers()
+    response = http_client.get(_git_url(f"ref/heads/{GITHUB_BRANCH}"), headers=headers, timeout=10)
+    print(f"🔍 GET branch head: {response.status_code}")
+    if response.status_code != 200:
+        return None, response
+    commit_sha = response.json()['object']['sha']
+    response = http_client.get(_git_url(f"commits/{commit_sha}"), headers=headers, timeout=10)
+    if response.status_code != 200:
+        return None, response
+    return commit_sha, response.json()['tree']['sha']
+
+
+def _commit_files(files, commit_message):
+    """Commit several JSON files as one commit through the Git Data API
+
+    Builds a tree on top of the branch head (contents go inline, so GitHub
+    creates the blobs), a commit with that tree, and then fast-forwards the
+    branch to it - every file lands or none does. The head is remembered
+    from the last commit, so a normal save is three requests; it is only
+    fetched when unknown, or when the branch moved underneath us (the ref
+    update is rejected with 422), in which case the commit is rebuilt on
+    the new head once.
+
+    Args:
+        files (dict): repo path -> data to store as JSON
+        commit_message (str): Commit message
+
+    Returns:
+        bool: True if the commit is on the branch
+    """
+    contents = {path: json.dumps(data, indent=2) for path, data in files.items()}
+    entries = [{'path': path, 'mode': '100644', 'type': 'blob', 'content': content}
+               for path, content in contents.items()]
+    headers = _github_headers()
+    head = _cached(_BRANCH_CACHE_KEY)
+
+    for attempt in range(2):
+        if 'commit' not in head:
+            commit_sha, tree_sha = _fetch_branch_head()
+            if commit_sha is None:
+                _report_commit_failure(tree_sha, "branch head")
+                return False
+            head = {'commit': commit_sha, 'tree': tree_sha}
+
+        response = http_client.post(_git_url("trees"), headers=headers, timeout=15, idempotent=True,
+                                    json={'base_tree': head['tree'], 'tree': entries})
+        if response.status_code != 201:
+            _report_commit_failure(response, "tree")
+            return False
+        tree_sha = response.json()['sha']
+
+        response = http_client.post(_git_url("commits"), headers=headers, timeout=15, idempotent=True,
+                                    json={'message': f"{commit_message} 🤖", 'tree': tree_sha,
+                                          'parents': [head['commit']]})
+        if response.status_code != 201:
+            _report_commit_failure(response, "commit")
+            return False
+        commit_sha = response.json()['sha']
+
+        # Not forced: GitHub rejects the update if the branch moved since head
+        response = http_client.patch(_git_url(f"refs/heads/{GITHUB_BRANCH}"), headers=headers,
+                                     json={'sha': commit_sha}, timeout=15)
+        print(f"🔍 PATCH branch ({len(files)} file(s)): {response.status_code}")
+        if response.status_code == 200:
+            _remember(_BRANCH_CACHE_KEY, commit=commit_sha, tree=tree_sha)
+            for path, data in files.items():
+                # Remember the blob SHAs so the next load reuses these copies
+                _remember(path, sha=_blob_sha(contents[path]), etag=None, data=copy.deepcopy(data))
+            return True
+        if response.status_code != 422 or attempt:
+            _report_commit_failure(response, "branch update")
+            return False
+        print("⚠️ Branch moved while saving - rebuilding the commit on the new head")
+        head = {}
+    return False
+
+
+# ============================================================================
+# SHARDED LAYOUT (one file per collection + manifest)
+# ============================================================================
+
+def _shard_path(collection):
+    """Repo path of the shard holding one top-level collection"""
+    return f"{GITHUB_SHARD_DIR}/{collection}.json"
+
+
+def _manifest_path():
+    return f"{GITHUB_SHARD_DIR}/{GITHUB_MANIFEST_NAME}"
+
+
+def _split_into_shards(data):
+    """Split the trip document into {collection: value} (last_updated is derived)"""
+    return {key: value for key, value in data.items() if key != 'last_updated'}
+
+
+def _load_sharded():
+    """Load the trip document from the shard directory
+
+    One conditional listing of the directory returns every shard's blob
+    SHA. Only shards whose SHA changed since the last load are downloaded;
+    a 304 on the listing means nothing changed at all.
+
+    Returns:
+        dict: Trip data, None if the directory doesn't exist yet, or the
+              failed response (after reporting it)
+    """
+    cached_dir = _cached(GITHUB_SHARD_DIR)
+    headers = _github_headers()
+    if cached_dir.get('etag') and 'data' in cached_dir:
+        headers["If-None-Match"] = cached_dir['etag']
+
+    response = http_client.get(_contents_url(GITHUB_SHARD_DIR), headers=headers, timeout=10)
+    print(f"🔍 Shard listing status: {response.status_code}")
+
+    if response.status_code == 304:
+        return copy.deepcopy(cached_dir['data'])
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        _report_load_failure(response)
+        return response
+
+    entries = {entry['name']: entry for entry in response.json() if entry.get('type') == 'file'}
+    manifest_entry = entries.get(GITHUB_MANIFEST_NAME)
+    if manifest_entry is None:
+        return None
+    _, manifest = _fetch_json_file(_manifest_path(), known_sha=manifest_entry.get('sha'))
+    if manifest is None:
+        return None
+
+    collections = [name for name in manifest.get('collections', []) if f"{name}.json" in entries]
+
+    # Download changed shards in parallel (unchanged ones come straight from cache)
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=SHARD_FETCH_WORKERS) as pool:
+        results = dict(zip(collections, pool.map(
+            lambda name: _fetch_json_file(_shard_path(name), known_sha=entries[f"{name}.json"].get('sha'))[1],
+            collections
+        )))
+
+    missing = [name for name, shard in results.items() if shard is None]
+    if missing:
+        # A partial document would overwrite the missing shards on the next save
+        print(f"❌ Could not load shard(s): {', '.join(missing)}")
+        st.warning(f"Could not load trip data ({', '.join(missing)}) from GitHub. Using default data.")
+        return response
+
+    data = {}
+    updated = []
+    for name, shard in results.items():
+        data[name] = shard.get('data')
+        if shard.get('updated_at'):
+            updated.append(shard['updated_at'])
+
+    # Ensure all required keys exist
+    default_data = init_empty_data()
+    for key in default_data:
+        if key not in data:
+            data[key] = default_data[key]
+    if updated:
+        data['last_updated'] = max(updated)
+
+    _remember(GITHUB_SHARD_DIR, etag=response.headers.get('ETag'), data=copy.deepcopy(data),
+              collections=manifest.get('collections', []))
+    return data
+
+
+def _load_single_file():
+    """Load the legacy single-file document (data/trip_data.json)
+
+    Returns:
+        tuple: (data, loaded) - loaded is False if GitHub returned an error,
+               in which case data is the empty default and must not be saved
+    """
+    response, data = _fetch_json_file(GITHUB_DATA_PATH)
+    print(f"🔍 Legacy file status: {response.status_code}")
+
+    if data is not None:
+        # Ensure all required keys exist
+        default_data = init_empty_data()
+        for key in default_data:
+            if key not in data:
+                data[key] = default_data[key]
+        return data, True
+    elif response.status_code == 404:
+        # File doesn't exist - initialize
+        return init_empty_data(), True
+    else:
+        _report_load_failure(response)
+        return init_empty_data(), False
+
+
+def _save_sharded(data, commit_message):
+    """Commit only the shards whose collection changed since the last load/save
+
+    Returns:
+        bool: True if the changed shards (and the manifest, if needed) were
+              committed - they are written together or not at all
+    """
+    if 'collections' not in _cached(GITHUB_SHARD_DIR):
+        # Never listed the directory in this process - learn the shard SHAs first
+        _load_sharded()
+
+    known_collections = _cached(GITHUB_SHARD_DIR).get('collections', [])
+    shards = _split_into_shards(data)
+    timestamp = data.get('last_updated', datetime.now().isoformat())
+
+    defaults = init_empty_data()
+    dirty = []
+    for name, value in shards.items():
+        cached = _cached(_shard_path(name))
+        if 'sha' not in cached and name not in known_collections:
+            # No shard yet - defaults are filled in on load, so skip until used
+            if name not in defaults or value != defaults[name]:
+                dirty.append(name)
+        elif (cached.get('data') or {}).get('data') != value:
+            dirty.append(name)
+    print(f"🔍 {len(dirty)} of {len(shards)} shard(s) changed: {', '.join(dirty) or 'none'}")
+
+    files = {
+        _shard_path(name): {'collection': name, 'updated_at': timestamp, 'data': shards[name]}
+        for name in dirty
+    }
+    collections = sorted(set(known_collections) | set(dirty))
+    if collections != sorted(known_collections):
+        files[_manifest_path()] = {
+            'schema_version': SHARD_SCHEMA_VERSION,
+            'collections': collections,
+            'migrated_from': GITHUB_DATA_PATH,
+            'updated_at': timestamp
+        }
+
+    # Shards and manifest go in one commit, so a failed save leaves nothing half-written
+    success = _commit_files(files, commit_message) if files else True
+
+    if success:
+        print(f"✅ Successfully saved to GitHub")
+        # The listing ETag is stale now; keep the document for SHA-based reuse
+        _remember(GITHUB_SHARD_DIR, etag=None, data=copy.deepcopy(data), collections=collections)
+    return success
+
+
 def save_data_to_github(data, commit_message="Update trip data"):
-    """Save data to GitHub"""
+    """Save trip data to the configured storage backend
+
+    Kept under its original name - GitHub is the default backend in the cloud.
+    """
     # Update timestamp
     data["last_updated"] = datetime.now().isoformat()
+    return get_storage_backend().save(data, commit_message)
 
-    if not GITHUB_TOKEN:
-        # Local development - save to local file with atomic write + backups
-        return _atomic_write_local(data, LOCAL_DATA_FILE)
 
-    try:
-        url = f"https://api.github.com/repos/{GITHUB_OWNER}/{GITHUB_REPO}/contents/{GITHUB_DATA_PATH}"
+def _save_github(data, commit_message):
+    """Save data to GitHub
 
-        # Debug: Show token info (safely)
+    Only the shards whose collection changed are committed (a packing
+    checkbox rewrites just packing_progress.json), all in one commit built
+    on the remembered branch head.
+    """
+    try:
         token_prefix = GITHUB_TOKEN[:7] if GITHUB_TOKEN and len(GITHUB_TOKEN) > 7 else "INVALID"
         print(f"🔍 Attempting to save to GitHub with token prefix: {token_prefix}...")
+        return _save_sharded(data, commit_message)
+    except Exception as e:
+        _note_save_failure(f"Error saving to GitHub: {e}")
+        return False
 
-        headers = {
-            "Authorization": f"token {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github.v3+json"
-        }
 
-        # Get current file SHA (needed for update)
-        response = requests.get(url, headers=headers, timeout=10)
+# ============================================================================
+# STORAGE BACKENDS
+# ============================================================================
+
+class StorageBackend:
+    """Where the trip document is persisted
+
+    Subclasses implement load() and save(). The snapshot above them keeps
+    serving reads from memory; backends only see whole-document loads and
+    saves plus the optional indexed lookups below.
+    """
+
+    name = "base"
+    # Queue saves and push them as one write per COMMIT_WINDOW_SECONDS
+    coalesce_saves = False
+    # Store the operation journal (False: compact before every save)
+    journaled = True
+
+    def load(self):
+        """Load the stored trip document (including the journal key)"""
+        raise NotImplementedError
+
+    def save(self, document, commit_message="Update trip data"):
+        """Persist the trip document
+
+        Returns:
+            bool: True if saved
+        """
+        raise NotImplementedError
+
+    def latest_tsa_update(self, airport_code, since, data=None):
+        """Most recent TSA update for an airport created after an ISO timestamp
+
+        The default scans the given trip document; indexed backends override.
+        """
+        updates = [
+            u for u in (data or {}).get('tsa_updates', [])
+            if u['airport_code'] == airport_code and u['created_at'] > since
+        ]
+        return max(updates, key=lambda u: u['created_at']) if updates else None
+
+    def get_proposal(self, kind, proposal_id, data=None):
+        """One meal or activity proposal by id
+
+        The default reads the given trip document; indexed backends override.
+        """
+        return (data or {}).get(kind, {}).get(proposal_id)
+
+
+class LocalJSONBackend(StorageBackend):
+    """Single JSON file on disk with atomic writes and rotating backups"""
+
+    name = "local"
+
+    def load(self):
+        return _load_local()
+
+    def save(self, document, commit_message="Update trip data"):
+        # Local development - save to local file with atomic write + backups
+        return _atomic_write_local(document, LOCAL_DATA_FILE)
+
+
+class GitHubBackend(StorageBackend):
+    """Sharded JSON files read through the GitHub contents API, saved as single commits"""
+
+    name = "github"
+    coalesce_saves = True
+
+    def load(self):
+        return _load_github()
+
+    def save(self, document, commit_message="Update trip data"):
+        return _save_github(document, commit_message)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_storage_backend():
+    """Get the configured storage backend (one instance per process)
+
+    TRIP_STORAGE_BACKEND picks "github", "local" or "sqlite"; unset means
+    GitHub when a token is configured and the local JSON file otherwise.
+    """
+    name = (STORAGE_BACKEND or ("github" if GITHUB_TOKEN else "local")).lower()
+    with _backends_lock:
+        if name not in _backends:
+            if name == "github":
+                _backends[name] = GitHubBackend()
+            elif name == "local":
+                _backends[name] = LocalJSONBackend()
+            elif name == "sqlite":
+                from sqlite_storage import SQLiteBackend
+                _backends[name] = SQLiteBackend()
+            else:
+                raise ValueError(f"Unknown TRIP_STORAGE_BACKEND: {name}")
+            print(f"💾 Using {name} storage backend")
+        return _backends[name]
+
 
-        print(f"🔍 GET response status (for SHA): {response.status_code}")
+def _merge_commit_messages(messages):
+    """Combine queued commit messages into a single commit message
 
-        if response.status_code == 401:
-            error_msg = "GitHub authentication failed (401). Cannot save data."
+    Args:
+        messages (list): Commit messages in the order they were queued
+
+    Returns:
+        str: The message itself for one change, otherwise a summary line
+             followed by one bullet per change
+    """
+    if len(messages) == 1:
+        return messages[0]
+    summary = f"Batch update ({len(messages)} changes)"
+    return summary + "\n\n" + "\n".join(f"- {message}" for message in messages)
+
+
+class CommitQueue:
+    """Write-behind queue that owns persistence for coalescing backends
+
+    Saves are acknowledged immediately and pushed by a background worker
+    thread, so a slow GitHub API never blocks a Streamlit script run. The
+    worker keeps the latest copy of the document plus every queued change
+    and pushes one commit once the window has elapsed. A failed push is
+    retried with exponential backoff; on shutdown the queue is flushed and,
+    if that still fails, spilled to disk and pushed on the next start.
+    """
+
+    def __init__(self, window_seconds=COMMIT_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._pending_data = None
+        self._messages = []
+        self._pending_ops = []
+        self._operations = deque(maxlen=SAVE_STATUS_HISTORY)
+        self._next_op_id = 1
+        self._first_queued_at = None
+        self._attempts = 0
+        self._retry_at = None
+        self._push_requested = False
+        self._saving = False
+        self._stopping = False
+        self._worker = None
+        self.last_flushed_at = None
+        self.last_error = None
+        self.next_retry_at = None
+
+    def enqueue(self, data, commit_message):
+        """Queue a save for the background worker
+
+        Args:
+            data (dict): Trip data to persist (copied, so later edits are safe)
+            commit_message (str): Description of this change
+
+        Returns:
+            bool: Always True - the change is acknowledged as pending
+        """
+        snapshot = copy.deepcopy(data)
+        with self._lock:
+            self._pending_data = snapshot
+            self._messages.append(commit_message)
+            operation = {
+                'id': self._next_op_id,
+                'message': commit_message,
+                'state': 'pending',
+                'queued_at': datetime.now(),
+                'saved_at': None,
+                'attempts': 0,
+                'error': None
+            }
+            self._next_op_id += 1
+            self._operations.append(operation)
+            self._pending_ops.append(operation)
+            if self._first_queued_at is None:
+                self._first_queued_at = time.monotonic()
+            self._start_worker()
+            self._wakeup.notify()
+        return True
+
+    def _start_worker(self):
+        """Start the worker thread on first use (caller holds the lock)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="trip-data-writer", daemon=True)
+            self._worker.start()
+
+    def _due_in(self):
+        """Seconds until the next push is due, or None if nothing is pending"""
+        if self._pending_data is None:
+            return None
+        if self._push_requested:
+            return 0
+        due = self._first_queued_at + self.window_seconds
+        if self._retry_at is not None:
+            due = max(due, self._retry_at)
+        return due - time.monotonic()
+
+    def _run(self):
+        """Worker loop: wait for the window (or retry backoff), then push"""
+        while True:
+            with self._lock:
+                while True:
+                    if self._stopping:
+                        return
+                    due_in = self._due_in()
+                    if due_in is not None and due_in <= 0:
+                        break
+                    self._wakeup.wait(due_in)
+            self._push()
+
+    def _push(self):
+        """Push all queued changes as one commit (worker or flush caller)
+
+        Returns:
+            bool: True if nothing was pending or the commit succeeded
+        """
+        with self._flush_lock:
+            with self._lock:
+                data, messages, operations = self._pending_data, self._messages, self._pending_ops
+                self._pending_data, self._messages, self._pending_ops = None, [], []
+                self._first_queued_at = None
+                self._push_requested = False
+                if data is None:
+                    return True
+                self._saving = True
+                for operation in operations:
+                    operation['state'] = 'saving'
+                    operation['attempts'] += 1
+
+            commit_message = _merge_commit_messages(messages)
+            print(f"📦 Flushing {len(messages)} queued change(s) in one commit")
+            _take_save_failure()
             try:
-                error_details = response.json()
-                print(f"❌ {error_msg} Details: {error_details}")
-                st.error(f"{error_msg} Please check your GITHUB_TOKEN permissions.")
-            except:
-                print(f"❌ {error_msg}")
-                st.error(error_msg)
-            return False
+                success = save_data_to_github(data, commit_message)
+                reason = None if success else _take_save_failure()
+            except Exception as e:
+                print(f"❌ Error in background save: {e}")
+                success, reason = False, str(e)
 
-        sha = response.json()['sha'] if response.status_code == 200 else None
+            with self._lock:
+                self._saving = False
+                if success:
+                    self.last_flushed_at = datetime.now()
+                    self.last_error = None
+                    self.next_retry_at = None
+                    self._attempts = 0
+                    self._retry_at = None
+                    for operation in operations:
+                        operation['state'] = 'saved'
+                        operation['saved_at'] = self.last_flushed_at
+                        operation['error'] = None
+                else:
+                    # Put the changes back and retry after an exponential backoff
+                    self._attempts += 1
+                    delay = min(SAVE_RETRY_BASE_SECONDS * 2 ** (self._attempts - 1), SAVE_RETRY_MAX_SECONDS)
+                    self._retry_at = time.monotonic() + delay
+                    self.next_retry_at = datetime.now() + timedelta(seconds=delay)
+                    self.last_error = f"Could not save {len(messages)} change(s) to GitHub"
+                    if reason:
+                        self.last_error += f": {reason}"
+                    if self._pending_data is None:
+                        self._pending_data = data
+                    self._messages = messages + self._messages
+                    self._pending_ops = operations + self._pending_ops
+                    if self._first_queued_at is None:
+                        self._first_queued_at = time.monotonic()
+                    for operation in operations:
+                        operation['state'] = 'retrying'
+                        operation['error'] = self.last_error
+                    print(f"⚠️ {self.last_error} - retrying in {delay:.0f}s")
+                self._wakeup.notify_all()
+            return success
 
-        # Encode content
-        content_encoded = base64.b64encode(json.dumps(data, indent=2).encode('utf-8')).decode('utf-8')
+    def flush(self):
+        """Push all queued changes now, in the calling thread
 
-        # Prepare commit
-        payload = {
-            "message": f"{commit_message} 🤖",
-            "content": content_encoded,
-            "branch": "main"
-        }
-        if sha:
-            payload["sha"] = sha
+        Returns:
+            bool: True if nothing was pending or the commit succeeded
+        """
+        return self._push()
 
-        # Commit to GitHub
-        response = requests.put(url, headers=headers, json=payload, timeout=15)
+    def retry_now(self):
+        """Skip the remaining backoff and let the worker push immediately"""
+        with self._lock:
+            self._push_requested = True
+            self._wakeup.notify()
 
-        print(f"🔍 PUT response status (for commit): {response.status_code}")
+    def wait_until_idle(self, timeout=None):
+        """Block until nothing is pending or saving (for shutdown and tests)
 
-        if response.status_code in [200, 201]:
-            print(f"✅ Successfully saved to GitHub")
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._pending_data is not None or self._saving:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wakeup.wait(remaining)
             return True
-        elif response.status_code == 401:
-            error_msg = "GitHub authentication failed (401). Cannot save data."
-            try:
-                error_details = response.json()
-                print(f"❌ {error_msg} Details: {error_details}")
-                st.error(f"{error_msg} Please check your GITHUB_TOKEN permissions.")
-            except:
-                print(f"❌ {error_msg}")
-                st.error(error_msg)
-            return False
-        else:
-            st.error(f"Failed to save to GitHub: {response.status_code} - {response.text}")
+
+    def shutdown(self):
+        """Stop the worker and flush durably
+
+        Tries a few immediate pushes; if GitHub is still unreachable the
+        pending document is written to PENDING_SAVES_FILE and pushed by
+        recover_spilled() on the next start.
+
+        Returns:
+            bool: True if everything was pushed
+        """
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout=SAVE_RETRY_MAX_SECONDS)
+
+        for attempt in range(SHUTDOWN_FLUSH_ATTEMPTS):
+            if self._push():
+                return True
+            time.sleep(min(SAVE_RETRY_BASE_SECONDS * 2 ** attempt, 5))
+
+        with self._lock:
+            data, messages = self._pending_data, list(self._messages)
+        if data is None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(PENDING_SAVES_FILE), exist_ok=True)
+            temp_file = f"{PENDING_SAVES_FILE}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump({'data': data, 'messages': messages}, f, indent=2)
+            os.replace(temp_file, PENDING_SAVES_FILE)
+            print(f"💾 Saved {len(messages)} unsent change(s) to {PENDING_SAVES_FILE}")
+        except Exception as e:
+            print(f"❌ Could not write {PENDING_SAVES_FILE}: {e}")
+        return False
+
+    def recover_spilled(self):
+        """Push changes left behind by a previous shutdown (called at startup)
+
+        Returns:
+            bool: True if there was nothing to recover or it was pushed
+        """
+        if not os.path.exists(PENDING_SAVES_FILE):
+            return True
+        try:
+            with open(PENDING_SAVES_FILE, 'r') as f:
+                spilled = json.load(f)
+        except Exception as e:
+            print(f"❌ Could not read {PENDING_SAVES_FILE}: {e}")
             return False
-    except Exception as e:
-        st.error(f"Error saving to GitHub: {e}")
+
+        print(f"🔄 Pushing {len(spilled['messages'])} change(s) left over from the last shutdown")
+        with self._lock:
+            self._pending_data = spilled['data']
+            self._messages = spilled['messages'] + self._messages
+            self._first_queued_at = time.monotonic()
+        if self._push():
+            os.remove(PENDING_SAVES_FILE)
+            return True
+        with self._lock:
+            self._start_worker()
         return False
 
+    def status(self):
+        """Get the pending state for display in the UI
+
+        Returns:
+            dict: pending flag, number of queued changes, saving flag, last flush
+                  time, last error, next retry time and the recent operations
+                  (newest first) with their state
+        """
+        with self._lock:
+            return {
+                'pending': self._pending_data is not None,
+                'pending_changes': len(self._messages),
+                'saving': self._saving,
+                'last_flushed_at': self.last_flushed_at,
+                'last_error': self.last_error,
+                'next_retry_at': self.next_retry_at,
+                'operations': [dict(operation) for operation in reversed(self._operations)]
+            }
+
+
+_commit_queue = CommitQueue()
+atexit.register(_commit_queue.shutdown)
+
+
+def flush_pending_saves():
+    """Push any queued changes to GitHub immediately (blocks until done)
+
+    Returns:
+        bool: True if nothing was pending or the commit succeeded
+    """
+    return _commit_queue.flush()
+
+
+def retry_pending_saves():
+    """Ask the background worker to retry a failed save now (doesn't block)"""
+    _commit_queue.retry_now()
+
+
+def get_save_status():
+    """Get the write-behind queue status (pending changes, per-save state, errors)"""
+    return _commit_queue.status()
+
+
+class TripDataSnapshot:
+    """Process-wide, versioned copy of the trip data shared by every session
+
+    Readers get the current document without any network I/O. Writers go
+    through record() or edit(), which copy the collections they touch, apply
+    the change to the copy and then publish it as a new version - so a reader
+    never sees a half-applied edit and older versions are never mutated.
+
+    What gets stored is the compacted base document plus the journal of
+    operations recorded since (see trip_journal). record() only appends to
+    the journal; edit() and compact() fold the journal into the base.
+    """
+
+    def __init__(self):
+        self.data = None
+        self.version = 0
+        self.loaded_at = None
+        self.base = None
+        self.base_seq = 0
+        self.journal = []
+        self._lock = threading.RLock()
+
+    def get(self):
+        """Get the current document, loading it on first use"""
+        if self.data is None:
+            with self._lock:
+                if self.data is None:
+                    self._set_document(load_data_from_github())
+                    self.loaded_at = datetime.now()
+        return self.data
+
+    def reload(self):
+        """Replace the current document with a fresh load from storage"""
+        with self._lock:
+            self._set_document(load_data_from_github())
+            self.loaded_at = datetime.now()
+        return self.data
+
+    def _set_document(self, document):
+        """Split a stored document into base + journal and publish the replay"""
+        base = dict(document)
+        journal = base.pop(JOURNAL_KEY, None) or empty_journal()
+        self.base = base
+        self.base_seq = journal.get('base_seq', 0)
+        self.journal = list(journal.get('ops', []))
+        self._publish(replay(base, self.journal) if self.journal else base)
+
+    def _publish(self, data):
+        self.data = data
+        self.version += 1
+
+    def _fold(self, data):
+        """Make data the new base and drop the journal it already includes"""
+        if self.journal:
+            self.base_seq = self.journal[-1]['seq']
+        self.base = data
+        self.journal = []
+
+    def record(self, op_type, **args):
+        """Apply a typed operation and append it to the journal
+
+        Args:
+            op_type (str): Operation registered in trip_journal
+            **args: Arguments for the operation's handler
+
+        Returns:
+            dict: The journal entry
+        """
+        with self._lock:
+            current = self.get()
+            entry = make_operation(op_type, self.base_seq + len(self.journal) + 1, **args)
+            name = collection_for(op_type, entry['args'])
+            draft = dict(current)
+            if name in draft:
+                draft[name] = copy.deepcopy(draft[name])
+            apply_operation(draft, entry)
+            self.journal = self.journal + [entry]
+            self._publish(draft)
+            return entry
+
+    @contextmanager
+    def edit(self, *collections):
+        """Copy-on-write edit of the document
+
+        Free-form edits can't be journaled, so a successful edit also
+        compacts: the edited document becomes the new base.
+
+        Args:
+            *collections: Top-level keys the edit will modify. Only these are
+                deep-copied; with none given the whole document is copied.
+
+        Yields:
+            dict: Draft document to mutate. It is published as the next version
+                  when the block exits cleanly and discarded on exception.
+        """
+        with self._lock:
+            current = self.get()
+            if collections:
+                draft = dict(current)
+                for name in collections:
+                    if name in draft:
+                        draft[name] = copy.deepcopy(draft[name])
+            else:
+                draft = copy.deepcopy(current)
+            yield draft
+            self._fold(draft)
+            self._publish(draft)
+
+    def compact(self):
+        """Fold the journal into the base document"""
+        with self._lock:
+            self.get()
+            self._fold(self.data)
+
+    def stored_document(self):
+        """Document to persist: the base plus the journal since it"""
+        with self._lock:
+            document = dict(self.base)
+            document[JOURNAL_KEY] = {'base_seq': self.base_seq, 'ops': list(self.journal)}
+            return document
+
+    def changes(self, since_seq=0):
+        """Journal entries after a sequence number (change feed)"""
+        return [entry for entry in self.journal if entry['seq'] > since_seq]
+
+    def as_of(self, timestamp):
+        """Rebuild the document as it was at an ISO timestamp
+
+        Only reaches back to the last compaction (older states live in the
+        storage history).
+        """
+        self.get()
+        return replay(self.base, self.journal, until=timestamp)
+
+
+@st.cache_resource
+def _get_shared_snapshot():
+    """Create the snapshot once per server process (shared across sessions)"""
+    if get_storage_backend().coalesce_saves:
+        # Push anything the previous process couldn't save before loading
+        _commit_queue.recover_spilled()
+    return TripDataSnapshot()
+
 
 def get_trip_data():
-    """Get trip data from session state (loads from GitHub if not cached)"""
-    if 'trip_data' not in st.session_state:
-        st.session_state.trip_data = load_data_from_github()
-    return st.session_state.trip_data
+    """Get the shared trip data snapshot (loads from GitHub on first use)
+
+    The returned dict is shared by every session - treat it as read-only
+    and make changes through edit_trip_data().
+    """
+    return _get_shared_snapshot().get()
+
+
+def get_trip_data_version():
+    """Get the version number of the shared snapshot (bumps on every edit)"""
+    return _get_shared_snapshot().version
+
+
+def edit_trip_data(*collections):
+    """Copy-on-write edit of the shared trip data (see TripDataSnapshot.edit)
+
+    Prefer record_trip_operation() for changes that have a journal operation.
+
+    Usage:
+        with edit_trip_data('notes') as data:
+            data['notes'].append(note)
+        save_trip_data("Add note")
+    """
+    return _get_shared_snapshot().edit(*collections)
+
+
+def record_trip_operation(op_type, **args):
+    """Apply a journaled operation to the shared trip data
+
+    Usage:
+        record_trip_operation('add_note', date='2025-11-08', content='Sunset!')
+        save_trip_data("Add note")
+    """
+    return _get_shared_snapshot().record(op_type, **args)
+
+
+def get_trip_changes(since_seq=0):
+    """Get journal entries recorded after since_seq (since the last compaction)"""
+    return _get_shared_snapshot().changes(since_seq)
+
+
+def get_trip_data_at(timestamp):
+    """Rebuild the trip data as of an ISO timestamp (back to the last compaction)"""
+    return _get_shared_snapshot().as_of(timestamp)
+
+
+def compact_trip_data():
+    """Fold the journal into the base document (written on the next save)"""
+    _get_shared_snapshot().compact()
+
+
+def reload_trip_data():
+    """Push queued changes and reload the shared snapshot from storage
+
+    If the queued changes can't be pushed the reload is skipped, so the
+    unsaved edits (and their journal entries) stay in memory for the
+    background worker to retry instead of being replaced by the older
+    remote copy.
+
+    Returns:
+        bool: True if the snapshot was reloaded, False if it was skipped
+    """
+    if not flush_pending_saves():
+        return False
+    _get_shared_snapshot().reload()
+    return True
 
 
 def save_trip_data(commit_message="Update trip data"):
-    """Save current trip data to GitHub"""
+    """Save current trip data to GitHub
+
+    Stores the base document plus the operation journal. With the sharded
+    layout a journaled change only rewrites the journal shard; once
+    JOURNAL_COMPACT_AFTER operations pile up the journal is folded into
+    the collection shards.
+
+    Local and SQLite saves are written immediately. GitHub saves are queued
+    and coalesced into one commit per COMMIT_WINDOW_SECONDS, so this returns
+    as soon as the change is acknowledged rather than after the commit lands.
+    """
+    snapshot = _get_shared_snapshot()
     # Defensive check for trip_data existence
-    trip_data = st.session_state.get('trip_data')
-    if trip_data is None:
-        print("❌ ERROR: trip_data not loaded in session state")
+    if snapshot.data is None:
+        print("❌ ERROR: trip_data not loaded")
         st.error("Trip data not loaded. Please refresh the page.")
         return False
-    return save_data_to_github(trip_data, commit_message)
+    backend = get_storage_backend()
+    if snapshot.journal and (not backend.journaled or len(snapshot.journal) >= JOURNAL_COMPACT_AFTER):
+        print(f"🗜️ Compacting {len(snapshot.journal)} journal entries")
+        snapshot.compact()
+    document = snapshot.stored_document()
+    if not backend.coalesce_saves:
+        return save_data_to_github(document, commit_message)
+    return _commit_queue.enqueue(document, commit_message)
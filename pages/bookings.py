@@ -7,7 +7,8 @@ Provides urgency-based prioritization and quick actions.
 
 import streamlit as st
 from datetime import datetime, timedelta
-from github_storage import get_trip_data, save_trip_data
+from github_storage import get_trip_data
+from data_operations import update_booking
 
 
 def show_booking_dashboard():
@@ -46,17 +47,14 @@ def show_booking_dashboard():
                 else:
                     urgency = 'normal'
 
-                # Get or create booking status
+                # Get booking status (records are created on first save)
                 booking_key = f"booking_{activity.get('id', activity['activity'].replace(' ', '_'))}"
-                if booking_key not in data:
-                    data[booking_key] = {
-                        'status': 'not_booked',
-                        'confirmation_number': None,
-                        'booked_date': None,
-                        'notes': ''
-                    }
-
-                booking_info = data[booking_key]
+                booking_info = data.get(booking_key, {
+                    'status': 'not_booked',
+                    'confirmation_number': None,
+                    'booked_date': None,
+                    'notes': ''
+                })
 
                 bookings.append({
                     'activity': activity,
@@ -141,12 +139,14 @@ def show_booking_dashboard():
                             notes_input = st.text_area("Notes:", key=f"notes_{booking['booking_key']}")
 
                             if st.form_submit_button("💾 Save"):
-                                data[booking['booking_key']]['status'] = 'confirmed'
-                                data[booking['booking_key']]['confirmation_number'] = conf_num
-                                data[booking['booking_key']]['booked_date'] = datetime.now().isoformat()
-                                data[booking['booking_key']]['notes'] = notes_input
-
-                                save_trip_data(f"Booked: {activity['activity']}")
+                                update_booking(
+                                    booking['booking_key'],
+                                    f"Booked: {activity['activity']}",
+                                    status='confirmed',
+                                    confirmation_number=conf_num,
+                                    booked_date=datetime.now().isoformat(),
+                                    notes=notes_input
+                                )
                                 st.success("✅ Saved!")
                                 st.session_state[f"show_form_{booking['booking_key']}"] = False
                                 st.rerun()
@@ -184,8 +184,7 @@ def show_booking_dashboard():
                         st.session_state[f"edit_mode_{booking['booking_key']}"] = True
 
                     if st.button("❌ Cancel", key=f"cancel_{booking['booking_key']}"):
-                        data[booking['booking_key']]['status'] = 'cancelled'
-                        save_trip_data(f"Cancelled: {activity['activity']}")
+                        update_booking(booking['booking_key'], f"Cancelled: {activity['activity']}", status='cancelled')
                         st.rerun()
 
                 # Edit mode
@@ -195,9 +194,12 @@ def show_booking_dashboard():
                         new_notes = st.text_area("Notes:", value=booking_info.get('notes', ''))
 
                         if st.form_submit_button("💾 Update"):
-                            data[booking['booking_key']]['confirmation_number'] = new_conf
-                            data[booking['booking_key']]['notes'] = new_notes
-                            save_trip_data(f"Updated: {activity['activity']}")
+                            update_booking(
+                                booking['booking_key'],
+                                f"Updated: {activity['activity']}",
+                                confirmation_number=new_conf,
+                                notes=new_notes
+                            )
                             st.success("✅ Updated!")
                             st.session_state[f"edit_mode_{booking['booking_key']}"] = False
                             st.rerun()
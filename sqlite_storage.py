@@ -0,0 +1,232 @@
+"""
+SQLite Storage Backend for Trip Data
+Keeps proposals, notes, TSA updates and activity lists in indexed tables
+
+Enable with TRIP_STORAGE_BACKEND=sqlite (database path: TRIP_SQLITE_PATH).
+Saves diff the document against the stored rows and write only the rows
+that changed, in a single transaction.
+"""
+
+import os
+import json
+import sqlite3
+from contextlib import closing
+
+from github_storage import StorageBackend, init_empty_data
+
+SQLITE_DB_FILE = os.getenv('TRIP_SQLITE_PATH', 'trip_data.db')
+
+# Collections stored as keyed rows: {proposal_id: proposal}
+PROPOSAL_COLLECTIONS = ('meal_proposals', 'activity_proposals')
+# Collections stored as ordered rows: [activity, ...]
+ACTIVITY_COLLECTIONS = ('custom_activities', 'completed_activities', 'done_activities', 'interested_activities')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS proposals (
+    kind TEXT NOT NULL,
+    proposal_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT,
+    updated_at TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (kind, proposal_id)
+);
+CREATE TABLE IF NOT EXISTS notes (
+    position INTEGER PRIMARY KEY,
+    note_id INTEGER,
+    date TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notes_date ON notes (date);
+CREATE TABLE IF NOT EXISTS tsa_updates (
+    position INTEGER PRIMARY KEY,
+    airport_code TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tsa_airport_time ON tsa_updates (airport_code, created_at);
+CREATE TABLE IF NOT EXISTS activities (
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    activity_key TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (kind, position)
+);
+CREATE INDEX IF NOT EXISTS idx_activities_key ON activities (kind, activity_key);
+"""
+
+
+def _encode(value):
+    """Stable JSON encoding (so unchanged rows compare equal)"""
+    return json.dumps(value, sort_keys=True)
+
+
+def _sync_rows(conn, table, key_columns, columns, rows, scope=None):
+    """Bring a table in line with the desired rows, touching only differences
+
+    Args:
+        conn: Open connection (inside a transaction)
+        table (str): Table name
+        key_columns (tuple): Primary key columns
+        columns (tuple): All columns, key columns first
+        rows (list): Desired rows as dicts of column -> value
+        scope (tuple): Optional (column, value) limiting which stored rows
+            belong to this sync (e.g. ('kind', 'meal_proposals'))
+
+    Returns:
+        int: Number of rows inserted, updated or deleted
+    """
+    where, params = (f" WHERE {scope[0]} = ?", [scope[1]]) if scope else ("", [])
+    existing = {
+        tuple(row[:len(key_columns)]): tuple(row)
+        for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table}{where}", params)
+    }
+    desired = {
+        tuple(row[c] for c in key_columns): tuple(row[c] for c in columns)
+        for row in rows
+    }
+
+    removed = [key for key in existing if key not in desired]
+    match = ' AND '.join(f"{c} = ?" for c in key_columns)
+    conn.executemany(f"DELETE FROM {table} WHERE {match}", removed)
+
+    changed = [values for key, values in desired.items() if existing.get(key) != values]
+    placeholders = ', '.join('?' for _ in columns)
+    conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", changed)
+
+    return len(removed) + len(changed)
+
+
+class SQLiteBackend(StorageBackend):
+    """Trip data in a local SQLite database with indexed tables"""
+
+    name = "sqlite"
+    # Tables always hold the full current state, so indexed queries see every change
+    journaled = False
+
+    def __init__(self, path=None):
+        self.path = path or SQLITE_DB_FILE
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def load(self):
+        """Assemble the trip document from the tables"""
+        try:
+            with closing(self._connect()) as conn:
+                data = {key: json.loads(body) for key, body in conn.execute("SELECT key, body FROM documents")}
+
+                for kind in PROPOSAL_COLLECTIONS:
+                    data[kind] = {
+                        proposal_id: json.loads(body)
+                        for proposal_id, body in conn.execute(
+                            "SELECT proposal_id, body FROM proposals WHERE kind = ? ORDER BY position", (kind,))
+                    }
+                for kind in ACTIVITY_COLLECTIONS:
+                    rows = conn.execute(
+                        "SELECT body FROM activities WHERE kind = ? ORDER BY position", (kind,)).fetchall()
+                    if rows or kind in data:
+                        data[kind] = [json.loads(body) for (body,) in rows]
+                data['notes'] = [json.loads(body) for (body,) in conn.execute("SELECT body FROM notes ORDER BY position")]
+                data['tsa_updates'] = [
+                    json.loads(body) for (body,) in conn.execute("SELECT body FROM tsa_updates ORDER BY position")
+                ]
+        except Exception as e:
+            print(f"Error loading SQLite data: {e}")
+            return init_empty_data()
+
+        # Ensure all required keys exist
+        default_data = init_empty_data()
+        for key in default_data:
+            if key not in data:
+                data[key] = default_data[key]
+        return data
+
+    def save(self, document, commit_message="Update trip data"):
+        """Write the rows that differ from the stored document in one transaction"""
+        try:
+            with closing(self._connect()) as conn:
+                with conn:
+                    changed = 0
+                    for kind in PROPOSAL_COLLECTIONS:
+                        changed += _sync_rows(
+                            conn, 'proposals', ('kind', 'proposal_id'),
+                            ('kind', 'proposal_id', 'position', 'status', 'updated_at', 'body'),
+                            [
+                                {'kind': kind, 'proposal_id': proposal_id, 'position': i,
+                                 'status': proposal.get('status'), 'updated_at': proposal.get('updated_at'),
+                                 'body': _encode(proposal)}
+                                for i, (proposal_id, proposal) in enumerate(document.get(kind, {}).items())
+                            ],
+                            scope=('kind', kind)
+                        )
+                    for kind in ACTIVITY_COLLECTIONS:
+                        changed += _sync_rows(
+                            conn, 'activities', ('kind', 'position'), ('kind', 'position', 'activity_key', 'body'),
+                            [
+                                {'kind': kind, 'position': i,
+                                 'activity_key': str(a.get('id')) if isinstance(a, dict) else str(a),
+                                 'body': _encode(a)}
+                                for i, a in enumerate(document.get(kind, []))
+                            ],
+                            scope=('kind', kind)
+                        )
+                    changed += _sync_rows(
+                        conn, 'notes', ('position',), ('position', 'note_id', 'date', 'body'),
+                        [
+                            {'position': i, 'note_id': n.get('id'), 'date': n.get('date'), 'body': _encode(n)}
+                            for i, n in enumerate(document.get('notes', []))
+                        ]
+                    )
+                    changed += _sync_rows(
+                        conn, 'tsa_updates', ('position',), ('position', 'airport_code', 'created_at', 'body'),
+                        [
+                            {'position': i, 'airport_code': u['airport_code'], 'created_at': u['created_at'],
+                             'body': _encode(u)}
+                            for i, u in enumerate(document.get('tsa_updates', []))
+                        ]
+                    )
+                    tabled = set(PROPOSAL_COLLECTIONS) | set(ACTIVITY_COLLECTIONS) | {'notes', 'tsa_updates'}
+                    changed += _sync_rows(
+                        conn, 'documents', ('key',), ('key', 'body'),
+                        [{'key': key, 'body': _encode(value)} for key, value in document.items() if key not in tabled]
+                    )
+            print(f"✅ Saved to SQLite ({changed} row(s) changed): {commit_message}")
+            return True
+        except Exception as e:
+            print(f"❌ Error saving to SQLite: {e}")
+            return False
+
+    def latest_tsa_update(self, airport_code, since, data=None):
+        """Most recent TSA update for an airport (indexed on airport_code, created_at)"""
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT body FROM tsa_updates WHERE airport_code = ? AND created_at > ? "
+                    "ORDER BY created_at DESC LIMIT 1",
+                    (airport_code, since)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            print(f"Error querying TSA updates: {e}")
+            return None
+
+    def get_proposal(self, kind, proposal_id, data=None):
+        """Read one proposal by primary key"""
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT body FROM proposals WHERE kind = ? AND proposal_id = ?", (kind, proposal_id)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            print(f"Error querying proposals: {e}")
+            return None
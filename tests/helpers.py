@@ -0,0 +1,30 @@
+"""
+Shared test doubles - fake HTTP responses and a controllable clock
+"""
+
+import json
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code=200, payload=None, headers=None, text=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+        if text is None:
+            text = json.dumps(payload) if payload is not None else ''
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+class FakeClock:
+    """Controllable time source (monotonic seconds or local datetimes)"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,69 @@
+"""
+Tests for the normalized activity model - cost parsing,
+day index, type enum, sorting
+"""
+
+import pytest
+
+from utils.activity_model import Activity, ActivityType, normalize_activities, parse_cost
+
+
+class TestParsing:
+    """Test the cost parser (times and durations: test_time_parsing.py)"""
+
+    def test_cost(self):
+        """Test numeric, range and free costs"""
+        assert parse_cost(45) == 45.0
+        assert parse_cost('$25-40') == 25.0
+        assert parse_cost('$1,200') == 1200.0
+        assert parse_cost('Free') == 0.0
+
+
+class TestActivity:
+    """Test normalized activities"""
+
+    def test_fields(self):
+        """Test that a dict is parsed into offsets, day, type, location and cost"""
+        source = {
+            'id': 'spa001', 'activity': 'Massage', 'date': '2025-11-09', 'time': '10:00 AM',
+            'duration': '1.5 hours', 'type': 'spa', 'cost': 245,
+            'location': {'name': 'Ritz Spa', 'lat': '30.6234', 'lon': -81.4567}
+        }
+        item = Activity(source)
+
+        assert (item.day, item.start, item.end, item.duration) == (2, 600, 690, 90)
+        assert item.type is ActivityType.SPA
+        assert (item.lat, item.lon) == (30.6234, -81.4567)
+        assert item.cost == 245.0
+        assert item.source is source
+
+    def test_missing_values(self):
+        """Test unscheduled activities and unknown types"""
+        item = Activity({'activity': 'Sunset cruise', 'time': 'TBD', 'type': 'mystery'})
+
+        assert item.is_scheduled is False
+        assert item.end is None and item.end_with_default(120) is None
+        assert item.type is ActivityType.OTHER
+
+    def test_default_duration(self):
+        """Test the end when the source has no duration"""
+        item = Activity({'activity': 'Flight', 'date': '2025-11-07', 'time': '6:01 PM'})
+
+        assert item.end == item.start
+        assert item.end_with_default(60) == item.start + 60
+
+    def test_slots(self):
+        """Test that activities don't carry a per-instance dict"""
+        with pytest.raises(AttributeError):
+            Activity({}).extra = 1
+
+    def test_normalize_sorts_by_day_then_time(self):
+        """Test chronological order with unscheduled activities last"""
+        items = normalize_activities([
+            {'activity': 'Dinner', 'date': '2025-11-08', 'time': '7:00 PM'},
+            {'activity': 'Someday', 'date': '2025-11-08', 'time': 'TBD'},
+            {'activity': 'Breakfast', 'date': '2025-11-08', 'time': '9:00 AM'},
+            {'activity': 'Arrival', 'date': '2025-11-07', 'time': '6:01 PM'},
+        ])
+
+        assert [item.name for item in items] == ['Arrival', 'Breakfast', 'Dinner', 'Someday']
@@ -0,0 +1,113 @@
+"""
+Tests for vectorized catalog scoring - feature matrix, weather/duration/
+cost/rating points, slot boosts, tide bonus, top-k picks
+"""
+
+import numpy as np
+import pytest
+
+from utils.catalog_scoring import FEATURES, CatalogFeatures, score_slots
+from utils.hourly_weather import HourlyWeather
+
+CATALOG = [
+    {"name": "Kayak Tour", "description": "Guided paddle through the marsh", "cost_range": "$65-85 per person",
+     "duration": "2-3 hours", "rating": "4.8/5"},
+    {"name": "Amelia Island Museum of History", "description": "Local history", "cost_range": "$10",
+     "duration": "1-2 hours", "rating": "4.6/5"},
+    {"name": "Main Beach Shelling", "description": "Hunt for shells at low tide", "cost_range": "FREE",
+     "duration": "1 hour", "rating": "4.5/5"},
+    {"name": "Golf Round", "description": "18 holes", "cost_range": "Varies by season",
+     "duration": "4-5 hours", "rating": "N/A"},
+]
+FORECAST = [
+    {"date": "2025-11-08", "high": 75, "low": 62, "condition": "Sunny", "precipitation": 10},
+    {"date": "2025-11-09", "high": 72, "low": 58, "condition": "Rain", "precipitation": 80},
+]
+SLOTS = [{'date': '2025-11-08', 'time': '10:00 AM'}, {'date': '2025-11-09', 'time': '3:00 PM'}]
+
+
+@pytest.fixture
+def features():
+    """Features for the small test catalog"""
+    return CatalogFeatures(CATALOG)
+
+
+class TestCatalogFeatures:
+    """Test the feature matrix"""
+
+    def test_matrix_shape_and_columns(self, features):
+        """Test one row per item and one column per feature"""
+        assert features.matrix.shape == (4, len(FEATURES))
+        assert features['duration'].tolist() == [150, 90, 60, 270]
+        assert features['cost'].tolist() == [65, 10, 0, 20]  # FREE -> 0, unknown -> 20
+        assert np.isnan(features['rating'][3])
+
+    def test_flags(self, features):
+        """Test outdoor/indoor/water/beach keyword flags"""
+        assert features.flag('outdoor').tolist() == [True, False, True, False]
+        assert features.flag('indoor').tolist() == [False, True, False, False]
+        assert features.flag('water').tolist() == [True, False, True, False]
+        assert features.flag('beach').tolist() == [False, False, True, False]
+
+    def test_parenthetical_duration(self):
+        """Test that a time note in parentheses isn't read as a range"""
+        features = CatalogFeatures([{"name": "Beach Fire", "duration": "1.5 hours (8:00-9:30 PM)"}])
+        assert features['duration'][0] == 90
+
+
+class TestScoreSlots:
+    """Test scoring every item against every slot"""
+
+    def test_scores_shape_and_points(self, features):
+        """Test weather, duration, cost and rating points per slot"""
+        scores = score_slots(features, SLOTS, {'forecast': FORECAST}).scores
+
+        assert scores.shape == (2, 4)
+        # Kayak: sunny 30 + duration 25 + cost 5 + rating 9; rainy day drops weather to 5
+        assert scores[:, 0].tolist() == [69, 44]
+        # Museum: indoor 25 either way + 25 + 8 + 9
+        assert scores[:, 1].tolist() == [67, 67]
+        # Golf: no weather keywords 15 + long 15 + unknown cost 8 + unrated 0
+        assert scores[:, 3].tolist() == [38, 38]
+
+    def test_hourly_weather(self, features):
+        """Test that hourly data is used when it covers the slot"""
+        weather = {'forecast': FORECAST, 'hourly': HourlyWeather.from_daily(FORECAST)}
+        slot_scores = score_slots(features, SLOTS[:1], weather)
+
+        reasons, _ = slot_scores.explain(0, 0)
+        assert reasons[0].startswith('☀️ Perfect weather (sunny')
+
+    def test_boost_and_top(self, features):
+        """Test a slot boost and top-k ordering"""
+        slots = [dict(SLOTS[1], boost=10, boost_words=['museum'])]
+        [picks] = score_slots(features, slots, {'forecast': FORECAST}).top(k=2)
+
+        assert [p['index'] for p in picks] == [1, 2]
+        assert picks[0]['score'] == 77
+        assert '☔ Great indoor choice (rainy day)' in picks[0]['reasons']
+
+    def test_min_score(self, features):
+        """Test that top() drops picks at or below the threshold"""
+        [picks] = score_slots(features, SLOTS[1:], {'forecast': FORECAST}).top(k=4, min_score=45)
+        assert [p['index'] for p in picks] == [1, 2]
+
+    def test_tide_check_once_per_duration(self, features):
+        """Test the beach tide bonus and that the check isn't repeated per item"""
+        calls = []
+
+        def tide_check(date_str, time_str, minutes):
+            calls.append((date_str, time_str, minutes))
+            return 10, '🐚 Low tide', None
+
+        slot_scores = score_slots(features, SLOTS, None, tide_check)
+
+        assert calls == [('2025-11-08', '10:00 AM', 60.0), ('2025-11-09', '3:00 PM', 60.0)]
+        assert slot_scores.scores[0, 2] == 15 + 25 + 10 + 9 + 10
+        assert '🐚 Low tide' in slot_scores.explain(0, 2)[0]
+
+    def test_empty_catalog(self):
+        """Test scoring with no candidates"""
+        slot_scores = score_slots(CatalogFeatures([]), SLOTS, None)
+        assert slot_scores.scores.shape == (2, 0)
+        assert slot_scores.top(k=3) == [[], []]
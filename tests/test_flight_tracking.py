@@ -0,0 +1,146 @@
+"""
+Tests for the flight tracker - adaptive poll intervals, cached status
+between polls, status history, fallback handling
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils import flight_tracking
+from utils.flight_tracking import FlightTracker, poll_interval, _flight_record
+
+from tests.helpers import FakeClock, FakeResponse
+
+DEPARTS = datetime(2025, 11, 12, 14, 39)
+ARRIVES = datetime(2025, 11, 12, 16, 40)
+
+
+def _flight(state='scheduled', gate='B4', delay=None, actual_arrival=None):
+    """AviationStack flight record"""
+    return {
+        'flight_status': state,
+        'flight': {'iata': 'AA5590'},
+        'departure': {'iata': 'JAX', 'airport': 'Jacksonville International', 'gate': gate, 'delay': delay,
+                      'scheduled': DEPARTS.isoformat() + '+00:00'},
+        'arrival': {'iata': 'DCA', 'airport': 'Reagan National', 'gate': None,
+                    'scheduled': ARRIVES.isoformat() + '+00:00', 'actual': actual_arrival},
+        'airline': {'name': 'American Airlines'}
+    }
+
+
+def _record(**kwargs):
+    return _flight_record('AA5590', '2025-11-12', _flight(**kwargs), 'OK')
+
+
+@pytest.fixture
+def aviationstack(monkeypatch):
+    """Serve queued AviationStack flights and count calls"""
+    calls, flights = [], []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(params)
+        return FakeResponse(payload={'data': [flights[0] if len(flights) == 1 else flights.pop(0)]})
+
+    monkeypatch.setattr(flight_tracking.http_client, 'get', fake_get)
+    return calls, flights
+
+
+class TestPollInterval:
+    """Test how often a flight is checked"""
+
+    @pytest.mark.parametrize('before, minutes', [
+        (timedelta(days=3), flight_tracking.POLL_DAYS_OUT),
+        (timedelta(hours=12), flight_tracking.POLL_DAY_BEFORE),
+        (timedelta(hours=4), flight_tracking.POLL_DAY_OF),
+        (timedelta(minutes=45), flight_tracking.POLL_BOARDING),
+        (timedelta(minutes=-10), flight_tracking.POLL_BOARDING),  # Status not yet updated
+    ])
+    def test_scheduled_tightens_toward_departure(self, before, minutes):
+        """Test the interval for a scheduled flight at different lead times"""
+        assert poll_interval(_record(), DEPARTS - before) == timedelta(minutes=minutes)
+
+    def test_interval_never_skips_boarding_window(self):
+        """Test that a long interval is cut short at the 2-hour mark"""
+        now = DEPARTS - timedelta(hours=6, minutes=30)
+        assert poll_interval(_record(), now) == timedelta(minutes=60)
+        assert poll_interval(_record(), DEPARTS - timedelta(hours=2, minutes=10)) == timedelta(minutes=10)
+
+    def test_airborne(self):
+        """Test en-route flights, then the approach"""
+        assert poll_interval(_record(state='active'), DEPARTS + timedelta(minutes=20)) == timedelta(minutes=10)
+        assert poll_interval(_record(state='active'), ARRIVES - timedelta(minutes=20)) == timedelta(minutes=3)
+
+    def test_landed_flight_stops_polling(self):
+        """Test that polling ends a while after landing"""
+        landed = _record(state='landed', actual_arrival=ARRIVES.isoformat())
+        assert poll_interval(landed, ARRIVES + timedelta(minutes=10)) == timedelta(minutes=10)
+        assert poll_interval(landed, ARRIVES + timedelta(hours=2)) is None
+
+
+class TestTracker:
+    """Test the shared tracker"""
+
+    def test_cached_until_next_check(self, aviationstack):
+        """Test that the API is only called when the interval has passed"""
+        calls, flights = aviationstack
+        flights.append(_flight())
+        clock = FakeClock(DEPARTS - timedelta(hours=12))
+        tracker = FlightTracker(api_key_getter=lambda: 'key', clock=clock)
+
+        tracker.get('aa 5590', '2025-11-12')
+        clock.now += timedelta(minutes=30)
+        status = tracker.get('AA5590', '2025-11-12')
+
+        assert len(calls) == 1
+        assert calls[0]['flight_iata'] == 'AA5590'
+        assert status['status_text'] == 'On Time'
+        assert status['departure']['gate'] == 'B4'
+        assert status['arrival']['gate'] == 'TBD'
+
+        clock.now += timedelta(minutes=31)
+        tracker.get('AA5590', '2025-11-12')
+        assert len(calls) == 2
+
+    def test_history_records_changes_only(self, aviationstack):
+        """Test that only polls with a change are added to the history"""
+        calls, flights = aviationstack
+        flights.extend([_flight(), _flight(), _flight(gate='C7', delay=25), _flight(state='active', gate='C7', delay=25)])
+        clock = FakeClock(DEPARTS - timedelta(hours=1))
+        tracker = FlightTracker(api_key_getter=lambda: 'key', clock=clock)
+
+        for _ in range(4):
+            tracker.get('AA5590', '2025-11-12')
+            clock.now += timedelta(minutes=5)
+
+        history = tracker.history('AA5590', '2025-11-12')
+        assert [(h['status'], h['dep_gate'], h['dep_delay']) for h in history] == [
+            ('scheduled', 'B4', 0), ('scheduled', 'C7', 25), ('active', 'C7', 25)
+        ]
+
+    def test_error_keeps_last_live_status(self, aviationstack, monkeypatch):
+        """Test that an API failure doesn't replace live data with a fallback"""
+        calls, flights = aviationstack
+        flights.append(_flight(gate='B4'))
+        clock = FakeClock(DEPARTS - timedelta(hours=1))
+        tracker = FlightTracker(api_key_getter=lambda: 'key', clock=clock)
+        tracker.get('AA5590', '2025-11-12')
+
+        monkeypatch.setattr(flight_tracking.http_client, 'get',
+                            lambda url, **kwargs: FakeResponse(503, {}))
+        clock.now += timedelta(minutes=6)
+        status = tracker.get('AA5590', '2025-11-12')
+
+        assert status['live_status'] == 'OK'
+        assert status['departure']['gate'] == 'B4'
+
+    def test_no_api_key_fallback(self, aviationstack):
+        """Test the fallback card without an API key"""
+        calls, _ = aviationstack
+        tracker = FlightTracker(api_key_getter=lambda: '', clock=FakeClock(DEPARTS))
+
+        status = tracker.get('AA2434', '2025-11-07')
+
+        assert calls == []
+        assert status['live_status'] == 'FALLBACK'
+        assert (status['departure']['airport'], status['arrival']['airport']) == ('DCA', 'JAX')
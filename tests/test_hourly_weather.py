@@ -0,0 +1,196 @@
+"""
+Tests for the hourly weather store - One Call and 3-hour forecast parsing,
+O(1) hour lookup, activity windows, daily summaries, fetch routes
+"""
+
+import calendar
+from datetime import datetime
+
+import pytest
+
+from utils import hourly_weather
+from utils.hourly_weather import HourlyWeather, conditions_at, fetch_weather
+
+from tests.helpers import FakeResponse
+
+OFFSET = -5 * 3600  # EST
+START = datetime(2025, 11, 9, 0, 0)
+
+
+def _ts(local):
+    """Local time at the forecast location -> unix timestamp"""
+    return calendar.timegm(local.timetuple()) - OFFSET
+
+
+def _weather(description):
+    return [{'description': description}]
+
+
+def _onecall():
+    """One Call response: 48 hours from midnight Nov 9, daily through Nov 12"""
+    hourly = []
+    for hour in range(48):
+        rainy = 14 <= hour <= 16  # Afternoon storm on the 9th
+        hourly.append({
+            'dt': _ts(START) + hour * 3600, 'temp': 60 + hour % 24, 'feels_like': 59 + hour % 24,
+            'pop': 0.8 if rainy else 0.1, 'wind_speed': 20 if rainy else 6,
+            'uvi': 9 if hour == 13 else 2, 'humidity': 70,
+            'weather': _weather('thunderstorm' if rainy else 'clear sky')
+        })
+    daily = [{
+        'dt': _ts(datetime(2025, 11, 9 + d, 12)), 'temp': {'min': 58, 'max': 76}, 'pop': 0.2,
+        'wind_speed': 8, 'uvi': 6, 'humidity': 65, 'weather': _weather('few clouds')
+    } for d in range(4)]
+    return {
+        'timezone_offset': OFFSET,
+        'current': {'temp': 71.4, 'feels_like': 70.2, 'humidity': 70, 'wind_speed': 6.3,
+                    'visibility': 10000, 'uvi': 3.2, 'weather': _weather('clear sky')},
+        'hourly': hourly,
+        'daily': daily
+    }
+
+
+class TestStore:
+    """Test building and querying the store"""
+
+    def test_onecall_hours_indexed_locally(self):
+        """Test that hourly entries land at their local hour"""
+        store = HourlyWeather.from_onecall(_onecall())
+
+        assert store.start == START
+        assert store.end == datetime(2025, 11, 13)  # Filled through the last daily day
+        at_storm = store.at(datetime(2025, 11, 9, 15, 40))
+        assert at_storm['precip_chance'] == 80
+        assert at_storm['condition'] == 'Thunderstorm'
+        assert store.at(datetime(2025, 11, 9, 13, 0))['uv'] == 9
+        assert store.at(datetime(2025, 11, 8, 23, 0)) is None
+        assert store.at(datetime(2025, 11, 13, 0, 0)) is None
+
+    def test_days_beyond_hourly_follow_daily_curves(self):
+        """Test that later days peak at the daily high mid-afternoon and have no UV at night"""
+        store = HourlyWeather.from_onecall(_onecall())
+
+        assert store.at(datetime(2025, 11, 12, 15))['temp'] == 76
+        assert store.at(datetime(2025, 11, 12, 6))['temp'] == 58
+        assert store.at(datetime(2025, 11, 12, 22))['uv'] == 0
+        assert store.at(datetime(2025, 11, 12, 13))['uv'] == pytest.approx(6, abs=0.3)
+
+    def test_window_takes_worst_hour(self):
+        """Test that an activity window reports its rainiest/windiest hour"""
+        store = HourlyWeather.from_onecall(_onecall())
+
+        morning = store.window(datetime(2025, 11, 9, 9, 0), hours=2)
+        boat_tour = store.window(datetime(2025, 11, 9, 12, 30), hours=3)
+
+        assert morning['precip_chance'] == 10
+        assert boat_tour['precip_chance'] == 80
+        assert boat_tour['wind'] == 20
+        assert boat_tour['uv'] == 9
+        assert boat_tour['condition'] == 'Clear Sky'  # At the start
+
+    def test_daily_summary(self):
+        """Test daily summaries in the app's forecast format"""
+        days = HourlyWeather.from_onecall(_onecall()).daily()
+
+        assert [d['date'] for d in days] == ['2025-11-09', '2025-11-10', '2025-11-11', '2025-11-12']
+        assert days[0]['high'] == 83 and days[0]['low'] == 60
+        assert days[0]['precipitation'] == 80
+        assert days[0]['uv_index'] == 9
+        assert set(days[0]) == {'date', 'high', 'low', 'condition', 'precipitation', 'humidity', 'wind',
+                                'uv_index'}
+
+    def test_three_hour_forecast_interpolated(self):
+        """Test that 3-hour buckets become hourly values"""
+        forecast = {'city': {'timezone': OFFSET}, 'list': [
+            {'dt': _ts(datetime(2025, 11, 9, 9)), 'main': {'temp': 60, 'humidity': 70}, 'pop': 0,
+             'wind': {'speed': 6}, 'weather': _weather('clear sky')},
+            {'dt': _ts(datetime(2025, 11, 9, 12)), 'main': {'temp': 72, 'humidity': 60}, 'pop': 0.6,
+             'wind': {'speed': 12}, 'weather': _weather('light rain')},
+        ]}
+        store = HourlyWeather.from_forecast(forecast)
+
+        assert len(store) == 4
+        assert store.at(datetime(2025, 11, 9, 10))['temp'] == 64
+        assert store.at(datetime(2025, 11, 9, 11))['precip_chance'] == 40
+        assert store.at(datetime(2025, 11, 9, 11))['condition'] == 'Clear Sky'
+        assert store.at(datetime(2025, 11, 9, 12))['condition'] == 'Light Rain'
+
+    def test_from_daily_sample_data(self):
+        """Test synthesizing hours from daily sample forecasts"""
+        store = HourlyWeather.from_daily([
+            {'date': '2025-11-07', 'high': 78, 'low': 65, 'condition': 'Sunny', 'precipitation': 0,
+             'humidity': 65, 'wind': 7, 'uv_index': 6.0}
+        ])
+
+        assert len(store) == 24
+        assert store.daily()[0]['high'] == 78 and store.daily()[0]['low'] == 65
+
+    def test_conditions_at_schedule_time(self):
+        """Test lookups by schedule date/time strings"""
+        weather = {'hourly': HourlyWeather.from_onecall(_onecall())}
+
+        assert conditions_at(weather, '2025-11-09', '3:00 PM')['precip_chance'] == 80
+        assert conditions_at(weather, '2025-11-09', 'TBD') is None
+        assert conditions_at({'forecast': []}, '2025-11-09', '3:00 PM') is None
+
+
+class TestFetch:
+    """Test the request routes"""
+
+    @pytest.fixture
+    def openweather(self, monkeypatch):
+        """Answer OpenWeather URLs from a dict and record them"""
+        calls, responses = [], {}
+        monkeypatch.setattr(hourly_weather, '_onecall_blocked_until', 0.0)
+
+        def fake_get(url, params=None, **kwargs):
+            calls.append(url)
+            return responses[url]
+
+        monkeypatch.setattr(hourly_weather.http_client, 'get', fake_get)
+        return calls, responses
+
+    def test_single_onecall_request(self, openweather):
+        """Test that One Call supplies everything in one request"""
+        calls, responses = openweather
+        responses[hourly_weather.ONECALL_URL] = FakeResponse(payload=_onecall())
+
+        weather = fetch_weather(30.6, -81.4, 'key')
+
+        assert calls == [hourly_weather.ONECALL_URL]
+        assert weather['current']['uv_index'] == 3.2
+        assert weather['current']['temperature'] == 71
+        assert len(weather['forecast']) == 4
+        assert 'Real Data' in weather['source']
+
+    def test_falls_back_without_onecall_access(self, openweather):
+        """Test the 2.5 endpoints after a 401, and no One Call retry afterwards"""
+        calls, responses = openweather
+        responses[hourly_weather.ONECALL_URL] = FakeResponse(401, {})
+        responses[hourly_weather.CURRENT_URL] = FakeResponse(payload={
+            'main': {'temp': 70, 'feels_like': 69, 'humidity': 72}, 'wind': {'speed': 5},
+            'weather': _weather('clear sky')
+        })
+        responses[hourly_weather.FORECAST_URL] = FakeResponse(payload={'city': {'timezone': OFFSET}, 'list': [
+            {'dt': _ts(datetime(2025, 11, 9, 9)), 'main': {'temp': 68, 'humidity': 70}, 'pop': 0.1,
+             'wind': {'speed': 6}, 'weather': _weather('clear sky')},
+            {'dt': _ts(datetime(2025, 11, 9, 12)), 'main': {'temp': 74, 'humidity': 60}, 'pop': 0.2,
+             'wind': {'speed': 8}, 'weather': _weather('few clouds')},
+        ]})
+
+        weather = fetch_weather(30.6, -81.4, 'key')
+        fetch_weather(30.6, -81.4, 'key')
+
+        assert calls.count(hourly_weather.ONECALL_URL) == 1
+        assert calls.count(hourly_weather.FORECAST_URL) == 2
+        assert weather['forecast'][0]['high'] == 74
+        assert weather['hourly'].at(datetime(2025, 11, 9, 10))['temp'] == 70
+
+    def test_failure_returns_none(self, openweather):
+        """Test that a failed fetch returns None so the caller can use its fallback"""
+        calls, responses = openweather
+        responses[hourly_weather.ONECALL_URL] = FakeResponse(500, {})
+        responses[hourly_weather.CURRENT_URL] = FakeResponse(500, {})
+        responses[hourly_weather.FORECAST_URL] = FakeResponse(500, {})
+
+        assert fetch_weather(30.6, -81.4, 'key') is None
@@ -0,0 +1,382 @@
+"""
+Tests for the shared HTTP client - pooling, retries with backoff,
+latency metrics, persistent response cache, circuit breakers
+"""
+
+import io
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from utils import http_client
+
+from tests.helpers import FakeClock, FakeResponse
+
+
+@pytest.fixture(autouse=True)
+def isolated_session(monkeypatch, tmp_path):
+    """Give each test its own session and cache file"""
+    monkeypatch.setattr(http_client, 'HTTP_CACHE_PATH', str(tmp_path / 'http_cache.sqlite'))
+    monkeypatch.setattr(http_client, '_session', None)
+    http_client.reset_circuit_breakers()
+    yield
+    http_client.reset_circuit_breakers()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """Script the shared session's responses and skip backoff sleeps"""
+    calls = []
+    outcomes = []
+
+    def fake_request(method, url, timeout=None, **kwargs):
+        if kwargs.get('only_if_cached'):
+            return FakeResponse(504)  # Nothing cached
+        calls.append((method, url, timeout))
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeResponse(outcome)
+
+    monkeypatch.setattr(http_client.get_session(), 'request', fake_request)
+    monkeypatch.setattr(http_client.time, 'sleep', lambda seconds: None)
+    http_client.reset_http_metrics()
+    yield calls, outcomes
+    http_client.reset_http_metrics()
+
+
+class TestSession:
+    """Test the shared connection pool"""
+
+    def test_session_is_shared(self):
+        """Test that every caller gets the same pooled session"""
+        assert http_client.get_session() is http_client.get_session()
+
+    def test_adapter_pool_size(self):
+        """Test that https connections go through the pooled adapter"""
+        adapter = http_client.get_session().get_adapter('https://api.github.com')
+        assert adapter._pool_maxsize == http_client.POOL_MAXSIZE
+
+
+class TestRetries:
+    """Test retry behaviour"""
+
+    def test_success_needs_one_call(self, session):
+        """Test that a 200 is returned straight away"""
+        calls, outcomes = session
+        outcomes.append(200)
+
+        response = http_client.get('https://api.example.com/x', timeout=3)
+
+        assert response.status_code == 200
+        assert calls == [('GET', 'https://api.example.com/x', 3)]
+
+    def test_retries_server_errors(self, session):
+        """Test that a 503 is retried and the later 200 returned"""
+        calls, outcomes = session
+        outcomes.extend([503, 200])
+
+        assert http_client.get('https://api.example.com/x').status_code == 200
+        assert len(calls) == 2
+
+    def test_gives_up_after_max_retries(self, session):
+        """Test that the last error response is returned when retries run out"""
+        calls, outcomes = session
+        outcomes.extend([502, 502, 502])
+
+        assert http_client.get('https://api.example.com/x').status_code == 502
+        assert len(calls) == 1 + http_client.MAX_RETRIES
+
+    def test_client_errors_not_retried(self, session):
+        """Test that 4xx responses (other than 429) are returned immediately"""
+        calls, outcomes = session
+        outcomes.append(404)
+
+        assert http_client.get('https://api.example.com/x').status_code == 404
+        assert len(calls) == 1
+
+    def test_connection_error_retried_then_raised(self, session):
+        """Test that connection failures are retried and finally raised"""
+        calls, outcomes = session
+        outcomes.extend([requests.ConnectionError("down")] * 3)
+
+        with pytest.raises(requests.ConnectionError):
+            http_client.get('https://api.example.com/x')
+        assert len(calls) == 3
+
+    def test_post_not_retried_by_default(self, session):
+        """Test that a POST is only retried when marked idempotent"""
+        calls, outcomes = session
+        outcomes.extend([503, 503, 200])
+
+        assert http_client.post('https://api.example.com/x').status_code == 503
+        assert http_client.post('https://api.example.com/x', idempotent=True).status_code == 200
+        assert len(calls) == 3
+
+    def test_backoff_is_jittered_and_grows(self):
+        """Test that backoff stays within the doubling envelope"""
+        for attempt in (1, 2, 3):
+            delay = http_client._backoff_delay(attempt)
+            assert 0 <= delay <= http_client.RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+
+
+class TestMetrics:
+    """Test per-host latency metrics"""
+
+    def test_metrics_per_host(self, session):
+        """Test that calls, retries and errors are counted per host"""
+        calls, outcomes = session
+        outcomes.extend([500, 200, 200])
+
+        http_client.get('https://api.openweathermap.org/data')
+        http_client.get('https://api.tidesandcurrents.noaa.gov/api')
+
+        metrics = http_client.get_http_metrics()
+        weather = metrics['api.openweathermap.org']
+        assert weather['calls'] == 2
+        assert weather['retries'] == 1
+        assert weather['errors'] == 1
+        assert weather['last_status'] == 200
+        assert metrics['api.tidesandcurrents.noaa.gov']['calls'] == 1
+        assert weather['p95_ms'] >= weather['p50_ms'] >= 0
+
+
+class CountingAdapter(HTTPAdapter):
+    """Transport that answers every request locally and counts them"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request.url)
+        raw = HTTPResponse(body=io.BytesIO(b'{"ok": true}'), status=200,
+                           headers={'Content-Type': 'application/json'}, preload_content=False)
+        return self.build_response(request, raw)
+
+
+class TestResponseCache:
+    """Test the persistent per-endpoint response cache"""
+
+    @pytest.fixture
+    def transport(self, tmp_path):
+        """Build sessions on one cache file with a counting transport"""
+        adapter = CountingAdapter()
+        cache_path = str(tmp_path / 'cache.sqlite')
+
+        def new_session():
+            session = http_client.create_session(cache_path)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            return session
+
+        return adapter, new_session
+
+    def test_geocode_served_from_cache(self, transport):
+        """Test that a repeated geocode doesn't reach the network"""
+        adapter, new_session = transport
+        session = new_session()
+        url = 'https://maps.googleapis.com/maps/api/geocode/json'
+
+        session.get(url, params={'address': 'Amelia Island', 'key': 'k1'})
+        cached = session.get(url, params={'address': 'Amelia Island', 'key': 'k1'})
+
+        assert len(adapter.sent) == 1
+        assert cached.from_cache is True
+
+    def test_cache_survives_restart(self, transport):
+        """Test that a new session (new process) reuses the cache file"""
+        adapter, new_session = transport
+        url = 'https://api.tidesandcurrents.noaa.gov/api/prod/datagetter?station=8720030'
+
+        new_session().get(url)
+        assert new_session().get(url).from_cache is True
+        assert len(adapter.sent) == 1
+
+    def test_api_key_not_part_of_cache_key(self, transport):
+        """Test that rotating the API key still hits the cache"""
+        adapter, new_session = transport
+        session = new_session()
+        url = 'https://api.openweathermap.org/data/2.5/weather'
+
+        session.get(url, params={'lat': 30.6, 'appid': 'old'})
+        session.get(url, params={'lat': 30.6, 'appid': 'new'})
+
+        assert len(adapter.sent) == 1
+
+    def test_unlisted_endpoints_not_cached(self, transport):
+        """Test that GitHub and flight status always go to the network"""
+        adapter, new_session = transport
+        session = new_session()
+
+        for _ in range(2):
+            session.get('https://api.github.com/repos/o/r/contents/data/trip_data')
+            session.get('http://api.aviationstack.com/v1/flights')
+
+        assert len(adapter.sent) == 4
+
+    def test_ttls(self):
+        """Test the configured endpoint lifetimes"""
+        from datetime import timedelta
+
+        assert http_client.CACHE_TTLS['maps.googleapis.com/maps/api/geocode'] == timedelta(days=30)
+        assert http_client.CACHE_TTLS['api.tidesandcurrents.noaa.gov'] == timedelta(hours=6)
+        assert http_client.CACHE_TTLS['api.openweathermap.org'] == timedelta(minutes=30)
+        assert http_client.CACHE_TTLS['maps.googleapis.com/maps/api/distancematrix'] == timedelta(minutes=5)
+
+
+class TestCircuitBreaker:
+    """Test failing fast while an upstream is down"""
+
+    URL = 'https://api.openweathermap.org/data/2.5/weather'
+    HOST = 'api.openweathermap.org'
+
+    @pytest.fixture
+    def clock(self):
+        """Install a breaker for the weather host driven by a fake clock"""
+        clock = FakeClock(100.0)
+        http_client._breakers[self.HOST] = http_client.CircuitBreaker(self.HOST, clock=clock)
+        return clock
+
+    def _fail(self, outcomes, times):
+        """Make `times` requests that each end in a connection error"""
+        for _ in range(times):
+            outcomes.extend([requests.ConnectionError("down")] * (1 + http_client.MAX_RETRIES))
+            with pytest.raises(requests.ConnectionError):
+                http_client.get(self.URL)
+
+    def test_opens_after_consecutive_failures(self, session, clock):
+        """Test that the circuit opens and later calls don't reach the host"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+        sent = len(calls)
+
+        with pytest.raises(http_client.CircuitOpenError):
+            http_client.get(self.URL)
+
+        assert len(calls) == sent
+        status = http_client.get_circuit_status()[self.HOST]
+        assert status['state'] == 'open'
+        assert status['rejected'] == 1
+        assert status['retry_in_seconds'] == http_client.BREAKER_OPEN_SECONDS
+
+    def test_open_error_caught_as_connection_error(self, session, clock):
+        """Test that existing `except requests.RequestException` fallbacks still work"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+
+        with pytest.raises(requests.RequestException):
+            http_client.get(self.URL)
+
+    def test_success_resets_failure_count(self, session, clock):
+        """Test that only consecutive failures count"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD - 1)
+        outcomes.append(200)
+        http_client.get(self.URL)
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD - 1)
+
+        assert http_client.get_circuit_status()[self.HOST]['state'] == 'closed'
+
+    def test_client_errors_do_not_trip(self, session, clock):
+        """Test that 4xx answers count as the host being up"""
+        calls, outcomes = session
+        outcomes.extend([401] * 5)
+        for _ in range(5):
+            http_client.get(self.URL)
+
+        assert http_client.get_circuit_status()[self.HOST]['state'] == 'closed'
+
+    def test_half_open_probe_closes_on_success(self, session, clock):
+        """Test that one probe is let through after the cool-down"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+        clock.now += http_client.BREAKER_OPEN_SECONDS
+
+        breaker = http_client.get_breaker(self.HOST)
+        assert breaker.allow() is True  # The probe
+        assert breaker.allow() is False  # Everyone else still fails fast
+        breaker.record_success(50)
+
+        assert breaker.snapshot()['state'] == 'closed'
+        outcomes.append(200)
+        assert http_client.get(self.URL).status_code == 200
+
+    def test_failed_probe_doubles_cool_down(self, session, clock):
+        """Test that a failed probe reopens the circuit for longer"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+        clock.now += http_client.BREAKER_OPEN_SECONDS
+
+        self._fail(outcomes, 1)
+
+        status = http_client.get_circuit_status()[self.HOST]
+        assert status['state'] == 'open'
+        assert status['times_opened'] == 2
+        assert status['retry_in_seconds'] == 2 * http_client.BREAKER_OPEN_SECONDS
+
+    def test_probe_released_on_other_errors(self, session, clock):
+        """Test that a probe failing with a non-timeout error doesn't wedge the breaker"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+        clock.now += http_client.BREAKER_OPEN_SECONDS
+
+        outcomes.append(requests.TooManyRedirects("loop"))
+        with pytest.raises(requests.TooManyRedirects):
+            http_client.get(self.URL)
+
+        status = http_client.get_circuit_status()[self.HOST]
+        assert status['state'] == 'open'
+        assert status['last_failure'] == 'TooManyRedirects'
+        clock.now += 2 * http_client.BREAKER_OPEN_SECONDS
+        outcomes.append(200)
+        assert http_client.get(self.URL).status_code == 200
+        assert http_client.get_circuit_status()[self.HOST]['state'] == 'closed'
+
+    def test_probe_released_when_interrupted(self, session, clock):
+        """Test that a probe that never finishes gives its slot back"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+        clock.now += http_client.BREAKER_OPEN_SECONDS
+
+        outcomes.append(KeyboardInterrupt())
+        with pytest.raises(KeyboardInterrupt):
+            http_client.get(self.URL)
+
+        assert http_client.get_breaker(self.HOST).allow() is True
+
+    def test_slow_answers_count_as_failures(self, clock):
+        """Test that responses slower than the limit trip the circuit"""
+        breaker = http_client.get_breaker(self.HOST)
+        for _ in range(http_client.BREAKER_FAILURE_THRESHOLD):
+            breaker.record_success(http_client.BREAKER_SLOW_CALL_MS + 1)
+
+        assert breaker.snapshot()['state'] == 'open'
+        assert breaker.snapshot()['last_failure'].startswith('slow response')
+
+    def test_hosts_are_independent(self, session, clock):
+        """Test that one host being down doesn't affect another"""
+        calls, outcomes = session
+        self._fail(outcomes, http_client.BREAKER_FAILURE_THRESHOLD)
+        outcomes.append(200)
+
+        assert http_client.get('https://api.tidesandcurrents.noaa.gov/api').status_code == 200
+
+    def test_open_circuit_serves_cached_response(self, tmp_path, monkeypatch):
+        """Test that a cached GET is still answered while the circuit is open"""
+        adapter = CountingAdapter()
+        session = http_client.create_session(str(tmp_path / 'cache.sqlite'))
+        session.mount('https://', adapter)
+        monkeypatch.setattr(http_client, '_session', session)
+        session.get(self.URL, params={'lat': 30.6})
+
+        breaker = http_client.get_breaker(self.HOST)
+        for _ in range(http_client.BREAKER_FAILURE_THRESHOLD):
+            breaker.record_failure("down")
+
+        assert http_client.get(self.URL, params={'lat': 30.6}).from_cache is True
+        with pytest.raises(http_client.CircuitOpenError):
+            http_client.get(self.URL, params={'lat': 99})
+        assert len(adapter.sent) == 1
@@ -0,0 +1,138 @@
+"""
+Tests for parallel live-data lookups - bounded pool, per-activity
+deadlines (from when each activity starts), merging and batching
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import live_enrichment
+from utils.live_enrichment import run_lookups, run_lookup_batches
+
+
+@pytest.fixture
+def executor():
+    """Private pool so slow test lookups don't occupy the shared one"""
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TestRunLookups:
+    """Test one activity's lookups"""
+
+    def test_results_merged(self, executor):
+        """Test that every lookup's fields end up in one dict"""
+        merged, missed = run_lookups({
+            'map': lambda: {'map_url': 'https://maps/x'},
+            'uv': lambda: {'uv_index': 7, 'uv_alert': 'High UV'},
+            'tides': lambda: None,
+        }, executor=executor)
+
+        assert merged == {'map_url': 'https://maps/x', 'uv_index': 7, 'uv_alert': 'High UV'}
+        assert missed == []
+
+    def test_lookups_run_in_parallel(self, executor):
+        """Test that independent lookups overlap instead of queueing"""
+        def slow(key):
+            def lookup():
+                time.sleep(0.2)
+                return {key: True}
+            return lookup
+
+        start = time.monotonic()
+        merged, _ = run_lookups({name: slow(name) for name in ('a', 'b', 'c')}, executor=executor)
+
+        assert merged == {'a': True, 'b': True, 'c': True}
+        assert time.monotonic() - start < 0.5
+
+    def test_failed_lookup_skipped(self, executor):
+        """Test that an exception in one lookup doesn't lose the others"""
+        def broken():
+            raise RuntimeError("API down")
+
+        merged, missed = run_lookups({'places': broken, 'map': lambda: {'map_url': 'x'}}, executor=executor)
+
+        assert merged == {'map_url': 'x'}
+        assert missed == []
+
+    def test_deadline_drops_slow_lookup(self, executor):
+        """Test that a lookup still running at the deadline is left out"""
+        release = threading.Event()
+
+        def stuck():
+            release.wait(2)
+            return {'flight_status': 'late'}
+
+        start = time.monotonic()
+        merged, missed = run_lookups({'flight': stuck, 'map': lambda: {'map_url': 'x'}},
+                                     deadline=0.2, executor=executor)
+        release.set()
+
+        assert merged == {'map_url': 'x'}
+        assert missed == ['flight']
+        assert time.monotonic() - start < 1
+
+
+class TestBatches:
+    """Test enriching several activities in one pass"""
+
+    def test_results_stay_with_their_activity(self, executor):
+        """Test that batch results come back in activity order"""
+        results = run_lookup_batches([
+            {'map': lambda: {'map_url': 'one'}},
+            {},
+            {'map': lambda: {'map_url': 'three'}, 'tides': lambda: {'tides': [1]}},
+        ], executor=executor)
+
+        assert [merged for merged, _ in results] == [
+            {'map_url': 'one'}, {}, {'map_url': 'three', 'tides': [1]}
+        ]
+
+    def test_batch_shares_one_deadline(self, executor):
+        """Test that many slow activities finish in about one lookup's time"""
+        def slow():
+            time.sleep(0.1)
+            return {'done': True}
+
+        start = time.monotonic()
+        results = run_lookup_batches([{'x': slow} for _ in range(4)], executor=executor)
+
+        assert all(merged == {'done': True} for merged, _ in results)
+        assert time.monotonic() - start < 0.35
+
+    def test_queued_activities_get_full_deadline(self, executor):
+        """Test that activities waiting for a worker start their clock late"""
+        def slow():
+            time.sleep(0.15)
+            return {'done': True}
+
+        # 4 workers: the second wave starts at ~0.15s and ends after the first wave's deadline
+        results = run_lookup_batches([{'x': slow} for _ in range(8)], deadline=0.25, executor=executor)
+
+        assert all(merged == {'done': True} and missed == [] for merged, missed in results)
+
+    def test_stuck_pool_is_capped(self, executor):
+        """Test that lookups that never get a worker give up after the batch cap"""
+        release = threading.Event()
+
+        def stuck():
+            release.wait(2)
+            return {'done': True}
+
+        start = time.monotonic()
+        results = run_lookup_batches([{'x': stuck} for _ in range(5)], deadline=0.2, executor=executor)
+        release.set()
+
+        assert [missed for _, missed in results] == [['x']] * 5
+        assert time.monotonic() - start < 0.8
+
+    def test_shared_pool_is_bounded(self):
+        """Test that the shared pool is reused and capped"""
+        pool = live_enrichment.get_executor()
+
+        assert pool is live_enrichment.get_executor()
+        assert pool._max_workers == live_enrichment.ENRICH_WORKERS
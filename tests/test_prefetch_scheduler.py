@@ -0,0 +1,125 @@
+"""
+Tests for the background prefetch scheduler - flight watch window,
+traffic/TSA refreshes before leave-by times, forecast refreshes
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.prefetch_scheduler import (
+    PrefetchScheduler, due_tasks, flight_is_watched, plan_watches, TRAFFIC_REFRESH_LEADS_MINUTES
+)
+
+from tests.helpers import FakeClock
+
+ACTIVITIES = [
+    {
+        'id': 'arr001', 'date': '2025-11-07', 'time': '6:01 PM', 'activity': 'Arrival at Jacksonville',
+        'type': 'transport', 'flight_number': 'AA2434', 'departure_airport': 'DCA',
+        'arrival_airport': 'JAX', 'departure_time': '3:51 PM', 'arrival_time': '6:01 PM'
+    },
+    {'id': 'spa001', 'date': '2025-11-09', 'time': '10:00 AM', 'activity': 'Massage', 'type': 'spa'},
+    {
+        'id': 'dep002', 'date': '2025-11-12', 'time': '12:30 PM', 'activity': 'Leave Hotel for Airport',
+        'type': 'transport', 'flight_number': 'AA5590', 'departure_airport': 'JAX',
+        'arrival_airport': 'DCA', 'flight_departure_time': '2:39 PM'
+    },
+]
+
+LEAVE_HOTEL = datetime(2025, 11, 12, 12, 30)
+
+
+def _kinds(tasks):
+    return sorted(kind for kind, _ in tasks)
+
+
+class TestPlanning:
+    """Test what is watched and when"""
+
+    def test_watches_from_schedule(self):
+        """Test flights, airport runs and the trip window come from the schedule"""
+        watches = plan_watches(ACTIVITIES)
+
+        assert [(f[0], f[2]) for f in watches['flights']] == [
+            ('AA2434', datetime(2025, 11, 7, 15, 51)),
+            ('AA5590', datetime(2025, 11, 12, 14, 39)),
+        ]
+        dca, jax = watches['airport_trips']
+        assert dca[0] == 'DCA' and dca[3] is False  # Leaves from home - no hotel traffic
+        assert jax[:2] == ('JAX', LEAVE_HOTEL)  # Scheduled "Leave Hotel" time is used
+        assert watches['trip_window'] == (datetime(2025, 11, 7, 18, 1), LEAVE_HOTEL)
+
+    def test_flight_watch_window(self):
+        """Test that flights are warmed from a day out until after landing"""
+        assert flight_is_watched(3 * 24 * 60) is False
+        assert flight_is_watched(20 * 60) is True
+        assert flight_is_watched(-60) is True  # In the air
+        assert flight_is_watched(-10 * 60) is False  # Long landed
+
+    def test_traffic_refreshed_at_each_lead_time(self):
+        """Test that traffic to the airport refreshes once per lead time before leaving"""
+        watches = plan_watches(ACTIVITIES)
+        last_run = {}
+        refreshed_at = []
+        now = LEAVE_HOTEL - timedelta(hours=3)
+        while now <= LEAVE_HOTEL + timedelta(hours=1):
+            for kind, args in due_tasks(watches, now, last_run):
+                if kind == 'traffic':
+                    refreshed_at.append(now)
+                    last_run[('traffic', 'JAX', LEAVE_HOTEL)] = now
+            now += timedelta(minutes=1)
+
+        assert refreshed_at == [LEAVE_HOTEL - timedelta(minutes=lead) for lead in TRAFFIC_REFRESH_LEADS_MINUTES]
+
+    def test_nothing_due_before_trip(self):
+        """Test that a month out nothing is prefetched"""
+        assert due_tasks(plan_watches(ACTIVITIES), datetime(2025, 10, 1, 9, 0), {}) == []
+
+
+class TestScheduler:
+    """Test running tasks through the fetchers"""
+
+    @pytest.fixture
+    def fetched(self):
+        """Fetchers that record their calls"""
+        calls = []
+        fetchers = {kind: (lambda *args, kind=kind: calls.append((kind, args)))
+                    for kind in ('flight', 'tsa', 'traffic', 'weather')}
+        return fetchers, calls
+
+    def test_runs_due_tasks_once(self, fetched):
+        """Test that a task isn't repeated until its interval passes"""
+        fetchers, calls = fetched
+        clock = FakeClock(datetime(2025, 11, 12, 12, 0))
+        scheduler = PrefetchScheduler(fetchers, clock=clock)
+        scheduler.update_schedule(ACTIVITIES)
+
+        scheduler.run_once()
+        assert _kinds(calls) == ['flight', 'traffic', 'tsa', 'weather']
+        assert ('flight', ('AA5590', '2025-11-12')) in calls
+
+        calls.clear()
+        clock.now += timedelta(seconds=30)
+        assert scheduler.run_once() == []
+
+        clock.now += timedelta(seconds=30)  # The flight tracker decides if a call is due
+        assert scheduler.run_once() == [('flight', ('AA5590', '2025-11-12'))]
+
+    def test_failing_fetcher_counted(self, fetched):
+        """Test that a failed refresh is recorded and doesn't stop the others"""
+        fetchers, calls = fetched
+
+        def down(*args):
+            raise ConnectionError("AviationStack down")
+
+        fetchers['flight'] = down
+        scheduler = PrefetchScheduler(fetchers, clock=FakeClock(datetime(2025, 11, 12, 12, 0)))
+        scheduler.update_schedule(ACTIVITIES)
+        scheduler.run_once()
+
+        status = scheduler.status()
+        assert status['failures'] == 1
+        assert 'AviationStack down' in status['last_error']
+        assert status['flights'] == ['AA5590']
+        assert 'weather' in _kinds(calls)
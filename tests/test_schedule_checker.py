@@ -92,6 +92,22 @@ class TestScheduleConflicts:
         assert warnings[0]['gap_minutes'] < 30
 
 
+    def test_overlap_beyond_next_activity(self):
+        """Test that a long activity overlapping two later ones is reported twice"""
+        activities = [
+            {'activity': 'Boat Tour', 'date': '2025-11-09', 'time': '09:00 AM', 'duration': '4 hours'},
+            {'activity': 'Coffee', 'date': '2025-11-09', 'time': '09:30 AM', 'duration': '30 min'},
+            {'activity': 'Lunch', 'date': '2025-11-09', 'time': '12:00 PM', 'duration': '1 hour'}
+        ]
+
+        conflicts, warnings, suggestions = check_schedule_conflicts(activities)
+
+        assert [(c['activity1'], c['activity2']) for c in conflicts] == [
+            ('Boat Tour', 'Coffee'), ('Boat Tour', 'Lunch')
+        ]
+        assert conflicts[1]['overlap_minutes'] == 60
+
+
 class TestDurationParsing:
     """Test duration string parsing"""
 
@@ -0,0 +1,128 @@
+"""
+Tests for the per-day schedule index - overlap queries, full overlap
+detection, transitions, incremental insert/delete
+"""
+
+import pytest
+
+from utils.schedule_index import ScheduleIndex
+
+
+def _activity(name, time, hours, date='2025-11-09'):
+    return {'activity': name, 'date': date, 'time': time, 'duration': f"{hours} hours"}
+
+
+def _index(activities):
+    return ScheduleIndex(activities)
+
+
+class TestQueries:
+    """Test overlap queries"""
+
+    def test_find_conflicts(self):
+        """Test a proposed slot against the day's activities"""
+        spa = _activity('Spa', '10:00 AM', 2)
+        lunch = _activity('Lunch', '1:00 PM', 1)
+        index = _index([spa, lunch, _activity('Dinner', '10:00 AM', 2, date='2025-11-10')])
+
+        assert index.find_conflicts('2025-11-09', '11:30 AM', 120) == [spa, lunch]
+        assert index.find_conflicts('2025-11-09', '12:00 PM', 60) == []  # Touching isn't overlapping
+        assert index.find_conflicts('2025-11-11', '10:00 AM', 60) == []
+        assert index.find_conflicts('2025-11-09', 'TBD', 60) == []
+
+    def test_long_activity_found_far_back(self):
+        """Test that a long activity is found even when many start after it"""
+        boat = _activity('All-day boat', '8:00 AM', 9)
+        shorts = [_activity(f"Stop {i}", f"{9 + i}:00 AM" if 9 + i < 12 else f"{9 + i - 12 or 12}:00 PM", 0.5)
+                  for i in range(6)]
+        index = _index([boat] + shorts)
+
+        assert boat in index.find_conflicts('2025-11-09', '4:30 PM', 30)
+
+    def test_every_overlap_detected(self):
+        """Test overlaps beyond the adjacent pair"""
+        index = _index([
+            _activity('Boat Tour', '9:00 AM', 4),
+            _activity('Coffee', '9:30 AM', 0.5),
+            _activity('Lunch', '12:00 PM', 1),
+            _activity('Dinner', '6:00 PM', 2),
+        ])
+
+        pairs = [(first.activity['activity'], second.activity['activity']) for _, first, second in index.overlaps()]
+        assert pairs == [('Boat Tour', 'Coffee'), ('Boat Tour', 'Lunch')]
+
+    def test_transitions_measure_from_latest_end(self):
+        """Test that free time starts when the longest earlier activity ends"""
+        index = _index([
+            _activity('Boat Tour', '9:00 AM', 4),
+            _activity('Coffee', '9:30 AM', 0.5),
+            _activity('Dinner', '6:00 PM', 2),
+        ])
+
+        [(date, previous, following, gap)] = index.transitions()
+        assert (previous.activity['activity'], following.activity['activity'], gap) == ('Boat Tour', 'Dinner', 300)
+
+
+class TestUpdates:
+    """Test incremental changes"""
+
+    def test_default_duration(self):
+        """Test the assumed length for activities without a duration"""
+        flight = {'activity': 'Flight lands', 'date': '2025-11-09', 'time': '6:00 PM'}
+
+        assert ScheduleIndex([flight]).find_conflicts('2025-11-09', '7:30 PM', 30) == [flight]
+        assert ScheduleIndex([flight], default_duration=0).find_conflicts('2025-11-09', '7:30 PM', 30) == []
+
+    def test_insert_and_delete(self):
+        """Test that adding and removing activities updates queries"""
+        index = _index([_activity('Spa', '10:00 AM', 2)])
+        boat = _activity('Boat', '6:00 AM', 10)
+
+        index.add(boat)
+        assert index.find_conflicts('2025-11-09', '3:00 PM', 30) == [boat]
+
+        assert index.remove(boat) is True
+        assert index.remove(boat) is False
+        assert index.find_conflicts('2025-11-09', '3:00 PM', 30) == []
+        assert len(index) == 1
+
+    def test_sync(self):
+        """Test that sync only applies what changed, matching rebuilt dicts by content"""
+        spa, lunch = _activity('Spa', '10:00 AM', 2), _activity('Lunch', '1:00 PM', 1)
+        index = ScheduleIndex()
+
+        assert index.sync([spa, lunch]) == (2, 0)
+        assert index.sync([dict(spa), dict(lunch)]) == (0, 0)  # Same schedule, new dicts
+
+        moved = dict(lunch, time='11:30 AM')
+        assert index.sync([dict(spa), moved]) == (1, 1)
+        assert index.find_conflicts('2025-11-09', '11:45 AM', 15) == [spa, moved]
+        assert index.sync([]) == (0, 2)
+        assert len(index) == 0
+
+    def test_sync_duplicates(self):
+        """Test identical entries are counted, not collapsed"""
+        coffee = _activity('Coffee', '8:00 AM', 0.5)
+        index = ScheduleIndex()
+
+        assert index.sync([coffee, dict(coffee)]) == (2, 0)
+        assert index.sync([coffee]) == (0, 1)
+        assert len(index) == 1
+
+    def test_untimed_as_instants(self):
+        """Test treating activities without a duration as instants per query"""
+        flight = {'activity': 'Flight lands', 'date': '2025-11-09', 'time': '6:00 PM'}
+        dinner = _activity('Dinner', '7:00 PM', 2)
+        index = _index([flight, dinner])
+
+        assert len(index.overlaps()) == 1
+        assert index.overlaps(untimed_minutes=0) == []
+        [(_, previous, following, gap)] = index.transitions(untimed_minutes=0)
+        assert (previous.activity, following.activity, gap) == (flight, dinner, 60)
+
+    def test_unschedulable_skipped(self):
+        """Test that activities without a date or time aren't indexed"""
+        index = _index([_activity('Someday', 'TBD', 1), {'activity': 'No date', 'time': '10:00 AM'}])
+
+        assert len(index) == 0
+        assert index.dates() == []
@@ -0,0 +1,185 @@
+"""
+Tests for single-flight request coalescing - shared results and errors,
+key normalization, issued/coalesced counts, HTTP client integration
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils import http_client
+from utils.single_flight import SingleFlight, make_key
+
+from tests.helpers import FakeResponse
+
+
+def _run_concurrently(count, target):
+    """Start `count` threads on target and wait for them"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+@pytest.fixture
+def slow_upstream():
+    """Upstream call that blocks until released, counting executions"""
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'temp': 78}
+
+    return fetch, release, calls
+
+
+def _start_and_release(group, key, fetch, release, count, results, label='weather'):
+    """Run `count` concurrent callers and release the upstream once all are waiting"""
+    def caller():
+        results.append(group.do(key, fetch, label=label))
+
+    threads = [threading.Thread(target=caller) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while sum(group.stats().get(label, {}).values()) < count and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+class TestKeys:
+    """Test request key normalization"""
+
+    def test_param_order_ignored(self):
+        """Test that dict parameter order doesn't change the key"""
+        assert make_key('GET', 'u', params={'a': 1, 'b': 2}) == make_key('GET', 'u', params={'b': 2, 'a': 1})
+
+    def test_whitespace_ignored(self):
+        """Test that surrounding whitespace is stripped"""
+        assert make_key('get_flight_status', ' AA2434 ') == make_key('get_flight_status', 'AA2434')
+
+    def test_different_params_differ(self):
+        """Test that different parameters give different keys"""
+        assert make_key('GET', 'u', params={'flight_iata': 'AA2434'}) != make_key('GET', 'u', params={'flight_iata': 'AA1585'})
+
+    def test_unhashable_values(self):
+        """Test that lists and nested dicts still produce a hashable key"""
+        hash(make_key('POST', json={'ids': [1, 2], 'filter': {'x': {1, 2}}}))
+
+
+class TestCoalescing:
+    """Test that concurrent duplicates share one call"""
+
+    def test_concurrent_callers_share_one_call(self, slow_upstream):
+        """Test that five simultaneous callers cause one upstream call"""
+        fetch, release, calls = slow_upstream
+        group, results = SingleFlight(), []
+
+        _start_and_release(group, 'weather', fetch, release, 5, results)
+
+        assert len(calls) == 1
+        assert results == [{'temp': 78}] * 5
+        assert group.stats()['weather'] == {'issued': 1, 'coalesced': 4}
+
+    def test_sequential_calls_not_coalesced(self):
+        """Test that nothing is cached once a call finishes"""
+        group, calls = SingleFlight(), []
+        for _ in range(3):
+            group.do('tides', lambda: calls.append(1), label='tides')
+
+        assert len(calls) == 3
+        assert group.stats()['tides'] == {'issued': 3, 'coalesced': 0}
+
+    def test_different_keys_run_separately(self):
+        """Test that unrelated requests don't wait on each other"""
+        group = SingleFlight()
+        assert group.do('a', lambda: 1) == 1
+        assert group.do('b', lambda: 2) == 2
+
+    def test_error_shared_with_waiters(self):
+        """Test that every waiter sees the leader's exception"""
+        group, release, errors = SingleFlight(), threading.Event(), []
+
+        def fail():
+            release.wait(5)
+            raise ConnectionError("NOAA down")
+
+        def caller():
+            try:
+                group.do('tides', fail, label='tides')
+            except ConnectionError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 5
+        while sum(group.stats().get('tides', {}).values()) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert errors == ["NOAA down"] * 3
+        assert group.do('tides', lambda: 'recovered') == 'recovered'
+
+
+class TestHttpClient:
+    """Test coalescing in the shared HTTP client"""
+
+    @pytest.fixture
+    def upstream(self, monkeypatch, tmp_path, slow_upstream):
+        """Route the shared session to the slow upstream"""
+        fetch, release, calls = slow_upstream
+        monkeypatch.setattr(http_client, 'HTTP_CACHE_PATH', str(tmp_path / 'cache.sqlite'))
+        monkeypatch.setattr(http_client, '_session', None)
+        group = SingleFlight()
+        monkeypatch.setattr(http_client, 'get_single_flight', lambda: group)
+        http_client.reset_circuit_breakers()
+
+        def fake_request(method, url, timeout=None, **kwargs):
+            fetch()
+            return FakeResponse(200)
+
+        monkeypatch.setattr(http_client.get_session(), 'request', fake_request)
+        yield group, release, calls
+        http_client.reset_circuit_breakers()
+
+    def test_identical_gets_coalesced(self, upstream):
+        """Test that concurrent identical GETs make one upstream request"""
+        group, release, calls = upstream
+        results = []
+
+        def caller():
+            results.append(http_client.get('http://api.aviationstack.com/v1/flights',
+                                           params={'flight_iata': 'AA2434', 'access_key': 'k'}))
+
+        threads = [threading.Thread(target=caller) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 5
+        while sum(group.stats().get('api.aviationstack.com', {}).values()) < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert all(r.status_code == 200 for r in results)
+        assert group.stats()['api.aviationstack.com'] == {'issued': 1, 'coalesced': 3}
+
+    def test_posts_never_coalesced(self, upstream):
+        """Test that writes always go upstream"""
+        group, release, calls = upstream
+        release.set()
+
+        _run_concurrently(3, lambda: http_client.post('https://api.github.com/graphql'))
+
+        assert len(calls) == 3
+        assert group.stats() == {}
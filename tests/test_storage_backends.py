@@ -0,0 +1,168 @@
+"""
+Tests for pluggable trip data storage backends - selection, local JSON,
+SQLite indexed tables and row-level saves
+"""
+
+import pytest
+
+import github_storage
+from github_storage import (
+    StorageBackend, LocalJSONBackend, GitHubBackend, TripDataSnapshot, get_storage_backend, init_empty_data
+)
+from sqlite_storage import SQLiteBackend
+
+
+def _document():
+    data = init_empty_data()
+    data['meal_proposals'] = {
+        'fri_dinner': {'meal_id': 'fri_dinner', 'status': 'proposed', 'updated_at': '2025-11-01T10:00:00'},
+        'sat_lunch': {'meal_id': 'sat_lunch', 'status': 'confirmed', 'updated_at': '2025-11-01T11:00:00'},
+    }
+    data['notes'] = [{'id': 1, 'date': '2025-11-08', 'content': 'Sunset'}]
+    data['tsa_updates'] = [
+        {'airport_code': 'JAX', 'wait_minutes': 10, 'created_at': '2025-11-07T08:00:00'},
+        {'airport_code': 'JAX', 'wait_minutes': 25, 'created_at': '2025-11-07T09:00:00'},
+        {'airport_code': 'MCO', 'wait_minutes': 40, 'created_at': '2025-11-07T09:30:00'},
+    ]
+    data['done_activities'] = ['Kayaking']
+    data['booking_spa'] = {'status': 'confirmed'}
+    return data
+
+
+class TestBackendSelection:
+    """Test choosing the backend from configuration"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_backends(self, monkeypatch):
+        """Don't reuse backend instances across tests"""
+        monkeypatch.setattr(github_storage, '_backends', {})
+
+    def test_default_without_token_is_local(self, monkeypatch):
+        """Test that no token and no setting means the local JSON file"""
+        monkeypatch.setattr(github_storage, 'GITHUB_TOKEN', None)
+        monkeypatch.setattr(github_storage, 'STORAGE_BACKEND', None)
+
+        assert isinstance(get_storage_backend(), LocalJSONBackend)
+
+    def test_default_with_token_is_github(self, monkeypatch):
+        """Test that a configured token selects GitHub"""
+        monkeypatch.setattr(github_storage, 'GITHUB_TOKEN', 'ghp_test_token')
+        monkeypatch.setattr(github_storage, 'STORAGE_BACKEND', None)
+
+        assert isinstance(get_storage_backend(), GitHubBackend)
+
+    def test_explicit_sqlite(self, monkeypatch, tmp_path):
+        """Test that TRIP_STORAGE_BACKEND=sqlite selects SQLite"""
+        monkeypatch.setattr(github_storage, 'STORAGE_BACKEND', 'sqlite')
+        monkeypatch.setattr('sqlite_storage.SQLITE_DB_FILE', str(tmp_path / 'trip.db'))
+
+        backend = get_storage_backend()
+
+        assert isinstance(backend, SQLiteBackend)
+        assert get_storage_backend() is backend
+
+    def test_unknown_backend_rejected(self, monkeypatch):
+        """Test that a typo in the setting fails loudly"""
+        monkeypatch.setattr(github_storage, 'STORAGE_BACKEND', 'postgres')
+
+        with pytest.raises(ValueError):
+            get_storage_backend()
+
+
+class TestSQLiteBackend:
+    """Test the SQLite backend tables and queries"""
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        """SQLite backend on a temporary database"""
+        return SQLiteBackend(str(tmp_path / 'trip.db'))
+
+    def test_round_trip(self, backend):
+        """Test that a saved document loads back unchanged"""
+        document = _document()
+
+        assert backend.save(document) is True
+
+        assert backend.load() == document
+
+    def test_empty_database_loads_defaults(self, backend):
+        """Test that a new database gives the empty structure"""
+        data = backend.load()
+
+        assert data['meal_proposals'] == {}
+        assert data['notes'] == []
+
+    def test_save_touches_only_changed_rows(self, backend, capsys):
+        """Test that a second save writes only the changed proposal row"""
+        document = _document()
+        backend.save(document)
+        capsys.readouterr()
+
+        document['meal_proposals']['fri_dinner']['status'] = 'voted'
+        backend.save(document)
+
+        assert "(1 row(s) changed)" in capsys.readouterr().out
+        assert backend.get_proposal('meal_proposals', 'fri_dinner')['status'] == 'voted'
+
+    def test_deleted_rows_removed(self, backend):
+        """Test that removed items are deleted from their tables"""
+        document = _document()
+        backend.save(document)
+
+        del document['meal_proposals']['sat_lunch']
+        document['tsa_updates'] = document['tsa_updates'][:1]
+        del document['booking_spa']
+        backend.save(document)
+
+        assert backend.load() == document
+
+    def test_latest_tsa_update_query(self, backend):
+        """Test the indexed TSA lookup"""
+        backend.save(_document())
+
+        latest = backend.latest_tsa_update('JAX', '2025-11-07T00:00:00')
+
+        assert latest['wait_minutes'] == 25
+        assert backend.latest_tsa_update('JAX', '2025-11-07T09:00:00') is None
+        assert backend.latest_tsa_update('PNS', '2025-11-01T00:00:00') is None
+
+    def test_proposal_lookup(self, backend):
+        """Test the primary-key proposal read and the base class fallback"""
+        document = _document()
+        backend.save(document)
+
+        assert backend.get_proposal('meal_proposals', 'sat_lunch')['status'] == 'confirmed'
+        assert backend.get_proposal('meal_proposals', 'sun_brunch') is None
+        assert StorageBackend().get_proposal('meal_proposals', 'sat_lunch', document) == \
+            backend.get_proposal('meal_proposals', 'sat_lunch')
+
+    def test_meal_proposal_read_goes_to_backend(self, backend, monkeypatch):
+        """Test that data_operations reads proposals through the configured backend"""
+        import data_operations
+        backend.save(_document())
+        monkeypatch.setattr(data_operations, 'get_storage_backend', lambda: backend)
+        monkeypatch.setattr(data_operations, 'get_trip_data', lambda: {})
+
+        assert data_operations.get_meal_proposal('fri_dinner')['status'] == 'proposed'
+        assert data_operations.get_activity_proposal('sun_afternoon') is None
+
+    def test_default_scan_matches_indexed_query(self, backend):
+        """Test that the base class scan returns the same TSA update"""
+        document = _document()
+        backend.save(document)
+
+        scanned = StorageBackend().latest_tsa_update('JAX', '2025-11-07T00:00:00', document)
+
+        assert scanned == backend.latest_tsa_update('JAX', '2025-11-07T00:00:00')
+
+    def test_save_trip_data_compacts_for_sqlite(self, backend, monkeypatch):
+        """Test that the journal is folded in before a SQLite save"""
+        monkeypatch.setattr(github_storage, 'get_storage_backend', lambda: backend)
+        snapshot = TripDataSnapshot()
+        monkeypatch.setattr(github_storage, '_get_shared_snapshot', lambda: snapshot)
+
+        github_storage.record_trip_operation('add_note', date='2025-11-09', content='Dinner')
+        assert github_storage.save_trip_data("Add note") is True
+
+        assert snapshot.journal == []
+        assert backend.load()['notes'][-1]['content'] == 'Dinner'
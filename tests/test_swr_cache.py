@@ -0,0 +1,223 @@
+"""
+Tests for the stale-while-revalidate cache - fresh hits, stale serving with
+background refresh, staleness cap, fallback handling, freshness labels
+"""
+
+import threading
+
+import pytest
+
+from utils.swr_cache import SWRCache, stale_while_revalidate, format_freshness
+
+from tests.helpers import FakeClock
+
+
+class QueuedExecutor:
+    """Holds background refreshes until the test runs them"""
+
+    def __init__(self):
+        self.queued = []
+
+    def submit(self, func):
+        self.queued.append(func)
+
+    def run_all(self):
+        while self.queued:
+            self.queued.pop(0)()
+
+
+@pytest.fixture
+def upstream():
+    """Upstream stub returning scripted values and counting calls"""
+    calls = []
+    results = []
+
+    def fetch(*args):
+        calls.append(args)
+        result = results.pop(0) if results else {'status': 'OK', 'n': len(calls)}
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return fetch, calls, results
+
+
+def _cache(fetch, clock, executor, accept=None):
+    return SWRCache(fetch, ttl=60, max_stale=600, accept=accept, clock=clock, executor=executor)
+
+
+class TestServing:
+    """Test when callers wait and when they get cached values"""
+
+    def test_first_call_blocks_then_hits(self, upstream):
+        """Test that a cold cache fetches once and then serves from memory"""
+        fetch, calls, _ = upstream
+        cache = _cache(fetch, FakeClock(1_000_000.0), QueuedExecutor())
+
+        assert cache()['n'] == 1
+        assert cache()['n'] == 1
+        assert len(calls) == 1
+
+    def test_stale_value_served_while_refreshing(self, upstream):
+        """Test that an expired value is returned at once and refreshed in the background"""
+        fetch, calls, _ = upstream
+        clock, executor = FakeClock(1_000_000.0), QueuedExecutor()
+        cache = _cache(fetch, clock, executor)
+        cache()
+
+        clock.now += 61
+        assert cache()['n'] == 1  # Stale, but no waiting
+        assert cache()['n'] == 1
+        assert len(executor.queued) == 1  # Only one refresh scheduled
+
+        executor.run_all()
+        assert cache()['n'] == 2
+
+    def test_staleness_cap_blocks(self, upstream):
+        """Test that a value past max_stale isn't served"""
+        fetch, calls, _ = upstream
+        clock, executor = FakeClock(1_000_000.0), QueuedExecutor()
+        cache = _cache(fetch, clock, executor)
+        cache()
+
+        clock.now += 601
+        assert cache()['n'] == 2
+        assert executor.queued == []
+
+    def test_arguments_cached_separately(self, upstream):
+        """Test that each argument combination has its own entry"""
+        fetch, calls, _ = upstream
+        cache = _cache(fetch, FakeClock(1_000_000.0), QueuedExecutor())
+
+        cache('JAX', 'Ritz')
+        cache('Ritz', 'JAX')
+        cache('JAX', 'Ritz')
+
+        assert calls == [('JAX', 'Ritz'), ('Ritz', 'JAX')]
+
+    def test_concurrent_cold_loads_share_one_call(self):
+        """Test that sessions arriving together on a cold cache make one upstream call"""
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'status': 'OK'}
+
+        cache = _cache(fetch, FakeClock(1_000_000.0), QueuedExecutor())
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache())) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        threading.Timer(0.2, release.set).start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert results == [{'status': 'OK'}] * 3
+
+    def test_refresh_forces_fetch(self, upstream):
+        """Test that refresh() replaces a fresh value right away (prefetching)"""
+        fetch, calls, _ = upstream
+        cache = _cache(fetch, FakeClock(1_000_000.0), QueuedExecutor())
+        cache('AA5590', '2025-11-12')
+
+        assert cache.refresh('AA5590', '2025-11-12')['n'] == 2
+        assert cache('AA5590', '2025-11-12')['n'] == 2
+        assert len(calls) == 2
+
+
+class TestFailures:
+    """Test that a failing upstream doesn't replace good data"""
+
+    def test_fallback_keeps_last_good_value(self, upstream):
+        """Test that a rejected refresh result keeps the good value"""
+        fetch, calls, results = upstream
+        clock, executor = FakeClock(1_000_000.0), QueuedExecutor()
+        cache = _cache(fetch, clock, executor, accept=lambda r: r['status'] == 'OK')
+        cache()
+
+        results.append({'status': 'FALLBACK'})
+        clock.now += 61
+        cache()
+        executor.run_all()
+
+        assert cache()['status'] == 'OK'
+        assert cache.freshness()['last_error'] == "fallback data"
+        assert executor.queued == []  # Next retry waits another ttl
+
+    def test_exception_keeps_last_good_value(self, upstream):
+        """Test that a refresh that raises keeps the good value"""
+        fetch, calls, results = upstream
+        clock, executor = FakeClock(1_000_000.0), QueuedExecutor()
+        cache = _cache(fetch, clock, executor)
+        cache()
+
+        results.append(RuntimeError("timeout"))
+        clock.now += 61
+        cache()
+        executor.run_all()
+
+        assert cache()['n'] == 1
+        assert cache.freshness()['last_error'] == "timeout"
+
+    def test_fallback_served_when_nothing_better(self, upstream):
+        """Test that fallback data is returned (and labelled) on a cold cache"""
+        fetch, calls, results = upstream
+        cache = _cache(fetch, FakeClock(1_000_000.0), QueuedExecutor(), accept=lambda r: r['status'] == 'OK')
+        results.append({'status': 'FALLBACK'})
+
+        assert cache()['status'] == 'FALLBACK'
+        assert cache.freshness()['fallback'] is True
+
+    def test_cold_exception_propagates(self, upstream):
+        """Test that an error with nothing cached reaches the caller"""
+        fetch, calls, results = upstream
+        cache = _cache(fetch, FakeClock(1_000_000.0), QueuedExecutor())
+        results.append(RuntimeError("down"))
+
+        with pytest.raises(RuntimeError):
+            cache()
+
+
+class TestFreshness:
+    """Test freshness metadata and labels"""
+
+    def test_freshness_metadata(self, upstream):
+        """Test age, staleness and refreshing flags"""
+        fetch, _, _ = upstream
+        clock, executor = FakeClock(1_000_000.0), QueuedExecutor()
+        cache = _cache(fetch, clock, executor)
+
+        assert cache.freshness() is None
+        cache()
+        clock.now += 240
+        cache()
+
+        info = cache.freshness()
+        assert info['age_seconds'] == 240
+        assert info['stale'] is True
+        assert info['refreshing'] is True
+
+    def test_labels(self):
+        """Test the human-readable labels"""
+        assert format_freshness(None) == "not loaded yet"
+        assert format_freshness({'age_seconds': 20}) == "updated just now"
+        assert format_freshness({'age_seconds': 4 * 60 + 10}) == "updated 4 min ago"
+        assert format_freshness({'age_seconds': 7300, 'refreshing': True}) == "updated 2 h ago • refreshing"
+        assert format_freshness({'age_seconds': 30, 'fallback': True}) == "updated just now • sample data"
+
+    def test_decorator(self):
+        """Test that the decorator keeps the function's name and adds helpers"""
+        @stale_while_revalidate(ttl=10)
+        def get_tide_data():
+            """Tides"""
+            return {'2025-11-08': []}
+
+        assert get_tide_data.__name__ == 'get_tide_data'
+        assert get_tide_data.max_stale == 40
+        assert get_tide_data() == {'2025-11-08': []}
+        assert get_tide_data.freshness()['stale'] is False
@@ -0,0 +1,105 @@
+"""
+Tests for the tide series - NOAA prediction parsing, vectorized water
+level lookups, low-tide windows across many gaps, synthesized curves
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from utils.tide_series import TideSeries, format_window
+
+DAY = datetime(2025, 11, 9)
+# Fallback-style events: low 1:45 AM, high 8:00 AM, low 2:15 PM, high 8:30 PM
+EVENTS = [
+    (DAY.replace(hour=1, minute=45), 0.3),
+    (DAY.replace(hour=8), 6.7),
+    (DAY.replace(hour=14, minute=15), 0.1),
+    (DAY.replace(hour=20, minute=30), 7.0),
+]
+
+
+@pytest.fixture
+def series():
+    """Series synthesized from one day of high/low events"""
+    return TideSeries.from_events(EVENTS)
+
+
+class TestLevels:
+    """Test water level lookups"""
+
+    def test_levels_at_events(self, series):
+        """Test that the curve passes through each high and low"""
+        levels = series.levels_at([t for t, _ in EVENTS])
+        assert levels == pytest.approx([h for _, h in EVENTS], abs=0.01)
+
+    def test_level_between_events(self, series):
+        """Test the cosine shape - halfway between low and high is mid-tide"""
+        midpoint = DAY.replace(hour=4, minute=52, second=30)
+        assert series.level_at(midpoint) == pytest.approx(3.5, abs=0.1)
+        assert series.is_rising(midpoint) is True
+        assert series.is_rising(DAY.replace(hour=11)) is False
+
+    def test_outside_series(self, series):
+        """Test that times outside the series have no level"""
+        assert series.level_at(DAY - timedelta(hours=1)) is None
+        assert np.isnan(series.levels_at([DAY + timedelta(days=1)])[0])
+
+    def test_from_noaa_predictions(self):
+        """Test parsing NOAA's 6-minute records"""
+        predictions = [{'t': f"2025-11-09 00:{m:02d}", 'v': str(1.0 + m / 60)} for m in range(0, 60, 6)]
+        series = TideSeries.from_predictions(predictions)
+
+        assert len(series) == 10
+        assert series.start == DAY
+        assert series.level_at(DAY.replace(minute=9)) == pytest.approx(1.15, abs=0.01)
+
+
+class TestLowTideWindows:
+    """Test low-water window queries"""
+
+    def test_window_around_low_tide(self, series):
+        """Test that the afternoon low gives one window centered on it"""
+        [windows] = series.low_tide_windows([(DAY.replace(hour=9), DAY.replace(hour=20))])
+
+        assert len(windows) == 1
+        window = windows[0]
+        assert window['start'] < DAY.replace(hour=14, minute=15) < window['end']
+        assert window['lowest_ft'] == pytest.approx(0.1, abs=0.01)
+        assert window['lowest_at'] == DAY.replace(hour=14, minute=15)
+
+    def test_many_gaps_in_one_call(self, series):
+        """Test one query for several gaps, clipped to each gap"""
+        gaps = [
+            (DAY.replace(hour=0), DAY.replace(hour=3)),  # Early low
+            (DAY.replace(hour=7), DAY.replace(hour=10)),  # High tide - nothing
+            (DAY.replace(hour=14), DAY.replace(hour=14, minute=20)),  # Too short
+            (DAY.replace(hour=13), DAY.replace(hour=15)),  # Gap inside the low stretch
+        ]
+        early, morning, short, afternoon = series.low_tide_windows(gaps)
+
+        assert len(early) == 1
+        assert morning == [] and short == []
+        assert (afternoon[0]['start'], afternoon[0]['end']) == gaps[3]
+
+    def test_threshold(self, series):
+        """Test that a lower threshold gives a shorter window"""
+        gap = [(DAY.replace(hour=9), DAY.replace(hour=20))]
+        wide = series.low_tide_windows(gap, max_height=2.0)[0][0]
+        narrow = series.low_tide_windows(gap, max_height=0.5)[0][0]
+
+        assert wide['start'] < narrow['start'] and narrow['end'] < wide['end']
+
+    def test_from_daily_tides_and_format(self):
+        """Test building from get_tide_data()'s daily events and the display text"""
+        daily = {'2025-11-09': {
+            'high': [{'time': '8:00 AM', 'time_24hr': '08:00', 'height': 6.7},
+                     {'time': '8:30 PM', 'time_24hr': '20:30', 'height': 7.0}],
+            'low': [{'time': '2:15 PM', 'time_24hr': '14:15', 'height': 0.1}]
+        }, 'series': None}
+        series = TideSeries.from_daily_tides(daily)
+        [[window]] = series.low_tide_windows([(DAY.replace(hour=8), DAY.replace(hour=20))])
+
+        assert format_window(window).endswith('(0.1 ft)')
+        assert 'PM-' in format_window(window)
@@ -0,0 +1,108 @@
+"""
+Tests for the shared time/duration parser - formats, ranges, batch
+parsing, memoization, and parity between every caller's wrapper
+"""
+
+import numpy as np
+import pytest
+
+from utils import time_parsing
+from utils.exports import _parse_duration as exports_hours
+from utils.schedule_checker import _parse_duration_to_hours as checker_hours
+from utils.smart_timing import _parse_duration as timing_minutes
+from utils.time_parsing import format_clock, parse_clock, parse_clocks, parse_duration, parse_durations
+
+
+class TestParseClock:
+    """Test schedule time parsing"""
+
+    @pytest.mark.parametrize('text, minutes', [
+        ('10:00 AM', 600), (' 2:30 PM', 870), ('12:15 AM', 15), ('12:00 PM', 720), ('14:30', 870),
+        ('10am', 600), ('9 p.m.', 1260), ('TBD', None), ('25:00', None), ('13:00 PM', None), (None, None)
+    ])
+    def test_clock(self, text, minutes):
+        """Test 12-hour, 24-hour, compact and missing times"""
+        assert parse_clock(text) == minutes
+
+    def test_format_clock(self):
+        """Test minutes back to a display time"""
+        assert format_clock(870) == '02:30 PM'
+        assert format_clock(25 * 60) == '01:00 AM'
+        assert parse_clock(format_clock(615)) == 615
+
+
+class TestParseDuration:
+    """Test duration parsing"""
+
+    @pytest.mark.parametrize('text, minutes', [
+        ('2 hours', 120), ('1.5 hours', 90), ('90 minutes', 90), ('45min', 45), ('30 mins', 30),
+        ('2h 10m', 130), ('2h', 120), ('1 hr 30 min', 90), ('3', 180)
+    ])
+    def test_single_values(self, text, minutes):
+        """Test hours, minutes, combined and bare-number durations"""
+        assert parse_duration(text) == minutes
+
+    @pytest.mark.parametrize('text, minutes', [
+        ('2-3 hours', 150), ('1-1.5 hours', 75), ('30-45 minutes', 37), ('45min-1 hour', 52),
+        ('2 to 3 hours', 150), ('1h-1h 30m', 75)
+    ])
+    def test_ranges(self, text, minutes):
+        """Test that ranges average, the low end borrowing the high end's unit"""
+        assert parse_duration(text) == minutes
+
+    @pytest.mark.parametrize('value, minutes', [
+        ('All day', 480), ('Full day tour', 480), ('Half day', 240), ('Flexible', 60), (45, 45), (1.5, 1),
+        ('N/A', None), ('', None), ('invalid', None), (None, None), (float('nan'), None)
+    ])
+    def test_special_values(self, value, minutes):
+        """Test day-length words, numeric minutes and missing durations"""
+        assert parse_duration(value) == minutes
+
+    def test_memoized(self):
+        """Test that a repeated string is served from the cache"""
+        parse_duration('7 hours 7 minutes')
+        hits = time_parsing.cache_info()['duration']['hits']
+        assert parse_duration('  7 Hours 7 Minutes ') == 427
+        assert time_parsing.cache_info()['duration']['hits'] == hits + 1
+
+
+class TestBatchParsing:
+    """Test the column entry points"""
+
+    def test_durations_column(self):
+        """Test a column with repeats, numbers and missing values"""
+        column = ['2 hours', '45min-1 hour', None, '2 hours', 90, 'TBD']
+        result = parse_durations(column)
+
+        assert result.dtype == float
+        assert result[[0, 1, 3, 4]].tolist() == [120, 52, 120, 90]
+        assert np.isnan(result[2]) and np.isnan(result[5])
+        assert parse_durations(column, default=60)[2] == 60
+
+    def test_clocks_column(self):
+        """Test times with a default for unparsable entries"""
+        result = parse_clocks(['10:00 AM', 'TBD', '14:30', '10:00 AM'], default=-1)
+        assert result.tolist() == [600, -1, 870, 600]
+
+    def test_matches_single_parser(self):
+        """Test that batch and single parsing agree"""
+        column = ['1.5 hours', '2h 10m', 'All day', '30-45 minutes', 'Flexible']
+        assert parse_durations(column).tolist() == [parse_duration(v) for v in column]
+
+
+class TestParity:
+    """Test that every module's duration helper agrees"""
+
+    @pytest.mark.parametrize('text', ['2h 10m', '45min-1 hour', '2-3 hours', '90 minutes', '1.5 hours', 'All day'])
+    def test_wrappers_agree(self, text):
+        """Test the exports, schedule checker and smart timing helpers on the same input"""
+        minutes = parse_duration(text)
+        assert exports_hours(text) == pytest.approx(minutes / 60)
+        assert checker_hours(text) == pytest.approx(minutes / 60)
+        assert timing_minutes(text) == minutes
+
+    def test_wrapper_defaults(self):
+        """Test that each helper keeps its own default for missing durations"""
+        assert exports_hours('') == 2.0
+        assert checker_hours(None) == 2.0
+        assert timing_minutes('TBD') == 60
@@ -0,0 +1,129 @@
+"""
+Tests for the offline travel-time estimator - haversine distances,
+band factors, calibration from Google responses and persistence
+"""
+
+import math
+import time
+
+import numpy as np
+import pytest
+
+from utils.travel_estimator import (
+    TravelTimeEstimator, haversine_miles, coordinates, DEFAULT_FACTORS, OVERHEAD_MINUTES
+)
+
+HOTEL = {'name': 'The Ritz-Carlton, Amelia Island', 'lat': 30.6074, 'lon': -81.4493}
+AIRPORT = {'name': 'Jacksonville International Airport (JAX)', 'lat': 30.4941, 'lon': -81.6879}
+FORT_CLINCH = {'name': 'Fort Clinch State Park', 'lat': 30.7003, 'lon': -81.4365}
+
+
+class TestHaversine:
+    """Test straight-line distances"""
+
+    def test_known_distance(self):
+        """Test hotel -> airport against a reference value (~16 miles)"""
+        miles = haversine_miles(HOTEL['lat'], HOTEL['lon'], AIRPORT['lat'], AIRPORT['lon'])
+        assert 15.5 < miles < 16.5
+
+    def test_vectorized(self):
+        """Test that arrays give the same answers as scalars"""
+        lats = np.array([AIRPORT['lat'], FORT_CLINCH['lat']])
+        lons = np.array([AIRPORT['lon'], FORT_CLINCH['lon']])
+
+        miles = haversine_miles(HOTEL['lat'], HOTEL['lon'], lats, lons)
+
+        assert miles[1] == pytest.approx(haversine_miles(HOTEL['lat'], HOTEL['lon'], FORT_CLINCH['lat'], FORT_CLINCH['lon']))
+
+    def test_coordinates(self):
+        """Test reading coordinates from dicts and "lat,lon" strings"""
+        assert coordinates(HOTEL) == (30.6074, -81.4493)
+        assert coordinates('30.6074,-81.4493') == (30.6074, -81.4493)
+        assert coordinates({'name': 'Le Clos'}) is None
+        assert coordinates('Le Clos, Amelia Island, FL') is None
+
+
+class TestEstimates:
+    """Test drive-time estimates"""
+
+    def test_default_airport_estimate(self):
+        """Test that the uncalibrated airport drive is in a sensible range"""
+        estimate = TravelTimeEstimator().estimate(HOTEL, AIRPORT)
+
+        assert 30 <= estimate['minutes'] <= 50
+        assert estimate['miles'] > 16
+
+    def test_same_place_is_zero(self):
+        """Test that a location to itself takes no time"""
+        assert TravelTimeEstimator().estimate(HOTEL, HOTEL) == {'minutes': 0, 'miles': 0.0}
+
+    def test_missing_coordinates(self):
+        """Test that places without coordinates can't be estimated"""
+        assert TravelTimeEstimator().estimate(HOTEL, {'name': 'Le Clos'}) is None
+
+    def test_matrix_matches_pairs(self):
+        """Test that the vectorized matrix agrees with single-pair estimates"""
+        estimator = TravelTimeEstimator()
+        places = [HOTEL, AIRPORT, FORT_CLINCH]
+        points = [(p['lat'], p['lon']) for p in places]
+
+        minutes, miles = estimator.estimate_matrix(points, points)
+
+        assert minutes.shape == (3, 3)
+        for i, origin in enumerate(places):
+            for j, destination in enumerate(places):
+                assert estimator.estimate(origin, destination)['minutes'] == math.ceil(minutes[i, j])
+
+    def test_pair_queries_are_fast(self):
+        """Test that a pair estimate takes microseconds"""
+        estimator = TravelTimeEstimator()
+        start = time.perf_counter()
+        for _ in range(1000):
+            estimator.estimate(HOTEL, AIRPORT)
+
+        assert (time.perf_counter() - start) / 1000 < 100e-6
+
+
+class TestCalibration:
+    """Test learning factors from Google responses"""
+
+    def test_observations_move_factors(self):
+        """Test that slower real drives raise the estimate"""
+        estimator = TravelTimeEstimator()
+        before = estimator.estimate(HOTEL, AIRPORT)['minutes']
+
+        for _ in range(20):
+            estimator.observe(HOTEL, AIRPORT, road_meters=48_000, duration_seconds=3000)
+
+        after = estimator.estimate(HOTEL, AIRPORT)['minutes']
+        assert after > before
+        assert abs(after - (50 + OVERHEAD_MINUTES)) <= 4
+
+    def test_defaults_without_observations(self):
+        """Test that the band factors start at the defaults"""
+        estimator = TravelTimeEstimator()
+
+        assert estimator.circuity.tolist() == pytest.approx([c for c, _ in DEFAULT_FACTORS])
+        assert estimator.speed_mph.tolist() == pytest.approx([s for _, s in DEFAULT_FACTORS])
+
+    def test_rejects_unusable_samples(self):
+        """Test that samples without coordinates or distance are ignored"""
+        estimator = TravelTimeEstimator()
+
+        assert estimator.observe({'name': 'Le Clos'}, AIRPORT, 1000, 60) is False
+        assert estimator.observe(HOTEL, HOTEL, 1000, 60) is False
+        assert estimator.observe(HOTEL, AIRPORT, 0, 60) is False
+        assert sum(estimator.samples) == 0
+
+    def test_calibration_persists(self, tmp_path):
+        """Test that learned factors survive a restart"""
+        path = str(tmp_path / 'calibration.json')
+        estimator = TravelTimeEstimator(path)
+        for _ in range(10):
+            estimator.observe('30.6074,-81.4493', '30.4941,-81.6879', 48_000, 3000)
+        estimator.save()
+
+        reloaded = TravelTimeEstimator(path)
+
+        assert reloaded.samples == estimator.samples
+        assert reloaded.estimate(HOTEL, AIRPORT) == estimator.estimate(HOTEL, AIRPORT)
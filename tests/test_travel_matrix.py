@@ -0,0 +1,282 @@
+"""
+Tests for the travel-time matrix - location collection, departure
+buckets, batched Distance Matrix calls and cached lookups
+"""
+
+import threading
+
+import pytest
+
+from utils import travel_matrix
+from utils.travel_estimator import TravelTimeEstimator
+from utils.travel_matrix import (
+    TravelTimeMatrix, collect_trip_locations, departure_bucket, _plan_chunks, location_key
+)
+
+from tests.helpers import FakeResponse
+
+HOTEL = {'name': 'The Ritz-Carlton, Amelia Island', 'address': '4750 Amelia Island Parkway', 'lat': 30.6074, 'lon': -81.4493}
+AIRPORT = {'name': 'Jacksonville International Airport (JAX)', 'address': '2400 Yankee Clipper Dr', 'lat': 30.4941, 'lon': -81.6879}
+
+
+@pytest.fixture(autouse=True)
+def estimator(monkeypatch):
+    """Calibrate a throwaway estimator instead of the saved one"""
+    fresh = TravelTimeEstimator()
+    monkeypatch.setattr(travel_matrix, 'get_estimator', lambda: fresh)
+    return fresh
+
+
+@pytest.fixture
+def google(monkeypatch):
+    """Answer Distance Matrix calls locally (10 min, 12 min in traffic) and record them"""
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        origins = params['origins'].split('|')
+        destinations = params['destinations'].split('|')
+        calls.append({'origins': origins, 'destinations': destinations, 'departure_time': params['departure_time']})
+        return FakeResponse(payload={
+            'status': 'OK',
+            'rows': [
+                {'elements': [
+                    {'status': 'OK', 'distance': {'text': '1 mi', 'value': 1600},
+                     'duration': {'text': '10 mins', 'value': 600},
+                     'duration_in_traffic': {'text': '12 mins', 'value': 720}}
+                    for _ in destinations
+                ]}
+                for _ in origins
+            ]
+        })
+
+    monkeypatch.setattr(travel_matrix.http_client, 'get', fake_get)
+    return calls
+
+
+def _matrix(key='test-key'):
+    return TravelTimeMatrix(api_key_getter=lambda: key)
+
+
+def _places(count):
+    return [{'name': f"Place {i}", 'lat': 30.0 + i / 1000, 'lon': -81.0} for i in range(count)]
+
+
+class TestLocations:
+    """Test collecting distinct trip locations"""
+
+    def test_trip_and_catalog_locations(self):
+        """Test that duplicates are dropped and catalog places located by name"""
+        activities = [
+            {'location': AIRPORT},
+            {'location': {'name': 'Fort Clinch', 'lat': 30.70, 'lon': -81.45}},
+            {'location': {'name': 'Fort Clinch', 'lat': 30.70, 'lon': -81.45}},
+            {'location': {'name': 'TBD', 'address': 'N/A'}},
+        ]
+        catalog = {'🍽️ Fine Dining': [{'name': 'Le Clos'}, {'name': 'Burlingame'}]}
+
+        trip, places = collect_trip_locations(activities, catalog, fixed=[HOTEL, AIRPORT])
+
+        assert [location_key(l) for l in trip] == ['30.6074,-81.4493', '30.4941,-81.6879', '30.7,-81.45']
+        assert [p['address'] for p in places] == ['Le Clos, Amelia Island, FL', 'Burlingame, Amelia Island, FL']
+
+
+class TestDepartureBuckets:
+    """Test departure time quantization"""
+
+    def test_now_and_none_share_a_bucket(self):
+        """Test that 'now' and no departure time map to the current bucket"""
+        now = 1_762_500_000
+        assert departure_bucket(None, now=now) == departure_bucket('now', now=now)
+
+    def test_times_in_same_window_share_a_bucket(self):
+        """Test that departures minutes apart use the same cells"""
+        now = 1_762_500_000
+        start = departure_bucket(now + 3600, now=now)
+
+        assert departure_bucket(start + 60, now=now) == start
+        assert departure_bucket(start + 14 * 60, now=now) == start
+        assert departure_bucket(start + 15 * 60, now=now) == start + 15 * 60
+
+    def test_past_times_are_now(self):
+        """Test that a departure in the past is treated as now"""
+        now = 1_762_500_000
+        assert departure_bucket(now - 86400, now=now) == departure_bucket(None, now=now)
+
+
+class TestBatching:
+    """Test how the matrix is split into Distance Matrix calls"""
+
+    def test_chunk_plan_respects_limits(self):
+        """Test that every planned call stays within Google's limits"""
+        for rows, cols in [(1, 130), (25, 25), (25, 1), (7, 3), (30, 130)]:
+            origin_chunk, destination_chunk = _plan_chunks(rows, cols)
+            assert origin_chunk <= 25 and destination_chunk <= 25
+            assert origin_chunk * destination_chunk <= 100
+
+    def test_chunk_plan_is_minimal(self):
+        """Test the call counts for typical shapes"""
+        assert _plan_chunks(25, 1) == (25, 1)  # one column: a single call
+        assert _plan_chunks(25, 25) == (4, 25)  # 7 calls
+        assert _plan_chunks(10, 10) == (10, 10)  # fits in one call
+
+    def test_first_miss_fills_trip_block(self, google):
+        """Test that one miss fetches the whole trip matrix and later pairs hit"""
+        matrix = _matrix()
+        places = _places(10)
+        matrix.add_locations(origins=places)
+
+        first = matrix.lookup(places[0], places[1])
+        for origin in places:
+            for destination in places:
+                assert matrix.lookup(origin, destination) is not None
+
+        assert first['duration_in_traffic']['value'] == 720
+        assert len(google) == 1  # 10 x 10 = 100 elements in one call
+        assert matrix.stats['misses'] == 1
+
+    def test_catalog_destination_fetched_as_one_column(self, google):
+        """Test that a new destination only fetches its own column"""
+        matrix = _matrix()
+        places = _places(5)
+        matrix.add_locations(origins=places, destinations=[{'name': 'Le Clos', 'address': 'Le Clos, Amelia Island, FL'}])
+        matrix.lookup(places[0], places[1])
+        google.clear()
+
+        assert matrix.lookup(places[2], 'Le Clos, Amelia Island, FL') is not None
+
+        assert len(google) == 1
+        assert google[0]['destinations'] == ['Le Clos, Amelia Island, FL']
+        assert len(google[0]['origins']) == 5
+
+    def test_aliases_share_cells(self, google):
+        """Test that an address string resolves to the coordinates key"""
+        matrix = _matrix()
+        matrix.add_locations(origins=[HOTEL, AIRPORT])
+
+        by_dict = matrix.lookup(HOTEL, AIRPORT)
+        by_address = matrix.lookup('4750 Amelia Island Parkway', '2400 Yankee Clipper Dr')
+
+        assert by_dict == by_address
+        assert len(google) == 1
+        assert '30.6074,-81.4493' in google[0]['origins']
+
+    def test_current_bucket_sends_now(self, google):
+        """Test that the current bucket asks Google for live traffic"""
+        matrix = _matrix()
+        matrix.lookup(HOTEL, AIRPORT)
+
+        assert google[0]['departure_time'] == 'now'
+
+    def test_future_bucket_fetched_separately(self, google):
+        """Test that a later departure gets its own cells"""
+        matrix = _matrix()
+        later = departure_bucket() + 2 * 3600
+
+        matrix.lookup(HOTEL, AIRPORT)
+        matrix.lookup(HOTEL, AIRPORT, departure_time=later + 120)
+        matrix.lookup(HOTEL, AIRPORT, departure_time=later + 600)
+
+        assert [c['departure_time'] for c in google] == ['now', later]
+
+    def test_prefetch_fills_everything(self, google):
+        """Test that prefetch covers origins x destinations"""
+        matrix = _matrix()
+        matrix.add_locations(origins=_places(4), destinations=_places(30)[4:])
+
+        assert matrix.prefetch() is True
+        calls = len(google)
+        for destination in _places(30):
+            matrix.lookup(_places(4)[0], destination)
+
+        assert len(google) == calls
+        assert sum(len(c['origins']) * len(c['destinations']) for c in google) == 4 * 30
+
+    def test_no_api_key(self, google):
+        """Test that lookups return None without a key"""
+        assert _matrix(key='').lookup(HOTEL, AIRPORT) is None
+        assert google == []
+
+    def test_failed_fill_not_retried_right_away(self, google, monkeypatch):
+        """Test that a failed call is retried only after the back-off"""
+        clock = [0.0]
+        matrix = TravelTimeMatrix(api_key_getter=lambda: 'test-key', clock=lambda: clock[0])
+        errors = []
+        monkeypatch.setattr(travel_matrix.http_client, 'get',
+                            lambda url, **kwargs: errors.append(url) or FakeResponse(payload={'status': 'OVER_QUERY_LIMIT'}))
+        assert matrix.lookup(HOTEL, AIRPORT) is None
+        assert matrix.lookup(AIRPORT, HOTEL) is None
+        assert len(errors) == 1
+
+        monkeypatch.setattr(travel_matrix.http_client, 'get', lambda url, **kwargs: FakeResponse(payload={
+            'status': 'OK',
+            'rows': [{'elements': [{'status': 'OK', 'distance': {'value': 1}, 'duration': {'value': 60}}] * 2}] * 2
+        }))
+        clock[0] += travel_matrix.FAILED_FILL_RETRY_SECONDS
+        assert matrix.lookup(HOTEL, AIRPORT)['duration']['value'] == 60
+
+    def test_missing_key_not_retried_right_away(self, google):
+        """Test that a missing key also backs off instead of re-planning every miss"""
+        keys = []
+        matrix = TravelTimeMatrix(api_key_getter=lambda: keys.append(1) or '')
+        matrix.lookup(HOTEL, AIRPORT)
+        matrix.lookup(AIRPORT, HOTEL)
+
+        assert len(keys) == 1
+
+    def test_cached_lookups_not_blocked_by_a_fill(self, google, monkeypatch):
+        """Test that hits and peeks are answered while a fill waits on the network"""
+        matrix = _matrix()
+        matrix.lookup(HOTEL, AIRPORT)
+        fake_get = travel_matrix.http_client.get
+        started, release = threading.Event(), threading.Event()
+
+        def slow_get(url, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return fake_get(url, **kwargs)
+
+        monkeypatch.setattr(travel_matrix.http_client, 'get', slow_get)
+        filling = threading.Thread(target=matrix.lookup, args=(HOTEL, _places(1)[0]))
+        filling.start()
+        assert started.wait(timeout=5)
+
+        answered = []
+        reader = threading.Thread(target=lambda: answered.append(
+            (matrix.lookup(HOTEL, AIRPORT), matrix.peek(HOTEL, AIRPORT))))
+        reader.start()
+        reader.join(timeout=2)
+        release.set()
+        filling.join(timeout=5)
+
+        assert answered and all(answered[0])
+        assert matrix.peek(HOTEL, _places(1)[0]) is not None
+
+
+class TestLiveRefinement:
+    """Test the matrix alongside the offline estimator"""
+
+    def test_responses_calibrate_estimator(self, google, estimator):
+        """Test that Google answers between coordinates are learned"""
+        matrix = _matrix()
+        matrix.add_locations(origins=[HOTEL, AIRPORT])
+        matrix.lookup(HOTEL, AIRPORT)
+
+        assert sum(estimator.samples) == 2  # hotel -> airport and back; self-pairs skipped
+
+    def test_peek_never_fetches(self, google):
+        """Test that peek only reads cached cells"""
+        matrix = _matrix()
+
+        assert matrix.peek(HOTEL, AIRPORT) is None
+        assert google == []
+        matrix.lookup(HOTEL, AIRPORT)
+        assert matrix.peek(HOTEL, AIRPORT) is not None
+
+    def test_refresh_async_fills_cell(self, google):
+        """Test that a background refresh makes live traffic available"""
+        matrix = _matrix()
+
+        matrix.refresh_async(HOTEL, AIRPORT)
+        travel_matrix._refresher.submit(lambda: None).result(timeout=5)  # Wait for the queued refresh
+
+        assert matrix.peek(HOTEL, AIRPORT)['duration_in_traffic']['value'] == 720
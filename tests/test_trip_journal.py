@@ -0,0 +1,150 @@
+"""
+Tests for the trip data operation journal - typed operations, replay,
+point-in-time reconstruction
+"""
+
+import pytest
+
+from trip_journal import OPERATIONS, make_operation, apply_operation, replay, collection_for
+
+
+def _snapshot():
+    return {
+        'meal_proposals': {},
+        'notes': [],
+        'packing_progress': {},
+        'alcohol_requests': []
+    }
+
+
+def _journal(*ops):
+    """Build journal entries with sequential seq numbers and fixed timestamps"""
+    journal = []
+    for i, (op_type, args) in enumerate(ops, start=1):
+        entry = make_operation(op_type, i, **args)
+        entry['at'] = f"2025-11-0{i}T12:00:00"
+        journal.append(entry)
+    return journal
+
+
+class TestOperations:
+    """Test journal entries and handlers"""
+
+    def test_make_operation(self):
+        """Test that an entry records type, args, sequence and time"""
+        entry = make_operation('add_note', 7, date='2025-11-08', content='Sunset')
+
+        assert entry['seq'] == 7
+        assert entry['op'] == 'add_note'
+        assert entry['args'] == {'date': '2025-11-08', 'content': 'Sunset'}
+        assert entry['at']
+
+    def test_unknown_operation_rejected(self):
+        """Test that unregistered operation types raise"""
+        with pytest.raises(ValueError):
+            make_operation('drop_everything', 1)
+
+    def test_args_are_copied(self):
+        """Test that later changes to the caller's objects don't alter the entry"""
+        activity = {'id': 'custom_1', 'activity': 'Kayaking'}
+        entry = make_operation('custom_activity_save', 1, activity=activity)
+        activity['activity'] = 'Changed'
+
+        assert entry['args']['activity']['activity'] == 'Kayaking'
+
+    def test_collection_for(self):
+        """Test that operations map to the collection they modify"""
+        assert collection_for('meal_vote', {}) == 'meal_proposals'
+        assert collection_for('booking_update', {'booking_key': 'booking_spa'}) == 'booking_spa'
+
+    def test_every_operation_has_handler(self):
+        """Test that the registry entries are callable"""
+        for op_type, (collection, handler) in OPERATIONS.items():
+            assert callable(handler), op_type
+
+    def test_meal_vote_flow(self):
+        """Test propose -> vote -> finalize"""
+        data = _snapshot()
+        for entry in _journal(
+            ('meal_propose', {'meal_id': 'fri_dinner', 'restaurant_options': [{'name': 'A'}, {'name': 'B'}]}),
+            ('meal_vote', {'meal_id': 'fri_dinner', 'restaurant_choice': 1}),
+            ('meal_finalize', {'meal_id': 'fri_dinner', 'final_choice_index': 1, 'meal_time': '7:00 PM'}),
+        ):
+            apply_operation(data, entry)
+
+        proposal = data['meal_proposals']['fri_dinner']
+        assert proposal['john_vote'] == 1
+        assert proposal['status'] == 'confirmed'
+        assert proposal['meal_time'] == '7:00 PM'
+        assert proposal['updated_at'] == '2025-11-03T12:00:00'
+
+    def test_solo_meal_auto_confirmed(self):
+        """Test that a solo meal proposal is confirmed immediately"""
+        data = _snapshot()
+        apply_operation(data, _journal(
+            ('meal_propose', {'meal_id': 'sat_lunch', 'restaurant_options': [{'name': 'A'}], 'is_solo': True}),
+        )[0])
+
+        assert data['meal_proposals']['sat_lunch']['status'] == 'confirmed'
+        assert data['meal_proposals']['sat_lunch']['final_choice'] == 0
+
+    def test_booking_update_creates_record(self):
+        """Test that a booking update fills in the default record"""
+        data = _snapshot()
+        apply_operation(data, _journal(
+            ('booking_update', {'booking_key': 'booking_spa', 'fields': {'status': 'confirmed'}}),
+        )[0])
+
+        assert data['booking_spa']['status'] == 'confirmed'
+        assert data['booking_spa']['notes'] == ''
+
+
+class TestReplay:
+    """Test rebuilding documents from snapshot + journal"""
+
+    def test_replay_leaves_snapshot_untouched(self):
+        """Test that replay works on a copy"""
+        snapshot = _snapshot()
+        journal = _journal(('add_note', {'date': '2025-11-08', 'content': 'Hi'}))
+
+        data = replay(snapshot, journal)
+
+        assert len(data['notes']) == 1
+        assert snapshot['notes'] == []
+
+    def test_replay_is_deterministic(self):
+        """Test that replaying twice gives identical documents (ids and timestamps)"""
+        journal = _journal(
+            ('add_note', {'date': '2025-11-08', 'content': 'One'}),
+            ('add_note', {'date': '2025-11-08', 'content': 'Two'}),
+            ('delete_note', {'note_id': 1}),
+            ('packing_update', {'item_id': 'sunscreen', 'packed': True}),
+        )
+
+        assert replay(_snapshot(), journal) == replay(_snapshot(), journal)
+        assert [n['content'] for n in replay(_snapshot(), journal)['notes']] == ['Two']
+
+    def test_point_in_time(self):
+        """Test that until= stops at the given timestamp"""
+        journal = _journal(
+            ('alcohol_add', {'item_name': 'Champagne'}),
+            ('alcohol_add', {'item_name': 'Rosé'}),
+            ('alcohol_purchased', {'request_id': 1, 'cost': 40.0}),
+        )
+
+        before_purchase = replay(_snapshot(), journal, until='2025-11-02T12:00:00')
+
+        assert len(before_purchase['alcohol_requests']) == 2
+        assert before_purchase['alcohol_requests'][0]['purchased'] is False
+        assert replay(_snapshot(), journal)['alcohol_requests'][0]['purchased'] is True
+
+    def test_bad_entry_is_skipped(self):
+        """Test that an entry that can't be applied doesn't block the rest"""
+        journal = _journal(
+            ('meal_vote', {'meal_id': 'missing', 'restaurant_choice': 0}),
+            ('add_note', {'date': '2025-11-08', 'content': 'Still here'}),
+        )
+
+        data = replay(_snapshot(), journal)
+
+        assert data['notes'][0]['content'] == 'Still here'
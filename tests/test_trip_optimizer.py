@@ -0,0 +1,172 @@
+"""
+Tests for the whole-trip optimizer - open slots, no repeats, budget,
+preferences, booked overlaps, travel, and planning speed
+"""
+
+import time
+
+from utils.catalog_scoring import CatalogFeatures
+from utils.trip_optimizer import day_slots, plan_trip
+
+DATES = ["2025-11-08", "2025-11-09", "2025-11-10"]
+FORECAST = [{"date": d, "high": 75, "low": 62, "condition": "Sunny", "precipitation": 10} for d in DATES]
+WEATHER = {'forecast': FORECAST}
+
+
+def _restaurant(name, rating, cost="$30-50 per person"):
+    return {"name": name, "description": "Dinner spot", "cost_range": cost, "duration": "1.5-2 hours",
+            "rating": rating}
+
+
+CATALOG = {
+    "🍽️ Fine Dining": [_restaurant("Le Clos", "4.9/5"), _restaurant("Burlingame", "4.8/5"),
+                       _restaurant("Lagniappe", "4.7/5")],
+    "🦞 Seafood & Waterfront": [_restaurant("Brett's", "5.0/5")],
+    "🥞 Breakfast & Brunch": [{"name": "29 South", "cost_range": "$18-35", "duration": "1 hour", "rating": "4.7/5"}],
+    "🏖️ Beach & Water": [
+        {"name": "Kayak Tour", "description": "Marsh paddle", "cost_range": "$65", "duration": "2 hours",
+         "rating": "4.9/5"},
+        {"name": "Beach Walk", "description": "Stroll", "cost_range": "FREE", "duration": "1 hour",
+         "rating": "4.8/5", "is_repeatable": True},
+    ],
+    "🛍️ Shopping & Culture": [
+        {"name": "History Museum", "description": "Local museum", "cost_range": "$10", "duration": "1.5 hours",
+         "rating": "4.7/5"},
+    ],
+    "🍺 Bars & Nightlife": [{"name": "Palace Saloon", "cost_range": "$8", "duration": "1 hour", "rating": "5.0/5"}],
+}
+
+
+# The arrival flight as it is in the trip data: landing at 6:01 PM, "2h 10m"
+ARRIVAL = {'id': 'arr001', 'date': '2025-11-07', 'time': '6:01 PM', 'activity': 'Arrival at Jacksonville',
+           'type': 'transport', 'duration': '2h 10m', 'arrival_time': '6:01 PM'}
+
+
+def _slots(existing=(), kinds=None):
+    return [slot for date in DATES for slot in day_slots(date, [a for a in existing if a['date'] == date], kinds)]
+
+
+def _names(plan, kind=None):
+    return [rec['activity']['name'] for recs in plan.values() for rec in recs
+            if kind is None or rec['type'] == kind]
+
+
+class TestDaySlots:
+    """Test open slot detection"""
+
+    def test_empty_day(self):
+        """Test that an empty day has all five slots"""
+        assert [s['kind'] for s in day_slots('2025-11-08', [])] == ['breakfast', 'morning', 'lunch', 'afternoon', 'dinner']
+
+    def test_filled_and_limited(self):
+        """Test that booked dinners/mornings fill slots and kinds limit them"""
+        day = [{'time': '7:00 PM', 'type': 'dining'}, {'time': '10:30 AM', 'type': 'spa'}, {'time': 'TBD'}]
+        assert [s['kind'] for s in day_slots('2025-11-09', day)] == ['breakfast', 'lunch', 'afternoon']
+        assert [s['kind'] for s in day_slots('2025-11-07', [], kinds=['dinner'])] == ['dinner']
+        assert [s['kind'] for s in day_slots('2025-11-07', [], include_meals=False)] == ['morning', 'afternoon']
+
+    def test_meal_moves_after_arrival(self):
+        """Test that the arrival-day dinner starts after the arrival block ends (8:11 PM)"""
+        [dinner] = day_slots('2025-11-07', [ARRIVAL], kinds=['dinner'], times={'dinner': '8:00 PM'})
+        assert dinner['time'] == '8:30 PM'
+        assert day_slots('2025-11-07', [], kinds=['dinner'], times={'dinner': '8:00 PM'})[0]['time'] == '8:00 PM'
+
+        leaving = dict(ARRIVAL, activity='Leave Hotel for Airport', time='7:30 PM')
+        assert day_slots('2025-11-07', [leaving], kinds=['dinner'], times={'dinner': '8:00 PM'})[0]['time'] == '8:00 PM'
+
+
+class TestPlanTrip:
+    """Test whole-trip planning"""
+
+    def test_no_repeated_dinners(self):
+        """Test that each night gets a different restaurant, best rated first"""
+        plan = plan_trip(CATALOG, _slots(kinds=['dinner']), WEATHER)
+        dinners = [recs[0]['activity']['name'] for recs in plan.values()]
+
+        assert len(set(dinners)) == 3
+        assert dinners[0] == "Brett's"
+
+    def test_repeatable_once_per_day(self):
+        """Test that repeatable amenities can recur on other days, but not the same day"""
+        plan = plan_trip(CATALOG, _slots(kinds=['morning', 'afternoon']), WEATHER)
+
+        assert _names(plan).count('Beach Walk') <= len(DATES)
+        for recs in plan.values():
+            names = [rec['activity']['name'] for rec in recs]
+            assert len(names) == len(set(names))
+        assert _names(plan).count('Kayak Tour') == 1
+
+    def test_preferences_and_categories(self):
+        """Test John's seafood preference and that bars aren't activities"""
+        plan = plan_trip(CATALOG, _slots(), WEATHER, preferences={'avoid_seafood_focused': 'true'})
+
+        assert "Brett's" not in _names(plan)
+        assert 'Palace Saloon' not in _names(plan)
+        assert set(_names(plan, 'dining')) <= {'Le Clos', 'Burlingame', 'Lagniappe', '29 South'}
+
+    def test_daily_budget(self):
+        """Test that no day's picks exceed the budget"""
+        plan = plan_trip(CATALOG, _slots(), WEATHER, preferences={'budget_per_day': 60})
+
+        assert _names(plan)
+        assert 'Kayak Tour' not in _names(plan)  # $65 alone is over budget
+        for recs in plan.values():
+            assert CatalogFeatures([rec['activity'] for rec in recs])['cost'].sum() <= 60
+
+    def test_skips_scheduled_and_booked_overlaps(self):
+        """Test that scheduled items aren't repeated and picks don't overlap bookings"""
+        existing = [{'date': '2025-11-08', 'time': '8:30 AM', 'activity': 'Le Clos', 'duration': '3 hours',
+                     'type': 'spa'}]
+        slots = _slots(existing)
+        plan = plan_trip(CATALOG, slots, WEATHER, existing)
+
+        assert 'Le Clos' not in _names(plan)
+        # Breakfast and morning slots are open but everything would overlap the 8:30-11:30 booking
+        assert {'8:00 AM', '10:00 AM'} <= {s['time'] for s in slots if s['date'] == '2025-11-08'}
+        assert {rec['time'] for rec in plan['2025-11-08']} & {'8:00 AM', '10:00 AM'} == set()
+        assert plan['2025-11-09'][0]['time'] == '8:00 AM'
+
+    def test_arrival_day_dinner(self):
+        """Test that arrival day still gets a dinner that doesn't overlap the arrival"""
+        slots = day_slots('2025-11-07', [ARRIVAL], kinds=['dinner'], times={'dinner': '8:00 PM'})
+        plan = plan_trip(CATALOG, slots, WEATHER, [ARRIVAL])
+
+        [dinner] = plan['2025-11-07']
+        assert dinner['time'] == '8:30 PM'
+        assert dinner['type'] == 'dining'
+
+    def test_travel_penalty(self):
+        """Test that a long drive tips the choice between equal options"""
+        catalog = {"🍽️ Fine Dining": [_restaurant("Far Away", "4.8/5"), _restaurant("Next Door", "4.8/5")]}
+        slots = day_slots('2025-11-08', [], kinds=['dinner'])
+
+        plan = plan_trip(catalog, slots, WEATHER,
+                         travel_minutes=lambda origin, destination: 45 if destination['name'] == 'Far Away' else 5)
+
+        [dinner] = plan['2025-11-08']
+        assert dinner['activity']['name'] == 'Next Door'
+        assert dinner['travel_minutes'] == 5
+
+    def test_large_catalog_under_a_second(self):
+        """Test planning six days of slots over a 160-item catalog"""
+        catalog = {
+            "🍽️ Fine Dining": [_restaurant(f"Restaurant {i}", f"{4 + (i % 10) / 10:.1f}/5") for i in range(40)],
+            "🥞 Breakfast & Brunch": [{"name": f"Cafe {i}", "duration": "1 hour", "cost_range": f"${i + 5}",
+                                       "rating": "4.5/5"} for i in range(10)],
+            "🥖 Delis & Lunch Spots": [{"name": f"Deli {i}", "duration": "45 minutes", "cost_range": "$12",
+                                        "rating": "4.4/5"} for i in range(10)],
+            "🏖️ Beach & Water": [{"name": f"Beach Thing {i}", "description": "beach", "duration": f"{1 + i % 3} hours",
+                                  "cost_range": f"${i}", "rating": f"{4 + (i % 10) / 10:.1f}/5"} for i in range(50)],
+            "🛍️ Shopping & Culture": [{"name": f"Museum {i}", "description": "museum", "duration": "90 minutes",
+                                       "cost_range": "$10", "rating": "4.6/5"} for i in range(50)],
+        }
+        dates = [f"2025-11-{d:02d}" for d in range(7, 13)]
+        forecast = [{"date": d, "high": 75, "low": 62, "condition": "Sunny", "precipitation": 10} for d in dates]
+        slots = [slot for date in dates for slot in day_slots(date, [])]
+
+        started = time.perf_counter()
+        plan = plan_trip(catalog, slots, {'forecast': forecast})
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 1.0
+        assert len(_names(plan)) == len(set(_names(plan))) == len(slots)
@@ -0,0 +1,757 @@
+"""
+Tests for GitHub trip data storage - commit queue, conditional loads,
+sharded layout, single-commit saves, shared copy-on-write snapshot,
+operation journal
+"""
+
+import base64
+import json
+import threading
+
+import pytest
+
+import github_storage
+from github_storage import CommitQueue, TripDataSnapshot, _merge_commit_messages
+
+from tests.helpers import FakeResponse
+
+
+class TestCommitQueue:
+    """Test coalescing of rapid saves into one commit"""
+
+    @pytest.fixture
+    def saved_commits(self, monkeypatch):
+        """Capture commits instead of calling the GitHub API"""
+        commits = []
+
+        def fake_save(data, commit_message="Update trip data"):
+            commits.append((data, commit_message))
+            return True
+
+        monkeypatch.setattr(github_storage, 'save_data_to_github', fake_save)
+        return commits
+
+    def test_enqueue_acknowledges_without_committing(self, saved_commits):
+        """Test that enqueue returns immediately without a GitHub call"""
+        queue = CommitQueue(window_seconds=60)
+
+        assert queue.enqueue({'notes': []}, "Add note") is True
+        assert saved_commits == []
+        assert queue.status()['pending'] is True
+        assert queue.status()['pending_changes'] == 1
+
+        queue.flush()
+
+    def test_flush_pushes_one_commit(self, saved_commits):
+        """Test that several queued saves become a single commit"""
+        queue = CommitQueue(window_seconds=60)
+
+        queue.enqueue({'step': 1}, "Mark interested: Kayaking")
+        queue.enqueue({'step': 2}, "Update packing list")
+        queue.enqueue({'step': 3}, "Add note")
+        assert queue.flush() is True
+
+        assert len(saved_commits) == 1
+        data, message = saved_commits[0]
+        assert data == {'step': 3}
+        assert message.startswith("Batch update (3 changes)")
+        assert "- Update packing list" in message
+        assert queue.status()['pending'] is False
+        assert queue.status()['last_flushed_at'] is not None
+
+    def test_enqueue_copies_data(self, saved_commits):
+        """Test that edits after enqueue don't leak into the queued commit"""
+        queue = CommitQueue(window_seconds=60)
+        data = {'notes': ['first']}
+
+        queue.enqueue(data, "Add note")
+        data['notes'].append('second')
+        queue.flush()
+
+        assert saved_commits[0][0] == {'notes': ['first']}
+
+    def test_flush_with_nothing_pending(self, saved_commits):
+        """Test that flushing an empty queue is a no-op"""
+        queue = CommitQueue(window_seconds=60)
+
+        assert queue.flush() is True
+        assert saved_commits == []
+
+    def test_failed_flush_keeps_changes(self, monkeypatch):
+        """Test that a failed commit is retried on the next flush"""
+        results = [False, True]
+        commits = []
+
+        def flaky_save(data, commit_message="Update trip data"):
+            commits.append(commit_message)
+            return results.pop(0)
+
+        monkeypatch.setattr(github_storage, 'save_data_to_github', flaky_save)
+        queue = CommitQueue(window_seconds=60)
+
+        queue.enqueue({'step': 1}, "Add note")
+        assert queue.flush() is False
+        assert queue.status()['pending'] is True
+        assert queue.status()['last_error']
+
+        assert queue.flush() is True
+        assert commits == ["Add note", "Add note"]
+        assert queue.status()['last_error'] is None
+
+    def test_window_triggers_flush(self, saved_commits):
+        """Test that the background worker pushes once the window elapses"""
+        queue = CommitQueue(window_seconds=0.01)
+
+        queue.enqueue({'step': 1}, "Add note")
+        assert queue.wait_until_idle(timeout=2)
+
+        assert len(saved_commits) == 1
+
+    def test_worker_retries_with_backoff(self, monkeypatch):
+        """Test that a failed push is retried by the worker after the backoff"""
+        results = [False, True]
+        commits = []
+
+        def flaky_save(data, commit_message="Update trip data"):
+            commits.append(commit_message)
+            return results.pop(0)
+
+        monkeypatch.setattr(github_storage, 'save_data_to_github', flaky_save)
+        monkeypatch.setattr(github_storage, 'SAVE_RETRY_BASE_SECONDS', 0.05)
+        queue = CommitQueue(window_seconds=0.01)
+
+        queue.enqueue({'step': 1}, "Add note")
+        assert queue.wait_until_idle(timeout=2)
+
+        assert commits == ["Add note", "Add note"]
+        assert queue.status()['operations'][0]['state'] == 'saved'
+        assert queue.status()['operations'][0]['attempts'] == 2
+
+    def test_worker_failure_recorded_not_shown(self, monkeypatch):
+        """Test that a failed background push lands in the queue status, not st.error"""
+        monkeypatch.setitem(github_storage._github_cache, github_storage._BRANCH_CACHE_KEY,
+                            {'commit': 'abc', 'tree': 'def'})
+        monkeypatch.setattr(github_storage.http_client, 'post', lambda url, **kwargs: FakeResponse(500, text='Server Error'))
+        monkeypatch.setattr(github_storage.st, 'error', lambda *args: pytest.fail("st.error from the worker"))
+        monkeypatch.setattr(github_storage, 'save_data_to_github',
+                            lambda data, message: github_storage._commit_files({'data/notes.json': data}, message))
+        monkeypatch.setattr(github_storage, 'SAVE_RETRY_BASE_SECONDS', 60)
+        queue = CommitQueue(window_seconds=0.01)
+
+        queue.enqueue({'step': 1}, "Add note")
+        for _ in range(200):
+            if queue.status()['last_error']:
+                break
+            threading.Event().wait(0.01)
+
+        assert queue.status()['last_error'] == \
+            "Could not save 1 change(s) to GitHub: Failed to save to GitHub (tree): 500 - Server Error"
+
+    def test_operation_status(self, saved_commits):
+        """Test that each queued save reports its own state"""
+        queue = CommitQueue(window_seconds=60)
+
+        queue.enqueue({'step': 1}, "Add note")
+        queue.enqueue({'step': 2}, "Update packing list")
+        pending = queue.status()['operations']
+        queue.flush()
+        saved = queue.status()['operations']
+
+        assert [op['message'] for op in pending] == ["Update packing list", "Add note"]
+        assert {op['state'] for op in pending} == {'pending'}
+        assert {op['state'] for op in saved} == {'saved'}
+        assert saved[0]['saved_at'] is not None
+
+    def test_retry_now_skips_window(self, saved_commits):
+        """Test that retry_now wakes the worker without blocking the caller"""
+        queue = CommitQueue(window_seconds=60)
+
+        queue.enqueue({'step': 1}, "Add note")
+        queue.retry_now()
+
+        assert queue.wait_until_idle(timeout=2)
+        assert len(saved_commits) == 1
+
+    def test_shutdown_spills_and_recovers(self, monkeypatch, tmp_path):
+        """Test that unsent changes survive a shutdown while GitHub is down"""
+        spill_file = tmp_path / 'pending_saves.json'
+        monkeypatch.setattr(github_storage, 'PENDING_SAVES_FILE', str(spill_file))
+        monkeypatch.setattr(github_storage, 'SAVE_RETRY_BASE_SECONDS', 0.001)
+        monkeypatch.setattr(github_storage, 'save_data_to_github', lambda data, commit_message="": False)
+        queue = CommitQueue(window_seconds=60)
+        queue.enqueue({'notes': ['unsent']}, "Add note")
+
+        assert queue.shutdown() is False
+        assert json.loads(spill_file.read_text())['messages'] == ["Add note"]
+
+        commits = []
+        monkeypatch.setattr(github_storage, 'save_data_to_github',
+                            lambda data, commit_message="": commits.append((data, commit_message)) or True)
+        assert CommitQueue().recover_spilled() is True
+        assert commits == [({'notes': ['unsent']}, "Add note")]
+        assert not spill_file.exists()
+
+
+def _contents_payload(data, sha):
+    """Build a GitHub contents API payload for a JSON document"""
+    encoded = base64.b64encode(json.dumps(data).encode('utf-8')).decode('utf-8')
+    return {'sha': sha, 'content': encoded}
+
+
+class TestConditionalLoad:
+    """Test ETag/SHA caching when downloading a JSON file"""
+
+    PATH = 'data/trip_data/notes.json'
+
+    @pytest.fixture
+    def github(self, monkeypatch):
+        """Pretend a token is configured and record outgoing GET requests"""
+        requests_seen = []
+        responses = []
+
+        def fake_get(url, headers=None, timeout=None, **kwargs):
+            requests_seen.append(dict(headers or {}))
+            return responses.pop(0)
+
+        monkeypatch.setattr(github_storage, 'GITHUB_TOKEN', 'ghp_test_token')
+        monkeypatch.setattr(github_storage.http_client, 'get', fake_get)
+        monkeypatch.setattr(github_storage, '_github_cache', {})
+        return requests_seen, responses
+
+    def test_first_load_has_no_etag(self, github):
+        """Test that a cold cache sends an unconditional GET"""
+        requests_seen, responses = github
+        responses.append(FakeResponse(200, _contents_payload({'notes': []}, 'sha1'), {'ETag': '"e1"'}))
+
+        _, data = github_storage._fetch_json_file(self.PATH)
+
+        assert 'If-None-Match' not in requests_seen[0]
+        assert data == {'notes': []}
+
+    def test_not_modified_reuses_cached_copy(self, github):
+        """Test that a 304 returns the cached document"""
+        requests_seen, responses = github
+        responses.append(FakeResponse(200, _contents_payload({'notes': ['hi']}, 'sha1'), {'ETag': '"e1"'}))
+        responses.append(FakeResponse(304))
+
+        _, first = github_storage._fetch_json_file(self.PATH)
+        _, second = github_storage._fetch_json_file(self.PATH)
+
+        assert requests_seen[1]['If-None-Match'] == '"e1"'
+        assert second == first
+        assert second is not first  # callers get their own copy
+
+    def test_same_sha_skips_parsing(self, github):
+        """Test that an unchanged blob SHA skips base64 decoding"""
+        requests_seen, responses = github
+        responses.append(FakeResponse(200, _contents_payload({'notes': []}, 'sha1'), {'ETag': '"e1"'}))
+        responses.append(FakeResponse(200, {'sha': 'sha1', 'content': 'not base64!'}, {'ETag': '"e2"'}))
+
+        github_storage._fetch_json_file(self.PATH)
+        _, data = github_storage._fetch_json_file(self.PATH)
+
+        assert data == {'notes': []}
+        assert github_storage._github_cache[self.PATH]['etag'] == '"e2"'
+
+    def test_known_sha_needs_no_request(self, github):
+        """Test that a SHA from a directory listing matching the cache skips the GET"""
+        requests_seen, responses = github
+        responses.append(FakeResponse(200, _contents_payload({'notes': []}, 'sha1'), {'ETag': '"e1"'}))
+
+        github_storage._fetch_json_file(self.PATH)
+        _, data = github_storage._fetch_json_file(self.PATH, known_sha='sha1')
+
+        assert len(requests_seen) == 1
+        assert data == {'notes': []}
+
+    def test_changed_file_is_reparsed(self, github):
+        """Test that a new blob SHA is decoded and cached"""
+        requests_seen, responses = github
+        responses.append(FakeResponse(200, _contents_payload({'notes': []}, 'sha1'), {'ETag': '"e1"'}))
+        responses.append(FakeResponse(200, _contents_payload({'notes': ['new']}, 'sha2'), {'ETag': '"e2"'}))
+
+        github_storage._fetch_json_file(self.PATH)
+        _, data = github_storage._fetch_json_file(self.PATH)
+
+        assert data == {'notes': ['new']}
+        assert github_storage._github_cache[self.PATH]['sha'] == 'sha2'
+
+
+class FakeGitHub:
+    """In-memory GitHub repo (contents API reads, Git Data API commits)"""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.posted_trees = []
+        self.trees = {'tree0': {}}
+        self.commits = {'commit0': ('tree0', None)}
+        self.head = 'commit0'
+        self._next_sha = 0
+
+    def _sha(self, prefix):
+        self._next_sha += 1
+        return f"{prefix}{self._next_sha}"
+
+    def _path(self, url):
+        # .../repos/<owner>/<repo>/contents/<path> or .../git/<endpoint>
+        rest = url.split('/repos/', 1)[1].split('/', 2)[2]
+        return rest.split('contents/', 1)[1] if rest.startswith('contents/') else rest
+
+    def write(self, path, data):
+        """Commit a file as another writer would (moves the branch)"""
+        self.files[path] = (data, self._sha('sha'))
+        tree = self._sha('tree')
+        self.trees[tree] = dict(self.files)
+        commit = self._sha('commit')
+        self.commits[commit] = (tree, self.head)
+        self.head = commit
+        return self.files[path][1]
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        path = self._path(url)
+        self.requests.append(('GET', path))
+        if path == 'git/ref/heads/main':
+            return FakeResponse(200, {'object': {'sha': self.head}})
+        if path.startswith('git/commits/'):
+            sha = path.rsplit('/', 1)[1]
+            return FakeResponse(200, {'sha': sha, 'tree': {'sha': self.commits[sha][0]}})
+        if path in self.files:
+            data, sha = self.files[path]
+            return FakeResponse(200, _contents_payload(data, sha))
+        listing = [
+            {'name': name.rsplit('/', 1)[1], 'type': 'file', 'sha': sha}
+            for name, (_, sha) in self.files.items()
+            if name.rsplit('/', 1)[0] == path
+        ]
+        if listing:
+            return FakeResponse(200, listing)
+        return FakeResponse(404, {'message': 'Not Found'})
+
+    def post(self, url, headers=None, json=None, timeout=None, **kwargs):
+        path = self._path(url)
+        self.requests.append(('POST', path))
+        if path == 'git/trees':
+            self.posted_trees.append(json['tree'])
+            tree = dict(self.trees[json['base_tree']])
+            for entry in json['tree']:
+                data = globals()['json'].loads(entry['content'])
+                tree[entry['path']] = (data, github_storage._blob_sha(entry['content']))
+            sha = self._sha('tree')
+            self.trees[sha] = tree
+        else:
+            sha = self._sha('commit')
+            self.commits[sha] = (json['tree'], json['parents'][0])
+        return FakeResponse(201, {'sha': sha})
+
+    def patch(self, url, headers=None, json=None, timeout=None, **kwargs):
+        self.requests.append(('PATCH', self._path(url)))
+        tree, parent = self.commits[json['sha']]
+        if parent != self.head:
+            return FakeResponse(422, {'message': 'Update is not a fast forward'})
+        self.head = json['sha']
+        self.files = dict(self.trees[tree])
+        return FakeResponse(200, {'object': {'sha': self.head}})
+
+    def tree_paths(self):
+        """Paths sent in each tree built for a commit"""
+        return [[entry['path'] for entry in tree] for tree in self.posted_trees]
+
+
+class TestShardedLayout:
+    """Test per-collection shard files, partial saves and legacy migration"""
+
+    @pytest.fixture
+    def remote(self, monkeypatch):
+        """Fake GitHub with a fresh per-path cache"""
+        remote = FakeGitHub()
+        monkeypatch.setattr(github_storage, 'GITHUB_TOKEN', 'ghp_test_token')
+        monkeypatch.setattr(github_storage.http_client, 'get', remote.get)
+        monkeypatch.setattr(github_storage.http_client, 'post', remote.post)
+        monkeypatch.setattr(github_storage.http_client, 'patch', remote.patch)
+        monkeypatch.setattr(github_storage, '_github_cache', {})
+        return remote
+
+    def _write_shards(self, remote, collections):
+        for name, value in collections.items():
+            remote.write(f"data/trip_data/{name}.json",
+                         {'collection': name, 'updated_at': '2025-11-01T10:00:00', 'data': value})
+        remote.write('data/trip_data/manifest.json',
+                     {'schema_version': 1, 'collections': sorted(collections)})
+
+    def test_load_assembles_shards(self, remote):
+        """Test that shards are combined into one trip document"""
+        self._write_shards(remote, {'notes': [{'id': 1}], 'packing_progress': {'sunscreen': True}})
+
+        data = github_storage.load_data_from_github()
+
+        assert data['notes'] == [{'id': 1}]
+        assert data['packing_progress'] == {'sunscreen': True}
+        assert data['last_updated'] == '2025-11-01T10:00:00'
+        assert 'meal_proposals' in data  # defaults filled in
+
+    def test_unchanged_shards_not_refetched(self, remote):
+        """Test that a reload only downloads shards whose SHA changed"""
+        self._write_shards(remote, {'notes': [], 'packing_progress': {}})
+        github_storage.load_data_from_github()
+        remote.write('data/trip_data/notes.json', {'collection': 'notes', 'data': ['new']})
+        remote.requests.clear()
+
+        data = github_storage.load_data_from_github()
+
+        assert data['notes'] == ['new']
+        assert remote.requests == [('GET', 'data/trip_data'), ('GET', 'data/trip_data/notes.json')]
+
+    def test_save_writes_only_changed_shard(self, remote):
+        """Test that a packing change commits just the packing shard"""
+        self._write_shards(remote, {'notes': [{'id': 1}], 'packing_progress': {}})
+        data = github_storage.load_data_from_github()
+        remote.requests.clear()
+
+        data['packing_progress']['sunscreen'] = True
+        assert github_storage.save_data_to_github(data, "Update packing list") is True
+
+        assert remote.tree_paths() == [['data/trip_data/packing_progress.json']]
+        assert remote.files['data/trip_data/packing_progress.json'][0]['data'] == {'sunscreen': True}
+
+    def test_missing_shard_is_not_treated_as_empty(self, remote, monkeypatch):
+        """Test that a failed shard download falls back instead of returning a partial document"""
+        self._write_shards(remote, {'notes': [{'id': 1}], 'packing_progress': {}})
+        queue = CommitQueue(window_seconds=60)
+        monkeypatch.setattr(github_storage, '_commit_queue', queue)
+        shard_get = remote.get
+        monkeypatch.setattr(github_storage.http_client, 'get', lambda url, **kw: (
+            FakeResponse(500, {'message': 'Server Error'}) if url.endswith('/notes.json')
+            else shard_get(url, **kw)))
+
+        data = github_storage.load_data_from_github()
+
+        assert data['notes'] == []
+        assert queue.status()['pending'] is False
+
+    def test_legacy_file_is_migrated(self, remote, monkeypatch):
+        """Test that the single-file layout is split into shards"""
+        queue = CommitQueue(window_seconds=60)
+        monkeypatch.setattr(github_storage, '_commit_queue', queue)
+        remote.write('data/trip_data.json', {'notes': [{'id': 1}], 'packing_progress': {'hat': True}})
+
+        data = github_storage.load_data_from_github()
+        assert data['notes'] == [{'id': 1}]
+        assert queue.flush() is True
+
+        manifest = remote.files['data/trip_data/manifest.json'][0]
+        assert 'notes' in manifest['collections']
+        assert remote.files['data/trip_data/packing_progress.json'][0]['data'] == {'hat': True}
+
+        github_storage._github_cache.clear()
+        assert github_storage.load_data_from_github()['notes'] == [{'id': 1}]
+
+    def test_failed_legacy_load_is_not_migrated(self, remote, monkeypatch):
+        """Test that an auth failure never overwrites remote data with defaults"""
+        queue = CommitQueue(window_seconds=60)
+        monkeypatch.setattr(github_storage, '_commit_queue', queue)
+        monkeypatch.setattr(github_storage.http_client, 'get',
+                            lambda url, **kw: FakeResponse(404 if url.endswith('/trip_data') else 401,
+                                                           {'message': 'Bad credentials'}))
+
+        github_storage.load_data_from_github()
+
+        assert queue.status()['pending'] is False
+
+
+class TestBranchCommits:
+    """Test that a save lands as one Git Data API commit"""
+
+    @pytest.fixture
+    def remote(self, monkeypatch):
+        """Fake GitHub holding a loaded two-collection document"""
+        remote = FakeGitHub()
+        monkeypatch.setattr(github_storage, 'GITHUB_TOKEN', 'ghp_test_token')
+        monkeypatch.setattr(github_storage.http_client, 'get', remote.get)
+        monkeypatch.setattr(github_storage.http_client, 'post', remote.post)
+        monkeypatch.setattr(github_storage.http_client, 'patch', remote.patch)
+        monkeypatch.setattr(github_storage, '_github_cache', {})
+        TestShardedLayout()._write_shards(remote, {'notes': [], 'packing_progress': {}})
+        remote.data = github_storage.load_data_from_github()
+        remote.requests.clear()
+        return remote
+
+    def test_shards_and_manifest_in_one_commit(self, remote):
+        """Test that a new collection and the manifest are committed together"""
+        start = remote.head
+        remote.data['notes'].append({'id': 1})
+        remote.data['weather_alerts'] = ['storm']
+
+        assert github_storage.save_data_to_github(remote.data, "Add note") is True
+
+        assert remote.requests == [('GET', 'git/ref/heads/main'), ('GET', f"git/commits/{start}"),
+                                   ('POST', 'git/trees'), ('POST', 'git/commits'),
+                                   ('PATCH', 'git/refs/heads/main')]
+        assert remote.commits[remote.head][1] == start
+        assert sorted(remote.tree_paths()[0]) == ['data/trip_data/manifest.json',
+                                                 'data/trip_data/notes.json',
+                                                 'data/trip_data/weather_alerts.json']
+        assert 'weather_alerts' in remote.files['data/trip_data/manifest.json'][0]['collections']
+
+    def test_known_head_skips_get(self, remote):
+        """Test that the next save builds on the remembered head"""
+        remote.data['notes'].append({'id': 1})
+        github_storage.save_data_to_github(remote.data, "Add note")
+        remote.requests.clear()
+
+        remote.data['notes'].append({'id': 2})
+        assert github_storage.save_data_to_github(remote.data, "Add note") is True
+
+        assert [method for method, _ in remote.requests] == ['POST', 'POST', 'PATCH']
+
+    def test_moved_branch_rebuilds_commit(self, remote):
+        """Test that a rejected fast-forward is rebuilt on the new head once"""
+        remote.data['notes'].append({'id': 1})
+        github_storage.save_data_to_github(remote.data, "Add note")
+        remote.write('data/trip_data/other.json', {'collection': 'other', 'data': 1})
+        remote.requests.clear()
+
+        remote.data['packing_progress']['hat'] = True
+        assert github_storage.save_data_to_github(remote.data, "Update packing list") is True
+
+        assert [method for method, _ in remote.requests] == \
+            ['POST', 'POST', 'PATCH', 'GET', 'GET', 'POST', 'POST', 'PATCH']
+        assert 'data/trip_data/other.json' in remote.files
+        assert remote.files['data/trip_data/packing_progress.json'][0]['data'] == {'hat': True}
+
+    def test_failed_commit_writes_nothing(self, remote, monkeypatch):
+        """Test that a failure before the ref update leaves every file untouched"""
+        before = dict(remote.files)
+        monkeypatch.setattr(github_storage.http_client, 'post', lambda url, **kwargs: (
+            FakeResponse(500, {'message': 'Server Error'}) if url.endswith('/git/commits')
+            else remote.post(url, **kwargs)))
+        remote.data['notes'].append({'id': 1})
+        remote.data['weather_alerts'] = ['storm']
+
+        assert github_storage.save_data_to_github(remote.data, "Add note") is False
+
+        assert remote.files == before
+        assert github_storage._take_save_failure().startswith("Failed to save to GitHub (commit): 500")
+
+    def test_saved_shards_not_redownloaded(self, remote):
+        """Test that the computed blob SHAs match the listing on the next load"""
+        remote.data['notes'].append({'id': 1})
+        github_storage.save_data_to_github(remote.data, "Add note")
+        remote.requests.clear()
+
+        assert github_storage.load_data_from_github()['notes'] == [{'id': 1}]
+        assert remote.requests == [('GET', 'data/trip_data')]
+
+    def test_blob_sha_matches_git(self):
+        """Test the blob SHA against `git hash-object`"""
+        assert github_storage._blob_sha("hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+class TestSharedSnapshot:
+    """Test the process-wide copy-on-write trip data snapshot"""
+
+    @pytest.fixture
+    def snapshot(self, monkeypatch):
+        """Snapshot backed by a counted in-memory load"""
+        loads = []
+
+        def fake_load():
+            loads.append(1)
+            return {'notes': [{'id': 1}], 'packing_progress': {}, 'meal_proposals': {}}
+
+        monkeypatch.setattr(github_storage, 'load_data_from_github', fake_load)
+        snapshot = TripDataSnapshot()
+        snapshot.loads = loads
+        return snapshot
+
+    def test_loads_once_for_all_readers(self, snapshot):
+        """Test that repeated reads share one load and one dict"""
+        first = snapshot.get()
+        second = snapshot.get()
+
+        assert first is second
+        assert len(snapshot.loads) == 1
+        assert snapshot.version == 1
+
+    def test_edit_publishes_new_version(self, snapshot):
+        """Test that edits leave the previous version untouched"""
+        before = snapshot.get()
+
+        with snapshot.edit('notes') as draft:
+            draft['notes'].append({'id': 2})
+
+        after = snapshot.get()
+        assert after is not before
+        assert len(before['notes']) == 1
+        assert len(after['notes']) == 2
+        assert snapshot.version == 2
+
+    def test_untouched_collections_are_shared(self, snapshot):
+        """Test that only the named collections are copied"""
+        before = snapshot.get()
+
+        with snapshot.edit('notes') as draft:
+            draft['notes'].append({'id': 2})
+
+        assert snapshot.get()['packing_progress'] is before['packing_progress']
+        assert snapshot.get()['notes'] is not before['notes']
+
+    def test_failed_edit_is_discarded(self, snapshot):
+        """Test that an exception inside edit() publishes nothing"""
+        before = snapshot.get()
+
+        with pytest.raises(KeyError):
+            with snapshot.edit('meal_proposals') as draft:
+                draft['meal_proposals']['fri_dinner'] = {'status': 'proposed'}
+                raise KeyError('boom')
+
+        assert snapshot.get() is before
+        assert snapshot.version == 1
+
+    def test_reload_replaces_document(self, snapshot):
+        """Test that reload fetches a fresh copy"""
+        before = snapshot.get()
+        after = snapshot.reload()
+
+        assert after is not before
+        assert len(snapshot.loads) == 2
+
+    def test_reload_skipped_when_flush_fails(self, snapshot, monkeypatch):
+        """Test that unsaved edits aren't replaced by the remote copy"""
+        monkeypatch.setattr(github_storage, '_get_shared_snapshot', lambda: snapshot)
+        monkeypatch.setattr(github_storage, 'flush_pending_saves', lambda: False)
+        snapshot.record('add_note', date='2025-11-08', content='Unsaved')
+
+        assert github_storage.reload_trip_data() is False
+        assert len(snapshot.loads) == 1
+        assert snapshot.get()['notes'][-1]['content'] == 'Unsaved'
+        assert len(snapshot.journal) == 1
+
+        monkeypatch.setattr(github_storage, 'flush_pending_saves', lambda: True)
+        assert github_storage.reload_trip_data() is True
+        assert len(snapshot.loads) == 2
+
+
+class TestJournaledSnapshot:
+    """Test recording operations in the snapshot journal"""
+
+    @pytest.fixture
+    def snapshot(self, monkeypatch):
+        """Snapshot loaded from a stored base + journal"""
+        stored = {
+            'notes': [],
+            'packing_progress': {},
+            'journal': {'base_seq': 4, 'ops': [
+                {'seq': 5, 'op': 'add_note', 'at': '2025-11-01T10:00:00',
+                 'args': {'date': '2025-11-08', 'content': 'Stored'}}
+            ]}
+        }
+        monkeypatch.setattr(github_storage, 'load_data_from_github', lambda: json.loads(json.dumps(stored)))
+        return TripDataSnapshot()
+
+    def test_load_replays_journal(self, snapshot):
+        """Test that loading applies the stored journal to the base"""
+        data = snapshot.get()
+
+        assert data['notes'][0]['content'] == 'Stored'
+        assert 'journal' not in data
+        assert snapshot.base['notes'] == []
+
+    def test_record_appends_without_touching_base(self, snapshot):
+        """Test that a recorded operation only grows the journal"""
+        snapshot.get()
+        base = snapshot.base
+
+        entry = snapshot.record('packing_update', item_id='sunscreen', packed=True)
+
+        assert entry['seq'] == 6
+        assert snapshot.get()['packing_progress']['sunscreen']['packed'] is True
+        assert snapshot.base is base
+        stored = snapshot.stored_document()
+        assert stored['packing_progress'] == {}
+        assert [op['seq'] for op in stored['journal']['ops']] == [5, 6]
+
+    def test_failed_operation_publishes_nothing(self, snapshot):
+        """Test that an operation whose handler fails is not journaled"""
+        before = snapshot.get()
+
+        with pytest.raises(KeyError):
+            snapshot.record('meal_vote', meal_id='missing', restaurant_choice=0)
+
+        assert snapshot.get() is before
+        assert len(snapshot.journal) == 1
+
+    def test_compact_folds_journal(self, snapshot):
+        """Test that compaction moves journaled changes into the base"""
+        snapshot.record('add_note', date='2025-11-09', content='Second')
+
+        snapshot.compact()
+
+        stored = snapshot.stored_document()
+        assert [n['content'] for n in stored['notes']] == ['Stored', 'Second']
+        assert stored['journal'] == {'base_seq': 6, 'ops': []}
+        assert snapshot.record('delete_note', note_id=1)['seq'] == 7
+
+    def test_edit_compacts(self, snapshot):
+        """Test that a free-form edit becomes the new base"""
+        with snapshot.edit('packing_progress') as draft:
+            draft['packing_progress']['hat'] = {'packed': True}
+
+        assert snapshot.journal == []
+        assert snapshot.base['notes'][0]['content'] == 'Stored'
+
+    def test_change_feed_and_point_in_time(self, snapshot):
+        """Test reading changes since a sequence number and past states"""
+        snapshot.get()
+        snapshot.record('add_note', date='2025-11-09', content='Second')
+
+        assert [e['op'] for e in snapshot.changes(since_seq=5)] == ['add_note']
+        assert len(snapshot.as_of('2025-11-01T10:00:00')['notes']) == 1
+        assert len(snapshot.as_of('2025-10-01T00:00:00')['notes']) == 0
+
+    def test_module_helpers_use_shared_snapshot(self, snapshot, monkeypatch):
+        """Test the module-level version, change feed, history and compact helpers"""
+        monkeypatch.setattr(github_storage, '_get_shared_snapshot', lambda: snapshot)
+        github_storage.get_trip_data()
+        version = github_storage.get_trip_data_version()
+
+        github_storage.record_trip_operation('add_note', date='2025-11-09', content='Second')
+
+        assert github_storage.get_trip_data_version() == version + 1
+        assert [e['seq'] for e in github_storage.get_trip_changes(since_seq=5)] == [6]
+        assert len(github_storage.get_trip_data_at('2025-11-01T10:00:00')['notes']) == 1
+
+        github_storage.compact_trip_data()
+        assert github_storage.get_trip_changes() == []
+        assert snapshot.base_seq == 6
+
+    def test_journaled_save_writes_only_journal_shard(self, monkeypatch):
+        """Test that with the sharded layout an operation only rewrites the journal"""
+        remote = FakeGitHub()
+        monkeypatch.setattr(github_storage, 'GITHUB_TOKEN', 'ghp_test_token')
+        monkeypatch.setattr(github_storage.http_client, 'get', remote.get)
+        monkeypatch.setattr(github_storage.http_client, 'post', remote.post)
+        monkeypatch.setattr(github_storage.http_client, 'patch', remote.patch)
+        monkeypatch.setattr(github_storage, '_github_cache', {})
+        TestShardedLayout()._write_shards(remote, {'notes': [], 'packing_progress': {}})
+        snapshot = TripDataSnapshot()
+        snapshot.get()
+        remote.requests.clear()
+
+        snapshot.record('packing_update', item_id='sunscreen', packed=True)
+        assert github_storage.save_data_to_github(snapshot.stored_document(), "Update packing list") is True
+
+        assert remote.tree_paths() == [['data/trip_data/journal.json', 'data/trip_data/manifest.json']]
+
+
+class TestCommitMessages:
+    """Test merging of queued commit messages"""
+
+    def test_single_message_unchanged(self):
+        """Test that a lone message is used as-is"""
+        assert _merge_commit_messages(["Add note"]) == "Add note"
+
+    def test_multiple_messages_listed(self):
+        """Test that several messages become a summary plus bullets"""
+        message = _merge_commit_messages(["Add note", "Delete note: 3"])
+        assert message == "Batch update (2 changes)\n\n- Add note\n- Delete note: 3"
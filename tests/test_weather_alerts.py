@@ -2,7 +2,10 @@
 Tests for weather alert system
 """
 
+from datetime import datetime
+
 import pytest
+from utils.hourly_weather import HourlyWeather
 from utils.weather_alerts import (
     check_weather_alerts,
     _is_outdoor_activity,
@@ -113,6 +116,33 @@ class TestWeatherAlerts:
         assert any(a['type'] == 'heat' for a in alerts)
 
 
+    def test_app_forecast_keys(self):
+        """Test daily entries from get_weather_ultimate (precipitation/wind)"""
+        activities = [{'activity': 'Kayak Tour', 'date': '2025-11-09', 'time': '10:00 AM'}]
+        weather = {'forecast': [{'date': '2025-11-09', 'precipitation': 65, 'wind': 18, 'high': 75, 'low': 60}]}
+
+        alerts = check_weather_alerts(activities, weather)
+
+        assert {a['type'] for a in alerts} == {'rain', 'wind'}
+
+    def test_hourly_conditions_at_activity_time(self):
+        """Test that a morning activity isn't warned about afternoon storms"""
+        day = {'date': '2025-11-09', 'high': 78, 'low': 62, 'condition': 'Sunny', 'precipitation': 10,
+               'humidity': 65, 'wind': 8, 'uv_index': 5.0}
+        hourly = HourlyWeather.from_daily([day])
+        storm = hourly.index(datetime(2025, 11, 9, 15))
+        hourly.values['precip_chance'][storm:storm + 3] = 80
+        weather = {'forecast': hourly.daily(), 'hourly': hourly}
+
+        morning = check_weather_alerts(
+            [{'activity': 'Beach Walk', 'date': '2025-11-09', 'time': '9:00 AM', 'duration': '2 hours'}], weather)
+        afternoon = check_weather_alerts(
+            [{'activity': 'Beach Walk', 'date': '2025-11-09', 'time': '2:00 PM', 'duration': '2 hours'}], weather)
+
+        assert not any(a['type'] == 'rain' for a in morning)
+        assert [a['rain_chance'] for a in afternoon if a['type'] == 'rain'] == [80]
+
+
 class TestActivityClassification:
     """Test activity classification functions"""
 
@@ -149,6 +179,13 @@ class TestActivityClassification:
         # All-day activity
         assert _is_extended_outdoor({'activity': 'Full Day at Beach'})
 
+    def test_extended_outdoor_uses_shared_duration_parser(self):
+        """Test minutes, ranges and all-day durations"""
+        assert not _is_extended_outdoor({'activity': 'Walk', 'duration': '90 min'})
+        assert _is_extended_outdoor({'activity': 'Walk', 'duration': '2-3 hours'})
+        assert _is_extended_outdoor({'activity': 'Walk', 'duration': '2h 10m'})
+        assert _is_extended_outdoor({'activity': 'Walk', 'duration': 'All day'})
+
 
 class TestWeatherBriefing:
     """Test weather briefing generation"""
@@ -0,0 +1,350 @@
+"""
+Trip Journal - Append-only log of typed trip data operations
+
+Every change made through data_operations is recorded as a small operation
+({'seq', 'op', 'args', 'at'}) instead of rewriting whole collections. The
+stored document is a compacted snapshot plus the journal of operations since
+the last compaction; loading replays the journal on top of the snapshot.
+
+Handlers are pure functions of (data, at, **args) so a replay produces the
+same document every time - timestamps come from the operation, never from
+the clock.
+"""
+
+import copy
+from datetime import datetime
+
+# Compact (fold the journal into the snapshot) once this many operations pile up
+JOURNAL_COMPACT_AFTER = 50
+
+# op type -> (collection it modifies, handler). The collection is either a
+# key name or a function of the operation's args (for per-booking keys).
+OPERATIONS = {}
+
+
+def operation(op_type, collection):
+    """Register a handler for an operation type
+
+    Args:
+        op_type (str): Name stored in the journal (e.g. 'meal_vote')
+        collection (str or callable): Top-level key the operation modifies,
+            or a function mapping the operation's args to that key
+    """
+    def register(handler):
+        OPERATIONS[op_type] = (collection, handler)
+        return handler
+    return register
+
+
+def collection_for(op_type, args):
+    """Top-level collection an operation modifies"""
+    collection = OPERATIONS[op_type][0]
+    return collection(args) if callable(collection) else collection
+
+
+def make_operation(op_type, seq, **args):
+    """Build a journal entry
+
+    Args:
+        op_type (str): Registered operation type
+        seq (int): Sequence number (one more than the previous entry)
+        **args: JSON-serializable arguments for the handler
+
+    Returns:
+        dict: Journal entry
+    """
+    if op_type not in OPERATIONS:
+        raise ValueError(f"Unknown trip operation: {op_type}")
+    return {
+        'seq': seq,
+        'op': op_type,
+        'args': copy.deepcopy(args),
+        'at': datetime.now().isoformat()
+    }
+
+
+def apply_operation(data, entry):
+    """Apply one journal entry to a document in place"""
+    _, handler = OPERATIONS[entry['op']]
+    # Copy the args so the document never shares objects with the journal
+    handler(data, entry['at'], **copy.deepcopy(entry['args']))
+
+
+def replay(snapshot, journal, until=None):
+    """Rebuild a document from a snapshot and a journal
+
+    Args:
+        snapshot (dict): Compacted document (not modified)
+        journal (list): Journal entries in sequence order
+        until (str): Optional ISO timestamp - only entries at or before it
+            are applied (point-in-time reconstruction)
+
+    Returns:
+        dict: New document
+    """
+    data = copy.deepcopy(snapshot)
+    for entry in journal:
+        if until is not None and entry['at'] > until:
+            break
+        try:
+            apply_operation(data, entry)
+        except Exception as e:
+            # A bad entry shouldn't make the whole trip unreadable
+            print(f"⚠️ Skipping journal entry {entry.get('seq')} ({entry.get('op')}): {e}")
+    return data
+
+
+def empty_journal():
+    """Journal stored alongside a freshly compacted snapshot"""
+    return {'base_seq': 0, 'ops': []}
+
+
+# ============================================================================
+# MEAL PROPOSALS
+# ============================================================================
+
+@operation('meal_propose', 'meal_proposals')
+def _meal_propose(data, at, meal_id, restaurant_options, submitted_by="Michael", is_solo=False):
+    if is_solo:
+        # For solo meals, auto-confirm the only restaurant selected
+        proposal = {
+            'meal_id': meal_id,
+            'restaurant_options': restaurant_options,
+            'status': 'confirmed',
+            'john_vote': None,
+            'final_choice': 0,
+            'meal_time': None,
+            'submitted_by': submitted_by,
+            'is_solo': True,
+            'created_at': at,
+            'updated_at': at
+        }
+    else:
+        proposal = {
+            'meal_id': meal_id,
+            'restaurant_options': restaurant_options,
+            'status': 'proposed',
+            'john_vote': None,
+            'final_choice': None,
+            'meal_time': None,
+            'submitted_by': submitted_by,
+            'created_at': at,
+            'updated_at': at
+        }
+    data['meal_proposals'][meal_id] = proposal
+
+
+@operation('meal_vote', 'meal_proposals')
+def _meal_vote(data, at, meal_id, restaurant_choice):
+    proposal = data['meal_proposals'][meal_id]
+    proposal['john_vote'] = restaurant_choice
+    proposal['status'] = 'voted'
+    proposal['updated_at'] = at
+
+
+@operation('meal_finalize', 'meal_proposals')
+def _meal_finalize(data, at, meal_id, final_choice_index, meal_time=None):
+    proposal = data['meal_proposals'][meal_id]
+    proposal['final_choice'] = final_choice_index
+    proposal['status'] = 'confirmed'
+    if meal_time:
+        proposal['meal_time'] = meal_time
+    proposal['updated_at'] = at
+
+
+@operation('meal_reset', 'meal_proposals')
+def _meal_reset(data, at, meal_id):
+    data['meal_proposals'][meal_id]['status'] = 'proposed'
+    data['meal_proposals'][meal_id]['final_choice'] = None
+
+
+@operation('meal_delete', 'meal_proposals')
+def _meal_delete(data, at, meal_id):
+    data['meal_proposals'].pop(meal_id, None)
+
+
+# ============================================================================
+# ACTIVITY PROPOSALS
+# ============================================================================
+
+@operation('activity_propose', 'activity_proposals')
+def _activity_propose(data, at, activity_slot_id, activity_options, activity_time=None, date=None,
+                      submitted_by="Michael"):
+    data['activity_proposals'][activity_slot_id] = {
+        'activity_slot_id': activity_slot_id,
+        'activity_options': activity_options,
+        'status': 'proposed',
+        'john_vote': None,
+        'final_choice': None,
+        'activity_time': activity_time,
+        'date': date,
+        'submitted_by': submitted_by,
+        'created_at': at,
+        'updated_at': at
+    }
+
+
+@operation('activity_vote', 'activity_proposals')
+def _activity_vote(data, at, activity_slot_id, activity_choice):
+    proposal = data['activity_proposals'][activity_slot_id]
+    proposal['john_vote'] = activity_choice
+    proposal['status'] = 'voted'
+    proposal['updated_at'] = at
+
+
+@operation('activity_finalize', 'activity_proposals')
+def _activity_finalize(data, at, activity_slot_id, final_choice_index, activity_time=None):
+    proposal = data['activity_proposals'][activity_slot_id]
+    proposal['final_choice'] = final_choice_index
+    proposal['status'] = 'confirmed'
+    if activity_time:
+        proposal['activity_time'] = activity_time
+    proposal['updated_at'] = at
+
+
+@operation('activity_reset', 'activity_proposals')
+def _activity_reset(data, at, activity_slot_id):
+    data['activity_proposals'][activity_slot_id]['status'] = 'proposed'
+    data['activity_proposals'][activity_slot_id]['final_choice'] = None
+
+
+@operation('activity_delete', 'activity_proposals')
+def _activity_delete(data, at, activity_slot_id):
+    data['activity_proposals'].pop(activity_slot_id, None)
+
+
+# ============================================================================
+# PREFERENCES, ALCOHOL, CUSTOM ACTIVITIES
+# ============================================================================
+
+@operation('set_preference', 'john_preferences')
+def _set_preference(data, at, key, value):
+    data.setdefault('john_preferences', {})[key] = value
+
+
+@operation('alcohol_add', 'alcohol_requests')
+def _alcohol_add(data, at, item_name, quantity='', notes=''):
+    data['alcohol_requests'].append({
+        'id': len(data['alcohol_requests']) + 1,
+        'item_name': item_name,
+        'quantity': quantity,
+        'notes': notes,
+        'purchased': False,
+        'cost': 0.0,
+        'created_at': at
+    })
+
+
+@operation('alcohol_delete', 'alcohol_requests')
+def _alcohol_delete(data, at, request_id):
+    data['alcohol_requests'] = [r for r in data['alcohol_requests'] if r['id'] != request_id]
+
+
+@operation('alcohol_purchased', 'alcohol_requests')
+def _alcohol_purchased(data, at, request_id, cost=0.0):
+    for request in data['alcohol_requests']:
+        if request['id'] == request_id:
+            request['purchased'] = True
+            request['cost'] = cost
+
+
+@operation('custom_activity_save', 'custom_activities')
+def _custom_activity_save(data, at, activity):
+    # Remove existing if updating
+    data['custom_activities'] = [a for a in data['custom_activities'] if a['id'] != activity['id']]
+    data['custom_activities'].append(activity)
+
+
+@operation('custom_activity_delete', 'custom_activities')
+def _custom_activity_delete(data, at, activity_id):
+    data['custom_activities'] = [a for a in data['custom_activities'] if a['id'] != activity_id]
+
+
+# ============================================================================
+# COMPLETED / DONE / INTERESTED
+# ============================================================================
+
+@operation('mark_completed', 'completed_activities')
+def _mark_completed(data, at, activity_id):
+    if activity_id not in data['completed_activities']:
+        data['completed_activities'].append(activity_id)
+
+
+@operation('mark_done', 'done_activities')
+def _mark_done(data, at, activity_name):
+    done = data.setdefault('done_activities', [])
+    if activity_name not in done:
+        done.append(activity_name)
+
+
+@operation('unmark_done', 'done_activities')
+def _unmark_done(data, at, activity_name):
+    if activity_name in data.get('done_activities', []):
+        data['done_activities'].remove(activity_name)
+
+
+@operation('mark_interested', 'interested_activities')
+def _mark_interested(data, at, activity_name):
+    interested = data.setdefault('interested_activities', [])
+    if activity_name not in interested:
+        interested.append(activity_name)
+
+
+@operation('unmark_interested', 'interested_activities')
+def _unmark_interested(data, at, activity_name):
+    if activity_name in data.get('interested_activities', []):
+        data['interested_activities'].remove(activity_name)
+
+
+# ============================================================================
+# BOOKINGS
+# ============================================================================
+
+@operation('booking_update', lambda args: args['booking_key'])
+def _booking_update(data, at, booking_key, fields):
+    booking = data.setdefault(booking_key, {
+        'status': 'not_booked',
+        'confirmation_number': None,
+        'booked_date': None,
+        'notes': ''
+    })
+    booking.update(fields)
+
+
+# ============================================================================
+# PACKING, NOTES, TSA
+# ============================================================================
+
+@operation('packing_update', 'packing_progress')
+def _packing_update(data, at, item_id, packed):
+    data['packing_progress'][item_id] = {
+        'packed': packed,
+        'updated_at': at
+    }
+
+
+@operation('add_note', 'notes')
+def _add_note(data, at, date, content, note_type='note'):
+    data['notes'].append({
+        'id': len(data['notes']) + 1,
+        'date': date,
+        'content': content,
+        'type': note_type,
+        'created_at': at
+    })
+
+
+@operation('delete_note', 'notes')
+def _delete_note(data, at, note_id):
+    data['notes'] = [n for n in data['notes'] if n['id'] != note_id]
+
+
+@operation('tsa_update', 'tsa_updates')
+def _tsa_update(data, at, airport_code, wait_minutes, reported_by="User", notes=""):
+    data.setdefault('tsa_updates', []).append({
+        'airport_code': airport_code,
+        'wait_minutes': wait_minutes,
+        'reported_by': reported_by,
+        'notes': notes,
+        'created_at': at
+    })
@@ -0,0 +1,113 @@
+"""
+Activity Model
+Normalized, compact representation of scheduled activities
+
+Schedule data arrives as dicts with display strings ("10:00 AM",
+"1.5 hours", "$25-40"). normalize_activities() parses those once (times
+and durations via utils.time_parsing) into Activity objects carrying
+minute offsets, a trip day index, a type enum, coordinates and a numeric
+cost, so schedule analysis (conflicts, gaps, meals, timelines) compares
+integers instead of re-parsing strings.
+The original dict stays available as `source` for display and saving.
+"""
+
+import re
+from datetime import date, datetime
+from enum import Enum
+from typing import Dict, Iterable, List, Optional
+
+from utils.time_parsing import parse_clock, parse_duration
+
+TRIP_START = date(2025, 11, 7)
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+class ActivityType(Enum):
+    """Activity categories used by the schedule"""
+    TRANSPORT = 'transport'
+    DINING = 'dining'
+    SPA = 'spa'
+    BEACH = 'beach'
+    ACTIVITY = 'activity'
+    OTHER = 'other'
+
+    @classmethod
+    def parse(cls, value) -> 'ActivityType':
+        try:
+            return cls(str(value or '').strip().lower())
+        except ValueError:
+            return cls.OTHER
+
+
+def parse_cost(value) -> float:
+    """Numeric cost from 45, "45.00", "$25-40" (low end) or "Free" (0)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    number = _NUMBER.search(str(value or '').replace(',', ''))
+    return float(number.group()) if number else 0.0
+
+
+class Activity:
+    """One scheduled activity with parsed times
+
+    start/end are minutes after midnight on `date` (end may pass 1440);
+    duration is None when the source has none, in which case end == start.
+    """
+
+    __slots__ = ('id', 'name', 'date', 'day', 'start', 'end', 'duration', 'type', 'lat', 'lon', 'cost', 'source')
+
+    def __init__(self, source: Dict, trip_start: date = TRIP_START):
+        self.source = source
+        self.id = source.get('id', '')
+        self.name = source.get('activity') or source.get('name', '')
+        self.date = source.get('date', '')
+        try:
+            self.day = (datetime.strptime(self.date, '%Y-%m-%d').date() - trip_start).days
+        except (TypeError, ValueError):
+            self.day = None
+        self.start = parse_clock(source.get('time'))
+        self.duration = parse_duration(source.get('duration'))
+        self.end = None if self.start is None else self.start + (self.duration or 0)
+        self.type = ActivityType.parse(source.get('type'))
+        location = source.get('location')
+        location = location if isinstance(location, dict) else {}
+        self.lat = _float_or_none(location.get('lat'))
+        self.lon = _float_or_none(location.get('lon', location.get('lng')))
+        self.cost = parse_cost(source.get('cost', source.get('cost_range', 0)))
+
+    def __repr__(self):
+        return f"Activity({self.name!r}, {self.date} {self.start}-{self.end})"
+
+    @property
+    def is_scheduled(self) -> bool:
+        """Has a date and a clock time"""
+        return self.day is not None and self.start is not None
+
+    def end_with_default(self, default_minutes: int) -> Optional[int]:
+        """End minute, assuming default_minutes when the source has no duration"""
+        if self.start is None:
+            return None
+        return self.start + (self.duration if self.duration is not None else default_minutes)
+
+
+def _float_or_none(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_activities(activities: Iterable[Dict], trip_start: date = TRIP_START) -> List[Activity]:
+    """Parse activities once, sorted by day then start (unscheduled last)
+
+    Args:
+        activities: Activity dicts (already-normalized Activity objects pass through)
+        trip_start: Day 0 of the trip
+
+    Returns:
+        list: Activity objects
+    """
+    normalized = [a if isinstance(a, Activity) else Activity(a, trip_start) for a in activities]
+    return sorted(normalized, key=lambda a: (a.day is None, a.day or 0, a.start is None, a.start or 0))
+
@@ -3,7 +3,7 @@ Google Air Quality and Pollen API Integration
 Provides air quality monitoring and pollen forecasts for outdoor activity planning
 """
 
-import requests
+from utils import http_client
 from typing import Dict, Optional, List
 from datetime import datetime
 import streamlit as st
@@ -49,7 +49,7 @@ def get_air_quality(lat: float, lon: float) -> Optional[Dict]:
     }
 
     try:
-        response = requests.post(url, headers=headers, params=params, json=data, timeout=10)
+        response = http_client.post(url, headers=headers, params=params, json=data, timeout=10, idempotent=True)
 
         if response.status_code == 200:
             return response.json()
@@ -97,7 +97,7 @@ def get_pollen_forecast(lat: float, lon: float, days: int = 5) -> Optional[Dict]
     }
 
     try:
-        response = requests.post(url, headers=headers, params=params, json=data, timeout=10)
+        response = http_client.post(url, headers=headers, params=params, json=data, timeout=10, idempotent=True)
 
         if response.status_code == 200:
             return response.json()
@@ -0,0 +1,259 @@
+"""
+Catalog Scoring
+Scores the whole optional-activities catalog against many time slots at once
+
+CatalogFeatures parses the catalog once into a NumPy feature matrix
+(outdoor/indoor/water/beach flags, duration minutes, cost, rating).
+score_slots() then scores every activity against every slot in one
+vectorized pass: each slot's weather is looked up once per distinct
+activity duration, and the tide check once per slot for beach activities.
+The result keeps the full slots x activities score matrix, with top-k
+picks per slot and their reasons/warnings.
+
+Points (0-100, plus optional per-slot keyword boosts):
+- Weather compatibility (30)
+- Duration fit (25)
+- Cost (10)
+- Rating (10)
+- Low tide for beach activities (bonus 10)
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.hourly_weather import conditions_at
+from utils.time_parsing import parse_durations
+
+OUTDOOR_WORDS = ('beach', 'hiking', 'kayak', 'horse', 'bike', 'walk', 'tour', 'boat')
+INDOOR_WORDS = ('spa', 'museum', 'shopping', 'dining', 'cooking', 'wine')
+WATER_WORDS = ('beach', 'kayak', 'boat', 'paddle', 'jet ski', 'parasail', 'fishing', 'diving', 'surf',
+               'snorkel', 'dolphin', 'pool', 'cruise')
+FREE_WORDS = ('free', 'complimentary')
+
+FEATURES = ('outdoor', 'indoor', 'water', 'beach', 'duration', 'cost', 'rating')
+DEFAULT_DURATION_MINUTES = 60
+UNKNOWN_COST = 20  # "Varies by program" etc.
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+# (date, time, duration minutes) -> (bonus points, reason, warning)
+TideCheck = Callable[[str, str, float], Tuple[int, Optional[str], Optional[str]]]
+
+
+def _cost(cost_str) -> float:
+    """Low end of a cost range in dollars ("FREE" -> 0, unknown -> UNKNOWN_COST)"""
+    text = str(cost_str or '').lower()
+    if any(word in text for word in FREE_WORDS):
+        return 0.0
+    number = _NUMBER.search(text.split('-')[0].replace(',', ''))
+    return float(number.group()) if number else float(UNKNOWN_COST)
+
+
+def _rating(rating_str) -> float:
+    """4.8 from "4.8/5" (NaN if unrated)"""
+    try:
+        return float(str(rating_str).split('/')[0])
+    except ValueError:
+        return np.nan
+
+
+class CatalogFeatures:
+    """Feature matrix for a list of catalog items, one row per item
+
+    Columns are FEATURES; flags are 0/1, duration in minutes, cost in
+    dollars, rating out of 5 (NaN if unrated).
+    """
+
+    def __init__(self, items: Iterable[Dict]):
+        self.items = list(items)
+        self.names = [item.get('name', '').lower() for item in self.items]
+        text = [f"{name} {item.get('description', '').lower()}" for name, item in zip(self.names, self.items)]
+
+        self.matrix = np.column_stack([
+            [any(word in t for word in OUTDOOR_WORDS) for t in text],
+            [any(word in t for word in INDOOR_WORDS) for t in text],
+            [any(word in t for word in WATER_WORDS) for t in text],
+            ['beach' in name or 'beach' in str(item.get('type', '')).lower()
+             for name, item in zip(self.names, self.items)],
+            parse_durations((item.get('duration', '1 hour') for item in self.items),
+                            default=DEFAULT_DURATION_MINUTES),
+            [_cost(item.get('cost_range', '$0')) for item in self.items],
+            [_rating(item.get('rating', '0/5')) for item in self.items],
+        ]).astype(float).reshape(len(self.items), len(FEATURES))
+        self._name_flags = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, feature: str) -> np.ndarray:
+        """One feature column, e.g. features['duration']"""
+        return self.matrix[:, FEATURES.index(feature)]
+
+    def flag(self, feature: str) -> np.ndarray:
+        """A 0/1 column as booleans"""
+        return self[feature] > 0
+
+    def name_has_any(self, words: Sequence[str]) -> np.ndarray:
+        """Items whose name contains any of the words (cached per word list)"""
+        key = tuple(words)
+        if key not in self._name_flags:
+            self._name_flags[key] = np.array([any(word in name for word in key) for name in self.names], dtype=bool)
+        return self._name_flags[key]
+
+
+class SlotScores:
+    """Scores for every slot x item, with what's needed to explain any entry"""
+
+    def __init__(self, features: CatalogFeatures, slots: List[Dict], scores: np.ndarray, weather: Dict,
+                 tide: Dict):
+        self.features = features
+        self.slots = slots
+        self.scores = scores
+        self._weather = weather
+        self._tide = tide
+
+    def explain(self, s: int, i: int) -> Tuple[List[str], List[str]]:
+        """(reasons, warnings) for slot s, item i"""
+        features, item = self.features, self.features.items[i]
+        reasons, warnings = [], []
+        duration_text = item.get('duration', '1 hour')
+
+        if self._weather['known'][s, i]:
+            rain, temp = int(self._weather['rain'][s, i]), int(self._weather['temp'][s, i])
+            condition = self._weather['condition'][s][i]
+            if features.flag('outdoor')[i]:
+                if rain > 70:
+                    warnings.append(f"⚠️ {rain}% rain chance - consider indoor alternative")
+                elif rain < 30 and 'sun' in condition:
+                    reasons.append(f"☀️ Perfect weather ({condition}, {temp}°F)")
+                elif rain < 30:
+                    reasons.append(f"✅ Good weather ({temp}°F, {rain}% rain)")
+            elif features.flag('indoor')[i] and rain > 50:
+                reasons.append("☔ Great indoor choice (rainy day)")
+
+        duration = features['duration'][i]
+        if 60 <= duration <= 180:
+            reasons.append(f"⏱️ Perfect duration ({duration_text})")
+        elif duration > 180:
+            warnings.append(f"⏱️ Long activity ({duration_text}) - plan accordingly")
+
+        if features['cost'][i] == 0:
+            reasons.append("💰 FREE activity!")
+        rating = features['rating'][i]
+        if rating >= 4.7:
+            reasons.append(f"⭐ Highly rated ({rating}/5)")
+
+        _, tide_reason, tide_warning = self._tide.get((s, i), (0, None, None))
+        if tide_reason:
+            reasons.append(tide_reason)
+        if tide_warning:
+            warnings.append(tide_warning)
+        return reasons, warnings
+
+    def top(self, k: int = 3, min_score: Optional[float] = None) -> List[List[Dict]]:
+        """Best k items per slot, highest score first
+
+        Returns:
+            list: One list per slot of {activity, index, score, reasons, warnings}
+        """
+        k = min(k, len(self.features))
+        if not k:
+            return [[] for _ in self.slots]
+        # Stable sort: equal scores keep catalog order (like max())
+        best = np.argsort(-self.scores, axis=1, kind='stable')[:, :k]
+        picks = []
+        for s, candidates in enumerate(best):
+            slot_picks = []
+            for i in candidates:
+                if min_score is not None and self.scores[s, i] <= min_score:
+                    break
+                reasons, warnings = self.explain(s, int(i))
+                slot_picks.append({'activity': self.features.items[i], 'index': int(i),
+                                   'score': int(self.scores[s, i]), 'reasons': reasons, 'warnings': warnings})
+            picks.append(slot_picks)
+        return picks
+
+
+def _slot_weather(weather_data: Optional[Dict], date_str: str, time_str: str,
+                  hours: float) -> Optional[Tuple[float, float, str]]:
+    """(rain %, temp, condition) for a slot - hourly when covered, else the daily forecast"""
+    conditions = conditions_at(weather_data, date_str, time_str, hours)
+    if conditions:
+        return round(conditions['precip_chance']), round(conditions['temp']), conditions['condition'].lower()
+    day = next((f for f in (weather_data or {}).get('forecast', []) if f['date'] == date_str), None)
+    if day:
+        return day.get('precipitation', 0), day.get('high', 75), day.get('condition', '').lower()
+    return None
+
+
+def score_slots(features: CatalogFeatures, slots: List[Dict], weather_data: Optional[Dict],
+                tide_check: Optional[TideCheck] = None) -> SlotScores:
+    """Score every catalog item against every slot
+
+    Args:
+        features: CatalogFeatures for the candidate items
+        slots: [{'date': "2025-11-09", 'time': "10:00 AM",
+                 'boost_words': [...], 'boost': 15}] - boost is added on top
+                 of the capped score for items whose name has a boost word
+        weather_data: get_weather_ultimate() data (hourly and/or daily)
+        tide_check: Called once per slot and beach-item duration
+
+    Returns:
+        SlotScores: scores has shape (len(slots), len(features))
+    """
+    n_slots, n_items = len(slots), len(features)
+    durations, duration_index = np.unique(features['duration'], return_inverse=True)
+    duration_index = duration_index.reshape(-1)
+
+    # Weather once per slot and distinct duration, then spread to the items
+    rain = np.zeros((n_slots, len(durations)))
+    temp = np.zeros((n_slots, len(durations)))
+    known = np.zeros((n_slots, len(durations)), dtype=bool)
+    sunny = np.zeros((n_slots, len(durations)), dtype=bool)
+    conditions = []
+    for s, slot in enumerate(slots):
+        slot_conditions = []
+        for d, minutes in enumerate(durations):
+            found = _slot_weather(weather_data, slot['date'], slot['time'], minutes / 60)
+            if found:
+                rain[s, d], temp[s, d], condition = found
+                known[s, d], sunny[s, d] = True, 'sun' in condition
+            slot_conditions.append(found[2] if found else '')
+        conditions.append([slot_conditions[d] for d in duration_index])
+    rain, temp = rain[:, duration_index], temp[:, duration_index]
+    known, sunny = known[:, duration_index], sunny[:, duration_index]
+
+    outdoor, indoor = features.flag('outdoor'), features.flag('indoor')
+    dry, wet = rain < 30, rain > 70
+    outdoor_points = np.select([wet, dry & sunny, dry], [5, 30, 25], 15)
+    weather_points = np.where(known & outdoor, outdoor_points, np.where(known & indoor, 25, 15))
+
+    duration, cost = features['duration'], features['cost']
+    duration_points = np.select([(duration >= 60) & (duration <= 180), duration < 60], [25, 20], 15)
+    cost_points = np.select([cost == 0, cost < 30, cost < 100], [10, 8, 5], 3)
+    rating_points = np.floor(np.nan_to_num(features['rating']) * 2)
+    item_points = duration_points + cost_points + rating_points
+
+    # Tide bonus for beach items, once per slot and distinct duration
+    tide_points = np.zeros((n_slots, n_items))
+    tide = {}
+    if tide_check is not None:
+        beach_items = np.flatnonzero(features.flag('beach'))
+        for s, slot in enumerate(slots):
+            checked = {}
+            for i in beach_items:
+                minutes = float(duration[i])
+                if minutes not in checked:
+                    checked[minutes] = tide_check(slot['date'], slot['time'], minutes)
+                tide[(s, i)] = checked[minutes]
+                tide_points[s, i] = checked[minutes][0]
+
+    scores = np.minimum(100, weather_points + item_points[None, :] + tide_points)
+    for s, slot in enumerate(slots):
+        if slot.get('boost') and slot.get('boost_words'):
+            scores[s] += slot['boost'] * features.name_has_any(slot['boost_words'])
+
+    weather = {'rain': rain, 'temp': temp, 'known': known, 'condition': conditions}
+    return SlotScores(features, slots, scores, weather, tide)
@@ -8,6 +8,7 @@ Critical for trip when app may not be accessible.
 from icalendar import Calendar, Event, Alarm
 from datetime import datetime, timedelta
 import pytz
+from utils.time_parsing import parse_duration
 
 
 def export_to_ical(activities_data, meal_proposals, filename='trip_schedule.ics'):
@@ -188,39 +189,10 @@ def _parse_duration(duration_str):
         duration_str (str): Duration like "2 hours", "1.5 hours", "2h 10m"
 
     Returns:
-        float: Duration in hours
+        float: Duration in hours (2.0 if there is none)
     """
-    if not duration_str:
-        return 2.0
-
-    duration_str = duration_str.lower()
-
-    # Handle "2 hours", "1.5 hours"
-    if 'hour' in duration_str:
-        try:
-            return float(duration_str.split('hour')[0].strip().split()[0])
-        except:
-            pass
-
-    # Handle "2h 10m"
-    if 'h' in duration_str and 'm' in duration_str:
-        try:
-            parts = duration_str.replace('h', ' ').replace('m', '').split()
-            hours = float(parts[0])
-            minutes = float(parts[1]) if len(parts) > 1 else 0
-            return hours + (minutes / 60)
-        except:
-            pass
-
-    # Handle just "2h"
-    if 'h' in duration_str:
-        try:
-            return float(duration_str.replace('h', '').strip())
-        except:
-            pass
-
-    # Default
-    return 2.0
+    minutes = parse_duration(duration_str)
+    return 2.0 if not minutes else minutes / 60
 
 
 def create_simple_text_schedule(activities_data, meal_proposals):
@@ -1,14 +1,54 @@
 """
 Flight Tracking and On-Time Performance
 Provides real-time flight status and historical performance data
+
+Live status comes from one FlightTracker shared by the whole app. Instead
+of a fixed cache lifetime it polls AviationStack on an interval set by
+the time to departure/arrival and the flight's state - every few hours
+days out, every few minutes around boarding and landing, never once the
+flight is done - and keeps a compact history of status changes per flight.
 """
 
-import requests
+from utils import http_client
+from utils.single_flight import get_single_flight, make_key
 import os
-from typing import Dict, Optional
+import threading
+from collections import deque
+from typing import Dict, List, Optional
 import streamlit as st
 from datetime import datetime, timedelta
 
+FLIGHTS_URL = "http://api.aviationstack.com/v1/flights"
+
+# Poll intervals in minutes
+POLL_DAYS_OUT = 6 * 60  # more than 24 h before departure
+POLL_DAY_BEFORE = 60  # 6-24 h before departure
+POLL_DAY_OF = 15  # 2-6 h before departure
+POLL_BOARDING = 5  # last 2 h before departure, and until it's airborne
+POLL_AIRBORNE = 10
+POLL_APPROACH = 3  # last 30 min before arrival
+POLL_AFTER_LANDING = 10  # gate / baggage updates
+POLL_CANCELLED = 60  # rebooking may change the record
+POLL_ERROR = 5
+LANDED_WATCH_MINUTES = 45  # stop polling this long after landing
+HISTORY_LENGTH = 50  # status changes kept per flight
+
+STATUS_DISPLAY = {
+    'scheduled': ('🕐', 'On Time'),
+    'active': ('✈️', 'In Flight'),
+    'en-route': ('✈️', 'In Flight'),
+    'landed': ('🛬', 'Landed'),
+    'cancelled': ('❌', 'Cancelled'),
+    'delayed': ('⏰', 'Delayed'),
+    'diverted': ('⚠️', 'Diverted'),
+    'incident': ('⚠️', 'Incident')
+}
+
+# Routes for the fallback card when there is no live data
+TRIP_ROUTES = {'AA2434': ('DCA', 'JAX'), 'AA1585': ('DCA', 'JAX')}
+DEFAULT_ROUTE = ('JAX', 'DCA')
+
+
 def get_api_key():
     """Get AviationStack API key from environment or secrets"""
     try:
@@ -16,77 +56,259 @@ def get_api_key():
     except:
         return os.getenv("AVIATIONSTACK_API_KEY", "")
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def get_flight_status(flight_number: str, date: str = None) -> Optional[Dict]:
+
+def normalize_flight_number(flight_number) -> str:
+    """Canonical flight number ("aa 2434" -> "AA2434")"""
+    return str(flight_number).replace(' ', '').upper()
+
+
+def _parse_time(value) -> Optional[datetime]:
+    """AviationStack timestamp -> naive local datetime
+
+    AviationStack reports airport-local times labelled +00:00, so the
+    offset is dropped rather than converted.
     """
-    Get real-time flight status
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _endpoint(raw: Dict, airport: str = '') -> Dict:
+    """Departure/arrival block in the app's format"""
+    raw = raw or {}
+    return {
+        'airport': raw.get('iata') or airport,
+        'name': raw.get('airport') or airport,
+        'scheduled': raw.get('scheduled') or None,
+        'estimated': raw.get('estimated') or None,
+        'actual': raw.get('actual') or None,
+        'gate': raw.get('gate') or 'TBD',
+        'terminal': raw.get('terminal') or 'TBD',
+        'delay': raw.get('delay') or 0
+    }
+
+
+def _flight_record(flight_number: str, date: str, flight: Optional[Dict], live_status: str,
+                   message: str = None) -> Dict:
+    """Build the flight status dict returned by get_flight_status()"""
+    flight = flight or {}
+    route = TRIP_ROUTES.get(flight_number, DEFAULT_ROUTE)
+    state = (flight.get('flight_status') or 'scheduled').lower()
+    emoji, text = STATUS_DISPLAY.get(state, ('🛫', state.title()))
+    record = {
+        'flight_number': (flight.get('flight') or {}).get('iata') or flight_number,
+        'date': date,
+        'flight_status': state,
+        'status_emoji': emoji,
+        'status_text': text,
+        'departure': _endpoint(flight.get('departure'), route[0]),
+        'arrival': _endpoint(flight.get('arrival'), route[1]),
+        'airline': (flight.get('airline') or {}).get('name', 'Unknown'),
+        'aircraft': (flight.get('aircraft') or {}).get('registration', 'Unknown'),
+        'live': flight.get('live') or {},
+        'live_status': live_status
+    }
+    if message:
+        record['message'] = message
+    return record
+
+
+def poll_interval(record: Dict, now: datetime) -> Optional[timedelta]:
+    """How long until a flight should be checked again
 
     Args:
-        flight_number: Flight number (e.g., "AA2434")
-        date: Flight date YYYY-MM-DD (defaults to today)
+        record: Last flight status (get_flight_status() format)
+        now: Current local time
 
     Returns:
-        Flight status data or None
+        timedelta, or None once the flight is finished
     """
-    api_key = get_api_key()
-    if not api_key:
-        return {
-            'status': 'no_api_key',
-            'message': 'Set AVIATIONSTACK_API_KEY for real-time flight tracking',
-            'mock_data': True
-        }
-
-    url = "http://api.aviationstack.com/v1/flights"
-
-    params = {
-        'access_key': api_key,
-        'flight_iata': flight_number,
+    if record.get('live_status') != 'OK':
+        return timedelta(minutes=POLL_ERROR)
+
+    state = record.get('flight_status')
+    departure, arrival = record['departure'], record['arrival']
+    departs = _parse_time(departure.get('estimated') or departure.get('scheduled'))
+    arrives = _parse_time(arrival.get('estimated') or arrival.get('scheduled'))
+
+    if state == 'landed':
+        landed = _parse_time(arrival.get('actual')) or arrives
+        if landed and now - landed > timedelta(minutes=LANDED_WATCH_MINUTES):
+            return None
+        return timedelta(minutes=POLL_AFTER_LANDING)
+    if state == 'cancelled':
+        return timedelta(minutes=POLL_CANCELLED)
+    if state in ('active', 'en-route', 'diverted'):
+        if arrives and arrives - now <= timedelta(minutes=30):
+            return timedelta(minutes=POLL_APPROACH)
+        return timedelta(minutes=POLL_AIRBORNE)
+
+    # Scheduled / delayed: tighten as departure approaches
+    if departs is None:
+        return timedelta(minutes=POLL_DAY_OF)
+    until_departure = departs - now
+    if until_departure > timedelta(hours=24):
+        minutes = POLL_DAYS_OUT
+    elif until_departure > timedelta(hours=6):
+        minutes = POLL_DAY_BEFORE
+    elif until_departure > timedelta(hours=2):
+        minutes = POLL_DAY_OF
+    else:
+        minutes = POLL_BOARDING  # Boarding, pushback, or status lagging takeoff
+    # Never sleep past the point where a tighter interval would apply
+    return min(timedelta(minutes=minutes), max(until_departure - timedelta(hours=2), timedelta(minutes=POLL_BOARDING)))
+
+
+def _history_entry(record: Dict, checked_at: datetime) -> Dict:
+    """Compact snapshot of the fields worth tracking over time"""
+    departure, arrival = record['departure'], record['arrival']
+    return {
+        'at': checked_at.isoformat(timespec='seconds'),
+        'status': record['flight_status'],
+        'dep_gate': departure['gate'],
+        'dep_delay': departure['delay'],
+        'arr_gate': arrival['gate'],
+        'arr_delay': arrival['delay'],
+        'eta': arrival['estimated']
     }
 
-    if date:
-        params['flight_date'] = date
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            flights = data.get('data', [])
-
-            if flights:
-                flight = flights[0]
-                return {
-                    'status': 'success',
-                    'flight_status': flight.get('flight_status', 'unknown'),
-                    'departure': {
-                        'airport': flight.get('departure', {}).get('airport', 'Unknown'),
-                        'iata': flight.get('departure', {}).get('iata', ''),
-                        'scheduled': flight.get('departure', {}).get('scheduled', ''),
-                        'estimated': flight.get('departure', {}).get('estimated', ''),
-                        'actual': flight.get('departure', {}).get('actual', ''),
-                        'delay': flight.get('departure', {}).get('delay', 0),
-                        'terminal': flight.get('departure', {}).get('terminal', ''),
-                        'gate': flight.get('departure', {}).get('gate', '')
-                    },
-                    'arrival': {
-                        'airport': flight.get('arrival', {}).get('airport', 'Unknown'),
-                        'iata': flight.get('arrival', {}).get('iata', ''),
-                        'scheduled': flight.get('arrival', {}).get('scheduled', ''),
-                        'estimated': flight.get('arrival', {}).get('estimated', ''),
-                        'actual': flight.get('arrival', {}).get('actual', ''),
-                        'delay': flight.get('arrival', {}).get('delay', 0),
-                        'terminal': flight.get('arrival', {}).get('terminal', ''),
-                        'gate': flight.get('arrival', {}).get('gate', '')
-                    },
-                    'airline': flight.get('airline', {}).get('name', 'Unknown'),
-                    'aircraft': flight.get('aircraft', {}).get('registration', 'Unknown'),
-                    'live': flight.get('live', {})
+class FlightTracker:
+    """Per-flight status with adaptive polling and change history"""
+
+    def __init__(self, api_key_getter=get_api_key, clock=datetime.now):
+        self._api_key = api_key_getter
+        self._clock = clock
+        self._flights = {}  # (flight number, date) -> state
+        self._lock = threading.Lock()
+        self.stats = {'polls': 0, 'served_cached': 0}
+
+    def _fetch(self, flight_number: str, date: str) -> Dict:
+        """One AviationStack call -> flight record"""
+        api_key = self._api_key()
+        if not api_key:
+            return _flight_record(flight_number, date, None, 'FALLBACK',
+                                  'Set AVIATIONSTACK_API_KEY for live tracking')
+        params = {'access_key': api_key, 'flight_iata': flight_number}
+        if date:
+            params['flight_date'] = date
+        try:
+            resp = http_client.get(FLIGHTS_URL, params=params, timeout=10)
+            if resp.status_code == 200:
+                flights = resp.json().get('data') or []
+                if flights:
+                    return _flight_record(flight_number, date, flights[0], 'OK')
+                return _flight_record(flight_number, date, None, 'NOT_FOUND', 'Flight not found yet')
+            print(f"Flight API returned {resp.status_code}")
+        except Exception as e:
+            print(f"Flight API error: {e}")
+        return _flight_record(flight_number, date, None, 'ERROR', 'Flight tracking unavailable')
+
+    def get(self, flight_number: str, date: str = None) -> Dict:
+        """Current status of a flight, polling AviationStack only when due
+
+        Args:
+            flight_number: e.g. "AA2434"
+            date: Flight date YYYY-MM-DD (optional)
+
+        Returns:
+            Flight status dict (see get_flight_status)
+        """
+        flight_number = normalize_flight_number(flight_number)
+        key = (flight_number, date)
+        now = self._clock()
+        with self._lock:
+            state = self._flights.get(key)
+            if state and (state['next_check_at'] is None or now < state['next_check_at']):
+                self.stats['served_cached'] += 1
+                return state['record']
+
+        record = get_single_flight().do(
+            make_key('flight_status', flight_number, date),
+            lambda: self._poll(key, flight_number, date),
+            label='flight_status'
+        )
+        return record
+
+    def _poll(self, key, flight_number: str, date: str) -> Dict:
+        record = self._fetch(flight_number, date)
+        now = self._clock()
+        with self._lock:
+            self.stats['polls'] += 1
+            state = self._flights.setdefault(key, {'record': None, 'history': deque(maxlen=HISTORY_LENGTH)})
+            previous = state['record']
+            if record['live_status'] != 'OK' and previous and previous['live_status'] == 'OK':
+                # Keep showing the last live status; retry soon
+                state['next_check_at'] = now + timedelta(minutes=POLL_ERROR)
+                return previous
+
+            entry = _history_entry(record, now)
+            last = state['history'][-1] if state['history'] else None
+            if record['live_status'] == 'OK' and (last is None or {**last, 'at': None} != {**entry, 'at': None}):
+                state['history'].append(entry)
+
+            interval = poll_interval(record, now)
+            record['checked_at'] = now.isoformat(timespec='seconds')
+            record['next_check_at'] = (now + interval).isoformat(timespec='seconds') if interval else None
+            state['record'] = record
+            state['next_check_at'] = now + interval if interval else None
+            return record
+
+    def history(self, flight_number: str, date: str = None) -> List[Dict]:
+        """Status changes seen for a flight, oldest first"""
+        with self._lock:
+            state = self._flights.get((normalize_flight_number(flight_number), date))
+            return list(state['history']) if state else []
+
+    def status(self) -> Dict:
+        """Tracked flights for diagnostics
+
+        Returns:
+            dict: flight number -> status, live_status, next check, changes seen
+        """
+        with self._lock:
+            return {
+                number: {
+                    'flight_status': state['record']['flight_status'],
+                    'live_status': state['record']['live_status'],
+                    'next_check_at': state['next_check_at'],
+                    'changes': len(state['history'])
                 }
+                for (number, _), state in self._flights.items()
+            }
 
-        return None
-    except Exception as e:
-        print(f"Flight status error: {e}")
-        return None
+
+_tracker = FlightTracker()
+
+
+def get_flight_tracker() -> FlightTracker:
+    """Get the shared flight tracker"""
+    return _tracker
+
+
+def get_flight_status(flight_number: str, date: str = None) -> Dict:
+    """
+    Get real-time flight status
+
+    Args:
+        flight_number: Flight number (e.g., "AA2434")
+        date: Flight date YYYY-MM-DD (optional)
+
+    Returns:
+        Dict with flight_status, status_emoji/status_text, departure and
+        arrival (airport, scheduled/estimated/actual, gate, terminal, delay),
+        checked_at/next_check_at and live_status - 'OK' for live data,
+        'FALLBACK' without an API key, 'NOT_FOUND' or 'ERROR' otherwise
+    """
+    return _tracker.get(flight_number, date)
+
+
+def get_flight_history(flight_number: str, date: str = None) -> List[Dict]:
+    """Get the status changes seen for a flight (gate, delay, state, ETA)"""
+    return _tracker.history(flight_number, date)
 
 
 def get_historical_performance(airline: str, flight_number: str, route: str) -> Dict:
@@ -219,7 +441,7 @@ def render_flight_status_card(flight_data: Dict):
 
     live_status = get_flight_status(flight_number_full, date)
 
-    if live_status and live_status.get('status') == 'success':
+    if live_status.get('live_status') == 'OK':
         st.markdown("---")
         st.markdown("### 📡 Live Flight Status")
 
@@ -249,7 +471,7 @@ def render_flight_status_card(flight_data: Dict):
         if arr.get('delay'):
             st.warning(f"⏱️ Arrival Delay: {arr['delay']} minutes")
 
-    elif live_status and live_status.get('mock_data'):
+    elif live_status.get('live_status') == 'FALLBACK':
         st.info("ℹ️ Add AVIATIONSTACK_API_KEY to .env for real-time flight tracking")
         st.markdown("[Get free API key at AviationStack →](https://aviationstack.com/)")
 
@@ -3,7 +3,7 @@ Google Geocoding API Integration
 Converts addresses to coordinates and vice versa
 """
 
-import requests
+from utils import http_client
 from typing import Optional, Dict, Tuple
 import streamlit as st
 
@@ -37,7 +37,7 @@ def geocode_address(address: str) -> Optional[Dict]:
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -73,7 +73,7 @@ def reverse_geocode(lat: float, lon: float) -> Optional[Dict]:
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
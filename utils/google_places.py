@@ -3,7 +3,7 @@ Google Places API Integration
 Provides restaurant/activity discovery, place details, and search functionality
 """
 
-import requests
+from utils import http_client
 from typing import List, Dict, Optional
 import streamlit as st
 
@@ -58,7 +58,7 @@ def search_nearby_places(lat: float, lon: float, place_type: str = "restaurant",
         data["minRating"] = min_rating
 
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=10)
+        response = http_client.post(url, headers=headers, json=data, timeout=10, idempotent=True)
 
         if response.status_code == 200:
             return response.json().get('places', [])
@@ -92,7 +92,7 @@ def get_place_details(place_id: str) -> Optional[Dict]:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             return response.json()
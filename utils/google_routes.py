@@ -3,7 +3,7 @@ Google Directions and Route Optimization API Integration
 Provides turn-by-turn directions and optimized multi-stop routing
 """
 
-import requests
+from utils import http_client
 from typing import List, Dict, Optional, Tuple
 import streamlit as st
 
@@ -44,7 +44,7 @@ def get_directions(origin: str, destination: str, mode: str = "driving",
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
 
         if response.status_code == 200:
             return response.json()
@@ -87,7 +87,7 @@ def optimize_waypoints(origin: str, destination: str, waypoints: List[str]) -> O
     }
 
     try:
-        response = requests.get(url, params=params, timeout=15)
+        response = http_client.get(url, params=params, timeout=15)
 
         if response.status_code == 200:
             return response.json()
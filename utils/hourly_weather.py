@@ -0,0 +1,342 @@
+"""
+Hourly Weather Store
+One weather pipeline for the whole app: a single OpenWeather One Call
+request (current, 48 hourly and 8 daily forecasts including UV) - or, for
+keys without One Call access, the current and 3-hour forecast endpoints
+fetched concurrently - turned into one hourly, time-indexed store
+
+HourlyWeather keeps temperature, precipitation chance, wind, UV, humidity
+and conditions in NumPy arrays indexed by hours since its start, so the
+conditions at any activity's actual hour are an O(1) lookup. Hours beyond
+the hourly forecast are filled from the daily forecast with typical daily
+temperature and UV curves.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils import http_client
+
+ONECALL_URL = "https://api.openweathermap.org/data/3.0/onecall"
+CURRENT_URL = "https://api.openweathermap.org/data/2.5/weather"
+FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+
+FIELDS = ('temp', 'feels_like', 'precip_chance', 'wind', 'uv', 'humidity')
+DEFAULT_UV_PEAK = 5.0  # November on Amelia Island, when no UV forecast is available
+ONECALL_RETRY_SECONDS = 6 * 3600  # after a 401/403 (key without One Call access)
+
+# Typical daily curves: temperature from low (6 AM) to high (3 PM); UV
+# follows the sun from 7 AM to 7 PM, peaking early afternoon
+_TEMP_ANCHOR_HOURS = [0, 6, 15, 24]
+_TEMP_ANCHOR_FRACTIONS = [0.3, 0.0, 1.0, 0.3]
+_SUNRISE_HOUR, _SUNSET_HOUR = 7, 19
+
+_onecall_blocked_until = 0.0
+_onecall_lock = threading.Lock()
+
+
+def _hour_floor(when: datetime) -> datetime:
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def _local_time(timestamp: int, offset_seconds: int) -> datetime:
+    """Unix timestamp -> naive local time at the forecast location"""
+    return datetime.fromtimestamp(timestamp + offset_seconds, timezone.utc).replace(tzinfo=None)
+
+
+def _daily_curves(low: float, high: float, uv_peak: float):
+    """Hour-of-day temperature and UV arrays for one day"""
+    hours = np.arange(24)
+    temp = low + (high - low) * np.interp(hours, _TEMP_ANCHOR_HOURS, _TEMP_ANCHOR_FRACTIONS)
+    daylight = np.clip(np.sin(np.pi * (hours - _SUNRISE_HOUR) / (_SUNSET_HOUR - _SUNRISE_HOUR)), 0, None)
+    return temp, uv_peak * daylight
+
+
+class HourlyWeather:
+    """Hourly conditions indexed by hours since `start`"""
+
+    def __init__(self, start: datetime, values: Dict[str, np.ndarray], conditions: List[str]):
+        self.start = _hour_floor(start)
+        self.values = {field: np.asarray(values[field], dtype=float) for field in FIELDS}
+        self.conditions = list(conditions)
+
+    def __len__(self):
+        return len(self.conditions)
+
+    @property
+    def end(self) -> datetime:
+        """First hour after the forecast"""
+        return self.start + timedelta(hours=len(self))
+
+    def index(self, when: datetime) -> Optional[int]:
+        """Array index of the hour containing `when`, or None if outside the forecast"""
+        offset = int((when - self.start).total_seconds() // 3600)
+        return offset if 0 <= offset < len(self) else None
+
+    def at(self, when: datetime) -> Optional[Dict]:
+        """Conditions for the hour containing `when`
+
+        Returns:
+            dict: temp, feels_like, precip_chance (%), wind (mph), uv,
+                  humidity, condition - or None outside the forecast
+        """
+        i = self.index(when)
+        if i is None:
+            return None
+        conditions = {field: round(float(self.values[field][i]), 1) for field in FIELDS}
+        conditions['condition'] = self.conditions[i]
+        return conditions
+
+    def window(self, when: datetime, hours: float = 1) -> Optional[Dict]:
+        """Worst-case conditions over an activity
+
+        Args:
+            when: Activity start
+            hours: Activity length (at least the starting hour is used)
+
+        Returns:
+            dict: temp/feels_like/precip_chance/wind/uv/humidity maxima,
+                  temp_min, and the condition at the start - or None if the
+                  start is outside the forecast
+        """
+        first = self.index(when)
+        if first is None:
+            return None
+        last = min(len(self), first + max(1, int(np.ceil(hours))))
+        conditions = {field: round(float(self.values[field][first:last].max()), 1) for field in FIELDS}
+        conditions['temp_min'] = round(float(self.values['temp'][first:last].min()), 1)
+        conditions['condition'] = self.conditions[first]
+        return conditions
+
+    def daily(self) -> List[Dict]:
+        """Daily summaries in the app's forecast format
+
+        Returns:
+            list: {date, high, low, condition, precipitation, humidity, wind,
+                   uv_index} per calendar day in the store
+        """
+        days = []
+        hour_of = self.start.hour
+        first_date = self.start.date()
+        day_index = (np.arange(len(self)) + hour_of) // 24
+        for day in np.unique(day_index):
+            rows = np.nonzero(day_index == day)[0]
+            date = first_date + timedelta(days=int(day))
+            # Daytime condition describes the day best; fall back to the most common one
+            noon = [i for i in rows if 11 <= (hour_of + i) % 24 <= 15]
+            condition = Counter(self.conditions[i] for i in (noon or rows)).most_common(1)[0][0]
+            days.append({
+                'date': date.strftime('%Y-%m-%d'),
+                'high': round(float(self.values['temp'][rows].max())),
+                'low': round(float(self.values['temp'][rows].min())),
+                'condition': condition,
+                'precipitation': int(round(float(self.values['precip_chance'][rows].max()))),
+                'humidity': int(round(float(self.values['humidity'][rows].mean()))),
+                'wind': round(float(self.values['wind'][rows].max())),
+                'uv_index': round(float(self.values['uv'][rows].max()), 1)
+            })
+        return days
+
+    @classmethod
+    def from_daily(cls, forecast: List[Dict]) -> 'HourlyWeather':
+        """Synthesize hourly values from daily forecasts (sample data)"""
+        hours = len(forecast) * 24
+        values = {field: np.zeros(hours) for field in FIELDS}
+        conditions = []
+        for d, day in enumerate(forecast):
+            temp, uv = _daily_curves(day['low'], day['high'], day.get('uv_index', DEFAULT_UV_PEAK))
+            span = slice(d * 24, (d + 1) * 24)
+            values['temp'][span] = temp
+            values['feels_like'][span] = temp
+            values['uv'][span] = uv
+            values['precip_chance'][span] = day.get('precipitation', 0)
+            values['wind'][span] = day.get('wind', 0)
+            values['humidity'][span] = day.get('humidity', 70)
+            conditions.extend([day.get('condition', 'Clear')] * 24)
+        return cls(datetime.strptime(forecast[0]['date'], '%Y-%m-%d'), values, conditions)
+
+    @classmethod
+    def from_onecall(cls, data: Dict) -> 'HourlyWeather':
+        """Build from a One Call 3.0 response (imperial units)
+
+        The 48 hourly entries are used as-is; the remaining days of the
+        daily forecast are filled with daily temperature/UV curves.
+        """
+        offset = data.get('timezone_offset', 0)
+        hourly = data.get('hourly') or []
+        daily = data.get('daily') or []
+        start = _local_time(hourly[0]['dt'] if hourly else daily[0]['dt'], offset)
+        start = _hour_floor(start)
+        last_day = _local_time(daily[-1]['dt'], offset).date() if daily else start.date()
+        hours = max(len(hourly), int((datetime.combine(last_day, datetime.min.time()) + timedelta(days=1) - start)
+                                      .total_seconds() // 3600))
+
+        values = {field: np.zeros(hours) for field in FIELDS}
+        conditions = [''] * hours
+
+        # Days beyond the hourly forecast first, then the hourly values on top
+        for day in daily:
+            day_start = datetime.combine(_local_time(day['dt'], offset).date(), datetime.min.time())
+            temp, uv = _daily_curves(day['temp']['min'], day['temp']['max'], day.get('uvi', DEFAULT_UV_PEAK))
+            for hour in range(24):
+                i = int((day_start + timedelta(hours=hour) - start).total_seconds() // 3600)
+                if 0 <= i < hours:
+                    values['temp'][i] = values['feels_like'][i] = temp[hour]
+                    values['uv'][i] = uv[hour]
+                    values['precip_chance'][i] = day.get('pop', 0) * 100
+                    values['wind'][i] = day.get('wind_speed', 0)
+                    values['humidity'][i] = day.get('humidity', 70)
+                    conditions[i] = day['weather'][0]['description'].title()
+
+        for entry in hourly:
+            i = int((_local_time(entry['dt'], offset) - start).total_seconds() // 3600)
+            if 0 <= i < hours:
+                values['temp'][i] = entry['temp']
+                values['feels_like'][i] = entry.get('feels_like', entry['temp'])
+                values['precip_chance'][i] = entry.get('pop', 0) * 100
+                values['wind'][i] = entry.get('wind_speed', 0)
+                values['uv'][i] = entry.get('uvi', 0)
+                values['humidity'][i] = entry.get('humidity', 70)
+                conditions[i] = entry['weather'][0]['description'].title()
+        return cls(start, values, conditions)
+
+    @classmethod
+    def from_forecast(cls, data: Dict) -> 'HourlyWeather':
+        """Build from the 2.5 3-hour forecast, interpolated to hours
+
+        This endpoint has no UV forecast, so UV follows the daylight curve
+        with DEFAULT_UV_PEAK.
+        """
+        offset = (data.get('city') or {}).get('timezone', 0)
+        entries = data['list']
+        times = np.array([entry['dt'] for entry in entries], dtype=float)
+        start = _hour_floor(_local_time(entries[0]['dt'], offset))
+        first_ts = entries[0]['dt'] - (_local_time(entries[0]['dt'], offset) - start).total_seconds()
+        hours = int((times[-1] - first_ts) // 3600) + 1
+        hour_ts = first_ts + 3600 * np.arange(hours)
+
+        def series(pick):
+            return np.interp(hour_ts, times, [pick(entry) for entry in entries])
+
+        nearest = np.clip(np.searchsorted(times, hour_ts, side='right') - 1, 0, len(entries) - 1)
+        hour_of_day = (start.hour + np.arange(hours)) % 24
+        _, uv_curve = _daily_curves(0, 0, DEFAULT_UV_PEAK)
+        values = {
+            'temp': series(lambda e: e['main']['temp']),
+            'feels_like': series(lambda e: e['main'].get('feels_like', e['main']['temp'])),
+            'precip_chance': series(lambda e: e.get('pop', 0) * 100),
+            'wind': series(lambda e: e['wind']['speed']),
+            'uv': uv_curve[hour_of_day],
+            'humidity': series(lambda e: e['main']['humidity'])
+        }
+        conditions = [entries[i]['weather'][0]['description'].title() for i in nearest]
+        return cls(start, values, conditions)
+
+
+def _current_from(current: Dict, uv: float) -> Dict:
+    """Current conditions in the app's format (2.5 /weather or One Call 'current')"""
+    main = current.get('main', current)
+    wind = current.get('wind', {}).get('speed', current.get('wind_speed', 0))
+    return {
+        'temperature': round(main['temp']),
+        'feels_like': round(main['feels_like']),
+        'condition': current['weather'][0]['description'].title(),
+        'humidity': main['humidity'],
+        'wind_speed': round(wind),
+        'visibility': round(current.get('visibility', 10000) / 1609.34, 1),
+        'uv_index': round(uv, 1)
+    }
+
+
+def _fetch_onecall(lat: float, lon: float, api_key: str) -> Optional[Dict]:
+    """One request for current, hourly and daily data (None if unavailable)"""
+    global _onecall_blocked_until
+    if time.time() < _onecall_blocked_until:
+        return None
+    resp = http_client.get(ONECALL_URL, params={
+        'lat': lat, 'lon': lon, 'appid': api_key, 'units': 'imperial', 'exclude': 'minutely,alerts'
+    }, timeout=5)
+    if resp.status_code in (401, 403):
+        # Key has no One Call subscription - don't ask again for a while
+        with _onecall_lock:
+            _onecall_blocked_until = time.time() + ONECALL_RETRY_SECONDS
+        return None
+    if resp.status_code != 200:
+        return None
+    data = resp.json()
+    store = HourlyWeather.from_onecall(data)
+    current = data['current']
+    return {
+        'current': _current_from(current, current.get('uvi', DEFAULT_UV_PEAK)),
+        'hourly': store
+    }
+
+
+def _fetch_current_and_forecast(lat: float, lon: float, api_key: str) -> Optional[Dict]:
+    """Current conditions and the 3-hour forecast, requested concurrently"""
+    params = {'lat': lat, 'lon': lon, 'appid': api_key, 'units': 'imperial'}
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='weather') as pool:
+        current_future = pool.submit(http_client.get, CURRENT_URL, params=params, timeout=5)
+        forecast_future = pool.submit(http_client.get, FORECAST_URL, params=params, timeout=5)
+        current_resp, forecast_resp = current_future.result(), forecast_future.result()
+    if current_resp.status_code != 200 or forecast_resp.status_code != 200:
+        return None
+    store = HourlyWeather.from_forecast(forecast_resp.json())
+    now_conditions = store.at(store.start)
+    return {
+        'current': _current_from(current_resp.json(), now_conditions['uv'] if now_conditions else DEFAULT_UV_PEAK),
+        'hourly': store
+    }
+
+
+def fetch_weather(lat: float, lon: float, api_key: str) -> Optional[Dict]:
+    """Fetch the forecast through the cheapest available route
+
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        api_key (str): OpenWeather API key
+
+    Returns:
+        dict: 'current' conditions, 'forecast' (daily summaries), 'hourly'
+              (HourlyWeather) and 'source' - or None if OpenWeather failed
+    """
+    try:
+        weather = _fetch_onecall(lat, lon, api_key) or _fetch_current_and_forecast(lat, lon, api_key)
+    except Exception as e:
+        print(f"⚠️ Weather fetch failed: {e}")
+        return None
+    if weather is None:
+        return None
+    weather['forecast'] = weather['hourly'].daily()[:6]
+    weather['source'] = "OpenWeather API (Real Data)"
+    return weather
+
+
+def conditions_at(weather_data: Dict, date_str: str, time_str: str, hours: float = 1) -> Optional[Dict]:
+    """Conditions over an activity from a get_weather_ultimate() result
+
+    Args:
+        weather_data: Weather dict with an 'hourly' HourlyWeather
+        date_str: "2025-11-09"
+        time_str: "10:00 AM"
+        hours: Activity length
+
+    Returns:
+        HourlyWeather.window() result, or None when there is no hourly
+        data for that time
+    """
+    store = (weather_data or {}).get('hourly')
+    if store is None:
+        return None
+    try:
+        when = datetime.strptime(f"{date_str} {time_str.strip()}", '%Y-%m-%d %I:%M %p')
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return store.window(when, hours)
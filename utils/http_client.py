@@ -0,0 +1,448 @@
+"""
+Shared HTTP Client for External APIs
+One pooled requests.Session for every API module (Google, OpenWeather,
+NOAA, AviationStack, GitHub), with keep-alive, consistent timeouts,
+retries with jittered backoff and per-host latency metrics
+
+GET responses from slow-changing endpoints are also cached on disk
+(requests-cache, SQLite) with per-endpoint lifetimes, so they survive
+restarts and redeploys and are shared by every worker process.
+
+Identical concurrent GETs (several sessions rerunning after a cache expiry)
+are coalesced: one goes upstream and every caller shares its response.
+
+Each host has a circuit breaker: after repeated failures (or very slow
+answers) calls fail fast with CircuitOpenError, so callers use their
+fallback data at once instead of waiting out timeouts; after a cool-down
+one probe request is let through to detect recovery.
+"""
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.single_flight import get_single_flight, make_key
+
+try:
+    import requests_cache
+except ImportError:  # Optional - fall back to an uncached session
+    requests_cache = None
+
+DEFAULT_TIMEOUT = 10  # seconds
+MAX_RETRIES = 2  # retries after the first attempt
+RETRY_BACKOFF_SECONDS = 0.5  # base delay, doubled per retry, plus jitter
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+COALESCED_METHODS = {'GET', 'HEAD'}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# Connection pools - one per host, each keeping this many sockets alive
+POOL_CONNECTIONS = 20
+POOL_MAXSIZE = 10
+
+LATENCY_SAMPLES = 200  # recent latencies kept per host for percentiles
+
+# Circuit breaker (per host)
+BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before the circuit opens
+BREAKER_SLOW_CALL_MS = 8000  # answers slower than this count as failures
+BREAKER_OPEN_SECONDS = 30  # first cool-down; doubles while probes keep failing
+BREAKER_MAX_OPEN_SECONDS = 300
+
+# Persistent response cache (set HTTP_CACHE_ENABLED=false to turn it off)
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() != 'false'
+HTTP_CACHE_PATH = os.getenv('HTTP_CACHE_PATH', 'data/http_cache.sqlite')
+
+# URL prefix -> how long a response stays fresh. Anything not listed
+# (GitHub, flight status, Places, ...) is never cached.
+CACHE_TTLS = {
+    'maps.googleapis.com/maps/api/geocode': timedelta(days=30),
+    'api.tidesandcurrents.noaa.gov': timedelta(hours=6),
+    'api.openweathermap.org': timedelta(minutes=30),
+    'maps.googleapis.com/maps/api/distancematrix': timedelta(minutes=5),
+    'maps.googleapis.com/maps/api/directions': timedelta(minutes=5),
+}
+
+# API keys are left out of cache keys (and out of the cache file)
+CACHE_IGNORED_PARAMETERS = (
+    'key', 'appid', 'access_key', 'api_key', 'apikey', 'access_token',
+    'Authorization', 'X-Goog-Api-Key', 'X-API-Key'
+)
+
+_session = None
+_session_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a host whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe -> closed"""
+
+    def __init__(self, host, clock=time.monotonic):
+        self.host = host
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.open_seconds = BREAKER_OPEN_SECONDS
+        self.open_until = None
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_failure = None
+        self.last_latency_ms = None
+
+    def allow(self):
+        """Whether a call may go to the host now (claims the probe when half-open)"""
+        with self._lock:
+            if self.state == 'open' and self._clock() >= self.open_until:
+                self.state = 'half_open'
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency_ms):
+        """Record an answer from the host (slow answers count as failures)"""
+        if latency_ms > BREAKER_SLOW_CALL_MS:
+            self.record_failure(f"slow response ({latency_ms / 1000:.1f}s)", latency_ms)
+            return
+        with self._lock:
+            self.last_latency_ms = latency_ms
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+            if self.state != 'closed':
+                print(f"✅ {self.host} recovered - circuit closed")
+            self.state = 'closed'
+            self.open_seconds = BREAKER_OPEN_SECONDS
+
+    def record_failure(self, reason, latency_ms=None):
+        """Record a failed call; opens the circuit when the threshold is reached"""
+        with self._lock:
+            self.last_failure = reason
+            if latency_ms is not None:
+                self.last_latency_ms = latency_ms
+            self.consecutive_failures += 1
+            if self.state == 'half_open':
+                # Probe failed - stay open longer
+                self.open_seconds = min(self.open_seconds * 2, BREAKER_MAX_OPEN_SECONDS)
+            elif self.consecutive_failures < BREAKER_FAILURE_THRESHOLD:
+                return
+            self.state = 'open'
+            self.probe_in_flight = False
+            self.open_until = self._clock() + self.open_seconds
+            self.times_opened += 1
+            print(f"🔌 {self.host} circuit open for {self.open_seconds:.0f}s ({reason})")
+
+    def release_probe(self):
+        """Give back a half-open probe that didn't reach the host (e.g. cache hit)"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def snapshot(self):
+        """Current state for diagnostics"""
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = max(0.0, round(self.open_until - self._clock(), 1))
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'retry_in_seconds': retry_in,
+                'last_failure': self.last_failure,
+                'last_latency_ms': round(self.last_latency_ms, 1) if self.last_latency_ms is not None else None
+            }
+
+
+def get_breaker(host):
+    """Get the circuit breaker for a host (created on first use)"""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def create_session(cache_path=None):
+    """Build a pooled session, disk-cached when requests-cache is available
+
+    Args:
+        cache_path (str): SQLite cache file (defaults to HTTP_CACHE_PATH);
+            caching is skipped when HTTP_CACHE_ENABLED is off
+
+    Returns:
+        requests.Session: Session with pooled adapters mounted
+    """
+    cache_path = cache_path or HTTP_CACHE_PATH
+    session = None
+    if HTTP_CACHE_ENABLED and requests_cache is not None:
+        try:
+            if os.path.dirname(cache_path):
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            session = requests_cache.CachedSession(
+                cache_path,
+                backend='sqlite',
+                wal=True,  # Lets several worker processes share the file
+                expire_after=requests_cache.DO_NOT_CACHE,
+                urls_expire_after=CACHE_TTLS,
+                allowable_methods=('GET',),
+                ignored_parameters=CACHE_IGNORED_PARAMETERS
+            )
+        except Exception as e:
+            print(f"⚠️ HTTP cache unavailable ({e}) - continuing without it")
+    if session is None:
+        session = requests.Session()
+
+    # Retries are handled in request() so they can be measured and jittered
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Get the shared pooled session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def clear_http_cache(expired_only=True):
+    """Remove cached responses (only expired ones by default)"""
+    cache = getattr(get_session(), 'cache', None)
+    if cache is None:
+        return
+    if expired_only:
+        cache.delete(expired=True)
+    else:
+        cache.clear()
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry number (1-based)"""
+    return random.uniform(0, RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+
+def _record(host, elapsed_ms, status_code=None, error=False, retried=False, from_cache=False):
+    """Add one call to the host's metrics"""
+    with _metrics_lock:
+        stats = _metrics.setdefault(host, {
+            'calls': 0,
+            'cache_hits': 0,
+            'errors': 0,
+            'retries': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'last_ms': 0.0,
+            'last_status': None,
+            'recent_ms': deque(maxlen=LATENCY_SAMPLES)
+        })
+        stats['calls'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['last_ms'] = elapsed_ms
+        stats['last_status'] = status_code
+        stats['recent_ms'].append(elapsed_ms)
+        if error or (status_code is not None and status_code >= 500):
+            stats['errors'] += 1
+        if retried:
+            stats['retries'] += 1
+        if from_cache:
+            stats['cache_hits'] += 1
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, retries=MAX_RETRIES, idempotent=None, **kwargs):
+    """Send a request through the shared session
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL
+        timeout (float): Seconds per attempt
+        retries (int): Retries after the first attempt on connection errors,
+            timeouts and RETRY_STATUSES responses
+        idempotent (bool): Whether retrying is safe. Defaults to True for
+            GET/HEAD/OPTIONS/PUT/DELETE; pass True for read-only POST queries
+        **kwargs: Passed to requests (params, headers, json, ...)
+
+    Returns:
+        requests.Response: Final response (may be an error status)
+
+    Raises:
+        CircuitOpenError: If the host's circuit is open and nothing is cached
+        requests.RequestException: If every attempt failed to get a response
+    """
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    attempts = 1 + (retries if idempotent else 0)
+    host = urlsplit(url).netloc
+
+    if method in COALESCED_METHODS and not kwargs.get('stream'):
+        # Concurrent identical reads share one upstream call
+        key = make_key(method, url, params=kwargs.get('params'), headers=kwargs.get('headers'))
+        return get_single_flight().do(
+            key, lambda: _send(method, url, host, timeout, attempts, kwargs), label=host)
+    return _send(method, url, host, timeout, attempts, kwargs)
+
+
+def _send(method, url, host, timeout, attempts, kwargs):
+    """Send one logical request (with retries) through the host's breaker"""
+    breaker = get_breaker(host)
+
+    if not breaker.allow():
+        return _serve_while_open(method, url, host, breaker, kwargs)
+
+    settled = False  # Whether the breaker has been told how the call went
+    try:
+        for attempt in range(1, attempts + 1):
+            start = time.perf_counter()
+            try:
+                response = get_session().request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                _record(host, elapsed_ms, error=True, retried=attempt > 1)
+                if attempt == attempts:
+                    breaker.record_failure(type(e).__name__, elapsed_ms)
+                    settled = True
+                    raise
+                print(f"⚠️ {method} {host} failed ({type(e).__name__}) - retry {attempt}/{attempts - 1}")
+                time.sleep(_backoff_delay(attempt))
+                continue
+            except Exception as e:
+                # Not retried (InvalidURL, TooManyRedirects, ChunkedEncodingError...)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                _record(host, elapsed_ms, error=True, retried=attempt > 1)
+                breaker.record_failure(type(e).__name__, elapsed_ms)
+                settled = True
+                raise
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            from_cache = getattr(response, 'from_cache', False)
+            _record(host, elapsed_ms, status_code=response.status_code,
+                    retried=attempt > 1, from_cache=from_cache)
+            if response.status_code in RETRY_STATUSES and attempt < attempts:
+                print(f"⚠️ {method} {host} returned {response.status_code} - retry {attempt}/{attempts - 1}")
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            # A cache hit says nothing about the host's health (the probe is released below)
+            if not from_cache:
+                if response.status_code in RETRY_STATUSES:
+                    breaker.record_failure(f"HTTP {response.status_code}", elapsed_ms)
+                else:
+                    # 4xx answers (bad key, bad request) still mean the host is up
+                    breaker.record_success(elapsed_ms)
+                settled = True
+            return response
+    finally:
+        if not settled:
+            # Never leave a half-open breaker holding its probe slot
+            breaker.release_probe()
+
+
+def _serve_while_open(method, url, host, breaker, kwargs):
+    """Answer from the disk cache (even if expired) or fail fast"""
+    session = get_session()
+    if method == 'GET' and requests_cache is not None and isinstance(session, requests_cache.CachedSession):
+        try:
+            response = session.request(method, url, only_if_cached=True, **kwargs)
+            if response.status_code != 504:  # 504 = not in the cache
+                _record(host, 0.0, status_code=response.status_code, from_cache=True)
+                return response
+        except Exception:
+            pass
+    raise CircuitOpenError(f"{host} is unavailable (circuit open) - {breaker.last_failure}")
+
+
+def get(url, **kwargs):
+    """GET through the shared session (see request())"""
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    """POST through the shared session (see request())"""
+    return request('POST', url, **kwargs)
+
+
+def put(url, **kwargs):
+    """PUT through the shared session (see request())"""
+    return request('PUT', url, **kwargs)
+
+
+def patch(url, **kwargs):
+    """PATCH through the shared session (see request())"""
+    return request('PATCH', url, **kwargs)
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def get_http_metrics():
+    """Get per-host call counts and latencies
+
+    Returns:
+        dict: host -> calls, cache hits, errors, retries, avg/p50/p95/max/last
+              latency (ms) and last status code
+    """
+    with _metrics_lock:
+        summary = {}
+        for host, stats in _metrics.items():
+            recent = list(stats['recent_ms'])
+            summary[host] = {
+                'calls': stats['calls'],
+                'cache_hits': stats['cache_hits'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'avg_ms': round(stats['total_ms'] / stats['calls'], 1),
+                'p50_ms': round(_percentile(recent, 0.5), 1),
+                'p95_ms': round(_percentile(recent, 0.95), 1),
+                'max_ms': round(stats['max_ms'], 1),
+                'last_ms': round(stats['last_ms'], 1),
+                'last_status': stats['last_status']
+            }
+        return summary
+
+
+def reset_http_metrics():
+    """Clear collected metrics"""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def get_circuit_status():
+    """Get every host's circuit breaker state
+
+    Returns:
+        dict: host -> state ('closed', 'open', 'half_open'), consecutive
+              failures, times opened, rejected calls, seconds until the
+              next probe, last failure and last latency (ms)
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.items())
+    return {host: breaker.snapshot() for host, breaker in breakers}
+
+
+def reset_circuit_breakers():
+    """Close every circuit and forget its history"""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,150 @@
+"""
+Parallel Live-Data Lookups
+Runs the independent per-activity lookups (maps, Street View, Places,
+smart timing, UV, tides, flights) on one shared, bounded thread pool
+
+Each activity's lookups share a deadline, counted from when the first of
+them starts running: results are merged as they complete, and anything
+still running when the deadline passes is left out so one slow API can't
+hold up the schedule page.
+"""
+
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # Outside Streamlit (tests, scripts)
+    add_script_run_ctx = get_script_run_ctx = None
+
+ENRICH_WORKERS = 8  # concurrent lookups across all activities
+ENRICH_DEADLINE_SECONDS = 4.0  # per-activity budget for live data
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Get the shared lookup pool (created on first use)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ENRICH_WORKERS, thread_name_prefix='live-data')
+    return _executor
+
+
+def _in_script_context(func):
+    """Run func under the caller's Streamlit script context
+
+    Cached functions and st.secrets look up the session from the current
+    thread; pool threads don't have one unless it's passed along.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx else None
+    if ctx is None:
+        return func
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func()
+    return run
+
+
+def _run_lookup(name, func):
+    """Call one lookup, turning failures into an empty result"""
+    try:
+        return func() or {}
+    except Exception as e:
+        print(f"⚠️ Live data lookup '{name}' failed: {e}")
+        return {}
+
+
+def run_lookup_batches(batches, deadline=ENRICH_DEADLINE_SECONDS, executor=None):
+    """Run several activities' lookups in one pass on the shared pool
+
+    Each activity's deadline starts when a worker picks up its first
+    lookup, so activities queued behind others on the bounded pool get
+    their full budget. In case the pool is stuck on lookups that never
+    return, the whole batch is also capped at one deadline per pool-full
+    of lookups.
+
+    Args:
+        batches (list): One dict per activity of lookup name -> callable
+            returning a dict of enriched fields (or None)
+        deadline (float): Seconds each activity's lookups may take
+        executor: Pool to use (defaults to the shared pool)
+
+    Returns:
+        list: Per activity (same order), a tuple of (merged results dict,
+              sorted names of lookups that missed the deadline)
+    """
+    executor = executor or get_executor()
+    started = {}  # activity index -> when its first lookup began running
+
+    def timed(index, name, func):
+        def run():
+            started.setdefault(index, time.monotonic())
+            return _run_lookup(name, func)
+        return run
+
+    futures = {}
+    for index, lookups in enumerate(batches):
+        for name, func in lookups.items():
+            future = executor.submit(timed(index, name, _in_script_context(func)))
+            futures[future] = (index, name)
+
+    workers = getattr(executor, '_max_workers', ENRICH_WORKERS)
+    cap = time.monotonic() + deadline * max(1, math.ceil(len(futures) / workers))
+
+    merged = [{} for _ in batches]
+    pending = [set(lookups) for lookups in batches]
+    waiting = set(futures)
+    closed = set()  # activities whose deadline has passed
+
+    def collect(future):
+        index, name = futures[future]
+        merged[index].update(future.result())
+        pending[index].discard(name)
+        waiting.discard(future)
+
+    while waiting:
+        now = time.monotonic()
+        expired = {
+            index for index in range(len(batches))
+            if index not in closed and (now >= cap or (index in started and now >= started[index] + deadline))
+        }
+        closed |= expired
+        for future in [f for f in waiting if futures[f][0] in expired]:
+            if future.done():
+                collect(future)  # Finished right at the deadline
+            else:
+                future.cancel()  # Queued lookups are dropped; running ones finish in the background
+                waiting.discard(future)
+        if not waiting:
+            break
+
+        # Wake for the next running activity's deadline - and at least once
+        # per deadline, so an activity that starts meanwhile is timed too
+        next_deadline = min([cap, now + deadline] + [
+            started[index] + deadline for index in started if index not in closed
+        ])
+        done, _ = wait(waiting, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+        for future in done:
+            collect(future)
+
+    late = sorted(f"{index}:{name}" for index, names in enumerate(pending) for name in names)
+    if late:
+        print(f"⏱️ Live data deadline ({deadline}s) passed - skipped {', '.join(late)}")
+
+    return [(merged[i], sorted(pending[i])) for i in range(len(batches))]
+
+
+def run_lookups(lookups, deadline=ENRICH_DEADLINE_SECONDS, executor=None):
+    """Run one activity's lookups in parallel (see run_lookup_batches)
+
+    Returns:
+        tuple: (merged results dict, names of lookups that missed the deadline)
+    """
+    return run_lookup_batches([lookups], deadline, executor)[0]
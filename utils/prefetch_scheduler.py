@@ -0,0 +1,233 @@
+"""
+Background Prefetch Scheduler
+Warms time-sensitive live data (flight status, TSA waits, traffic to the
+airport, the forecast) ahead of need, driven by the trip schedule
+
+Pages read these values from their stale-while-revalidate caches; this
+scheduler makes sure the caches already hold fresh values when someone
+opens the Travel Dashboard. Flights are handed to the flight tracker
+(which decides from departure time and flight state whether AviationStack
+is due) from a day before departure until landing, traffic and TSA waits
+are refreshed at fixed lead times before each "leave hotel by" time, and
+the forecast is refreshed throughout the trip.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.smart_timing import (
+    AIRPORT_LOCATION, FLIGHT_HOTEL_TO_AIRPORT, FLIGHT_RECOMMENDED_EARLY, HOTEL_LOCATION
+)
+from utils.travel_estimator import get_estimator
+
+FLIGHT_WATCH_BEFORE_MINUTES = 24 * 60  # start warming a flight's status a day out
+FLIGHT_TRACK_AFTER_MINUTES = 4 * 60  # keep checking until the flight has landed
+FLIGHT_CHECK_MINUTES = 1  # the tracker's own interval decides if an API call is made
+TRAFFIC_REFRESH_LEADS_MINUTES = (90, 45, 20, 5)  # before each leave-by time
+WEATHER_REFRESH_MINUTES = 30
+TICK_SECONDS = 30
+
+
+def parse_event_time(date_str: str, time_str: str) -> Optional[datetime]:
+    """Combine a schedule date ("2025-11-07") and time ("3:51 PM")"""
+    try:
+        return datetime.strptime(f"{date_str} {time_str.strip()}", '%Y-%m-%d %I:%M %p')
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def flight_is_watched(minutes_to_departure: float) -> bool:
+    """Whether a flight is close enough to departure (or still in the air) to warm"""
+    return -FLIGHT_TRACK_AFTER_MINUTES <= minutes_to_departure <= FLIGHT_WATCH_BEFORE_MINUTES
+
+
+def _airport_leave_by(activity: Dict, departs: datetime) -> datetime:
+    """When to leave the hotel for a departing flight"""
+    leave_time = parse_event_time(activity.get('date'), activity.get('time'))
+    if leave_time and 'leave' in activity.get('activity', '').lower():
+        return leave_time  # The schedule already says when
+    drive = get_estimator().estimate(HOTEL_LOCATION, AIRPORT_LOCATION)
+    drive_minutes = drive['minutes'] if drive else FLIGHT_HOTEL_TO_AIRPORT
+    return departs - timedelta(minutes=FLIGHT_RECOMMENDED_EARLY + drive_minutes)
+
+
+def plan_watches(activities: Iterable[Dict]) -> Dict:
+    """Work out what to watch from the schedule
+
+    Args:
+        activities: Scheduled activities (from get_ultimate_trip_data)
+
+    Returns:
+        dict: 'flights' - (flight number, date, departure time),
+              'airport_trips' - (airport code, leave-by time, at-airport-by
+              time, whether the trip starts at the hotel),
+              'trip_window' - (first, last) activity times or None
+    """
+    flights, airport_trips, times = [], [], []
+    for activity in activities:
+        start = parse_event_time(activity.get('date'), activity.get('time'))
+        if start:
+            times.append(start)
+        flight_number = activity.get('flight_number')
+        if not flight_number:
+            continue
+        departs = parse_event_time(
+            activity.get('date'),
+            activity.get('flight_departure_time') or activity.get('departure_time') or activity.get('time')
+        )
+        if not departs:
+            continue
+        flights.append((flight_number.replace(' ', '').upper(), activity['date'], departs))
+
+        airport = activity.get('departure_airport')
+        if airport:
+            from_hotel = airport == 'JAX'  # Flights home leave from the island
+            at_airport = departs - timedelta(minutes=FLIGHT_RECOMMENDED_EARLY)
+            leave_by = _airport_leave_by(activity, departs) if from_hotel else at_airport
+            airport_trips.append((airport, leave_by, at_airport, from_hotel))
+
+    return {
+        'flights': sorted(set(flights), key=lambda f: f[2]),
+        'airport_trips': sorted(airport_trips, key=lambda t: t[1]),
+        'trip_window': (min(times), max(times)) if times else None
+    }
+
+
+def due_tasks(watches: Dict, now: datetime, last_run: Dict) -> List[Tuple]:
+    """Prefetch tasks due at `now`
+
+    Args:
+        watches: Result of plan_watches()
+        now: Current local time
+        last_run: Task key -> datetime it last ran
+
+    Returns:
+        list: (kind, args) tuples - kind is 'flight', 'traffic', 'tsa' or
+              'weather'; args are passed to that kind's fetcher
+    """
+    tasks = []
+
+    def is_due(key, every_minutes):
+        last = last_run.get(key)
+        return last is None or now - last >= timedelta(minutes=every_minutes)
+
+    def crossed_refresh_point(key, deadline):
+        """Whether a lead time before deadline has passed since the last run"""
+        if not deadline - timedelta(minutes=max(TRAFFIC_REFRESH_LEADS_MINUTES)) <= now <= deadline:
+            return False
+        last = last_run.get(key)
+        points = [deadline - timedelta(minutes=lead) for lead in TRAFFIC_REFRESH_LEADS_MINUTES]
+        return any(point <= now and (last is None or last < point) for point in points)
+
+    for flight_number, date_str, departs in watches['flights']:
+        if flight_is_watched((departs - now).total_seconds() / 60) and \
+                is_due(('flight', flight_number, date_str), FLIGHT_CHECK_MINUTES):
+            tasks.append(('flight', (flight_number, date_str)))
+
+    for airport, leave_by, at_airport, from_hotel in watches['airport_trips']:
+        if from_hotel and crossed_refresh_point(('traffic', airport, leave_by), leave_by):
+            tasks.append(('traffic', (airport,)))
+        if crossed_refresh_point(('tsa', airport, at_airport), at_airport):
+            tasks.append(('tsa', (airport,)))
+
+    window = watches['trip_window']
+    if window and window[0] - timedelta(days=1) <= now <= window[1] + timedelta(days=1):
+        if is_due(('weather',), WEATHER_REFRESH_MINUTES):
+            tasks.append(('weather', ()))
+
+    # De-duplicate (two trips to the same airport in one window)
+    return list(dict.fromkeys(tasks))
+
+
+def _task_keys(watches: Dict, kind: str, args: Tuple) -> List[Tuple]:
+    """Keys under which a completed task is recorded in last_run"""
+    if kind == 'flight':
+        return [('flight',) + args]
+    if kind == 'weather':
+        return [('weather',)]
+    time_index = 1 if kind == 'traffic' else 2
+    return [(kind, trip[0], trip[time_index]) for trip in watches['airport_trips'] if trip[0] == args[0]]
+
+
+class PrefetchScheduler:
+    """Runs due prefetch tasks on a daemon thread"""
+
+    def __init__(self, fetchers: Dict[str, Callable], clock: Callable[[], datetime] = datetime.now,
+                 tick_seconds: float = TICK_SECONDS):
+        self.fetchers = fetchers
+        self._clock = clock
+        self.tick_seconds = tick_seconds
+        self._watches = plan_watches([])
+        self._last_run = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'runs': 0, 'failures': 0, 'last_error': None}
+
+    def update_schedule(self, activities: Iterable[Dict]):
+        """Re-plan from the current schedule (cheap - call on every rerun)"""
+        watches = plan_watches(activities)
+        with self._lock:
+            self._watches = watches
+
+    def run_once(self) -> List[Tuple]:
+        """Run every task that is due now
+
+        Returns:
+            list: (kind, args) tasks that ran
+        """
+        now = self._clock()
+        with self._lock:
+            watches = self._watches
+            tasks = due_tasks(watches, now, self._last_run)
+
+        for kind, args in tasks:
+            try:
+                self.fetchers[kind](*args)
+                self.stats['runs'] += 1
+            except Exception as e:
+                # Still counts as run - the next poll interval retries it
+                self.stats['failures'] += 1
+                self.stats['last_error'] = f"{kind}: {e}"
+                print(f"⚠️ Prefetch of {kind} {args} failed: {e}")
+            with self._lock:
+                for key in _task_keys(watches, kind, args):
+                    self._last_run[key] = now
+        return tasks
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Prefetch scheduler error: {e}")
+            if self._stop.wait(self.tick_seconds):
+                return
+
+    def start(self):
+        """Start the background thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='prefetch-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+    def status(self) -> Dict:
+        """Watched flights and task counts for diagnostics
+
+        Returns:
+            dict: 'flights' (flight numbers being warmed now), 'runs',
+                  'failures', 'last_error'
+        """
+        now = self._clock()
+        with self._lock:
+            flights = [
+                flight_number for flight_number, _, departs in self._watches['flights']
+                if flight_is_watched((departs - now).total_seconds() / 60)
+            ]
+        return {'flights': flights, **self.stats}
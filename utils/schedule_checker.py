@@ -11,12 +11,17 @@ import streamlit as st
 from datetime import datetime, timedelta
 import pandas as pd
 
+from utils.activity_model import normalize_activities
+from utils.schedule_index import DEFAULT_DURATION_MINUTES, ScheduleIndex
+from utils.time_parsing import parse_duration
 
-def check_schedule_conflicts(activities):
+
+def check_schedule_conflicts(activities, index=None):
     """Comprehensive conflict detection
 
     Args:
         activities (list): List of activity dictionaries
+        index (ScheduleIndex): The schedule's shared index, if it has one
 
     Returns:
         tuple: (conflicts, warnings, suggestions)
@@ -26,73 +31,47 @@ def check_schedule_conflicts(activities):
     warnings = []
     suggestions = []
 
-    # Filter out activities without dates/times
-    valid_activities = [
-        a for a in activities
-        if a.get('date') and a.get('time')
-    ]
-
-    # Sort chronologically
-    sorted_acts = sorted(
-        valid_activities,
-        key=lambda x: datetime.strptime(f"{x['date']} {x.get('time', '12:00 PM')}", '%Y-%m-%d %I:%M %p')
-    )
-
-    for i in range(len(sorted_acts) - 1):
-        current = sorted_acts[i]
-        next_act = sorted_acts[i + 1]
-
-        try:
-            current_start = datetime.strptime(f"{current['date']} {current.get('time', '12:00 PM')}", '%Y-%m-%d %I:%M %p')
-
-            # Parse duration
-            duration = current.get('duration', '2 hours')
-            duration_hours = _parse_duration_to_hours(duration)
-            current_end = current_start + timedelta(hours=duration_hours)
-
-            next_start = datetime.strptime(f"{next_act['date']} {next_act.get('time', '12:00 PM')}", '%Y-%m-%d %I:%M %p')
-
-            # HARD CONFLICT (overlap)
-            if current_end > next_start:
-                conflicts.append({
-                    'severity': 'critical',
+    if index is None:
+        index = ScheduleIndex(activities)
+
+    # HARD CONFLICTS - every overlapping pair, not just neighbours
+    for date, first, second in index.overlaps():
+        conflicts.append({
+            'severity': 'critical',
+            'activity1': first.activity['activity'],
+            'activity2': second.activity['activity'],
+            'current_end': first.end_time,
+            'next_start': second.start_time,
+            'overlap_minutes': min(first.end, second.end) - second.start,
+            'message': f"⛔ OVERLAP: {first.activity['activity']} runs until {first.end_time} but {second.activity['activity']} starts at {second.start_time}"
+        })
+
+    for date, previous, next_interval, gap_minutes in index.transitions():
+        current, next_act = previous.activity, next_interval.activity
+
+        # TIGHT TRANSITION (< 30 min, different locations)
+        if gap_minutes < 30:
+            loc1 = _get_location_name(current)
+            loc2 = _get_location_name(next_act)
+
+            if loc1 != loc2 and loc1 and loc2:
+                warnings.append({
+                    'severity': 'warning',
                     'activity1': current['activity'],
                     'activity2': next_act['activity'],
-                    'current_end': current_end.strftime('%I:%M %p'),
-                    'next_start': next_start.strftime('%I:%M %p'),
-                    'overlap_minutes': int((current_end - next_start).total_seconds() / 60),
-                    'message': f"⛔ OVERLAP: {current['activity']} runs until {current_end.strftime('%I:%M %p')} but {next_act['activity']} starts at {next_start.strftime('%I:%M %p')}"
-                })
-
-            # TIGHT TRANSITION (< 30 min, different locations)
-            elif (next_start - current_end) < timedelta(minutes=30):
-                loc1 = _get_location_name(current)
-                loc2 = _get_location_name(next_act)
-
-                gap_minutes = int((next_start - current_end).total_seconds() / 60)
-
-                if loc1 != loc2 and loc1 and loc2:
-                    warnings.append({
-                        'severity': 'warning',
-                        'activity1': current['activity'],
-                        'activity2': next_act['activity'],
-                        'gap_minutes': gap_minutes,
-                        'location1': loc1,
-                        'location2': loc2,
-                        'message': f"⚠️ TIGHT: Only {gap_minutes} min to get from {loc1} to {loc2}"
-                    })
-
-            # GOOD BUFFER (30min-2hrs)
-            elif timedelta(minutes=30) <= (next_start - current_end) <= timedelta(hours=2):
-                gap_minutes = int((next_start - current_end).total_seconds() / 60)
-                suggestions.append({
-                    'severity': 'info',
                     'gap_minutes': gap_minutes,
-                    'message': f"✅ Good buffer: {gap_minutes} min between {current['activity']} and {next_act['activity']}"
+                    'location1': loc1,
+                    'location2': loc2,
+                    'message': f"⚠️ TIGHT: Only {gap_minutes} min to get from {loc1} to {loc2}"
                 })
 
-        except Exception as e:
-            print(f"Error checking conflict between {current.get('activity')} and {next_act.get('activity')}: {e}")
+        # GOOD BUFFER (30min-2hrs)
+        elif gap_minutes <= 120:
+            suggestions.append({
+                'severity': 'info',
+                'gap_minutes': gap_minutes,
+                'message': f"✅ Good buffer: {gap_minutes} min between {current['activity']} and {next_act['activity']}"
+            })
 
     return conflicts, warnings, suggestions
 
@@ -110,48 +89,10 @@ def _parse_duration_to_hours(duration_str):
         duration_str (str): Duration string
 
     Returns:
-        float: Duration in hours
+        float: Duration in hours (2.0 if there is none)
     """
-    if not duration_str:
-        return 2.0
-
-    duration_str = str(duration_str).lower()
-
-    # Handle "2 hours", "1.5 hours"
-    if 'hour' in duration_str:
-        try:
-            numbers = duration_str.replace('hours', '').replace('hour', '').strip()
-            return float(numbers.split()[0])
-        except:
-            pass
-
-    # Handle "90 minutes", "30 min"
-    if 'min' in duration_str:
-        try:
-            numbers = duration_str.replace('minutes', '').replace('minute', '').replace('min', '').strip()
-            return float(numbers.split()[0]) / 60
-        except:
-            pass
-
-    # Handle "2h 10m"
-    if 'h' in duration_str and 'm' in duration_str:
-        try:
-            parts = duration_str.replace('h', ' ').replace('m', '').split()
-            hours = float(parts[0])
-            minutes = float(parts[1]) if len(parts) > 1 else 0
-            return hours + (minutes / 60)
-        except:
-            pass
-
-    # Handle just "2h"
-    if 'h' in duration_str:
-        try:
-            return float(duration_str.replace('h', '').strip())
-        except:
-            pass
-
-    # Default
-    return 2.0
+    minutes = parse_duration(duration_str)
+    return 2.0 if not minutes else minutes / 60
 
 
 def _get_location_name(activity):
@@ -185,25 +126,19 @@ def visualize_schedule_timeline(activities):
     # Prepare data for visualization
     schedule_data = []
 
-    for activity in activities:
-        if not activity.get('date') or not activity.get('time'):
+    for item in normalize_activities(activities):
+        if not item.is_scheduled:
             continue
 
-        try:
-            start = datetime.strptime(f"{activity['date']} {activity.get('time', '12:00 PM')}", '%Y-%m-%d %I:%M %p')
-
-            duration_hours = _parse_duration_to_hours(activity.get('duration', '2 hours'))
-            end = start + timedelta(hours=duration_hours)
-
-            schedule_data.append({
-                'Activity': activity['activity'],
-                'Start': start,
-                'End': end,
-                'Duration (hrs)': duration_hours,
-                'Day': start.strftime('%A, %b %d')
-            })
-        except Exception as e:
-            print(f"Error visualizing {activity.get('activity')}: {e}")
+        day_start = datetime.strptime(item.date, '%Y-%m-%d')
+        end_minutes = item.end_with_default(DEFAULT_DURATION_MINUTES)
+        schedule_data.append({
+            'Activity': item.name,
+            'Start': day_start + timedelta(minutes=item.start),
+            'End': day_start + timedelta(minutes=end_minutes),
+            'Duration (hrs)': (end_minutes - item.start) / 60,
+            'Day': day_start.strftime('%A, %b %d')
+        })
 
     if not schedule_data:
         st.warning("No activities with valid dates/times to visualize")
@@ -248,17 +183,18 @@ def visualize_schedule_timeline(activities):
         st.divider()
 
 
-def show_schedule_conflicts_panel(activities):
+def show_schedule_conflicts_panel(activities, index=None):
     """Display conflicts panel with all checks and visualizations
 
     Args:
         activities (list): List of activity dictionaries
+        index (ScheduleIndex): The schedule's shared index, if it has one
     """
 
     st.markdown("### 🔍 Schedule Conflict Detection")
 
     # Run conflict check
-    conflicts, warnings, suggestions = check_schedule_conflicts(activities)
+    conflicts, warnings, suggestions = check_schedule_conflicts(activities, index)
 
     # Display alerts
     if conflicts:
@@ -0,0 +1,235 @@
+"""
+Schedule Index
+One per-day index of scheduled activity intervals, shared by every
+conflict check (schedule view, conflict panel, new-activity check)
+
+Each day keeps its activities as minute intervals sorted by start, plus
+the day's longest duration. An interval can only overlap [start, end) if
+it starts in [start - longest, end), so an overlap query is two binary
+searches plus the matches. Inserts and deletes keep the order, and a sweep
+over the sorted intervals finds every overlap - including ones that span
+more than the next activity.
+
+The app keeps one index per session and brings it in line with the
+current activities with sync(), which only adds and removes what changed.
+"""
+
+import itertools
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.activity_model import Activity, normalize_activities
+from utils.time_parsing import format_clock, parse_clock
+
+DEFAULT_DURATION_MINUTES = 120
+
+
+class ScheduledInterval:
+    """One activity's [start, end) minutes on its day"""
+
+    def __init__(self, start: int, end: int, item: Activity):
+        self.start = start
+        self.end = end
+        self.item = item
+
+    @property
+    def activity(self) -> Dict:
+        """The source activity dict"""
+        return self.item.source
+
+    def overlaps(self, start: float, end: float) -> bool:
+        return self.start < end and self.end > start
+
+    def end_for(self, untimed_minutes: Optional[int]) -> int:
+        """End minute, with untimed_minutes for an activity without a duration (None: as indexed)"""
+        if untimed_minutes is None or self.item.duration is not None:
+            return self.end
+        return self.start + untimed_minutes
+
+    @property
+    def end_time(self) -> str:
+        return format_clock(self.end)
+
+    @property
+    def start_time(self) -> str:
+        return format_clock(self.start)
+
+
+class DaySchedule:
+    """Sorted intervals for one date"""
+
+    def __init__(self):
+        self._keys = []  # (start, sequence) - sorted, parallel to _intervals
+        self._intervals = []
+        self._longest = 0
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return iter(self._intervals)
+
+    def insert(self, key: Tuple[int, int], interval: ScheduledInterval):
+        i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._intervals.insert(i, interval)
+        self._longest = max(self._longest, interval.end - interval.start)
+
+    def delete(self, key: Tuple[int, int]) -> ScheduledInterval:
+        i = bisect_left(self._keys, key)
+        del self._keys[i]
+        interval = self._intervals.pop(i)
+        if interval.end - interval.start == self._longest:
+            self._longest = max((iv.end - iv.start for iv in self._intervals), default=0)
+        return interval
+
+    def overlapping(self, start: float, end: float) -> List[ScheduledInterval]:
+        """Intervals overlapping [start, end)"""
+        lo = bisect_left(self._keys, (start - self._longest,))
+        hi = bisect_left(self._keys, (end,))
+        return [interval for interval in self._intervals[lo:hi] if interval.overlaps(start, end)]
+
+    def overlaps(self, untimed_minutes: Optional[int] = None) -> List[Tuple[ScheduledInterval, ScheduledInterval]]:
+        """Every overlapping pair, earlier start first"""
+        pairs, active = [], []
+        for interval in self._intervals:
+            end = interval.end_for(untimed_minutes)
+            active = [(other, other_end) for other, other_end in active if other_end > interval.start]
+            pairs.extend((other, interval) for other, other_end in active
+                         if other.start < end and other_end > interval.start)
+            active.append((interval, end))
+        return pairs
+
+    def transitions(self, untimed_minutes: Optional[int] = None
+                    ) -> List[Tuple[ScheduledInterval, ScheduledInterval, int]]:
+        """(previous, next, gap minutes) wherever the day is free before an activity
+
+        `previous` is whichever earlier activity finishes last, so a long
+        activity isn't hidden by a short one inside it.
+        """
+        result, latest, latest_end = [], None, None
+        for interval in self._intervals:
+            end = interval.end_for(untimed_minutes)
+            if latest is not None and interval.start >= latest_end:
+                result.append((latest, interval, interval.start - latest_end))
+            if latest is None or end > latest_end:
+                latest, latest_end = interval, end
+        return result
+
+
+class ScheduleIndex:
+    """Per-day schedule index with incremental insert/delete
+
+    Args:
+        activities: Activity dicts or normalized Activity objects
+        default_duration: Minutes assumed for activities without a duration
+    """
+
+    def __init__(self, activities: Iterable[Union[Dict, Activity]] = (),
+                 default_duration: int = DEFAULT_DURATION_MINUTES):
+        self.default_duration = default_duration
+        self._days = {}
+        self._keys = {}  # id(source dict) -> (date, key, fingerprint)
+        self._sources = {}  # fingerprint -> indexed source dicts (for sync)
+        self._sequence = itertools.count()
+        for item in normalize_activities(activities):
+            self.add(item)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, activity: Union[Dict, Activity]) -> Optional[ScheduledInterval]:
+        """Index an activity (skipped if it has no date or parsable time)"""
+        item = activity if isinstance(activity, Activity) else Activity(activity)
+        if not item.is_scheduled:
+            return None
+        interval = ScheduledInterval(item.start, item.end_with_default(self.default_duration), item)
+        key = (item.start, next(self._sequence))
+        self._days.setdefault(item.date, DaySchedule()).insert(key, interval)
+        fingerprint = _fingerprint(item.source)
+        self._keys[id(item.source)] = (item.date, key, fingerprint)
+        self._sources.setdefault(fingerprint, []).append(item.source)
+        return interval
+
+    def remove(self, activity: Union[Dict, Activity]) -> bool:
+        """Remove a previously added activity (the same dict or its Activity)"""
+        source = activity.source if isinstance(activity, Activity) else activity
+        location = self._keys.pop(id(source), None)
+        if location is None:
+            return False
+        date, key, fingerprint = location
+        self._days[date].delete(key)
+        same = self._sources[fingerprint]
+        del same[next(i for i, indexed in enumerate(same) if indexed is source)]
+        if not same:
+            del self._sources[fingerprint]
+        return True
+
+    def sync(self, activities: Iterable[Dict]) -> Tuple[int, int]:
+        """Bring the index in line with the current activities
+
+        Activities are matched by content, so an unchanged schedule rebuilt
+        as new dicts (every page run) costs no index updates; only added,
+        edited and removed activities are inserted or deleted.
+
+        Returns:
+            tuple: (added, removed) counts
+        """
+        wanted = {}
+        for activity in activities:
+            wanted.setdefault(_fingerprint(activity), []).append(activity)
+
+        removed = 0
+        for fingerprint, sources in list(self._sources.items()):
+            for source in sources[len(wanted.get(fingerprint, ())):]:
+                removed += self.remove(source)
+        added = 0
+        for fingerprint, listed in wanted.items():
+            for activity in listed[len(self._sources.get(fingerprint, ())):]:
+                added += self.add(activity) is not None
+        return added, removed
+
+    def dates(self) -> List[str]:
+        return sorted(date for date, day in self._days.items() if len(day))
+
+    def day(self, date: str) -> DaySchedule:
+        return self._days.get(date) or DaySchedule()
+
+    def find_conflicts(self, date: str, time_str: str, duration_minutes: float) -> List[Dict]:
+        """Activities overlapping a proposed time slot
+
+        Args:
+            date: "2025-11-09"
+            time_str: "10:00 AM" or "10:00"
+            duration_minutes: Proposed length
+
+        Returns:
+            list: Overlapping activity dicts, earliest first (empty if the
+                  time can't be parsed)
+        """
+        start = parse_clock(time_str)
+        if start is None:
+            return []
+        return [interval.activity for interval in self.day(date).overlapping(start, start + duration_minutes)]
+
+    def overlaps(self, untimed_minutes: Optional[int] = None) -> List[Tuple[str, ScheduledInterval, ScheduledInterval]]:
+        """Every overlapping pair on every day: (date, earlier, later)
+
+        Args:
+            untimed_minutes: Length for activities without a duration
+                             instead of the index default (0 = instants)
+        """
+        return [(date, first, second) for date in self.dates()
+                for first, second in self._days[date].overlaps(untimed_minutes)]
+
+    def transitions(self, untimed_minutes: Optional[int] = None
+                    ) -> List[Tuple[str, ScheduledInterval, ScheduledInterval, int]]:
+        """Free time before each activity: (date, previous, next, gap minutes)"""
+        return [(date, *transition) for date in self.dates()
+                for transition in self._days[date].transitions(untimed_minutes)]
+
+
+def _fingerprint(activity: Union[Dict, Activity]) -> Tuple:
+    """What makes two activity dicts the same schedule entry"""
+    source = activity.source if isinstance(activity, Activity) else activity
+    return tuple(str(source.get(field, '')) for field in ('id', 'date', 'activity', 'name', 'time', 'duration', 'type', 'location'))
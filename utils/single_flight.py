@@ -0,0 +1,143 @@
+"""
+Single-Flight Request Coalescing
+Lets concurrent sessions share one upstream call instead of each firing
+an identical request
+
+When several sessions ask for the same thing at the same moment (typically
+right after a cache expiry), the first caller runs the call and the rest
+wait for it and receive the same result - or the same exception. Keys are
+built from normalized request parameters, so argument order and spelling
+differences don't defeat coalescing. Nothing is cached once the call
+finishes; that is the caches' job.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+# How long a waiter blocks for the leader before running the call itself
+WAIT_TIMEOUT_SECONDS = 60
+
+
+def _normalize(value) -> Hashable:
+    """Hashable, order-independent form of a request parameter"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_normalize(v) for v in value))
+    if isinstance(value, str):
+        return value.strip()
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def make_key(*parts, **named) -> Hashable:
+    """Build a coalescing key from request parameters
+
+    Args:
+        *parts: Positional parts (function name, URL, ...)
+        **named: Named parameters - order doesn't matter
+
+    Returns:
+        Hashable key; equal for equivalent requests
+    """
+    return (_normalize(parts), _normalize(named))
+
+
+class _Call:
+    """One in-flight call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Group of keyed calls where concurrent duplicates share one execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, label, field):
+        stats = self._stats.setdefault(label, {'issued': 0, 'coalesced': 0})
+        stats[field] += 1
+
+    def do(self, key: Hashable, func: Callable[[], Any], label: str = 'default') -> Any:
+        """Run func once per key among concurrent callers
+
+        Args:
+            key: Coalescing key (see make_key)
+            func: Zero-argument callable doing the upstream call
+            label: Name the call is counted under in stats()
+
+        Returns:
+            func's result (shared with any callers that waited on it)
+
+        Raises:
+            Whatever func raised - every waiter sees the same exception
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self._count(label, 'issued')
+            else:
+                call.waiters += 1
+                leader = False
+                self._count(label, 'coalesced')
+
+        if not leader:
+            if call.done.wait(WAIT_TIMEOUT_SECONDS):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # Leader is stuck - don't hang the page, make the call ourselves
+            print(f"⚠️ Coalesced call for {label} timed out waiting - calling directly")
+            return func()
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Issued and coalesced counts per label
+
+        Returns:
+            dict: label -> {'issued', 'coalesced'}
+        """
+        with self._lock:
+            return {label: dict(counts) for label, counts in self._stats.items()}
+
+    def reset_stats(self):
+        """Clear the counters"""
+        with self._lock:
+            self._stats.clear()
+
+
+_group = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group"""
+    return _group
+
+
+def get_coalescing_stats() -> Dict[str, Dict[str, int]]:
+    """Issued and coalesced counts per label for the shared group"""
+    return _group.stats()
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, List, Tuple
 import streamlit as st
 
+from utils.time_parsing import parse_duration
+
 # Import Google Routes API for travel time calculations
 try:
     from utils.google_routes import get_directions, format_duration
@@ -87,14 +89,20 @@ AIRPORT_LOCATION = {
 # TRAVEL TIME CALCULATIONS
 # =============================================================================
 
-def get_travel_time(origin: Dict, destination: Dict, mode: str = "driving") -> Tuple[int, str]:
+def get_travel_time(origin: Dict, destination: Dict, mode: str = "driving",
+                    departure_time=None) -> Tuple[int, str]:
     """
-    Get travel time between two locations using Google Routes API
+    Get travel time between two locations
+
+    Driving times come from the offline estimator, refined with live
+    traffic from the shared travel-time matrix once it has been fetched;
+    other modes use the Google Routes API.
 
     Args:
         origin: Dict with 'lat', 'lon', or 'address'
         destination: Dict with 'lat', 'lon', or 'address'
         mode: Travel mode (driving, walking, etc.)
+        departure_time: Unix timestamp (optional, defaults to now)
 
     Returns:
         Tuple of (travel_minutes, formatted_display_string)
@@ -128,8 +136,22 @@ def get_travel_time(origin: Dict, destination: Dict, mode: str = "driving") -> T
             minutes = default_times['local']
             return minutes, f"~{minutes} min"
 
-    if not GOOGLE_ROUTES_AVAILABLE:
-        return get_smart_default()
+    def format_minutes(duration_minutes: int) -> Tuple[int, str]:
+        """Minutes and display string"""
+        if duration_minutes < 60:
+            display = f"~{duration_minutes} min"
+        else:
+            hours = duration_minutes // 60
+            mins = duration_minutes % 60
+            display = f"~{hours}h {mins}m" if mins else f"~{hours}h"
+
+        return duration_minutes, display
+
+    def format_travel_time(leg: Dict) -> Tuple[int, str]:
+        """Minutes and display string from a matrix element / directions leg"""
+        # Use traffic-adjusted duration if available
+        duration_seconds = leg.get('duration_in_traffic', leg.get('duration', {})).get('value', 0)
+        return format_minutes((duration_seconds + 59) // 60)  # Round up
 
     # Format location strings
     origin_str = _format_location(origin)
@@ -138,6 +160,31 @@ def get_travel_time(origin: Dict, destination: Dict, mode: str = "driving") -> T
     if not origin_str or not dest_str:
         return get_smart_default()
 
+    # Driving: live traffic if the travel-time matrix already has it, otherwise
+    # the offline estimate (no API wait) while the matrix refreshes in the background
+    if mode == "driving":
+        try:
+            from utils.travel_matrix import get_travel_matrix
+            from utils.travel_estimator import get_estimator
+            matrix = get_travel_matrix()
+            estimate = get_estimator().estimate(origin, destination)
+            if estimate:
+                element = matrix.peek(origin, destination, departure_time)
+                if element:
+                    return format_travel_time(element)
+                matrix.refresh_async(origin, destination, departure_time)
+                return format_minutes(estimate['minutes'])
+
+            # No coordinates to estimate from - ask the matrix directly
+            element = matrix.lookup(origin, destination, departure_time)
+            if element:
+                return format_travel_time(element)
+        except Exception as e:
+            print(f"Travel time matrix error: {e}")
+
+    if not GOOGLE_ROUTES_AVAILABLE:
+        return get_smart_default()
+
     # Get directions from Google
     try:
         directions = get_directions(origin_str, dest_str, mode=mode)
@@ -145,20 +192,7 @@ def get_travel_time(origin: Dict, destination: Dict, mode: str = "driving") -> T
         if directions and directions.get('status') == 'OK':
             routes = directions.get('routes', [])
             if routes:
-                leg = routes[0]['legs'][0]
-                # Use traffic-adjusted duration if available
-                duration_seconds = leg.get('duration_in_traffic', leg.get('duration', {})).get('value', 0)
-                duration_minutes = (duration_seconds + 59) // 60  # Round up
-
-                # Format display string
-                if duration_minutes < 60:
-                    display = f"~{duration_minutes} min"
-                else:
-                    hours = duration_minutes // 60
-                    mins = duration_minutes % 60
-                    display = f"~{hours}h {mins}m" if mins else f"~{hours}h"
-
-                return duration_minutes, display
+                return format_travel_time(routes[0]['legs'][0])
     except Exception as e:
         print(f"Travel time calculation error: {e}")
 
@@ -959,30 +993,8 @@ def calculate_smart_timing(event: Dict, previous_event: Dict = None, next_event_
 
 
 def _parse_duration(duration_str: str) -> int:
-    """Parse duration string into minutes"""
-    if isinstance(duration_str, int):
-        return duration_str
-
-    if not isinstance(duration_str, str):
-        return 60  # Default
-
-    duration_str = duration_str.lower()
-
-    # Handle various formats
-    import re
-
-    # "2 hours" or "2h"
-    hours = re.search(r'(\d+\.?\d*)\s*h', duration_str)
-    # "30 minutes" or "30 min"
-    minutes = re.search(r'(\d+)\s*m', duration_str)
-
-    total_minutes = 0
-    if hours:
-        total_minutes += int(float(hours.group(1)) * 60)
-    if minutes:
-        total_minutes += int(minutes.group(1))
-
-    return total_minutes if total_minutes > 0 else 60
+    """Parse duration string into minutes (60 if there is none)"""
+    return parse_duration(duration_str) or 60
 
 
 def _determine_meal_type(event: Dict) -> str:
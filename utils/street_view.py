@@ -5,7 +5,7 @@ Provides street-level preview images of locations
 
 from typing import Optional
 import streamlit as st
-import requests
+from utils import http_client
 
 def get_api_key():
     """Get Google Maps API key from Streamlit secrets"""
@@ -63,7 +63,7 @@ def get_street_view_metadata(location: str) -> dict:
     }
 
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = http_client.get(url, params=params, timeout=5)
         if response.status_code == 200:
             return response.json()
         else:
@@ -0,0 +1,190 @@
+"""
+Stale-While-Revalidate Cache
+Caches slow upstream lookups (weather, tides, UV, traffic) so a page never
+waits on an expired entry
+
+After `ttl` seconds a value goes stale: the next caller still gets it
+immediately while a background thread fetches a fresh one. Only when a
+value is older than `max_stale` seconds does a caller block on the
+upstream call. Results rejected by `accept` (fallback data returned while
+an API is down) never replace the last good value until it hits the
+staleness cap. Concurrent loads of the same entry (several sessions
+hitting a cold or too-stale cache at once) share one upstream call.
+"""
+
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.single_flight import get_single_flight
+
+REFRESH_WORKERS = 4
+
+_refresher = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='swr-refresh')
+
+
+def _make_key(args, kwargs):
+    """Hashable cache key from call arguments"""
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return repr(key)
+
+
+class SWRCache:
+    """Per-argument cache entries served stale while a refresh runs"""
+
+    def __init__(self, func, ttl, max_stale, accept=None, clock=time.time, executor=None):
+        self.func = func
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.accept = accept
+        self._clock = clock
+        self._executor = executor or _refresher
+        self._entries = {}
+        self._lock = threading.Lock()
+        functools.update_wrapper(self, func)
+
+    def _load(self, key, args, kwargs):
+        """Call the upstream function and store the result"""
+        try:
+            value = get_single_flight().do(
+                (self.func.__module__, self.func.__qualname__, key),
+                lambda: self.func(*args, **kwargs),
+                label=self.func.__name__
+            )
+            error = None
+        except Exception as e:
+            value, error = None, e
+
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            good = error is None and (self.accept is None or self.accept(value))
+            keep_old = (
+                not good and entry is not None and entry['good']
+                and now - entry['fetched_at'] < self.max_stale
+            )
+            if keep_old:
+                # Upstream failed - keep serving the last good value, try again after ttl
+                entry['checked_at'] = now
+                entry['refreshing'] = False
+                entry['last_error'] = str(error) if error else "fallback data"
+                return entry['value']
+            if error is not None:
+                if entry is not None:
+                    entry['refreshing'] = False
+                raise error
+            self._entries[key] = {
+                'value': value,
+                'fetched_at': now,
+                'checked_at': now,
+                'good': good,
+                'refreshing': False,
+                'last_error': None if good else "fallback data"
+            }
+            return value
+
+    def _refresh_in_background(self, key, args, kwargs):
+        def refresh():
+            try:
+                self._load(key, args, kwargs)
+            except Exception as e:
+                print(f"⚠️ Background refresh of {self.func.__name__} failed: {e}")
+        self._executor.submit(refresh)
+
+    def __call__(self, *args, **kwargs):
+        key = _make_key(args, kwargs)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry['fetched_at'] < self.max_stale:
+                if now - entry['checked_at'] >= self.ttl and not entry['refreshing']:
+                    entry['refreshing'] = True
+                    self._refresh_in_background(key, args, kwargs)
+                return entry['value']
+
+        # Nothing cached, or too stale to serve - wait for the upstream
+        return self._load(key, args, kwargs)
+
+    def refresh(self, *args, **kwargs):
+        """Fetch a fresh value now, whatever the cached one's age (for prefetching)
+
+        Returns:
+            The value now cached (the old one if the upstream failed and it
+            is still servable)
+        """
+        key = _make_key(args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['refreshing'] = True
+        return self._load(key, args, kwargs)
+
+    def freshness(self, *args, **kwargs):
+        """How old the cached value for these arguments is
+
+        Returns:
+            dict: fetched_at, age_seconds, stale, refreshing, fallback and
+                  last_error - or None if nothing is cached
+        """
+        with self._lock:
+            entry = self._entries.get(_make_key(args, kwargs))
+            if entry is None:
+                return None
+            age = self._clock() - entry['fetched_at']
+            return {
+                'fetched_at': entry['fetched_at'],
+                'age_seconds': age,
+                'stale': age >= self.ttl,
+                'refreshing': entry['refreshing'],
+                'fallback': not entry['good'],
+                'last_error': entry['last_error']
+            }
+
+    def clear(self):
+        """Drop every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+
+def stale_while_revalidate(ttl, max_stale=None, accept=None):
+    """Decorator: cache a function's results with stale-while-revalidate
+
+    Args:
+        ttl (float): Seconds before a value is refreshed in the background
+        max_stale (float): Seconds after which a value is too old to serve
+            and callers wait for the upstream (defaults to 4 x ttl)
+        accept (callable): Returns False for results that shouldn't replace
+            a good cached value (e.g. fallback data)
+
+    Returns:
+        Decorator producing an SWRCache (call it like the original function;
+        .freshness(*args), .refresh(*args) and .clear() are added)
+    """
+    def decorator(func):
+        return SWRCache(func, ttl, max_stale if max_stale is not None else ttl * 4, accept)
+    return decorator
+
+
+def format_freshness(info):
+    """Short label such as "updated 4 min ago" for a freshness() result"""
+    if not info:
+        return "not loaded yet"
+    age = info['age_seconds']
+    if age < 60:
+        label = "updated just now"
+    elif age < 3600:
+        label = f"updated {int(age // 60)} min ago"
+    elif age < 86400:
+        label = f"updated {int(age // 3600)} h ago"
+    else:
+        label = f"updated {int(age // 86400)} d ago"
+    if info.get('refreshing'):
+        label += " • refreshing"
+    elif info.get('fallback'):
+        label += " • sample data"
+    return label
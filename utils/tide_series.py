@@ -0,0 +1,151 @@
+"""
+Tide Series
+Time-indexed water levels for Fernandina Beach (NOAA station 8720030)
+
+NOAA's 6-minute prediction series is stored as one float32 array on a
+regular time grid, so the water level at any time is a vectorized
+interpolation and "when is the tide low enough for a beach walk within
+this gap?" is answered for many gaps in one call. When only high/low
+events are available (fallback data) the curve between them is
+synthesized with the usual cosine tide shape.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LOW_TIDE_MAX_FT = 2.0  # Feet above MLLW - wide, walkable beach (range is ~6-7 ft)
+LOW_TIDE_MIN_MINUTES = 30  # Shorter low-water stretches aren't worth planning around
+SERIES_STEP_MINUTES = 6  # NOAA prediction interval
+
+
+def _minutes(times, start: datetime) -> np.ndarray:
+    """Datetimes -> minutes since start"""
+    return np.array([(t - start).total_seconds() / 60 for t in times], dtype=float)
+
+
+class TideSeries:
+    """Water levels (ft above MLLW) on a regular grid from `start`"""
+
+    def __init__(self, start: datetime, heights: Sequence[float], step_minutes: int = SERIES_STEP_MINUTES):
+        self.start = start
+        self.step_minutes = step_minutes
+        self.heights = np.asarray(heights, dtype=np.float32)
+        self._grid = np.arange(len(self.heights), dtype=float) * step_minutes
+        self._runs = {}  # max height -> (start index, end index) arrays of low-water runs
+
+    def __len__(self):
+        return len(self.heights)
+
+    @property
+    def end(self) -> datetime:
+        """Time of the last level"""
+        return self.start + timedelta(minutes=float(self._grid[-1])) if len(self) else self.start
+
+    def levels_at(self, times: Iterable[datetime]) -> np.ndarray:
+        """Water levels at many times at once (NaN outside the series)"""
+        if not len(self):
+            return np.full(len(list(times)), np.nan)
+        return np.interp(_minutes(times, self.start), self._grid, self.heights, left=np.nan, right=np.nan)
+
+    def level_at(self, when: datetime) -> Optional[float]:
+        """Water level at one time, or None outside the series"""
+        level = self.levels_at([when])[0]
+        return None if np.isnan(level) else round(float(level), 2)
+
+    def is_rising(self, when: datetime) -> Optional[bool]:
+        """Whether the tide is coming in at `when`"""
+        before, after = self.levels_at([when - timedelta(minutes=self.step_minutes), when])
+        if np.isnan(before) or np.isnan(after):
+            return None
+        return bool(after > before)
+
+    def _low_runs(self, max_height: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Index ranges [start, end) where the level is at or below max_height"""
+        if max_height not in self._runs:
+            below = np.concatenate(([False], self.heights <= max_height, [False]))
+            edges = np.flatnonzero(np.diff(below.astype(np.int8)))
+            self._runs[max_height] = (edges[0::2], edges[1::2])
+        return self._runs[max_height]
+
+    def low_tide_windows(self, gaps: Sequence[Tuple[datetime, datetime]], max_height: float = LOW_TIDE_MAX_FT,
+                         min_minutes: float = LOW_TIDE_MIN_MINUTES) -> List[List[Dict]]:
+        """Low-water stretches inside each of many time gaps
+
+        Args:
+            gaps: (start, end) datetimes - free time, activity slots, ...
+            max_height: Level (ft) at or below which the tide counts as low
+            min_minutes: Shortest stretch worth reporting
+
+        Returns:
+            list: One list per gap of {start, end, lowest_ft, lowest_at},
+                  earliest first
+        """
+        if not gaps:
+            return []
+        run_starts, run_ends = self._low_runs(max_height)
+        gap_starts = _minutes([g[0] for g in gaps], self.start)
+        gap_ends = _minutes([g[1] for g in gaps], self.start)
+
+        # Clip every run to every gap at once (gaps x runs)
+        window_starts = np.maximum(gap_starts[:, None], run_starts[None, :] * self.step_minutes)
+        window_ends = np.minimum(gap_ends[:, None], (run_ends[None, :] - 1) * self.step_minutes)
+        usable = window_ends - window_starts >= min_minutes
+
+        windows = [[] for _ in gaps]
+        for g, r in zip(*np.nonzero(usable)):
+            first = int(np.ceil(window_starts[g, r] / self.step_minutes))
+            last = int(window_ends[g, r] // self.step_minutes) + 1
+            lowest = first + int(np.argmin(self.heights[first:last]))
+            windows[g].append({
+                'start': self.start + timedelta(minutes=float(window_starts[g, r])),
+                'end': self.start + timedelta(minutes=float(window_ends[g, r])),
+                'lowest_ft': round(float(self.heights[lowest]), 2),
+                'lowest_at': self.start + timedelta(minutes=lowest * self.step_minutes)
+            })
+        return windows
+
+    @classmethod
+    def from_predictions(cls, predictions: List[Dict]) -> 'TideSeries':
+        """Build from NOAA prediction records ({'t': "2025-11-07 06:30", 'v': "5.123"})"""
+        times = [datetime.strptime(p['t'], '%Y-%m-%d %H:%M') for p in predictions]
+        start = times[0]
+        offsets = _minutes(times, start)
+        grid = np.arange(0, offsets[-1] + 1, SERIES_STEP_MINUTES, dtype=float)
+        heights = np.interp(grid, offsets, [float(p['v']) for p in predictions])
+        return cls(start, heights)
+
+    @classmethod
+    def from_events(cls, events: List[Tuple[datetime, float]]) -> 'TideSeries':
+        """Synthesize a series from high/low events with a cosine curve between them"""
+        events = sorted(events)
+        start = events[0][0]
+        event_minutes = _minutes([t for t, _ in events], start)
+        event_heights = np.array([h for _, h in events], dtype=float)
+        # Events aren't on the 6-minute grid - run one step past the last one
+        grid = np.arange(0, event_minutes[-1] + SERIES_STEP_MINUTES, SERIES_STEP_MINUTES, dtype=float)
+        i = np.clip(np.searchsorted(event_minutes, grid, side='right') - 1, 0, max(len(events) - 2, 0))
+        if len(events) < 2:
+            return cls(start, np.full(len(grid), event_heights[0]))
+        span = event_minutes[i + 1] - event_minutes[i]
+        fraction = np.clip((grid - event_minutes[i]) / span, 0, 1)
+        heights = event_heights[i] + (event_heights[i + 1] - event_heights[i]) * (1 - np.cos(np.pi * fraction)) / 2
+        return cls(start, heights)
+
+    @classmethod
+    def from_daily_tides(cls, daily_tides: Dict) -> Optional['TideSeries']:
+        """Build from get_tide_data()'s {date: {'high': [...], 'low': [...]}} events"""
+        events = [
+            (datetime.strptime(f"{date_str} {tide['time_24hr']}", '%Y-%m-%d %H:%M'), tide['height'])
+            for date_str, day in daily_tides.items() if isinstance(day, dict)
+            for kind in ('high', 'low') for tide in day.get(kind, [])
+        ]
+        return cls.from_events(events) if events else None
+
+
+def format_window(window: Dict) -> str:
+    """Display text for a low_tide_windows() entry, e.g. 1:12 PM-3:06 PM (0.3 ft)"""
+    start = window['start'].strftime('%I:%M %p').lstrip('0')
+    end = window['end'].strftime('%I:%M %p').lstrip('0')
+    return f"{start}-{end} ({window['lowest_ft']} ft)"
@@ -0,0 +1,151 @@
+"""
+Time and Duration Parsing
+The one parser for schedule times ("10:00 AM", "14:30") and durations
+("1.5 hours", "2h 10m", "45min-1 hour", "All day") used across the app
+
+Patterns are compiled once and results are memoized per distinct string
+(schedules repeat the same handful of values), and parse_durations() /
+parse_clocks() turn whole columns into NumPy arrays, parsing each distinct
+value only once. Missing or unparsable values come back as None (NaN in
+batches) so each caller keeps its own default.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import numpy as np
+
+CACHE_SIZE = 2048
+ALL_DAY_MINUTES = 8 * 60
+HALF_DAY_MINUTES = 4 * 60
+FLEXIBLE_MINUTES = 60
+
+_CLOCK_12 = re.compile(r'^(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m?\.?$')
+_CLOCK_24 = re.compile(r'^(\d{1,2}):(\d{2})$')
+_HOURS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:hours?|hrs?|h)(?![a-z])')
+_MINUTES = re.compile(r'(\d+(?:\.\d+)?)\s*(?:minutes?|mins?|m)(?![a-z])')
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_RANGE = re.compile(r'\s*(?:-|–|\bto\b)\s*')
+_NOTE = re.compile(r'\([^)]*\)')  # "1.5 hours (8:00-9:30 PM)"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _clock(text: str) -> Optional[int]:
+    match = _CLOCK_12.match(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2) or 0)
+        if not 1 <= hour <= 12 or minute > 59:
+            return None
+        return (hour % 12 + (12 if match.group(3) == 'p' else 0)) * 60 + minute
+    match = _CLOCK_24.match(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        return hour * 60 + minute if hour < 24 and minute < 60 else None
+    return None
+
+
+def parse_clock(time_str) -> Optional[int]:
+    """Minutes after midnight for "10:00 AM", "10am", "14:30"
+
+    Args:
+        time_str: Schedule time string
+
+    Returns:
+        int: Minutes after midnight, or None ("TBD", empty, invalid)
+    """
+    if not isinstance(time_str, str):
+        return None
+    return _clock(time_str.strip().lower())
+
+
+def _part(text: str, unit_minutes: Optional[float] = None) -> Optional[float]:
+    """Minutes for one value; a bare number uses unit_minutes (hours by default)"""
+    hours = _HOURS.findall(text)
+    minutes = _MINUTES.findall(text)
+    if hours or minutes:
+        return sum(float(h) for h in hours) * 60 + sum(float(m) for m in minutes)
+    number = _NUMBER.search(text)
+    if not number:
+        return None
+    return float(number.group()) * (unit_minutes or 60)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _duration(text: str) -> Optional[int]:
+    if not text or text == 'n/a':
+        return None
+    if 'all day' in text or 'full day' in text:
+        return ALL_DAY_MINUTES
+    if 'half day' in text:
+        return HALF_DAY_MINUTES
+    text = _NOTE.sub(' ', text).strip() or text
+
+    parts = _RANGE.split(text, maxsplit=1)
+    if len(parts) == 2 and _NUMBER.search(parts[0]) and _NUMBER.search(parts[1]):
+        # "2-3 hours" - the low end borrows the high end's unit
+        high = _part(parts[1])
+        high_unit = 1 if _MINUTES.search(parts[1]) and not _HOURS.search(parts[1]) else 60
+        low = _part(parts[0], unit_minutes=high_unit)
+        if low is not None and high is not None:
+            return int((low + high) / 2)
+
+    minutes = _part(text)
+    if minutes is None:
+        return FLEXIBLE_MINUTES if 'flexible' in text else None
+    return int(minutes)
+
+
+def parse_duration(duration) -> Optional[int]:
+    """Minutes for a duration; ranges average, numbers are minutes
+
+    Args:
+        duration: "1.5 hours", "90 min", "2h 10m", "2-3 hours",
+                  "45min-1 hour", "All day", or a number of minutes
+
+    Returns:
+        int: Minutes, or None if there is no duration in it
+    """
+    if isinstance(duration, bool) or duration is None:
+        return None
+    if isinstance(duration, (int, float)):
+        return None if duration != duration else int(duration)  # NaN check
+    return _duration(str(duration).strip().lower())
+
+
+def parse_durations(values: Iterable, default: float = np.nan) -> np.ndarray:
+    """Minutes for a whole column of durations (each distinct value parsed once)"""
+    values = list(values)
+    parsed = {}
+    for value in values:
+        key = value if isinstance(value, str) or value is None else repr(value)
+        if key not in parsed:
+            minutes = parse_duration(value)
+            parsed[key] = default if minutes is None else minutes
+    return np.fromiter(
+        (parsed[value if isinstance(value, str) or value is None else repr(value)] for value in values),
+        dtype=float, count=len(values)
+    )
+
+
+def parse_clocks(values: Iterable, default: float = np.nan) -> np.ndarray:
+    """Minutes after midnight for a whole column of times"""
+    values = list(values)
+    parsed = {}
+    for value in values:
+        if value not in parsed:
+            minutes = parse_clock(value)
+            parsed[value] = default if minutes is None else minutes
+    return np.fromiter((parsed[value] for value in values), dtype=float, count=len(values))
+
+
+def format_clock(minutes: float) -> str:
+    """Minutes after midnight -> "01:30 PM" (wraps past midnight)"""
+    minutes = int(minutes) % (24 * 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def cache_info() -> dict:
+    """Memoization hit/miss counts for diagnostics"""
+    return {'clock': _clock.cache_info()._asdict(), 'duration': _duration.cache_info()._asdict()}
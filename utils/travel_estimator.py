@@ -0,0 +1,194 @@
+"""
+Offline Travel-Time Estimator
+Estimates drive times from coordinates alone - no API call, microseconds
+per query - so it can answer every travel-time question first
+
+Straight-line (haversine) distance is turned into road miles with a
+circuity factor and into minutes with an average speed, both per distance
+band (local streets, island roads, highway). The factors start from
+sensible defaults and are recalibrated from every Google Distance Matrix
+response the travel-time matrix receives; live traffic then only refines
+the estimate.
+"""
+
+import json
+import math
+import os
+import threading
+from bisect import bisect_right
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Straight-line miles where each band starts: local, island roads, highway
+BAND_EDGES = (0.0, 3.0, 10.0)
+# Defaults per band: (road miles per straight mile, average mph)
+DEFAULT_FACTORS = ((1.4, 20.0), (1.35, 30.0), (1.6, 42.0))
+# Reference straight-line miles per band for the default pseudo-samples
+BAND_REFERENCE_MILES = (1.5, 6.0, 15.0)
+PRIOR_SAMPLES = 5  # defaults count as this many observations per band
+OVERHEAD_MINUTES = 3  # parking, walking to the door
+
+CALIBRATION_FILE = os.getenv('TRAVEL_CALIBRATION_PATH', 'data/travel_calibration.json')
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles (works on scalars or NumPy arrays)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def coordinates(location) -> Optional[Tuple[float, float]]:
+    """(lat, lon) from a location dict or a "lat,lon" string, else None"""
+    try:
+        if isinstance(location, dict):
+            if location.get('lat') is None or location.get('lon') is None:
+                return None
+            return float(location['lat']), float(location['lon'])
+        lat, lon = str(location).split(',')
+        return float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+
+
+class TravelTimeEstimator:
+    """Haversine distance x calibrated circuity / speed per distance band"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        # Running sums per band: straight miles, road miles, driving hours
+        self.samples = [0] * len(BAND_EDGES)
+        self._straight = np.array([PRIOR_SAMPLES * ref for ref in BAND_REFERENCE_MILES])
+        self._road = self._straight * np.array([c for c, _ in DEFAULT_FACTORS])
+        self._hours = self._road / np.array([s for _, s in DEFAULT_FACTORS])
+        if path:
+            self._load()
+        self._refresh_factors()
+
+    def _refresh_factors(self):
+        self.circuity = self._road / self._straight
+        self.speed_mph = self._road / self._hours
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            self.samples = saved['samples']
+            self._straight = np.array(saved['straight_miles'])
+            self._road = np.array(saved['road_miles'])
+            self._hours = np.array(saved['hours'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Could not read travel calibration ({e}) - using defaults")
+
+    def save(self):
+        """Write the calibration so it survives restarts"""
+        if not self.path:
+            return
+        try:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._lock:
+                saved = {
+                    'samples': self.samples,
+                    'straight_miles': self._straight.tolist(),
+                    'road_miles': self._road.tolist(),
+                    'hours': self._hours.tolist()
+                }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not save travel calibration: {e}")
+
+    def observe(self, origin, destination, road_meters, duration_seconds):
+        """Learn from one Google response (traffic-free duration)
+
+        Args:
+            origin: Location dict or "lat,lon" string
+            destination: Location dict or "lat,lon" string
+            road_meters (float): Google's route distance
+            duration_seconds (float): Google's duration without traffic
+
+        Returns:
+            bool: Whether the sample was used
+        """
+        start, end = coordinates(origin), coordinates(destination)
+        if not start or not end or road_meters <= 0 or duration_seconds <= 0:
+            return False
+        straight = float(haversine_miles(start[0], start[1], end[0], end[1]))
+        if straight < 0.1:
+            return False  # Same place - circuity is meaningless
+
+        band = int(np.searchsorted(BAND_EDGES, straight, side='right')) - 1
+        with self._lock:
+            self.samples[band] += 1
+            self._straight[band] += straight
+            self._road[band] += road_meters / 1609.344
+            self._hours[band] += duration_seconds / 3600
+            self._refresh_factors()
+        return True
+
+    def estimate_matrix(self, origins, destinations):
+        """Drive minutes and road miles for every origin/destination pair
+
+        Args:
+            origins: Array-like of (lat, lon), shape (N, 2)
+            destinations: Array-like of (lat, lon), shape (M, 2)
+
+        Returns:
+            tuple: (minutes array (N, M), road miles array (N, M))
+        """
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=float).reshape(-1, 2)
+        straight = haversine_miles(origins[:, None, 0], origins[:, None, 1],
+                                   destinations[None, :, 0], destinations[None, :, 1])
+        band = np.searchsorted(BAND_EDGES, straight, side='right') - 1
+        road = straight * self.circuity[band]
+        minutes = np.where(straight < 0.05, 0.0, OVERHEAD_MINUTES + road / self.speed_mph[band] * 60)
+        return minutes, road
+
+    def estimate(self, origin, destination) -> Optional[Dict]:
+        """Estimated drive between two locations
+
+        Args:
+            origin: Location dict or "lat,lon" string
+            destination: Location dict or "lat,lon" string
+
+        Returns:
+            Dict with 'minutes' (rounded up) and 'miles' (road), or None
+            if either location has no coordinates
+        """
+        start, end = coordinates(origin), coordinates(destination)
+        if not start or not end:
+            return None
+        # Scalar math for single pairs - NumPy's per-call overhead dominates here
+        lat1, lon1, lat2, lon2 = map(math.radians, (*start, *end))
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        straight = 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+        if straight < 0.05:
+            return {'minutes': 0, 'miles': 0.0}
+        band = bisect_right(BAND_EDGES, straight) - 1
+        road = straight * self.circuity[band]
+        minutes = OVERHEAD_MINUTES + road / self.speed_mph[band] * 60
+        return {'minutes': math.ceil(minutes), 'miles': round(float(road), 1)}
+
+
+_estimator = None
+_estimator_lock = threading.Lock()
+
+
+def get_estimator() -> TravelTimeEstimator:
+    """Get the shared estimator (loads the saved calibration on first use)"""
+    global _estimator
+    if _estimator is None:
+        with _estimator_lock:
+            if _estimator is None:
+                _estimator = TravelTimeEstimator(CALIBRATION_FILE)
+    return _estimator
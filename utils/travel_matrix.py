@@ -0,0 +1,349 @@
+"""
+Travel-Time Matrix for Trip Locations
+Serves every drive-time query from one cached Google Distance Matrix
+
+The matrix covers each distinct trip location (hotel, airport, scheduled
+activities) as origins and destinations; catalog places are added as
+destinations. A miss fills every missing cell of the matrix in as few
+batched Distance Matrix calls as the API limits allow (25 origins, 25
+destinations, 100 elements per call), so the rest of the page is served
+from memory.
+
+Departure times are quantized into DEPARTURE_BUCKET_MINUTES buckets: all
+queries for "now" (or for times in the same window) share one set of
+cells instead of each getting a unique cache key. Every answer also
+recalibrates the offline estimator (utils/travel_estimator.py).
+
+Fills run outside the matrix lock, so cached lookups and peeks never wait
+on the network; answers are merged in afterwards. A bucket whose fill
+failed (no API key, API error) isn't retried for FAILED_FILL_RETRY_SECONDS.
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import streamlit as st
+
+from utils import http_client
+from utils.travel_estimator import get_estimator
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Google Distance Matrix limits per request
+MAX_ORIGINS_PER_CALL = 25
+MAX_DESTINATIONS_PER_CALL = 25
+MAX_ELEMENTS_PER_CALL = 100
+
+DEPARTURE_BUCKET_MINUTES = 15
+MAX_CACHED_BUCKETS = 96  # one day of future buckets
+FAILED_FILL_RETRY_SECONDS = 60
+
+# Catalog places have no coordinates - locate them by name on the island
+CATALOG_AREA = "Amelia Island, FL"
+
+Location = Union[str, Dict]
+
+
+def get_api_key():
+    """Get Google Maps API key from Streamlit secrets"""
+    try:
+        return st.secrets.get("GOOGLE_MAPS_API_KEY", "")
+    except:
+        return ""
+
+
+def location_key(location: Location) -> Optional[str]:
+    """Canonical matrix key for a location (coordinates when known)
+
+    Args:
+        location: Location dict ('lat'/'lon', 'address' or 'name') or a
+            plain address / "lat,lon" string
+
+    Returns:
+        String sent to Google for this location, or None
+    """
+    if not location:
+        return None
+    if isinstance(location, str):
+        return location.strip() or None
+    if location.get('lat') is not None and location.get('lon') is not None:
+        return f"{location['lat']},{location['lon']}"
+    return location.get('address') or location.get('name') or None
+
+
+def _aliases(location: Location) -> List[str]:
+    """Every string a caller might use for the same location"""
+    if isinstance(location, str):
+        return [location.strip()]
+    return [str(location[field]).strip() for field in ('address', 'name') if location.get(field)]
+
+
+def departure_bucket(departure_time=None, now: Optional[float] = None) -> int:
+    """Quantize a departure time to the start of its bucket
+
+    Args:
+        departure_time: Unix timestamp, 'now' or None (both mean now);
+            times in the past are treated as now
+        now: Current time (for tests)
+
+    Returns:
+        int: Unix timestamp of the bucket start
+    """
+    now = time.time() if now is None else now
+    size = DEPARTURE_BUCKET_MINUTES * 60
+    current = int(now // size * size)
+    if departure_time in (None, 'now'):
+        return current
+    return max(current, int(float(departure_time) // size * size))
+
+
+def _plan_chunks(rows: int, cols: int) -> Tuple[int, int]:
+    """Pick the origin/destination chunk sizes needing the fewest calls"""
+    best = None
+    for origin_chunk in range(1, min(rows, MAX_ORIGINS_PER_CALL) + 1):
+        destination_chunk = min(cols, MAX_DESTINATIONS_PER_CALL, MAX_ELEMENTS_PER_CALL // origin_chunk)
+        calls = math.ceil(rows / origin_chunk) * math.ceil(cols / destination_chunk)
+        if best is None or calls < best[0]:
+            best = (calls, origin_chunk, destination_chunk)
+    return best[1], best[2]
+
+
+def collect_trip_locations(activities: Iterable[Dict], catalog: Optional[Dict] = None,
+                           fixed: Iterable[Dict] = ()) -> Tuple[List[Dict], List[Dict]]:
+    """Collect the distinct trip and catalog locations
+
+    Args:
+        activities: Scheduled activities (each with a 'location' dict)
+        catalog: Optional-activities catalog (category -> list of places)
+        fixed: Locations always included (hotel, airport)
+
+    Returns:
+        tuple: (trip locations - used as origins and destinations,
+                catalog locations - used as destinations)
+    """
+    trip, seen = [], set()
+    for location in list(fixed) + [a.get('location') for a in activities]:
+        key = location_key(location) if isinstance(location, dict) else None
+        if key and key != 'N/A' and key not in seen:
+            seen.add(key)
+            trip.append(location)
+
+    places = []
+    for items in (catalog or {}).values():
+        for item in items:
+            name = item.get('name')
+            if not name:
+                continue
+            place = {'name': name, 'address': item.get('address') or f"{name}, {CATALOG_AREA}"}
+            key = location_key(place)
+            if key not in seen:
+                seen.add(key)
+                places.append(place)
+    return trip, places
+
+
+class TravelTimeMatrix:
+    """Distance Matrix cells cached per departure bucket"""
+
+    def __init__(self, api_key_getter=get_api_key, clock=time.monotonic):
+        self._api_key = api_key_getter
+        self._clock = clock
+        self.origins = []  # canonical keys, in insertion order
+        self.destinations = []
+        self._aliases = {}  # any known spelling -> canonical key
+        self._buckets = {}  # bucket -> {(origin, destination): element}
+        self._failed = {}  # bucket -> clock time its next fill may be tried
+        self._lock = threading.RLock()
+        self._refreshing = set()  # background refreshes in flight
+        self.stats = {'calls': 0, 'elements': 0, 'hits': 0, 'misses': 0}
+
+    def _register(self, location: Location, as_origin: bool) -> Optional[str]:
+        key = location_key(location)
+        if not key:
+            return None
+        key = self._aliases.get(key, key)
+        for alias in _aliases(location) + [key]:
+            self._aliases.setdefault(alias, key)
+        if as_origin and key not in self.origins:
+            self.origins.append(key)
+        if key not in self.destinations:
+            self.destinations.append(key)
+        return key
+
+    def add_locations(self, origins: Iterable[Location] = (), destinations: Iterable[Location] = ()):
+        """Add locations to the matrix (origins are also destinations)"""
+        with self._lock:
+            for location in origins:
+                self._register(location, as_origin=True)
+            for location in destinations:
+                self._register(location, as_origin=False)
+
+    def _cells(self, bucket: int) -> Dict:
+        """Cells for a bucket, dropping buckets that have passed"""
+        if bucket not in self._buckets:
+            current = departure_bucket()
+            for old in [b for b in self._buckets if b < current]:
+                del self._buckets[old]
+            while len(self._buckets) >= MAX_CACHED_BUCKETS:
+                del self._buckets[max(self._buckets)]
+            self._buckets[bucket] = {}
+        return self._buckets[bucket]
+
+    def _fill(self, bucket: int, origins: List[str], destinations: List[str]) -> bool:
+        """Fetch every missing cell of origins x destinations for a bucket
+
+        Call without holding the lock: only the planning and the merge of
+        the answers take it, never the network calls.
+        """
+        with self._lock:
+            cells = self._cells(bucket)
+            rows = [o for o in origins if any((o, d) not in cells for d in destinations)]
+            cols = [d for d in destinations if any((o, d) not in cells for o in rows)]
+            if not rows:
+                return True
+            if self._clock() < self._failed.get(bucket, 0):
+                return False  # Failed recently - don't retry the whole batch on every miss
+
+        api_key = self._api_key()
+        fetched = {}
+        ok = bool(api_key) and self._fetch(bucket, rows, cols, api_key, fetched)
+
+        with self._lock:
+            self._cells(bucket).update(fetched)
+            self.stats['elements'] += len(fetched)
+            if ok:
+                self._failed.pop(bucket, None)
+            else:
+                self._failed[bucket] = self._clock() + FAILED_FILL_RETRY_SECONDS
+        return ok
+
+    def _fetch(self, bucket: int, rows: List[str], cols: List[str], api_key: str, fetched: Dict) -> bool:
+        """Batched Distance Matrix calls for rows x cols, answers into fetched"""
+        departure = 'now' if bucket <= departure_bucket() else bucket
+        estimator = get_estimator()
+        learned = 0
+        origin_chunk, destination_chunk = _plan_chunks(len(rows), len(cols))
+        for i in range(0, len(rows), origin_chunk):
+            chunk_origins = rows[i:i + origin_chunk]
+            for j in range(0, len(cols), destination_chunk):
+                chunk_destinations = cols[j:j + destination_chunk]
+                try:
+                    resp = http_client.get(DISTANCE_MATRIX_URL, params={
+                        'origins': '|'.join(chunk_origins),
+                        'destinations': '|'.join(chunk_destinations),
+                        'departure_time': departure,
+                        'traffic_model': 'best_guess',
+                        'key': api_key
+                    }, timeout=10)
+                    with self._lock:
+                        self.stats['calls'] += 1
+                    data = resp.json() if resp.status_code == 200 else {}
+                    if data.get('status') != 'OK':
+                        print(f"Distance Matrix error: {data.get('status', resp.status_code)}")
+                        return False
+                    for origin, row in zip(chunk_origins, data['rows']):
+                        for destination, element in zip(chunk_destinations, row['elements']):
+                            fetched[(origin, destination)] = element
+                            # Every answer recalibrates the offline estimator
+                            if element.get('status') == 'OK' and estimator.observe(
+                                    origin, destination, element['distance']['value'], element['duration']['value']):
+                                learned += 1
+                except Exception as e:
+                    print(f"Distance Matrix request failed: {e}")
+                    return False
+                finally:
+                    if learned:
+                        estimator.save()
+                        learned = 0
+        return True
+
+    def lookup(self, origin: Location, destination: Location, departure_time=None) -> Optional[Dict]:
+        """Travel time between two locations
+
+        Args:
+            origin: Location dict or address / "lat,lon" string
+            destination: Location dict or address / "lat,lon" string
+            departure_time: Unix timestamp, 'now' or None
+
+        Returns:
+            Distance Matrix element (distance, duration, duration_in_traffic)
+            or None if unavailable
+        """
+        bucket = departure_bucket(departure_time)
+        with self._lock:
+            origin_key = self._register(origin, as_origin=True)
+            destination_key = self._register(destination, as_origin=False)
+            if not origin_key or not destination_key:
+                return None
+
+            hit = (origin_key, destination_key) in self._cells(bucket)
+            if hit:
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                # Fill the trip block plus this destination's column in one go
+                origins = list(self.origins)
+                trip_destinations = [d for d in self.destinations if d in self.origins]
+                if destination_key not in trip_destinations:
+                    trip_destinations.append(destination_key)
+
+        if not hit:
+            self._fill(bucket, origins, trip_destinations)
+        with self._lock:
+            element = self._cells(bucket).get((origin_key, destination_key))
+        if element and element.get('status') == 'OK':
+            return element
+        return None
+
+    def peek(self, origin: Location, destination: Location, departure_time=None) -> Optional[Dict]:
+        """Cached travel time only - never calls the API"""
+        with self._lock:
+            origin_key = self._aliases.get(location_key(origin), location_key(origin))
+            destination_key = self._aliases.get(location_key(destination), location_key(destination))
+            element = self._buckets.get(departure_bucket(departure_time), {}).get((origin_key, destination_key))
+        if element and element.get('status') == 'OK':
+            return element
+        return None
+
+    def refresh_async(self, origin: Location, destination: Location, departure_time=None):
+        """Fill the cell in the background so a later query gets live traffic"""
+        if not self._api_key():
+            return
+        request = (location_key(origin), location_key(destination), departure_bucket(departure_time))
+        with self._lock:
+            if request in self._refreshing:
+                return
+            self._refreshing.add(request)
+
+        def refresh():
+            try:
+                self.lookup(origin, destination, departure_time)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(request)
+        _refresher.submit(refresh)
+
+    def prefetch(self, departure_time=None) -> bool:
+        """Fill the whole origins x destinations matrix for a departure bucket"""
+        with self._lock:
+            origins, destinations = list(self.origins), list(self.destinations)
+        return self._fill(departure_bucket(departure_time), origins, destinations)
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+# One worker is enough - background refreshes are rare and coalesced per cell
+_refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='travel-matrix')
+
+
+def get_travel_matrix() -> TravelTimeMatrix:
+    """Get the shared travel-time matrix (created on first use)"""
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                _matrix = TravelTimeMatrix()
+    return _matrix
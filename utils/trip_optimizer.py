@@ -0,0 +1,270 @@
+"""
+Trip Optimizer
+Plans every open slot of the trip at once instead of filling each day greedily
+
+The catalog is scored against all open slots (breakfast, morning, lunch,
+afternoon, dinner on every day) in one pass with utils.catalog_scoring,
+then a beam search walks the slots in order keeping the best partial
+plans. Constraints:
+- No repeats: an item is picked once (repeatable resort amenities once per
+  day), and never if it's already on the schedule
+- Daily budget for what the plan adds, and a cap on activities per day
+- No overlap with activities already booked; a meal slot that starts
+  during an arrival (the flight in, John getting to the hotel) moves to
+  just after it
+- Travel: drive time between consecutive picks (and from the hotel) is a
+  penalty, as is running late into the next slot
+- Weather, tides and ratings through the slot scores; John's preferences
+  (avoid seafood-focused or Mexican restaurants) filter the candidates
+"""
+
+import math
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.activity_model import ActivityType, normalize_activities
+from utils.catalog_scoring import CatalogFeatures, TideCheck, score_slots
+from utils.schedule_index import ScheduleIndex
+from utils.time_parsing import format_clock, parse_clock
+
+BEAM_WIDTH = 48
+CANDIDATES_PER_SLOT = 12
+ACTIVITY_MIN_SCORE = 50  # Leave an activity slot open rather than recommend a weak fit
+DEFAULT_BUDGET_PER_DAY = 200
+DEFAULT_MAX_ACTIVITIES = 3
+DEFAULT_TRAVEL_MINUTES = 15  # Anywhere on the island when the matrix has no answer
+TRAVEL_POINTS_PER_MINUTE = 0.25
+LATE_POINTS_PER_MINUTE = 0.5
+MEAL_ROUND_MINUTES = 30  # A meal moved past an arrival starts on the next half hour
+
+# Slots of a trip day; `filled` is (dining only, from hour, to hour) - the
+# slot is taken if the day already has an activity starting in that window
+SLOT_TEMPLATES = (
+    {'kind': 'breakfast', 'time': '8:00 AM', 'meal': True, 'duration': '45 minutes',
+     'reason': 'Start your day with highly-rated breakfast', 'filled': (True, 0, 11)},
+    {'kind': 'morning', 'time': '10:00 AM', 'meal': False, 'filled': (False, 9, 12),
+     'boost': 15, 'boost_words': ['beach', 'kayak', 'bike', 'walk', 'boat']},
+    {'kind': 'lunch', 'time': '12:30 PM', 'meal': True, 'duration': '1 hour',
+     'reason': 'Refuel with a great lunch spot', 'filled': (True, 11, 16)},
+    {'kind': 'afternoon', 'time': '3:00 PM', 'meal': False, 'filled': (False, 14, 17),
+     'boost': 10, 'boost_words': ['spa', 'massage', 'wine', 'museum']},
+    {'kind': 'dinner', 'time': '6:30 PM', 'meal': True, 'duration': '1.5 hours',
+     'reason': 'End the day with an amazing dinner', 'filled': (True, 16, 24)},
+)
+
+# Catalog categories (matched by substring) serving each meal
+MEAL_CATEGORIES = {
+    'breakfast': ('Breakfast', 'Coffee'),
+    'lunch': ('Casual & Comfort', 'Delis', 'Pizza', 'Asian', 'Mexican', 'Seafood', 'Ritz-Carlton Dining'),
+    'dinner': ('Fine Dining', 'Pizza', 'Asian', 'Mexican', 'Seafood', 'Ritz-Carlton Dining', 'Special Dining'),
+}
+# Not activity-slot material: bars, in-room services, kids' programs, the
+# spa menu link and the already-booked birthday spa day
+NON_ACTIVITY_CATEGORIES = ('Bars', 'Hotel Services', 'Kids', 'Spa Menu', 'Birthday Spa')
+# John's preferences -> catalog categories to leave out
+PREFERENCE_EXCLUSIONS = {'avoid_seafood_focused': 'Seafood', 'avoid_mexican': 'Mexican'}
+ON_SITE_WORDS = ('ritz', 'resort', 'hotel guests', 'poolside', 'cabana')
+
+# (origin item or None for the hotel, destination item) -> drive minutes or None
+TravelMinutes = Callable[[Optional[Dict], Dict], Optional[float]]
+
+_State = namedtuple('_State', 'value picks used day_items date spend count last_item last_end')
+
+
+def _is_set(value) -> bool:
+    """Preference flags are stored as True/False or "true"/"false" """
+    return value is True or str(value).lower() == 'true'
+
+
+def _after_arrivals(start: int, arrivals: List) -> int:
+    """Move a meal start out of any arrival block it falls in"""
+    for item in arrivals:
+        end = item.end_with_default(0)
+        if item.start <= start < end:
+            start = math.ceil(end / MEAL_ROUND_MINUTES) * MEAL_ROUND_MINUTES
+    return start
+
+
+def day_slots(date_str: str, day_activities: Iterable[Dict], kinds: Optional[Iterable[str]] = None,
+              include_meals: bool = True, times: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """Open slots for one day
+
+    Args:
+        date_str: "2025-11-09"
+        day_activities: Activities already scheduled that day
+        kinds: Slot kinds allowed (e.g. only 'dinner' on arrival day)
+        include_meals: Whether to plan meals
+        times: Preferred start per slot kind (e.g. {'dinner': "8:00 PM"})
+
+    Returns:
+        list: Slot dicts (copies of SLOT_TEMPLATES with 'date'), in time order
+    """
+    day_activities = list(day_activities)
+    starts = [(a.get('type') == 'dining', parse_clock(a.get('time'))) for a in day_activities]
+    arrivals = [item for item in normalize_activities(day_activities)
+                if item.is_scheduled and item.type is ActivityType.TRANSPORT and 'arriv' in item.name.lower()]
+    slots = []
+    for template in SLOT_TEMPLATES:
+        if kinds is not None and template['kind'] not in kinds:
+            continue
+        if template['meal'] and not include_meals:
+            continue
+        dining_only, from_hour, to_hour = template['filled']
+        if any(start is not None and from_hour * 60 <= start < to_hour * 60 and (is_dining or not dining_only)
+               for is_dining, start in starts):
+            continue
+        slot = dict(template, date=date_str)
+        if times and template['kind'] in times:
+            slot['time'] = times[template['kind']]
+        if template['meal'] and arrivals:
+            start = parse_clock(slot['time'])
+            moved = _after_arrivals(start, arrivals)
+            if moved != start:
+                slot['time'] = format_clock(moved).lstrip('0')
+        slots.append(slot)
+    return slots
+
+
+def _catalog_items(catalog: Dict[str, List[Dict]], preferences: Dict):
+    """Flatten the catalog: (items, {slot kind: eligible mask})"""
+    excluded = [category for key, category in PREFERENCE_EXCLUSIONS.items() if _is_set(preferences.get(key))]
+    items, categories = [], []
+    for category, entries in catalog.items():
+        if any(word in category for word in excluded):
+            continue
+        for item in entries:
+            if item.get('name') and not item.get('view_full_spa_menu'):
+                items.append(item)
+                categories.append(category)
+
+    eligible = {kind: np.array([any(word in c for word in words) for c in categories], dtype=bool)
+                for kind, words in MEAL_CATEGORIES.items()}
+    meal_any = np.logical_or.reduce(list(eligible.values())) if items else np.zeros(0, dtype=bool)
+    not_activity = np.array([any(word in c for word in NON_ACTIVITY_CATEGORIES) for c in categories], dtype=bool)
+    activity = ~(meal_any | not_activity) if items else np.zeros(0, dtype=bool)
+    eligible['morning'] = eligible['afternoon'] = activity
+    return items, eligible
+
+
+def _on_site(item: Dict) -> bool:
+    text = f"{item.get('name', '')} {item.get('cost_range', '')}".lower()
+    return any(word in text for word in ON_SITE_WORDS)
+
+
+def plan_trip(catalog: Dict[str, List[Dict]], slots: List[Dict], weather_data: Optional[Dict],
+              existing_activities: Iterable[Dict] = (), preferences: Optional[Dict] = None,
+              tide_check: Optional[TideCheck] = None, travel_minutes: Optional[TravelMinutes] = None,
+              beam_width: int = BEAM_WIDTH) -> Dict[str, List[Dict]]:
+    """Best plan for every open slot of the trip
+
+    Args:
+        catalog: get_optional_activities() (category -> items)
+        slots: Open slots from day_slots() for every day to plan
+        weather_data: get_weather_ultimate() data
+        existing_activities: The current schedule (for repeats and overlaps)
+        preferences: budget_per_day, max_activities, plus John's
+                     avoid_seafood_focused / avoid_mexican flags
+        tide_check: Beach tide bonus (see catalog_scoring.score_slots)
+        travel_minutes: Drive time lookup; DEFAULT_TRAVEL_MINUTES if None
+        beam_width: Partial plans kept per step
+
+    Returns:
+        dict: date -> recommendations in time order, each {time, activity,
+              type, reason, duration, score, travel_minutes}
+    """
+    preferences = preferences or {}
+    existing_activities = list(existing_activities)
+    budget = preferences.get('budget_per_day', DEFAULT_BUDGET_PER_DAY)
+    max_activities = preferences.get('max_activities', DEFAULT_MAX_ACTIVITIES)
+    plan = {slot['date']: [] for slot in slots}
+
+    items, eligible = _catalog_items(catalog, preferences)
+    slots = sorted(slots, key=lambda slot: (slot['date'], parse_clock(slot['time'])))
+    if not items or not slots:
+        return plan
+
+    features = CatalogFeatures(items)
+    slot_scores = score_slots(features, slots, weather_data, tide_check)
+    scores, durations, costs = slot_scores.scores, features['duration'], features['cost']
+    repeatable = [bool(item.get('is_repeatable')) for item in items]
+    on_site = [_on_site(item) for item in items]
+
+    # Already on the schedule - never recommend again
+    scheduled = {str(a.get('activity', a.get('name', ''))).strip().lower() for a in existing_activities}
+    unscheduled = np.array([item['name'].strip().lower() not in scheduled for item in items], dtype=bool)
+
+    # Candidates per slot: eligible, free of booked overlaps, best scores first
+    index = ScheduleIndex(existing_activities)
+    distinct_durations, duration_index = np.unique(durations, return_inverse=True)
+    starts, candidates = [], []
+    for t, slot in enumerate(slots):
+        starts.append(parse_clock(slot['time']))
+        clear = np.array([not index.find_conflicts(slot['date'], slot['time'], minutes)
+                          for minutes in distinct_durations], dtype=bool)[duration_index.reshape(-1)]
+        usable = eligible[slot['kind']] & unscheduled & clear
+        if not slot['meal']:
+            usable &= scores[t] > ACTIVITY_MIN_SCORE
+        order = np.argsort(-np.where(usable, scores[t], -np.inf), kind='stable')[:CANDIDATES_PER_SLOT]
+        candidates.append([int(i) for i in order if usable[i]])
+
+    travel_cache = {}
+
+    def travel(origin: Optional[int], destination: int) -> float:
+        key = (origin, destination)
+        if key not in travel_cache:
+            if on_site[destination] and (origin is None or on_site[origin]):
+                minutes = 0.0
+            else:
+                found = travel_minutes(None if origin is None else items[origin], items[destination]) \
+                    if travel_minutes else None
+                minutes = DEFAULT_TRAVEL_MINUTES if found is None else float(found)
+            travel_cache[key] = minutes
+        return travel_cache[key]
+
+    beam = [_State(0.0, (), frozenset(), frozenset(), None, 0.0, 0, None, None)]
+    for t, slot in enumerate(slots):
+        expanded = {}
+
+        def keep(state):
+            key = (state.used, state.day_items, state.date, state.spend, state.count, state.last_item, state.last_end)
+            if key not in expanded or state.value > expanded[key].value:
+                expanded[key] = state
+
+        for state in beam:
+            if state.date != slot['date']:  # New day: reset the day's running totals
+                state = state._replace(day_items=frozenset(), date=slot['date'], spend=0.0, count=0,
+                                       last_item=None, last_end=None)
+            keep(state)  # Leave the slot open
+            for i in candidates[t]:
+                if i in state.day_items or (i in state.used and not repeatable[i]):
+                    continue
+                if state.spend + costs[i] > budget:
+                    continue
+                if not slot['meal'] and state.count >= max_activities:
+                    continue
+                drive = travel(state.last_item, i)
+                late = 0 if state.last_end is None else max(0, state.last_end + drive - starts[t])
+                gain = scores[t, i] - TRAVEL_POINTS_PER_MINUTE * drive - LATE_POINTS_PER_MINUTE * late
+                keep(state._replace(
+                    value=state.value + gain, picks=state.picks + ((t, i, drive),),
+                    used=state.used | {i}, day_items=state.day_items | {i}, spend=state.spend + costs[i],
+                    count=state.count + (0 if slot['meal'] else 1), last_item=i,
+                    last_end=starts[t] + durations[i]
+                ))
+        beam = sorted(expanded.values(), key=lambda state: -state.value)[:beam_width]
+
+    for t, i, drive in beam[0].picks:
+        slot, item = slots[t], items[i]
+        reasons, _ = slot_scores.explain(t, i)
+        plan[slot['date']].append({
+            'time': slot['time'],
+            'activity': item,
+            'type': 'dining' if slot['meal'] else 'activity',
+            'reason': slot.get('reason') or ', '.join(reasons[:2]),
+            'duration': slot.get('duration') or item.get('duration', '2 hours'),
+            'score': int(scores[t, i]),
+            'travel_minutes': int(drive)
+        })
+    return plan
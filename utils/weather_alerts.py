@@ -7,10 +7,16 @@ and generates actionable alerts for:
 - High UV index for extended outdoor time
 - Strong winds for water activities
 - Temperature extremes
+
+When the weather data carries an hourly store ('hourly'), conditions are
+read for the activity's own hours rather than the whole day.
 """
 
 from datetime import datetime, timedelta
 
+from utils.hourly_weather import conditions_at
+from utils.time_parsing import parse_duration
+
 
 def check_weather_alerts(activities_data, weather_data):
     """Check weather conditions against activities and generate alerts
@@ -46,6 +52,9 @@ def check_weather_alerts(activities_data, weather_data):
         if not is_outdoor:
             continue
 
+        # Narrow to the activity's hours when hourly data is available
+        day_weather = _activity_weather(activity, day_weather, weather_data)
+
         # Check for rain
         if day_weather.get('rain_chance', 0) > 30:
             alerts.append({
@@ -107,6 +116,48 @@ def check_weather_alerts(activities_data, weather_data):
     return alerts
 
 
+def _activity_weather(activity, day_weather, weather_data):
+    """Weather for an activity - its own hours if known, else the whole day
+
+    Args:
+        activity (dict): Activity dictionary
+        day_weather (dict): Daily forecast entry for the activity's date
+        weather_data (dict): Weather data, optionally with an 'hourly' store
+
+    Returns:
+        dict: rain_chance, uv_index, wind_speed and high for the activity
+    """
+
+    conditions = conditions_at(weather_data, activity.get('date'), activity.get('time'),
+                               _duration_hours(activity))
+    if conditions:
+        return {
+            'rain_chance': int(round(conditions['precip_chance'])),
+            'uv_index': conditions['uv'],
+            'wind_speed': int(round(conditions['wind'])),
+            'high': int(round(conditions['temp'])),
+            'condition': conditions['condition']
+        }
+
+    # Daily entries from get_weather_ultimate use precipitation/wind
+    return {
+        **day_weather,
+        'rain_chance': _rain_chance(day_weather),
+        'wind_speed': day_weather.get('wind_speed', day_weather.get('wind', 0))
+    }
+
+
+def _rain_chance(day_weather):
+    """Rain chance from a daily entry ('rain_chance' or 'precipitation')"""
+    return day_weather.get('rain_chance', day_weather.get('precipitation', 0))
+
+
+def _duration_hours(activity, default=1):
+    """Activity length in hours ("2 hours", "90 min", "All day"), see parse_duration"""
+    minutes = parse_duration(activity.get('duration'))
+    return default if minutes is None else minutes / 60
+
+
 def _is_outdoor_activity(activity):
     """Determine if activity is outdoors
 
@@ -172,18 +223,9 @@ def _is_extended_outdoor(activity):
         bool: True if extended outdoor activity
     """
 
-    duration_str = activity.get('duration', '1 hour').lower()
-
-    # Parse duration
-    try:
-        if 'hour' in duration_str:
-            hours = float(duration_str.split('hour')[0].strip().split()[-1])
-            return hours >= 2
-        elif 'h' in duration_str:
-            hours = float(duration_str.split('h')[0].strip())
-            return hours >= 2
-    except:
-        pass
+    hours = _duration_hours(activity, default=None)
+    if hours is not None:
+        return hours >= 2
 
     # Assume extended for certain activities
     extended_activities = ['boat tour', 'beach', 'all day', 'full day', 'photography']
@@ -252,9 +294,10 @@ def generate_weather_briefing(activities_data, weather_data, target_date=None):
     outdoor_activities = [a for a in day_activities if _is_outdoor_activity(a)]
 
     # Generate summary
+    rain_chance = _rain_chance(day_weather)
     summary = f"{day_weather['condition']}, {day_weather['high']}°F / {day_weather['low']}°F"
-    if day_weather.get('rain_chance', 0) > 30:
-        summary += f" ({day_weather['rain_chance']}% chance of rain)"
+    if rain_chance > 30:
+        summary += f" ({rain_chance}% chance of rain)"
 
     # Get alerts for this day
     all_alerts = check_weather_alerts(activities_data, weather_data)
@@ -269,7 +312,7 @@ def generate_weather_briefing(activities_data, weather_data, target_date=None):
         if day_weather.get('uv_index', 0) >= 6:
             recommendations.append("☀️ Apply sunscreen before heading out")
 
-        if day_weather.get('rain_chance', 0) > 30:
+        if rain_chance > 30:
             recommendations.append("☂️ Pack umbrella or rain jacket")
 
         if day_weather['high'] > 85: